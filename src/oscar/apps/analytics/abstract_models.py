@@ -1,5 +1,7 @@
 from decimal import Decimal
 
+from django.conf import settings
+from django.core.files.storage import storages
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -31,6 +33,16 @@ class AbstractProductRecord(models.Model):
     # Product score - used within search
     score = models.FloatField(_("Score"), default=0.00)
 
+    # Used to recalculate the scores of changed records only
+    date_updated = models.DateTimeField(_("Date updated"), auto_now=True, db_index=True)
+    # The weighted counters and last change the score was calculated from
+    scored_activity = models.PositiveBigIntegerField(
+        _("Scored activity"), default=0, editable=False
+    )
+    date_scored = models.DateTimeField(
+        _("Date scored"), null=True, blank=True, editable=False, db_index=True
+    )
+
     class Meta:
         abstract = True
         app_label = "analytics"
@@ -117,3 +129,141 @@ class AbstractUserSearch(models.Model):
             "user": self.user,
             "query": self.query,
         }
+
+
+class AbstractSalesRecord(models.Model):
+    """
+    The sales of a period of time, maintained as orders are placed and
+    baskets are opened and closed.
+
+    Reading the records of a period costs the same however many orders
+    were placed.  The ``oscar_rebuild_sales_records`` command rebuilds them
+    from the orders, eg to backfill them or after orders have been deleted.
+    """
+
+    revenue = models.DecimalField(
+        _("Revenue (inc. tax)"), decimal_places=2, max_digits=16, default=0
+    )
+    num_orders = models.PositiveIntegerField(_("Orders"), default=0)
+    num_lines = models.PositiveIntegerField(_("Order lines"), default=0)
+    num_items = models.PositiveIntegerField(_("Order items"), default=0)
+    # Customers who placed their first order in the period
+    num_new_customers = models.PositiveIntegerField(_("New customers"), default=0)
+    # Baskets created in the period that are still open
+    num_open_baskets = models.IntegerField(_("Open baskets"), default=0)
+    date_updated = models.DateTimeField(_("Date updated"), auto_now=True)
+
+    class Meta:
+        abstract = True
+
+
+class AbstractHourlySalesRecord(AbstractSalesRecord):
+    hour = models.DateTimeField(_("Hour"), unique=True)
+
+    class Meta:
+        abstract = True
+        app_label = "analytics"
+        ordering = ["-hour"]
+        verbose_name = _("Hourly sales record")
+        verbose_name_plural = _("Hourly sales records")
+
+    def __str__(self):
+        return _("Sales of the hour from %s") % self.hour
+
+
+class AbstractDailySalesRecord(AbstractSalesRecord):
+    # The day in the current time zone
+    day = models.DateField(_("Day"), unique=True)
+
+    class Meta:
+        abstract = True
+        app_label = "analytics"
+        ordering = ["-day"]
+        verbose_name = _("Daily sales record")
+        verbose_name_plural = _("Daily sales records")
+
+    def __str__(self):
+        return _("Sales of %s") % self.day
+
+
+def get_report_storage():
+    return storages[settings.OSCAR_REPORT_STORAGE]
+
+
+class AbstractReportJob(models.Model):
+    """
+    A report generated in the background.
+
+    Jobs are created by the reports dashboard and run by the
+    ``oscar_run_report_jobs`` command, which saves the report as a
+    compressed file with Django's storage.  A completed report is served
+    again for the same report, date range and format until it's older than
+    ``OSCAR_REPORT_FILE_MAX_AGE``.
+    """
+
+    PENDING, RUNNING, COMPLETE, FAILED = "Pending", "Running", "Complete", "Failed"
+    STATUS_CHOICES = (
+        (PENDING, _("Pending")),
+        (RUNNING, _("Running")),
+        (COMPLETE, _("Complete")),
+        (FAILED, _("Failed")),
+    )
+
+    # The code of the report generator
+    code = models.CharField(_("Report"), max_length=128, db_index=True)
+    formatter = models.CharField(_("Format"), max_length=32, default="CSV")
+    start_date = models.DateField(_("Start date"), null=True, blank=True)
+    end_date = models.DateField(_("End date"), null=True, blank=True)
+
+    status = models.CharField(
+        _("Status"), max_length=32, choices=STATUS_CHOICES, default=PENDING
+    )
+    num_rows = models.PositiveIntegerField(_("Rows written"), default=0)
+    num_rows_total = models.PositiveIntegerField(_("Total rows"), null=True)
+    file = models.FileField(
+        _("File"),
+        upload_to=settings.OSCAR_REPORT_FOLDER,
+        storage=get_report_storage,
+        blank=True,
+        max_length=255,
+    )
+    error_message = models.TextField(_("Error message"), blank=True)
+
+    user = models.ForeignKey(
+        AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="report_jobs",
+        verbose_name=_("Requested by"),
+    )
+    date_created = models.DateTimeField(_("Date created"), auto_now_add=True)
+    date_started = models.DateTimeField(_("Date started"), null=True, blank=True)
+    date_completed = models.DateTimeField(_("Date completed"), null=True, blank=True)
+    # Saved with the progress of running jobs, to spot jobs whose worker died
+    date_updated = models.DateTimeField(_("Date updated"), auto_now=True)
+
+    class Meta:
+        abstract = True
+        app_label = "analytics"
+        ordering = ["-date_created", "-pk"]
+        verbose_name = _("Report job")
+        verbose_name_plural = _("Report jobs")
+
+    def __str__(self):
+        return _("%(code)s report #%(pk)s") % {"code": self.code, "pk": self.pk}
+
+    @property
+    def is_complete(self):
+        return self.status == self.COMPLETE
+
+    @property
+    def progress(self):
+        """
+        Return the percentage of rows written, if known
+        """
+        if self.is_complete:
+            return 100
+        if not self.num_rows_total:
+            return None
+        return min(100, int(100 * self.num_rows / self.num_rows_total))
@@ -0,0 +1,338 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from oscar.core.loading import get_model
+
+PRODUCT, USER = "product", "user"
+
+logger = logging.getLogger("oscar.analytics")
+
+
+class AnalyticsBuffer(object):
+    """
+    Accumulates analytics counter increments and product views, and writes
+    them to the database in batches.
+
+    Buffers are flushed in a background thread once
+    ``OSCAR_ANALYTICS_BUFFER_FLUSH_THRESHOLD`` events have been recorded by
+    the process, or once the last flush is older than
+    ``OSCAR_ANALYTICS_BUFFER_FLUSH_INTERVAL`` seconds when the next event is
+    recorded, so that requests don't wait for the writes.  The
+    ``oscar_flush_analytics`` management command flushes them on demand.
+
+    Subclasses implement the storage of the pending events.
+    """
+
+    #: The counter models by the kind of object they count for, with the
+    #: field holding the object's id
+    counter_models = {
+        PRODUCT: ("ProductRecord", "product_id"),
+        USER: ("UserRecord", "user_id"),
+    }
+    batch_size = 500
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._num_recorded = 0
+        self._last_flushed = time.monotonic()
+        self._flush_thread = None
+
+    def increment(self, kind, object_id, field_name, increment=1):
+        """
+        Record an increment of a counter of the product or user record for
+        the given object id
+        """
+        self.add_increment((kind, object_id, field_name), increment)
+        self.recorded()
+
+    def add_product_view(self, product_id, user_id):
+        """
+        Record a product view by an authenticated user
+        """
+        self.add_view((product_id, user_id))
+        self.recorded()
+
+    def recorded(self):
+        with self._lock:
+            self._num_recorded += 1
+            threshold = settings.OSCAR_ANALYTICS_BUFFER_FLUSH_THRESHOLD
+            interval = settings.OSCAR_ANALYTICS_BUFFER_FLUSH_INTERVAL
+            due = (threshold and self._num_recorded >= threshold) or (
+                interval and time.monotonic() - self._last_flushed >= interval
+            )
+            if due:
+                self._num_recorded = 0
+                self._last_flushed = time.monotonic()
+        if due:
+            self.flush_in_background()
+
+    def flush_in_background(self):
+        """
+        Flush the buffer in a separate thread, unless a flush started by this
+        buffer is still running
+        """
+        with self._lock:
+            if self._flush_thread is not None and self._flush_thread.is_alive():
+                return
+            self._flush_thread = threading.Thread(
+                target=self._flush_and_close_connections,
+                name="oscar-analytics-flush",
+                daemon=True,
+            )
+            self._flush_thread.start()
+
+    def _flush_and_close_connections(self):
+        try:
+            self.flush()
+        except Exception:
+            # The events are kept pending for the next flush
+            logger.exception("Error flushing the analytics buffer")
+        finally:
+            # The thread's own connections
+            connections.close_all()
+
+    def flush(self):
+        """
+        Write all pending events to the database, returning the number of
+        counters and views written
+        """
+        with self.claim() as (increments, views):
+            if increments or views:
+                self.write(increments, views)
+            return len(increments) + len(views)
+
+    def write(self, increments, views):
+        """
+        Write increments, given as a dict of ``(kind, object_id, field_name)``
+        to the increment, and ``(product_id, user_id)`` views.
+        """
+        by_kind = defaultdict(lambda: defaultdict(dict))
+        for (kind, object_id, field_name), increment in increments.items():
+            by_kind[kind][object_id][field_name] = increment
+        with transaction.atomic():
+            for kind, counters in by_kind.items():
+                self.write_counters(kind, counters)
+            self.write_views(views)
+
+    def write_counters(self, kind, counters):
+        """
+        Add the increments to the counters of the given objects, creating
+        their records when missing
+        """
+        model_name, key_field = self.counter_models[kind]
+        model = get_model("analytics", model_name)
+        related_model = model._meta.get_field(key_field).related_model
+        object_ids = list(counters)
+        for i in range(0, len(object_ids), self.batch_size):
+            end = i + self.batch_size
+            # Ignore objects that were deleted since the events were recorded
+            batch = list(
+                related_model._default_manager.filter(pk__in=object_ids[i:end])
+                .order_by()
+                .values_list("pk", flat=True)
+            )
+            model._default_manager.bulk_create(
+                [model(**{key_field: object_id}) for object_id in batch],
+                ignore_conflicts=True,
+            )
+            field_names = {
+                field_name for object_id in batch for field_name in counters[object_id]
+            }
+            updates = {}
+            for field_name in field_names:
+                updates[field_name] = F(field_name) + Case(
+                    *[
+                        When(
+                            **{key_field: object_id},
+                            then=Value(counters[object_id][field_name]),
+                        )
+                        for object_id in batch
+                        if field_name in counters[object_id]
+                    ],
+                    default=Value(0),
+                )
+            if updates:
+                # update() doesn't set auto_now fields
+                now = timezone.now()
+                for field in model._meta.concrete_fields:
+                    if getattr(field, "auto_now", False):
+                        updates[field.name] = now
+                model._default_manager.filter(**{"%s__in" % key_field: batch}).update(
+                    **updates
+                )
+
+    def write_views(self, views):
+        Product = get_model("catalogue", "Product")
+        UserProductView = get_model("analytics", "UserProductView")
+        product_ids = set(
+            Product._default_manager.filter(
+                pk__in={product_id for product_id, __ in views}
+            )
+            .order_by()
+            .values_list("pk", flat=True)
+        )
+        UserProductView._default_manager.bulk_create(
+            [
+                UserProductView(product_id=product_id, user_id=user_id)
+                for product_id, user_id in views
+                if product_id in product_ids
+            ],
+            batch_size=self.batch_size,
+        )
+
+    # Storage
+
+    def add_increment(self, key, increment):
+        raise NotImplementedError
+
+    def add_view(self, view):
+        raise NotImplementedError
+
+    def claim(self):
+        """
+        Return a context manager yielding the pending increments and views.
+        They're discarded if the block succeeds, and kept pending otherwise.
+        """
+        raise NotImplementedError
+
+
+class InProcessAnalyticsBuffer(AnalyticsBuffer):
+    """
+    Keeps pending events in the memory of the process.
+
+    Pending events are lost if the process exits before they're flushed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._increments = defaultdict(int)
+        self._views = []
+
+    def add_increment(self, key, increment):
+        with self._lock:
+            self._increments[key] += increment
+
+    def add_view(self, view):
+        with self._lock:
+            self._views.append(view)
+
+    @contextmanager
+    def claim(self):
+        with self._lock:
+            increments, views = self._increments, self._views
+            self._increments, self._views = defaultdict(int), []
+        try:
+            yield increments, views
+        except Exception:
+            with self._lock:
+                for key, increment in increments.items():
+                    self._increments[key] += increment
+                self._views[:0] = views
+            raise
+
+
+class CacheAnalyticsBuffer(AnalyticsBuffer):
+    """
+    Keeps pending events in Django's cache, so that they're shared between
+    processes and flushed together.
+
+    Events are appended to a log, using an atomically incremented sequence
+    number.  This needs a cache backend that is shared between processes and
+    doesn't evict the log entries before they're flushed.
+
+    An entry is stored just after its sequence number is taken, so a flush
+    stops at the first missing entry and picks it up next time.  Entries
+    that are still missing after ``missing_entry_timeout`` seconds are taken
+    to be lost, eg because the process recording them died, and skipped.
+    """
+
+    key_prefix = "oscar-analytics-buffer"
+    lock_timeout = 5 * 60
+    missing_entry_timeout = 60
+
+    def get_key(self, name):
+        return "%s-%s" % (self.key_prefix, name)
+
+    def append(self, entry):
+        sequence_key = self.get_key("sequence")
+        cache.add(sequence_key, 0, None)
+        sequence = cache.incr(sequence_key)
+        cache.set(self.get_key(sequence), entry, None)
+
+    def add_increment(self, key, increment):
+        self.append(("increment", key, increment))
+
+    def add_view(self, view):
+        self.append(("view", view))
+
+    def is_lost(self, sequence):
+        """
+        Return whether the missing entry with the given sequence number has
+        been missing for longer than ``missing_entry_timeout``
+        """
+        missing_key = self.get_key("missing")
+        missing = cache.get(missing_key)
+        if missing is None or missing[0] != sequence:
+            cache.set(missing_key, (sequence, time.time()), None)
+            return False
+        return time.time() - missing[1] >= self.missing_entry_timeout
+
+    @contextmanager
+    def claim(self):
+        increments, views = defaultdict(int), []
+        lock_key = self.get_key("lock")
+        if not cache.add(lock_key, True, self.lock_timeout):
+            # Another process is flushing
+            yield increments, views
+            return
+        try:
+            last = cache.get(self.get_key("sequence")) or 0
+            first = (cache.get(self.get_key("flushed")) or 0) + 1
+            entries = {}
+            keys = [self.get_key(sequence) for sequence in range(first, last + 1)]
+            for i in range(0, len(keys), self.batch_size):
+                end = i + self.batch_size
+                entries.update(cache.get_many(keys[i:end]))
+            flushed = first - 1
+            for sequence in range(first, last + 1):
+                entry = entries.get(self.get_key(sequence))
+                if entry is None:
+                    if not self.is_lost(sequence):
+                        # Not stored yet
+                        break
+                elif entry[0] == "increment":
+                    increments[entry[1]] += entry[2]
+                else:
+                    views.append(entry[1])
+                flushed = sequence
+            yield increments, views
+            cache.set(self.get_key("flushed"), flushed, None)
+            cache.delete_many(keys[: flushed - first + 1])
+        finally:
+            cache.delete(lock_key)
+
+
+_buffers = {}
+
+
+def get_analytics_buffer():
+    """
+    Return the analytics buffer configured by ``OSCAR_ANALYTICS_BUFFER``, or
+    ``None`` if analytics are written directly.
+    """
+    path = settings.OSCAR_ANALYTICS_BUFFER
+    if not path:
+        return None
+    if path not in _buffers:
+        _buffers[path] = import_string(path)()
+    return _buffers[path]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:12
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_auto_20200801_0817'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productrecord',
+            name='date_updated',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Date updated'),
+            preserve_default=False,
+        ),
+    ]
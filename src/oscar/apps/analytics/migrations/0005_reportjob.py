@@ -0,0 +1,120 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0004_productrecord_date_updated"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReportJob",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "code",
+                    models.CharField(
+                        db_index=True, max_length=128, verbose_name="Report"
+                    ),
+                ),
+                (
+                    "formatter",
+                    models.CharField(
+                        default="CSV", max_length=32, verbose_name="Format"
+                    ),
+                ),
+                (
+                    "start_date",
+                    models.DateField(blank=True, null=True, verbose_name="Start date"),
+                ),
+                (
+                    "end_date",
+                    models.DateField(blank=True, null=True, verbose_name="End date"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("Pending", "Pending"),
+                            ("Running", "Running"),
+                            ("Complete", "Complete"),
+                            ("Failed", "Failed"),
+                        ],
+                        default="Pending",
+                        max_length=32,
+                        verbose_name="Status",
+                    ),
+                ),
+                (
+                    "num_rows",
+                    models.PositiveIntegerField(default=0, verbose_name="Rows written"),
+                ),
+                (
+                    "num_rows_total",
+                    models.PositiveIntegerField(null=True, verbose_name="Total rows"),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True,
+                        max_length=255,
+                        upload_to="reports/%Y/%m/",
+                        verbose_name="File",
+                    ),
+                ),
+                (
+                    "error_message",
+                    models.TextField(blank=True, verbose_name="Error message"),
+                ),
+                (
+                    "date_created",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Date created"
+                    ),
+                ),
+                (
+                    "date_started",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Date started"
+                    ),
+                ),
+                (
+                    "date_completed",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Date completed"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="report_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Requested by",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Report job",
+                "verbose_name_plural": "Report jobs",
+                "ordering": ["-date_created", "-pk"],
+                "abstract": False,
+            },
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0005_reportjob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySalesRecord",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=16,
+                        verbose_name="Revenue (inc. tax)",
+                    ),
+                ),
+                (
+                    "num_orders",
+                    models.PositiveIntegerField(default=0, verbose_name="Orders"),
+                ),
+                (
+                    "num_lines",
+                    models.PositiveIntegerField(default=0, verbose_name="Order lines"),
+                ),
+                (
+                    "num_items",
+                    models.PositiveIntegerField(default=0, verbose_name="Order items"),
+                ),
+                (
+                    "num_new_customers",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="New customers"
+                    ),
+                ),
+                (
+                    "date_updated",
+                    models.DateTimeField(auto_now=True, verbose_name="Date updated"),
+                ),
+                ("day", models.DateField(unique=True, verbose_name="Day")),
+            ],
+            options={
+                "verbose_name": "Daily sales record",
+                "verbose_name_plural": "Daily sales records",
+                "ordering": ["-day"],
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="HourlySalesRecord",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        max_digits=16,
+                        verbose_name="Revenue (inc. tax)",
+                    ),
+                ),
+                (
+                    "num_orders",
+                    models.PositiveIntegerField(default=0, verbose_name="Orders"),
+                ),
+                (
+                    "num_lines",
+                    models.PositiveIntegerField(default=0, verbose_name="Order lines"),
+                ),
+                (
+                    "num_items",
+                    models.PositiveIntegerField(default=0, verbose_name="Order items"),
+                ),
+                (
+                    "num_new_customers",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="New customers"
+                    ),
+                ),
+                (
+                    "date_updated",
+                    models.DateTimeField(auto_now=True, verbose_name="Date updated"),
+                ),
+                ("hour", models.DateTimeField(unique=True, verbose_name="Hour")),
+            ],
+            options={
+                "verbose_name": "Hourly sales record",
+                "verbose_name_plural": "Hourly sales records",
+                "ordering": ["-hour"],
+                "abstract": False,
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:50
+
+import oscar.apps.analytics.abstract_models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0006_sales_records"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reportjob",
+            name="date_updated",
+            field=models.DateTimeField(auto_now=True, verbose_name="Date updated"),
+        ),
+        migrations.AlterField(
+            model_name="reportjob",
+            name="file",
+            field=models.FileField(
+                blank=True,
+                max_length=255,
+                storage=oscar.apps.analytics.abstract_models.get_report_storage,
+                upload_to="reports/%Y/%m/",
+                verbose_name="File",
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0007_reportjob_date_updated_storage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productrecord",
+            name="date_scored",
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                null=True,
+                verbose_name="Date scored",
+            ),
+        ),
+        migrations.AddField(
+            model_name="productrecord",
+            name="scored_activity",
+            field=models.PositiveBigIntegerField(
+                default=0, editable=False, verbose_name="Scored activity"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("analytics", "0008_productrecord_scored_activity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dailysalesrecord",
+            name="num_open_baskets",
+            field=models.IntegerField(default=0, verbose_name="Open baskets"),
+        ),
+        migrations.AddField(
+            model_name="hourlysalesrecord",
+            name="num_open_baskets",
+            field=models.IntegerField(default=0, verbose_name="Open baskets"),
+        ),
+    ]
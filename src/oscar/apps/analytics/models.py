@@ -1,5 +1,8 @@
 from oscar.apps.analytics.abstract_models import (
+    AbstractDailySalesRecord,
+    AbstractHourlySalesRecord,
     AbstractProductRecord,
+    AbstractReportJob,
     AbstractUserProductView,
     AbstractUserRecord,
     AbstractUserSearch,
@@ -39,3 +42,27 @@ if not is_model_registered("analytics", "UserSearch"):
         pass
 
     __all__.append("UserSearch")
+
+
+if not is_model_registered("analytics", "ReportJob"):
+
+    class ReportJob(AbstractReportJob):
+        pass
+
+    __all__.append("ReportJob")
+
+
+if not is_model_registered("analytics", "HourlySalesRecord"):
+
+    class HourlySalesRecord(AbstractHourlySalesRecord):
+        pass
+
+    __all__.append("HourlySalesRecord")
+
+
+if not is_model_registered("analytics", "DailySalesRecord"):
+
+    class DailySalesRecord(AbstractDailySalesRecord):
+        pass
+
+    __all__.append("DailySalesRecord")
@@ -1,25 +1,44 @@
 import logging
 
+from django.conf import settings
 from django.db import IntegrityError
 from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
 from django.dispatch import receiver
+from django.utils import timezone
 
 from oscar.apps.basket.signals import basket_addition
 from oscar.apps.catalogue.signals import product_viewed
 from oscar.apps.order.signals import order_placed
 from oscar.apps.search.signals import user_search
-from oscar.core.loading import get_model
+from oscar.core.loading import get_class, get_model
 
+Basket = get_model("basket", "Basket")
 ProductRecord = get_model("analytics", "ProductRecord")
 UserProductView = get_model("analytics", "UserProductView")
 UserRecord = get_model("analytics", "UserRecord")
 UserSearch = get_model("analytics", "UserSearch")
+get_analytics_buffer = get_class("analytics.buffer", "get_analytics_buffer")
+SalesRecords = get_class("analytics.sales", "SalesRecords")
 
 # Helpers
 
 logger = logging.getLogger("oscar.analytics")
 
 
+def _get_auto_now_updates(model):
+    """
+    Return the values of the model's ``auto_now`` fields, which ``update()``
+    doesn't set.
+    """
+    now = timezone.now()
+    return {
+        field.name: now
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False)
+    }
+
+
 def _update_counter(model, field_name, filter_kwargs, increment=1):
     """
     Efficiently updates a counter field by a given increment. Uses Django's
@@ -31,7 +50,9 @@ def _update_counter(model, field_name, filter_kwargs, increment=1):
                           correct instance
     """
     record = model.objects.filter(**filter_kwargs)
-    affected = record.update(**{field_name: F(field_name) + increment})
+    affected = record.update(
+        **{field_name: F(field_name) + increment}, **_get_auto_now_updates(model)
+    )
     if not affected:
         filter_kwargs[field_name] = increment
         try:
@@ -41,7 +62,10 @@ def _update_counter(model, field_name, filter_kwargs, increment=1):
             logger.warning(
                 "IntegrityError when updating analytics counter for %s", model
             )
-            record.update(**{field_name: F(field_name) + increment})
+            record.update(
+                **{field_name: F(field_name) + increment},
+                **_get_auto_now_updates(model),
+            )
 
 
 def _record_products_in_order(order):
@@ -85,6 +109,13 @@ def _record_user_order(user, order):
 def receive_product_view(sender, product, user, **kwargs):
     if kwargs.get("raw", False):
         return
+    buffer = get_analytics_buffer()
+    if buffer is not None:
+        buffer.increment("product", product.pk, "num_views")
+        if user and user.is_authenticated:
+            buffer.increment("user", user.pk, "num_product_views")
+            buffer.add_product_view(product.pk, user.pk)
+        return
     _update_counter(ProductRecord, "num_views", {"product": product})
     if user and user.is_authenticated:
         _update_counter(UserRecord, "num_product_views", {"user": user})
@@ -103,6 +134,12 @@ def receive_product_search(sender, query, user, **kwargs):
 def receive_basket_addition(sender, product, user, **kwargs):
     if kwargs.get("raw", False):
         return
+    buffer = get_analytics_buffer()
+    if buffer is not None:
+        buffer.increment("product", product.pk, "num_basket_additions")
+        if user and user.is_authenticated:
+            buffer.increment("user", user.pk, "num_basket_additions")
+        return
     _update_counter(ProductRecord, "num_basket_additions", {"product": product})
     if user and user.is_authenticated:
         _update_counter(UserRecord, "num_basket_additions", {"user": user})
@@ -116,3 +153,39 @@ def receive_order_placed(sender, order, user, **kwargs):
     _record_products_in_order(order)
     if user and user.is_authenticated:
         _record_user_order(user, order)
+    if settings.OSCAR_DASHBOARD_USE_SALES_RECORDS:
+        SalesRecords().record_order(order, user)
+
+
+# pylint: disable=unused-argument
+@receiver(post_init, sender=Basket)
+def receive_basket_init(sender, instance, **kwargs):
+    # Remember the loaded status, to tell when a save opens or closes the
+    # basket. A deferred status isn't loaded to find out.
+    instance._sales_record_status = instance.__dict__.get("status")
+
+
+# pylint: disable=unused-argument
+@receiver(post_save, sender=Basket)
+def receive_basket_saved(sender, instance, created, **kwargs):
+    previous_status = getattr(instance, "_sales_record_status", None)
+    instance._sales_record_status = instance.__dict__.get("status")
+    if kwargs.get("raw", False) or not settings.OSCAR_DASHBOARD_USE_SALES_RECORDS:
+        return
+    is_open = instance._sales_record_status == Basket.OPEN
+    if created:
+        if is_open:
+            SalesRecords().record_basket(instance, 1)
+    elif previous_status is not None and instance._sales_record_status is not None:
+        was_open = previous_status == Basket.OPEN
+        if is_open != was_open:
+            SalesRecords().record_basket(instance, 1 if is_open else -1)
+
+
+# pylint: disable=unused-argument
+@receiver(post_delete, sender=Basket)
+def receive_basket_deleted(sender, instance, **kwargs):
+    if not settings.OSCAR_DASHBOARD_USE_SALES_RECORDS:
+        return
+    if instance.__dict__.get("status") == Basket.OPEN:
+        SalesRecords().record_basket(instance, -1)
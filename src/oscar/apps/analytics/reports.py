@@ -12,19 +12,19 @@ UserRecord = get_model("analytics", "UserRecord")
 class ProductReportCSVFormatter(ReportCSVFormatter):
     filename_template = "conditional-offer-performance.csv"
 
-    def generate_csv(self, response, products):
-        writer = self.get_csv_writer(response)
-        header_row = [_("Product"), _("Views"), _("Basket additions"), _("Purchases")]
-        writer.writerow(header_row)
-
-        for record in products:
-            row = [
-                record.product,
-                record.num_views,
-                record.num_basket_additions,
-                record.num_purchases,
-            ]
-            writer.writerow(row)
+    def get_header_row(self):
+        return [_("Product"), _("Views"), _("Basket additions"), _("Purchases")]
+
+    def prepare_queryset(self, queryset):
+        return queryset.select_related("product")
+
+    def get_row(self, record):
+        return [
+            record.product,
+            record.num_views,
+            record.num_basket_additions,
+            record.num_purchases,
+        ]
 
 
 class ProductReportHTMLFormatter(ReportHTMLFormatter):
@@ -51,9 +51,8 @@ class ProductReportGenerator(ReportGenerator):
 class UserReportCSVFormatter(ReportCSVFormatter):
     filename_template = "user-analytics.csv"
 
-    def generate_csv(self, response, users):
-        writer = self.get_csv_writer(response)
-        header_row = [
+    def get_header_row(self):
+        return [
             _("Email"),
             _("Name"),
             _("Date registered"),
@@ -65,22 +64,23 @@ class UserReportCSVFormatter(ReportCSVFormatter):
             _("Total spent"),
             _("Date of last order"),
         ]
-        writer.writerow(header_row)
-
-        for record in users:
-            row = [
-                record.user.email,
-                record.user.get_full_name(),
-                self.format_date(record.user.date_joined),
-                record.num_product_views,
-                record.num_basket_additions,
-                record.num_orders,
-                record.num_order_lines,
-                record.num_order_items,
-                record.total_spent,
-                self.format_datetime(record.date_last_order),
-            ]
-            writer.writerow(row)
+
+    def prepare_queryset(self, queryset):
+        return queryset.select_related("user")
+
+    def get_row(self, record):
+        return [
+            record.user.email,
+            record.user.get_full_name(),
+            self.format_date(record.user.date_joined),
+            record.num_product_views,
+            record.num_basket_additions,
+            record.num_orders,
+            record.num_order_lines,
+            record.num_order_items,
+            record.total_spent,
+            self.format_datetime(record.date_last_order),
+        ]
 
 
 class UserReportHTMLFormatter(ReportHTMLFormatter):
@@ -0,0 +1,219 @@
+from collections import defaultdict
+from decimal import Decimal as D
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from oscar.core.loading import get_model
+
+SALES_FIELDS = (
+    "revenue",
+    "num_orders",
+    "num_lines",
+    "num_items",
+    "num_new_customers",
+    "num_open_baskets",
+)
+
+
+class SalesRecords(object):
+    """
+    Maintains and reads the hourly and daily sales records.
+
+    Each placed order is added to the record of its hour and of its day, in
+    the current time zone, and so is each basket while it is open, by the
+    time it was created.  Dashboards read the sums of a few records rather
+    than aggregating orders and baskets.  Orders that are later changed or
+    deleted aren't reflected until the records are rebuilt.
+    """
+
+    batch_size = 500
+
+    def get_hour(self, value):
+        return timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+
+    def get_day(self, value):
+        return timezone.localtime(value).date()
+
+    # Recording
+
+    def record_order(self, order, user=None):
+        """
+        Add a newly placed order to the records
+        """
+        Order = get_model("order", "Order")
+        lines = order.lines.aggregate(num_lines=Count("pk"), num_items=Sum("quantity"))
+        is_new_customer = (
+            user is not None
+            and user.is_authenticated
+            and not Order.objects.filter(user=user).exclude(pk=order.pk).exists()
+        )
+        values = {
+            "revenue": order.total_incl_tax,
+            "num_orders": 1,
+            "num_lines": lines["num_lines"],
+            "num_items": lines["num_items"] or 0,
+            "num_new_customers": int(is_new_customer),
+        }
+        self.add(
+            get_model("analytics", "HourlySalesRecord"),
+            {"hour": self.get_hour(order.date_placed)},
+            values,
+        )
+        self.add(
+            get_model("analytics", "DailySalesRecord"),
+            {"day": self.get_day(order.date_placed)},
+            values,
+        )
+
+    def record_basket(self, basket, change):
+        """
+        Add the change to the number of open baskets of the period the
+        basket was created in: 1 when it is opened and -1 when it is closed
+        """
+        values = {"num_open_baskets": change}
+        self.add(
+            get_model("analytics", "HourlySalesRecord"),
+            {"hour": self.get_hour(basket.date_created)},
+            values,
+        )
+        self.add(
+            get_model("analytics", "DailySalesRecord"),
+            {"day": self.get_day(basket.date_created)},
+            values,
+        )
+
+    def add(self, model, lookup, values):
+        """
+        Add the values to the fields of the record with the given lookup,
+        creating it if needed
+        """
+        increments = {name: F(name) + value for name, value in values.items()}
+        increments["date_updated"] = timezone.now()
+        records = model.objects.filter(**lookup)
+        if records.update(**increments):
+            return
+        try:
+            with transaction.atomic():
+                model.objects.create(**lookup, **values)
+        except IntegrityError:
+            # Another process created the record in the meantime
+            records.update(**increments)
+
+    # Rebuilding
+
+    def rebuild(self):
+        """
+        Rebuild all the records from the orders and open baskets, returning
+        the number of hourly records
+        """
+        HourlySalesRecord = get_model("analytics", "HourlySalesRecord")
+        DailySalesRecord = get_model("analytics", "DailySalesRecord")
+        hourly = self.aggregate_orders(TruncHour, self.get_hour)
+        daily = self.aggregate_orders(TruncDate, self.get_day)
+        with transaction.atomic():
+            HourlySalesRecord.objects.all().delete()
+            DailySalesRecord.objects.all().delete()
+            HourlySalesRecord.objects.bulk_create(
+                [
+                    HourlySalesRecord(hour=hour, **values)
+                    for hour, values in hourly.items()
+                ],
+                batch_size=self.batch_size,
+            )
+            DailySalesRecord.objects.bulk_create(
+                [DailySalesRecord(day=day, **values) for day, values in daily.items()],
+                batch_size=self.batch_size,
+            )
+        return len(hourly)
+
+    def aggregate_orders(self, trunc, get_period):
+        """
+        Return a dict of each period with orders or open baskets to the
+        values of its record
+        """
+        Basket = get_model("basket", "Basket")
+        Order = get_model("order", "Order")
+        Line = get_model("order", "Line")
+        periods = defaultdict(lambda: dict.fromkeys(SALES_FIELDS, 0))
+        orders = (
+            Order.objects.annotate(period=trunc("date_placed"))
+            .values("period")
+            .annotate(revenue=Sum("total_incl_tax"), num_orders=Count("pk"))
+            .order_by()
+        )
+        for row in orders:
+            period = periods[row["period"]]
+            period["revenue"] = row["revenue"] or D("0.00")
+            period["num_orders"] = row["num_orders"]
+        lines = (
+            Line.objects.annotate(period=trunc("order__date_placed"))
+            .values("period")
+            .annotate(num_lines=Count("pk"), num_items=Sum("quantity"))
+            .order_by()
+        )
+        for row in lines:
+            period = periods[row["period"]]
+            period["num_lines"] = row["num_lines"]
+            period["num_items"] = row["num_items"] or 0
+        first_orders = (
+            Order.objects.filter(user__isnull=False)
+            .values("user")
+            .annotate(first_placed=Min("date_placed"))
+            .order_by()
+            .values_list("first_placed", flat=True)
+        )
+        for first_placed in first_orders.iterator():
+            periods[get_period(first_placed)]["num_new_customers"] += 1
+        baskets = (
+            Basket._default_manager.filter(status=Basket.OPEN)
+            .annotate(period=trunc("date_created"))
+            .values("period")
+            .annotate(num_open_baskets=Count("pk"))
+            .order_by()
+        )
+        for row in baskets:
+            periods[row["period"]]["num_open_baskets"] = row["num_open_baskets"]
+        return periods
+
+    # Reading
+
+    def sum_records(self, records):
+        totals = records.aggregate(**{name: Sum(name) for name in SALES_FIELDS})
+        totals = {name: value or 0 for name, value in totals.items()}
+        totals["revenue"] = totals["revenue"] or D("0.00")
+        return totals
+
+    def get_totals(self, start_day=None, end_day=None):
+        """
+        Return the sums of the records of the days in the given range,
+        including both ends, or of all days
+        """
+        records = get_model("analytics", "DailySalesRecord").objects.all()
+        if start_day is not None:
+            records = records.filter(day__gte=start_day)
+        if end_day is not None:
+            records = records.filter(day__lte=end_day)
+        return self.sum_records(records)
+
+    def get_totals_since(self, start_time):
+        """
+        Return the sums of the records of the hours since the one including
+        the given time
+        """
+        records = get_model("analytics", "HourlySalesRecord").objects.filter(
+            hour__gte=self.get_hour(start_time)
+        )
+        return self.sum_records(records)
+
+    def get_hourly_revenue(self, start_time, end_time):
+        """
+        Return a dict of the start of each hour in the given range with
+        sales to its revenue
+        """
+        records = get_model("analytics", "HourlySalesRecord").objects.filter(
+            hour__gte=start_time, hour__lt=end_time
+        )
+        return dict(records.values_list("hour", "revenue"))
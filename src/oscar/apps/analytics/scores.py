@@ -1,4 +1,18 @@
-from django.db.models import F
+import math
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Case,
+    F,
+    FloatField,
+    Max,
+    PositiveBigIntegerField,
+    Value,
+    When,
+)
 
 from oscar.core.loading import get_model
 
@@ -6,17 +20,146 @@ ProductRecord = get_model("analytics", "ProductRecord")
 
 
 class Calculator(object):
+    """
+    Calculates the scores of product records from their counters.
+
+    Only the records changed since the last calculation are recalculated,
+    in chunks of ``chunk_size`` records that are each updated in their own
+    transaction.  Each record stores when it last changed before its score
+    was calculated, and the latest of these is where the next calculation
+    starts.  All records are recalculated when none has a score yet.
+
+    If ``OSCAR_ANALYTICS_SCORE_HALF_LIFE`` is set, scores favour recent
+    activity.  Each calculation adds the activity since the previous one,
+    weighted by two to the power of the number of half-lives between a fixed
+    landmark and the record's last change, and scores are the base 2
+    logarithm of the sum.  Activity one half-life later counts twice as much,
+    earlier activity keeps the weight it was added with, and scores of
+    records that don't change never need recalculating.
+    """
+
     # Map of field name to weight
     weights = {"num_views": 1, "num_basket_additions": 3, "num_purchases": 5}
 
-    def __init__(self, logger):
+    chunk_size = 1000
+
+    #: The time decayed scores are measured from
+    landmark = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+
+    #: Records changed this long before the last calculated change are
+    #: recalculated again by the next run, to allow for clock skew and
+    #: transactions that were committed during the calculation
+    overlap = timedelta(minutes=5)
+
+    def __init__(self, logger, chunk_size=None):
         self.logger = logger
+        if chunk_size:
+            self.chunk_size = chunk_size
+
+    def run(self, since=None, recalculate_all=False):
+        """
+        Calculate the scores of the records changed since the last
+        calculation, or the given time if that's earlier
+        """
+        last_scored = None
+        if not recalculate_all:
+            last_scored = ProductRecord.objects.aggregate(
+                last_scored=Max("date_scored")
+            )["last_scored"]
+        if last_scored is None:
+            since = None
+        elif since is None or since > last_scored - self.overlap:
+            since = last_scored - self.overlap
+        self.calculate_scores(since)
+
+    def get_changed_records(self, since=None):
+        records = ProductRecord.objects.all()
+        if since is not None:
+            records = records.filter(date_updated__gte=since)
+        return records
 
-    def run(self):
-        self.calculate_scores()
+    def calculate_scores(self, since=None):
+        """
+        Calculate the scores of the records changed since the given time, or
+        of all records from scratch
+        """
+        if since is None:
+            self.logger.info("Calculating product scores")
+        else:
+            self.logger.info("Calculating product scores changed since %s", since)
+        records = self.get_changed_records(since)
+        num_calculated, last_pk = 0, 0
+        while True:
+            pks = list(
+                records.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[: self.chunk_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                self.calculate_chunk(pks, from_scratch=since is None)
+            num_calculated += len(pks)
+            last_pk = pks[-1]
+        self.logger.info("Calculated %d product scores", num_calculated)
+        return num_calculated
 
-    def calculate_scores(self):
-        self.logger.info("Calculating product scores")
+    def calculate_chunk(self, pks, from_scratch=False):
+        """
+        Update the scores of the records with the given primary keys
+        """
         total_weight = float(sum(self.weights.values()))
-        weighted_fields = [self.weights[name] * F(name) for name in self.weights.keys()]
-        ProductRecord.objects.update(score=sum(weighted_fields) / total_weight)
+        half_life = settings.OSCAR_ANALYTICS_SCORE_HALF_LIFE
+        records = ProductRecord.objects.filter(pk__in=pks)
+        activity = sum(self.weights[name] * F(name) for name in self.weights.keys())
+        if not half_life:
+            records.update(
+                score=activity / total_weight,
+                scored_activity=activity,
+                date_scored=F("date_updated"),
+            )
+            return
+
+        # Decayed scores need logarithms, which not all databases support.
+        # The records are locked so that the activity read is what's scored
+        # up to their last change.
+        scores, activities = {}, {}
+        fields = ["pk", "score", "scored_activity", "date_updated"]
+        for values in records.select_for_update().values(*fields, *self.weights):
+            activities[values["pk"]] = sum(
+                self.weights[name] * values[name] for name in self.weights.keys()
+            )
+            new_activity = activities[values["pk"]] - values["scored_activity"]
+            score = values["score"]
+            if from_scratch or not values["scored_activity"] or new_activity < 0:
+                score, new_activity = None, activities[values["pk"]]
+            scores[values["pk"]] = self.get_decayed_score(
+                score, new_activity / total_weight, values["date_updated"], half_life
+            )
+        records.update(
+            score=self.get_case(scores, FloatField()),
+            scored_activity=self.get_case(activities, PositiveBigIntegerField()),
+            date_scored=F("date_updated"),
+        )
+
+    def get_case(self, values, output_field):
+        return Case(
+            *[When(pk=pk, then=Value(value)) for pk, value in values.items()],
+            output_field=output_field,
+        )
+
+    def get_decayed_score(self, score, activity, date_updated, half_life):
+        """
+        Return the score of a record, given its previous score (or None) and
+        the weighted counters since, adjusted for how recently it changed.
+        The half-life is in days.
+        """
+        if not activity:
+            return score or 0.0
+        age = (date_updated - self.landmark) / timedelta(days=half_life)
+        added = math.log2(activity) + age
+        if score is None:
+            return added
+        # log2(2 ** score + 2 ** added), without overflowing
+        highest = max(score, added)
+        return highest + math.log2(1 + 2 ** (min(score, added) - highest))
@@ -100,6 +100,9 @@ class AbstractBasket(models.Model):
         # information.
         self._lines = None
         self.offer_applications = OfferApplications()
+        # Range membership of the basket's products, resolved by the offer
+        # applicator so conditions and benefits don't query it per line.
+        self.range_membership = None
 
     def __str__(self):
         return _("%(status)s basket (owner: %(owner)s, lines: %(num_lines)d)") % {
@@ -329,6 +332,7 @@ class AbstractBasket(models.Model):
         Remove any discounts so they get recalculated
         """
         self.offer_applications = OfferApplications()
+        self.range_membership = None
         self._lines = None
 
     def merge_line(self, line, add_quantities=True):
@@ -14,10 +14,13 @@ class BasketConfig(OscarConfig):
 
     namespace = "basket"
 
-    # pylint: disable=attribute-defined-outside-init
+    # pylint: disable=attribute-defined-outside-init, unused-import
     def ready(self):
+        from . import receivers
+
         self.summary_view = get_class("basket.views", "BasketView")
         self.saved_view = get_class("basket.views", "SavedView")
+        self.quick_view = get_class("basket.views", "BasketQuickView")
         self.add_view = get_class("basket.views", "BasketAddView")
         self.add_voucher_view = get_class("basket.views", "VoucherAddView")
         self.remove_voucher_view = get_class("basket.views", "VoucherRemoveView")
@@ -25,6 +28,7 @@ class BasketConfig(OscarConfig):
     def get_urls(self):
         urls = [
             path("", self.summary_view.as_view(), name="summary"),
+            path("quick/", self.quick_view.as_view(), name="quick"),
             path("add/<int:pk>/", self.add_view.as_view(), name="add"),
             path("vouchers/add/", self.add_voucher_view.as_view(), name="vouchers-add"),
             path(
@@ -0,0 +1,142 @@
+import hashlib
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils.timezone import now
+
+from oscar.core.loading import get_class, get_model
+
+LineDiscountRegistry = get_class("basket.utils", "LineDiscountRegistry")
+get_offers_version = get_class("offer.cache", "get_offers_version")
+
+
+class BasketPricingCache(object):
+    """
+    Caches the offer applications and line discounts of baskets.
+
+    Baskets are fingerprinted by their lines, the prices of their stock
+    records, their vouchers and the vouchers' usage, the offers version and
+    the pricing strategy. A basket whose fingerprint hasn't changed since its
+    offers were last applied has its discounts restored from the cache
+    instead of running the offer applicator again. Cached discounts expire
+    once an applied offer or voucher ends or another offer starts.
+
+    Offers that depend on anything else (eg session offers) need the
+    fingerprint to be extended by overriding ``get_fingerprint_parts``.
+    """
+
+    key_prefix = "oscar-basket-pricing"
+
+    def get_fingerprint_parts(self, basket, request=None):
+        parts = [basket.id, get_offers_version()]
+        strategy = basket.strategy
+        parts.append("%s.%s" % (type(strategy).__module__, type(strategy).__qualname__))
+        user = getattr(request, "user", None)
+        parts.append(user.pk if user is not None and user.is_authenticated else None)
+        parts.append(sorted(basket.vouchers.values_list("id", "num_orders")))
+        for line in basket.all_lines():
+            stockrecord = line.stockrecord
+            parts.append(
+                (
+                    line.id,
+                    line.quantity,
+                    line.date_updated.isoformat(),
+                    stockrecord.id,
+                    str(stockrecord.price),
+                    stockrecord.date_updated.isoformat(),
+                )
+            )
+        return parts
+
+    def get_key(self, basket, request=None):
+        """
+        Return the cache key for the basket's current contents
+        """
+        fingerprint = repr(self.get_fingerprint_parts(basket, request))
+        return "%s-%s" % (
+            self.key_prefix,
+            hashlib.sha1(fingerprint.encode("utf8")).hexdigest(),
+        )
+
+    def get_snapshot(self, basket):
+        """
+        Return the discount state of the basket in a picklable form.
+
+        The offers are stored once with the applications, and shared by the
+        line discount states when unpickled.
+        """
+        # pylint: disable=protected-access
+        lines = {}
+        for line in basket.all_lines():
+            discounts = line.discounts
+            lines[line.id] = {
+                "offers": discounts._offers,
+                "affected_quantity": discounts._affected_quantity,
+                "consumptions": dict(discounts._consumptions),
+                "discounts": discounts._discounts,
+            }
+        return {"applications": basket.offer_applications, "lines": lines}
+
+    def restore_snapshot(self, basket, snapshot):
+        # pylint: disable=protected-access
+        basket.offer_applications = snapshot["applications"]
+        for line in basket.all_lines():
+            state = snapshot["lines"][line.id]
+            discounts = LineDiscountRegistry(line)
+            discounts._offers = state["offers"]
+            discounts._affected_quantity = state["affected_quantity"]
+            discounts._consumptions = defaultdict(int, state["consumptions"])
+            discounts._discounts = state["discounts"]
+            line.discounts = discounts
+
+    def restore(self, basket, key):
+        """
+        Restore the basket's discounts from the cache, returning whether
+        they were found.
+        """
+        snapshot = cache.get(key)
+        if snapshot is None:
+            return False
+        self.restore_snapshot(basket, snapshot)
+        return True
+
+    def get_expiry_datetimes(self, basket):
+        """
+        Return the upcoming datetimes at which the basket's discounts may
+        change: when its applied offers and vouchers end, and when other
+        offers start.
+        """
+        ConditionalOffer = get_model("offer", "ConditionalOffer")
+        cutoff = now()
+        datetimes = [
+            application["offer"].end_datetime
+            for application in basket.offer_applications
+        ]
+        for voucher in basket.vouchers.all():
+            datetimes.extend([voucher.start_datetime, voucher.end_datetime])
+        datetimes.append(
+            ConditionalOffer.objects.filter(
+                status=ConditionalOffer.OPEN, start_datetime__gt=cutoff
+            ).aggregate(next_start=Min("start_datetime"))["next_start"]
+        )
+        return [dt for dt in datetimes if dt is not None and dt > cutoff]
+
+    def get_timeout(self, basket):
+        """
+        Return the number of seconds to cache the basket's discounts for
+        """
+        timeout = settings.OSCAR_BASKET_PRICING_CACHE_TIMEOUT
+        datetimes = self.get_expiry_datetimes(basket)
+        if datetimes:
+            seconds = math.ceil((min(datetimes) - now()).total_seconds())
+            timeout = seconds if timeout is None else min(timeout, seconds)
+        return timeout
+
+    def store(self, basket, key):
+        cache.set(key, self.get_snapshot(basket), self.get_timeout(basket))
+
+
+basket_pricing_cache = BasketPricingCache()
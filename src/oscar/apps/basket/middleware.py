@@ -8,6 +8,9 @@ from oscar.core.loading import get_class, get_model
 
 Applicator = get_class("offer.applicator", "Applicator")
 Basket = get_model("basket", "basket")
+BasketSummary = get_class("basket.summary", "BasketSummary")
+basket_pricing_cache = get_class("basket.cache", "basket_pricing_cache")
+basket_summary_cache = get_class("basket.summary", "basket_summary_cache")
 Selector = get_class("partner.strategy", "Selector")
 
 selector = Selector()
@@ -38,9 +41,24 @@ class BasketMiddleware:
             basket = self.get_basket(request)
             basket.strategy = request.strategy
             self.apply_offers_to_basket(request, basket)
+            basket_summary_cache.store(basket)
 
             return basket
 
+        def load_basket_summary():
+            """
+            Return the number of items and totals of the basket, without
+            loading its lines or applying offers if possible.
+            """
+            if not (
+                isinstance(request.basket, SimpleLazyObject)
+                and request.basket._wrapped is empty
+            ):
+                # The full basket has been loaded already
+                return BasketSummary.from_basket(request.basket)
+            basket = self.get_basket(request)
+            return basket_summary_cache.get_summary(basket, request.strategy)
+
         def load_basket_hash():
             """
             Load the basket and return the basket hash
@@ -56,6 +74,7 @@ class BasketMiddleware:
         # when the attribute is accessed.
         request.basket = SimpleLazyObject(load_full_basket)
         request.basket_hash = SimpleLazyObject(load_basket_hash)
+        request.basket_summary = SimpleLazyObject(load_basket_summary)
 
         response = self.get_response(request)
         return self.process_response(request, response)
@@ -226,8 +245,18 @@ class BasketMiddleware:
         return basket
 
     def apply_offers_to_basket(self, request, basket):
-        if not basket.is_empty:
+        if basket.is_empty:
+            return
+        if not settings.OSCAR_BASKET_CACHE_PRICING:
+            Applicator().apply(basket, request.user, request)
+            return
+
+        # Unchanged baskets have their discounts restored from the cache
+        # rather than applying offers again.
+        key = basket_pricing_cache.get_key(basket, request)
+        if not basket_pricing_cache.restore(basket, key):
             Applicator().apply(basket, request.user, request)
+            basket_pricing_cache.store(basket, key)
 
     def get_basket_hash(self, basket_id):
         return Signer().sign(basket_id)
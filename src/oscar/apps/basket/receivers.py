@@ -0,0 +1,39 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from oscar.core.loading import get_class, get_model
+
+Basket = get_model("basket", "Basket")
+Line = get_model("basket", "Line")
+basket_summary_cache = get_class("basket.summary", "basket_summary_cache")
+invalidate_purchase_info = get_class("partner.strategy", "invalidate_purchase_info")
+
+
+@receiver(post_save, sender=Line)
+@receiver(post_delete, sender=Line)
+def invalidate_basket_summary_on_line_change(instance, **kwargs):
+    basket_summary_cache.invalidate(instance.basket_id)
+
+
+@receiver(post_save, sender=Line)
+@receiver(post_delete, sender=Line)
+def invalidate_purchase_info_on_line_change(instance, **kwargs):
+    invalidate_purchase_info(product_ids=[instance.product_id])
+
+
+@receiver(post_save, sender=Basket)
+@receiver(post_delete, sender=Basket)
+def invalidate_basket_summary_on_basket_change(instance, **kwargs):
+    basket_summary_cache.invalidate(instance.pk)
+
+
+@receiver(m2m_changed, sender=Basket.vouchers.through)
+def invalidate_basket_summary_on_voucher_change(instance, action, reverse, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        # A voucher's baskets have changed
+        for basket_id in kwargs.get("pk_set") or ():
+            basket_summary_cache.invalidate(basket_id)
+    else:
+        basket_summary_cache.invalidate(instance.pk)
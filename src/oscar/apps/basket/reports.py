@@ -1,3 +1,5 @@
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 
 from oscar.core.loading import get_class, get_model
@@ -6,14 +8,30 @@ ReportGenerator = get_class("dashboard.reports.reports", "ReportGenerator")
 ReportCSVFormatter = get_class("dashboard.reports.reports", "ReportCSVFormatter")
 ReportHTMLFormatter = get_class("dashboard.reports.reports", "ReportHTMLFormatter")
 Basket = get_model("basket", "Basket")
+Line = get_model("basket", "Line")
+
+
+def annotate_line_counts(baskets):
+    """
+    Annotate baskets with their number of lines and items, as
+    ``line_count`` and ``item_count``
+    """
+    lines = Line.objects.filter(basket=OuterRef("pk")).order_by().values("basket")
+    return baskets.annotate(
+        line_count=Coalesce(
+            Subquery(lines.annotate(count=Count("pk")).values("count")), 0
+        ),
+        item_count=Coalesce(
+            Subquery(lines.annotate(total=Sum("quantity")).values("total")), 0
+        ),
+    )
 
 
 class OpenBasketReportCSVFormatter(ReportCSVFormatter):
     filename_template = "open-baskets-%s-%s.csv"
 
-    def generate_csv(self, response, baskets):
-        writer = self.get_csv_writer(response)
-        header_row = [
+    def get_header_row(self):
+        return [
             _("User ID"),
             _("Name"),
             _("Email"),
@@ -23,32 +41,32 @@ class OpenBasketReportCSVFormatter(ReportCSVFormatter):
             _("Date of creation"),
             _("Time since creation"),
         ]
-        writer.writerow(header_row)
-
-        for basket in baskets:
-            if basket.owner:
-                row = [
-                    basket.owner_id,
-                    basket.owner.get_full_name(),
-                    basket.owner.email,
-                    basket.status,
-                    basket.num_lines,
-                    basket.num_items,
-                    self.format_datetime(basket.date_created),
-                    basket.time_since_creation,
-                ]
-            else:
-                row = [
-                    basket.owner_id,
-                    None,
-                    None,
-                    basket.status,
-                    basket.num_lines,
-                    basket.num_items,
-                    self.format_datetime(basket.date_created),
-                    self.format_timedelta(basket.time_since_creation),
-                ]
-            writer.writerow(row)
+
+    def prepare_queryset(self, queryset):
+        return annotate_line_counts(queryset.select_related("owner"))
+
+    def get_row(self, basket):
+        if basket.owner:
+            return [
+                basket.owner_id,
+                basket.owner.get_full_name(),
+                basket.owner.email,
+                basket.status,
+                basket.line_count,
+                basket.item_count,
+                self.format_datetime(basket.date_created),
+                basket.time_since_creation,
+            ]
+        return [
+            basket.owner_id,
+            None,
+            None,
+            basket.status,
+            basket.line_count,
+            basket.item_count,
+            self.format_datetime(basket.date_created),
+            self.format_timedelta(basket.time_since_creation),
+        ]
 
     def filename(self, **kwargs):
         return self.filename_template % (kwargs["start_date"], kwargs["end_date"])
@@ -81,9 +99,8 @@ class OpenBasketReportGenerator(ReportGenerator):
 class SubmittedBasketReportCSVFormatter(ReportCSVFormatter):
     filename_template = "submitted_baskets-%s-%s.csv"
 
-    def generate_csv(self, response, baskets):
-        writer = self.get_csv_writer(response)
-        header_row = [
+    def get_header_row(self):
+        return [
             _("User ID"),
             _("User"),
             _("Basket status"),
@@ -92,19 +109,20 @@ class SubmittedBasketReportCSVFormatter(ReportCSVFormatter):
             _("Date created"),
             _("Time between creation and submission"),
         ]
-        writer.writerow(header_row)
 
-        for basket in baskets:
-            row = [
-                basket.owner_id,
-                basket.owner,
-                basket.status,
-                basket.num_lines,
-                basket.num_items,
-                self.format_datetime(basket.date_created),
-                basket.time_before_submit,
-            ]
-            writer.writerow(row)
+    def prepare_queryset(self, queryset):
+        return annotate_line_counts(queryset.select_related("owner"))
+
+    def get_row(self, basket):
+        return [
+            basket.owner_id,
+            basket.owner,
+            basket.status,
+            basket.line_count,
+            basket.item_count,
+            self.format_datetime(basket.date_created),
+            basket.time_before_submit,
+        ]
 
     def filename(self, **kwargs):
         return self.filename_template % (kwargs["start_date"], kwargs["end_date"])
@@ -0,0 +1,158 @@
+from decimal import Decimal as D
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, F, Max, Q, Sum
+
+from oscar.core.loading import get_class, get_model
+from oscar.core.utils import round_half_up_two_dec
+
+get_offers_version = get_class("offer.cache", "get_offers_version")
+
+
+class BasketSummary(object):
+    """
+    The number of items and totals of a basket, which is all that headers and
+    mini-baskets need to display.
+
+    ``includes_discounts`` is false for totals worked out from the line
+    prices without applying offers, which are the totals before discounts.
+    """
+
+    def __init__(
+        self,
+        num_lines=0,
+        num_items=0,
+        total_excl_tax=D("0.00"),
+        total_incl_tax=D("0.00"),
+        is_tax_known=False,
+        currency=None,
+        includes_discounts=True,
+    ):
+        self.num_lines = num_lines
+        self.num_items = num_items
+        self.total_excl_tax = total_excl_tax
+        self.total_incl_tax = total_incl_tax
+        self.is_tax_known = is_tax_known
+        self.currency = currency
+        self.includes_discounts = includes_discounts
+
+    @classmethod
+    def from_basket(cls, basket):
+        """
+        Return the summary of a basket that has had its offers applied
+        """
+        if basket.is_empty:
+            return cls()
+        return cls(
+            num_lines=basket.num_lines,
+            num_items=basket.num_items,
+            total_excl_tax=basket.total_excl_tax,
+            total_incl_tax=basket.total_incl_tax if basket.is_tax_known else None,
+            is_tax_known=basket.is_tax_known,
+            currency=basket.currency,
+        )
+
+    @property
+    def is_empty(self):
+        return self.num_lines == 0
+
+    def as_dict(self):
+        return {
+            "num_lines": self.num_lines,
+            "num_items": self.num_items,
+            "total_excl_tax": self.total_excl_tax,
+            "total_incl_tax": self.total_incl_tax,
+            "is_tax_known": self.is_tax_known,
+            "currency": self.currency,
+            "includes_discounts": self.includes_discounts,
+        }
+
+
+class BasketSummaryCache(object):
+    """
+    Serves basket summaries without loading the basket's lines or applying
+    offers.
+
+    A summary is cached per basket whenever the full basket is loaded, and is
+    discarded when the basket's lines or vouchers change.  Summaries cached
+    under another offers version or pricing strategy are ignored.  Without a
+    cached summary, one is calculated from the prices stored on the basket
+    lines in a single query, which doesn't include any discounts.
+    """
+
+    key_prefix = "oscar-basket-summary"
+
+    def get_key(self, basket_id):
+        return "%s-%s" % (self.key_prefix, basket_id)
+
+    def get_version(self, strategy):
+        return "%s:%s.%s" % (
+            get_offers_version(),
+            type(strategy).__module__,
+            type(strategy).__qualname__,
+        )
+
+    def get_summary(self, basket, strategy):
+        if basket.id is None:
+            return BasketSummary()
+        entry = cache.get(self.get_key(basket.id))
+        if entry is not None and entry["version"] == self.get_version(strategy):
+            return BasketSummary(**entry["summary"])
+        return self.calculate(basket)
+
+    def calculate(self, basket):
+        """
+        Return the summary of the basket calculated from the prices stored on
+        its lines, which doesn't include discounts.
+        """
+        Line = get_model("basket", "Line")
+        price_field = DecimalField(max_digits=12, decimal_places=2)
+        totals = Line.objects.filter(basket_id=basket.id).aggregate(
+            num_lines=Count("id"),
+            num_items=Sum("quantity"),
+            total_excl_tax=Sum(
+                F("quantity") * F("price_excl_tax"), output_field=price_field
+            ),
+            total_incl_tax=Sum(
+                F("quantity") * F("price_incl_tax"), output_field=price_field
+            ),
+            num_unknown_tax=Count("id", filter=Q(price_incl_tax__isnull=True)),
+            currency=Max("price_currency"),
+        )
+        if not totals["num_lines"]:
+            return BasketSummary()
+        is_tax_known = totals["num_unknown_tax"] == 0
+        return BasketSummary(
+            num_lines=totals["num_lines"],
+            num_items=totals["num_items"],
+            total_excl_tax=round_half_up_two_dec(totals["total_excl_tax"] or D("0.00")),
+            total_incl_tax=(
+                round_half_up_two_dec(totals["total_incl_tax"])
+                if is_tax_known
+                else None
+            ),
+            is_tax_known=is_tax_known,
+            currency=totals["currency"],
+            includes_discounts=False,
+        )
+
+    def store(self, basket):
+        """
+        Cache the summary of a basket that has had its offers applied
+        """
+        if basket.id is None:
+            return
+        entry = {
+            "version": self.get_version(basket.strategy),
+            "summary": BasketSummary.from_basket(basket).as_dict(),
+        }
+        cache.set(
+            self.get_key(basket.id), entry, settings.OSCAR_BASKET_SUMMARY_CACHE_TIMEOUT
+        )
+
+    def invalidate(self, basket_id):
+        cache.delete(self.get_key(basket_id))
+
+
+basket_summary_cache = BasketSummaryCache()
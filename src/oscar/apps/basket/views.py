@@ -8,7 +8,7 @@ from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.utils.translation import gettext_lazy as _
-from django.views.generic import FormView, View
+from django.views.generic import FormView, TemplateView, View
 from extra_views import ModelFormSetView
 
 from oscar.apps.basket.signals import basket_addition, voucher_addition, voucher_removal
@@ -315,6 +315,17 @@ class BasketView(ModelFormSetView):
         formset.full_clean()
 
 
+class BasketQuickView(TemplateView):
+    """
+    Render the lines of the mini-basket dropdown.
+
+    The dropdown is loaded when it's opened, so that pages only need the
+    basket summary for the header.
+    """
+
+    template_name = "oscar/basket/partials/basket_quick.html"
+
+
 class BasketAddView(FormView):
     """
     Handles the add-to-basket submissions, which are triggered from various
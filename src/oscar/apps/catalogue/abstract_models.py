@@ -28,6 +28,7 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.translation import pgettext, pgettext_lazy
 from treebeard.mp_tree import MP_Node
 
+from oscar.apps.catalogue.imaging import get_content_hash
 from oscar.core.decorators import deprecated
 from oscar.core.loading import get_class, get_classes, get_model
 from oscar.core.utils import slugify
@@ -42,6 +43,7 @@ CategoryQuerySet, CategoryManager, ProductQuerySet = get_classes(
 ProductAttributesContainer = get_class(
     "catalogue.product_attributes", "ProductAttributesContainer"
 )
+get_category_tree = get_class("catalogue.tree", "get_category_tree")
 
 
 # pylint: disable=abstract-method
@@ -199,24 +201,103 @@ class AbstractCategory(MP_Node):
         hence kept for backwards compatibility. It's also sufficiently useful
         to keep around.
         """
+        node = self.get_tree_node()
+        if node is not None:
+            return node.full_name
         names = [category.name for category in self.get_ancestors_and_self()]
         return self._full_name_separator.join(names)
 
+    def get_tree_node(self):
+        """
+        Returns the category's node in the category tree snapshot, or ``None``
+        if the snapshot isn't used or doesn't match the category.
+        """
+        if self.pk is None:
+            return None
+        tree = get_category_tree()
+        if tree is None:
+            return None
+        node = tree.get(self.pk)
+        if node is None or (node.category.path, node.category.slug) != (
+            self.path,
+            self.slug,
+        ):
+            # Eg the category has unsaved changes
+            return None
+        return node
+
     def get_full_slug(self, parent_slug=None):
         if self.is_root():
             return self.slug
 
+        if parent_slug is None:
+            return self.get_full_slugs([self])[self.pk]
+
         cache_key = self.get_url_cache_key()
         full_slug = cache.get(cache_key)
         if full_slug is None:
-            parent_slug = (
-                parent_slug if parent_slug is not None else self.get_parent().full_slug
-            )
             full_slug = "%s%s%s" % (parent_slug, self._slug_separator, self.slug)
             cache.set(cache_key, full_slug)
 
         return full_slug
 
+    @classmethod
+    def get_full_slugs(cls, categories):
+        """
+        Returns a dict of the primary keys of the given categories to their
+        full slugs.
+
+        The cached full slugs are fetched at once. The others are built from
+        the slugs of the categories' ancestors, which are looked up by their
+        paths in a single query, and are cached at once.
+        """
+        full_slugs = {}
+        uncached = {}
+        for category in categories:
+            node = category.get_tree_node()
+            if node is not None:
+                full_slugs[category.pk] = node.full_slug
+            elif category.is_root():
+                full_slugs[category.pk] = category.slug
+            else:
+                uncached[category.get_url_cache_key()] = category
+        if not uncached:
+            return full_slugs
+
+        for cache_key, full_slug in cache.get_many(list(uncached)).items():
+            full_slugs[uncached.pop(cache_key).pk] = full_slug
+        if not uncached:
+            return full_slugs
+
+        ancestor_paths = {
+            path
+            for category in uncached.values()
+            for path in category.get_ancestor_paths()
+        }
+        ancestor_slugs = dict(
+            cls.objects.filter(path__in=ancestor_paths).values_list("path", "slug")
+        )
+        to_cache = {}
+        for cache_key, category in uncached.items():
+            try:
+                slugs = [ancestor_slugs[path] for path in category.get_ancestor_paths()]
+            except KeyError:
+                raise cls.DoesNotExist(
+                    "An ancestor of category %s does not exist" % category.pk
+                )
+            full_slug = cls._slug_separator.join(slugs + [category.slug])
+            full_slugs[category.pk] = to_cache[cache_key] = full_slug
+        cache.set_many(to_cache)
+        return full_slugs
+
+    def get_ancestor_paths(self):
+        """
+        Returns the paths of the category's ancestors, from the root down
+        """
+        return [
+            self.path[:end] for end in range(self.steplen, len(self.path), self.steplen)
+        ]
+
     @property
     def full_slug(self):
         """
@@ -295,6 +376,10 @@ class AbstractCategory(MP_Node):
         if self.is_root():
             return [self]
 
+        node = self.get_tree_node()
+        if node is not None:
+            return node.get_ancestors_and_self()[:-1] + [self]
+
         return list(self.get_ancestors()) + [self]
 
     def get_descendants_and_self(self):
@@ -310,21 +395,24 @@ class AbstractCategory(MP_Node):
         cache_key = "CATEGORY_URL_%s_%s" % (current_locale, self.pk)
         return cache_key
 
-    def _get_absolute_url(self, parent_slug=None):
+    def _get_absolute_url(self, parent_slug=None, full_slug=None):
         """
         Our URL scheme means we have to look up the category's ancestors. As
         that is a bit more expensive, we cache the generated URL. That is
         safe even for a stale cache, as the default implementation of
         ProductCategoryView does the lookup via primary key anyway. But if
         you change that logic, you'll have to reconsider the caching
-        approach.
+        approach. Callers that know the full slug already can pass it.
         """
+        if full_slug is None:
+            if parent_slug is None:
+                node = self.get_tree_node()
+                if node is not None:
+                    return node.get_absolute_url()
+            full_slug = self.get_full_slug(parent_slug=parent_slug)
         return reverse(
             "catalogue:category",
-            kwargs={
-                "category_slug": self.get_full_slug(parent_slug=parent_slug),
-                "pk": self.pk,
-            },
+            kwargs={"category_slug": full_slug, "pk": self.pk},
         )
 
     def get_absolute_url(self):
@@ -1664,6 +1752,11 @@ class AbstractProductImage(models.Model):
             " image for a product"
         ),
     )
+    #: Hash of the content of the original image, used to spot duplicates
+    #: without reading the images back from storage
+    content_hash = models.CharField(
+        _("Content hash"), max_length=64, blank=True, db_index=True, editable=False
+    )
     date_created = models.DateTimeField(_("Date created"), auto_now_add=True)
 
     class Meta:
@@ -1684,6 +1777,15 @@ class AbstractProductImage(models.Model):
         """
         return self.display_order == 0
 
+    def save(self, *args, **kwargs):
+        if self.original and not self.original._committed:
+            # A newly uploaded file, which is read before being stored and
+            # may have been read already, eg by form validation
+            self.original.seek(0)
+            self.content_hash = get_content_hash(self.original)
+            self.original.seek(0)
+        super().save(*args, **kwargs)
+
     def delete(self, *args, **kwargs):
         """
         Always keep the display_order as consecutive integers. This avoids
@@ -1709,3 +1811,19 @@ class AbstractProductCategoryHierarchy(models.Model):
         # Point to postgres created product hierarchy
         db_table = "catalogue_product_category_hierarchy"
         managed = False
+
+
+class AbstractProductCategoryHierarchyStatus(models.Model):
+    """
+    Whether the product category hierarchy needs refreshing, and when it was
+    last refreshed.  There's a single row, so that all processes see it.
+    """
+
+    is_dirty = models.BooleanField(_("Is dirty"), default=False)
+    date_refreshed = models.DateTimeField(_("Date refreshed"), null=True, blank=True)
+
+    class Meta:
+        abstract = True
+        app_label = "catalogue"
+        verbose_name = _("Product category hierarchy status")
+        verbose_name_plural = _("Product category hierarchy statuses")
@@ -0,0 +1,282 @@
+from collections import defaultdict
+
+from django.db.models import Count, Q
+from django.db.models.functions import Substr
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from purl import URL
+
+from oscar.core.loading import get_model
+from oscar.core.pagination import KeysetPaginator
+
+Category = get_model("catalogue", "Category")
+Product = get_model("catalogue", "Product")
+ProductAttribute = get_model("catalogue", "ProductAttribute")
+ProductAttributeValue = get_model("catalogue", "ProductAttributeValue")
+ProductCategory = get_model("catalogue", "ProductCategory")
+
+
+class ProductBrowser(object):
+    """
+    Browses the products of the catalogue or a category with the database
+    rather than a search backend.
+
+    Products are filtered by the selected facets, given as ``field:value``
+    strings like the selected facets of searches, and paginated by keyset.
+    Products matching any of the selected values of a field match the field.
+
+    Facets are counted with a grouped query each: the browsable categories
+    directly below the browsed one count the products in their subtree, and
+    product classes and the attributes in ``attribute_facets`` count the
+    products with each of their values.  Each field is counted for the
+    products matching the selected values of the other fields, so the
+    counts of its other values are known.
+    """
+
+    #: Map of ``ProductBrowseForm`` sort option to the ordering of products
+    sort_orderings = {
+        "newest": ("-date_created",),
+        "title-asc": ("title",),
+        "title-desc": ("-title",),
+    }
+    default_ordering = ("-date_created",)
+
+    #: The codes of the attributes to facet products by.  Attributes of the
+    #: option, multi option, text, integer and boolean types are supported.
+    attribute_facets = ()
+
+    #: The value column of each type of attribute that can be faceted by
+    attribute_value_fields = {
+        "option": "value_option__option",
+        "multi_option": "value_multi_option__option",
+        "text": "value_text",
+        "integer": "value_integer",
+        "boolean": "value_boolean",
+    }
+
+    cursor_param = "cursor"
+
+    def __init__(self, category=None, selected_facets=(), sort_by=None):
+        self.category = category
+        self.ordering = self.sort_orderings.get(sort_by, self.default_ordering)
+        facet_fields = self.get_facet_fields()
+        self.selected_facets = []
+        self.selected_multi_facets = defaultdict(list)
+        for facet in selected_facets:
+            field, __, value = facet.partition(":")
+            if field in facet_fields and value:
+                self.selected_facets.append(facet)
+                self.selected_multi_facets[field].append(value)
+
+    def get_facet_fields(self):
+        return ["category", "product_class"] + [
+            self.get_attribute_field(code) for code in self.attribute_facets
+        ]
+
+    def get_attribute_field(self, code):
+        return "attribute_%s" % code
+
+    # Products
+
+    def get_categories(self, paths):
+        """
+        Return the browsable categories in the subtrees with the given paths
+        """
+        condition = Q()
+        for path in paths:
+            condition |= Q(path__startswith=path)
+        if not condition:
+            return Category.objects.none()
+        return Category.objects.browsable().filter(condition)
+
+    def get_category_filter(self, paths):
+        # Filter with a subquery, as joining would duplicate products that
+        # are in several of the categories
+        return Q(
+            pk__in=ProductCategory.objects.filter(
+                category__in=self.get_categories(paths)
+            ).values("product_id")
+        )
+
+    @cached_property
+    def facet_filters(self):
+        """
+        Return a dict of the selected facet fields to the filter of products
+        matching them
+        """
+        filters = {}
+        selected = self.selected_multi_facets
+        if selected["category"]:
+            paths = Category.objects.filter(
+                pk__in=[pk for pk in selected["category"] if pk.isdigit()]
+            ).values_list("path", flat=True)
+            filters["category"] = self.get_category_filter(list(paths))
+        if selected["product_class"]:
+            filters["product_class"] = Q(
+                product_class__slug__in=selected["product_class"]
+            )
+        for code in self.attribute_facets:
+            field = self.get_attribute_field(code)
+            if selected[field]:
+                # Filter with a subquery, as joining would duplicate products
+                # with several of the values
+                matching = Product.objects.filter_by_attributes(
+                    **{"%s__in" % code: selected[field]}
+                )
+                filters[field] = Q(pk__in=matching.values("pk"))
+        return filters
+
+    def get_queryset(self, exclude_field=None):
+        """
+        Return the browsable products matching the category and selected
+        facets, except those of ``exclude_field``, without any ordering
+        """
+        products = Product.objects.browsable().order_by()
+        if self.category is not None:
+            products = products.filter(self.get_category_filter([self.category.path]))
+        for field, condition in self.facet_filters.items():
+            if field != exclude_field:
+                products = products.filter(condition)
+        return products
+
+    def get_page(self, cursor=None, per_page=20):
+        """
+        Return the page of products for the given cursor.  ``InvalidPage`` is
+        raised for invalid cursors.
+        """
+        products = self.get_queryset().base_queryset()
+        return KeysetPaginator(products, per_page, self.ordering).page(cursor)
+
+    # Facets
+
+    def count_categories(self, products):
+        """
+        Return ``(value, name, count)`` for each browsable category below the
+        browsed one with matching products in its subtree
+        """
+        if self.category is None:
+            depth, path = 1, ""
+        else:
+            depth, path = self.category.depth + 1, self.category.path
+        children = Category.objects.browsable().filter(
+            depth=depth, path__startswith=path
+        )
+        counts = dict(
+            ProductCategory.objects.filter(
+                product__in=products.values("pk"),
+                category__in=Category.objects.browsable(),
+                category__depth__gte=depth,
+                category__path__startswith=path,
+            )
+            .annotate(branch=Substr("category__path", 1, depth * Category.steplen))
+            .values("branch")
+            .annotate(num_products=Count("product_id", distinct=True))
+            .values_list("branch", "num_products")
+        )
+        return [
+            (str(child.pk), child.name, counts[child.path])
+            for child in children
+            if child.path in counts
+        ]
+
+    def count_product_classes(self, products):
+        return [
+            (
+                values["product_class__slug"],
+                values["product_class__name"],
+                values["num_products"],
+            )
+            for values in products.values("product_class__slug", "product_class__name")
+            .annotate(num_products=Count("pk"))
+            .order_by("-num_products", "product_class__name")
+            if values["product_class__slug"]
+        ]
+
+    def count_attribute_values(self, attribute_type, code, products):
+        field = self.attribute_value_fields[attribute_type]
+        counts = (
+            ProductAttributeValue.objects.filter(
+                attribute__code=code,
+                attribute__type=attribute_type,
+                product__in=products.values("pk"),
+            )
+            .exclude(**{"%s__isnull" % field: True})
+            .values(field)
+            .annotate(num_products=Count("product_id", distinct=True))
+            .order_by("-num_products", field)
+            .values_list(field, "num_products")
+        )
+        return [(str(value), str(value), count) for value, count in counts]
+
+    def get_facet_counts(self):
+        """
+        Return an ordered dict of facet field to its name and the
+        ``(value, name, count)`` of its values
+        """
+        facet_counts = {
+            "category": (
+                _("Category"),
+                self.count_categories(self.get_queryset("category")),
+            ),
+            "product_class": (
+                _("Type"),
+                self.count_product_classes(self.get_queryset("product_class")),
+            ),
+        }
+        attributes = ProductAttribute.objects.filter(
+            code__in=self.attribute_facets,
+            type__in=self.attribute_value_fields.keys(),
+        ).values_list("code", "name", "type")
+        # Attributes of different product classes can share their code
+        attributes = {
+            (code, attribute_type): name for code, name, attribute_type in attributes
+        }
+        counts_by_code = defaultdict(list)
+        names = {}
+        for (code, attribute_type), name in attributes.items():
+            names.setdefault(code, name)
+            products = self.get_queryset(self.get_attribute_field(code))
+            counts_by_code[code].extend(
+                self.count_attribute_values(attribute_type, code, products)
+            )
+        for code in self.attribute_facets:
+            if code in names:
+                facet_counts[self.get_attribute_field(code)] = (
+                    names[code],
+                    counts_by_code[code],
+                )
+        return facet_counts
+
+    def get_facet_data(self, path):
+        """
+        Return the facet data for templates, in the same structure as
+        ``FacetMunger``, with URLs based on the given request path
+        """
+        base_url = URL(path)
+        facet_data = {}
+        for field, (name, counts) in self.get_facet_counts().items():
+            results = []
+            for value, value_name, count in counts:
+                datum = {
+                    "name": value_name,
+                    "count": count,
+                    "show_count": True,
+                    "disabled": count == 0,
+                    "selected": False,
+                }
+                facet = "%s:%s" % (field, value)
+                if value in self.selected_multi_facets.get(field, []):
+                    datum["selected"] = True
+                    url = base_url.remove_query_param("selected_facets", facet)
+                    datum["deselect_url"] = self.strip_pagination(url)
+                else:
+                    url = base_url.append_query_param("selected_facets", facet)
+                    datum["select_url"] = self.strip_pagination(url)
+                results.append(datum)
+            facet_data[field] = {"name": name, "results": results}
+        return facet_data
+
+    def strip_pagination(self, url):
+        if url.has_query_param(self.cursor_param):
+            url = url.remove_query_param(self.cursor_param)
+        return url.as_string()
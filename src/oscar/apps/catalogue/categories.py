@@ -1,6 +1,14 @@
-from oscar.core.loading import get_model
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Max
+from django.db.models.functions import Left, Length
+from treebeard.exceptions import PathOverflow
+
+from oscar.core.loading import get_class, get_model
 
 Category = get_model("catalogue", "category")
+bump_category_tree_version = get_class("catalogue.tree", "bump_category_tree_version")
 
 
 def create_from_sequence(bits):
@@ -46,3 +54,176 @@ def create_from_breadcrumbs(breadcrumb_str, separator=">"):
     category_names = [x.strip() for x in breadcrumb_str.split(separator)]
     categories = create_from_sequence(category_names)
     return categories[-1]
+
+
+class BulkCategoryCreator(object):
+    """
+    Creates the categories of many breadcrumbs at once, eg for imports.
+
+    The existing categories are looked up in a single query. The missing
+    ones are given their materialised paths up front, after the last child
+    of their parent, and inserted with ``bulk_create``. As new categories are
+    public, whether their ancestors are public is taken from their parents
+    instead of being worked out by the ``post_save`` receiver for each of
+    them. ``bulk_create`` sends no signals, so the category tree snapshot is
+    invalidated once at the end.
+
+    Categories created concurrently by other processes can take the same
+    paths, which fails the import on the unique path constraint.
+    """
+
+    batch_size = 500
+
+    def __init__(self, separator=">"):
+        self.separator = separator
+
+    def parse(self, breadcrumb_str):
+        return tuple(x.strip() for x in breadcrumb_str.split(self.separator))
+
+    def create(self, breadcrumbs):
+        """
+        Create the categories of the given breadcrumb strings, returning a
+        dict of each breadcrumb string to its last category
+        """
+        trails = {breadcrumb: self.parse(breadcrumb) for breadcrumb in breadcrumbs}
+        # Parents come before their children, and siblings are created in
+        # the order they first appear
+        prefixes = dict.fromkeys(
+            trail[:depth]
+            for trail in trails.values()
+            for depth in range(1, len(trail) + 1)
+        )
+        prefixes = sorted(prefixes, key=len)
+        with transaction.atomic():
+            categories, missing = self.resolve_existing(prefixes)
+            if missing:
+                self.create_missing(missing, categories)
+                transaction.on_commit(bump_category_tree_version)
+        return {breadcrumb: categories[trail] for breadcrumb, trail in trails.items()}
+
+    def resolve_existing(self, prefixes):
+        """
+        Return a dict of the prefixes of existing categories to them, and a
+        list of the missing prefixes
+        """
+        if not prefixes:
+            return {}, []
+        existing = defaultdict(list)
+        candidates = Category.objects.filter(
+            depth__lte=len(prefixes[-1]),
+            name__in={prefix[-1] for prefix in prefixes},
+        )
+        for category in candidates:
+            parent_path = category.path[: -Category.steplen]
+            existing[(parent_path, category.name)].append(category)
+
+        categories, missing = {}, []
+        for prefix in prefixes:
+            parent = None
+            if len(prefix) > 1:
+                parent = categories.get(prefix[:-1])
+                if parent is None:
+                    # The parent is missing, and so is the category
+                    missing.append(prefix)
+                    continue
+            parent_path = parent.path if parent is not None else ""
+            matches = existing.get((parent_path, prefix[-1]), [])
+            if len(matches) > 1:
+                if parent is None:
+                    raise ValueError(
+                        "There are more than one categories with name %s at depth=1"
+                        % prefix[-1]
+                    )
+                raise ValueError(
+                    "There are more than one categories with name %s which are "
+                    "children of %s" % (prefix[-1], parent)
+                )
+            if matches:
+                categories[prefix] = matches[0]
+            else:
+                missing.append(prefix)
+        return categories, missing
+
+    def get_last_positions(self, parent_paths):
+        """
+        Return a dict of the given parent paths ("" for the roots) to the
+        position of their last child
+        """
+        steplen = Category.steplen
+        last_paths = (
+            Category.objects.filter(
+                depth__in={len(path) // steplen + 1 for path in parent_paths}
+            )
+            .annotate(parent_path=Left("path", Length("path") - steplen))
+            .filter(parent_path__in=parent_paths)
+            .values("parent_path")
+            .annotate(last_path=Max("path"))
+            .order_by()
+        )
+        return {
+            row["parent_path"]: Category._str2int(row["last_path"][-steplen:])
+            for row in last_paths
+        }
+
+    def create_missing(self, missing, categories):
+        existing_parent_paths = set()
+        for prefix in missing:
+            if len(prefix) == 1:
+                existing_parent_paths.add("")
+            elif prefix[:-1] in categories:
+                existing_parent_paths.add(categories[prefix[:-1]].path)
+        last_positions = self.get_last_positions(existing_parent_paths)
+
+        new_categories = []
+        new_children = defaultdict(int)
+        for prefix in missing:
+            parent = categories.get(prefix[:-1])
+            parent_path = parent.path if parent is not None else ""
+            position = last_positions.get(parent_path, 0) + 1
+            last_positions[parent_path] = position
+            depth = len(prefix)
+            path = Category._get_path(parent_path, depth, position)
+            if len(path) > depth * Category.steplen:
+                raise PathOverflow("Path Overflow from: '%s'" % parent_path)
+            category = Category(
+                name=prefix[-1],
+                path=path,
+                depth=depth,
+                numchild=0,
+                ancestors_are_public=(
+                    parent is None or (parent.is_public and parent.ancestors_are_public)
+                ),
+            )
+            category.slug = category.generate_slug()
+            if parent is not None:
+                if parent._state.adding:
+                    parent.numchild += 1
+                else:
+                    new_children[parent] += 1
+            categories[prefix] = category
+            new_categories.append(category)
+
+        Category.objects.bulk_create(new_categories, batch_size=self.batch_size)
+        self.set_primary_keys(new_categories)
+
+        parents_by_increment = defaultdict(list)
+        for parent, num_new in new_children.items():
+            parent.numchild += num_new
+            parents_by_increment[num_new].append(parent.pk)
+        for num_new, pks in parents_by_increment.items():
+            Category.objects.filter(pk__in=pks).update(numchild=F("numchild") + num_new)
+
+    def set_primary_keys(self, new_categories):
+        """
+        Look up the primary keys of the inserted categories by path, on
+        databases (eg MySQL) that don't return them from bulk inserts
+        """
+        if all(category.pk is not None for category in new_categories):
+            return
+        pks = dict(
+            Category.objects.filter(
+                path__in=[category.path for category in new_categories]
+            ).values_list("path", "pk")
+        )
+        for category in new_categories:
+            category.pk = pks[category.path]
@@ -0,0 +1,25 @@
+from django import forms
+from django.utils.translation import gettext_lazy as _
+
+
+class ProductBrowseForm(forms.Form):
+    """
+    Sorting of products browsed with the database, see ``ProductBrowser``
+    """
+
+    NEWEST = "newest"
+    TITLE_A_TO_Z = "title-asc"
+    TITLE_Z_TO_A = "title-desc"
+
+    SORT_BY_CHOICES = [
+        (NEWEST, _("Newest")),
+        (TITLE_A_TO_Z, _("Title A to Z")),
+        (TITLE_Z_TO_A, _("Title Z to A")),
+    ]
+
+    sort_by = forms.ChoiceField(
+        label=_("Sort by"),
+        choices=SORT_BY_CHOICES,
+        widget=forms.Select(),
+        required=False,
+    )
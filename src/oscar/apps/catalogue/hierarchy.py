@@ -0,0 +1,233 @@
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from oscar.checks import is_postgres
+from oscar.core.loading import get_model
+
+
+class ProductCategoryHierarchyRefresher(object):
+    """
+    Keeps the product category hierarchy up to date while coalescing work.
+
+    On PostgreSQL the hierarchy is a materialised view, which can only be
+    refreshed as a whole.  Changes mark it dirty, and it's refreshed at most
+    once per transaction commit.  If
+    ``OSCAR_CATALOGUE_MATERIALISED_VIEW_REFRESH_INTERVAL`` is set, refreshes
+    are further limited to one per interval, and the view is left dirty for
+    a later commit or the ``oscar_refresh_product_category_hierarchy``
+    command to pick up.  The dirty flag and the time of the last refresh are
+    kept in the ``ProductCategoryHierarchyStatus`` table, so that every
+    process sees them.
+
+    On other databases the hierarchy is a regular table, which is updated
+    incrementally for the changed products.
+
+    Refreshes are deferred while ``suspended()`` is active, and done once
+    when it's left.
+    """
+
+    batch_size = 1000
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def is_suspended(self):
+        return getattr(self._local, "suspended", 0) > 0
+
+    @contextmanager
+    def suspended(self):
+        """
+        Context manager that suspends refreshes during bulk operations
+        """
+        if not self.is_suspended:
+            self._local.suspended = 0
+            self._local.pending_product_ids = set()
+            self._local.pending_rebuild = False
+        self._local.suspended += 1
+        try:
+            yield
+        finally:
+            self._local.suspended -= 1
+            if not self.is_suspended:
+                product_ids = self._local.pending_product_ids
+                rebuild = self._local.pending_rebuild
+                if rebuild:
+                    self.mark_dirty()
+                elif product_ids:
+                    self.mark_dirty(product_ids)
+
+    def mark_dirty(self, product_ids=None):
+        """
+        Record that the categories of the given products (all products if
+        not given) have changed.
+        """
+        if self.is_suspended:
+            if product_ids is None:
+                self._local.pending_rebuild = True
+            else:
+                self._local.pending_product_ids.update(product_ids)
+            return
+
+        if is_postgres():
+            self.schedule_refresh()
+        elif product_ids is None:
+            self.rebuild()
+        else:
+            self.update_products(product_ids)
+
+    def get_status_queryset(self):
+        return get_model("catalogue", "ProductCategoryHierarchyStatus").objects.all()
+
+    def set_status(self, **fields):
+        self.get_status_queryset().update_or_create(pk=1, defaults=fields)
+
+    def is_dirty(self):
+        return self.get_status_queryset().filter(is_dirty=True).exists()
+
+    def schedule_refresh(self):
+        """
+        Mark the materialised view dirty and refresh it once the current
+        transaction is committed.
+        """
+        # Only lock the status row if it isn't dirty already
+        if not self.is_dirty():
+            self.set_status(is_dirty=True)
+        if self.is_refresh_scheduled:
+            return
+        callback = self.refresh_on_commit
+        self._local.scheduled_refresh = weakref.ref(callback)
+        transaction.on_commit(callback)
+
+    @property
+    def is_refresh_scheduled(self):
+        # Django drops the callbacks of transactions and savepoints that are
+        # rolled back, which frees the callback and kills the reference.
+        callback = getattr(self._local, "scheduled_refresh", None)
+        return callback is not None and callback() is not None
+
+    def refresh_on_commit(self):
+        self._local.scheduled_refresh = None
+        interval = settings.OSCAR_CATALOGUE_MATERIALISED_VIEW_REFRESH_INTERVAL
+        last_refreshed = (
+            self.get_status_queryset().values_list("date_refreshed", flat=True).first()
+        )
+        if (
+            interval
+            and last_refreshed
+            and timezone.now() - last_refreshed < timedelta(seconds=interval)
+        ):
+            return
+        self.refresh()
+
+    def refresh_if_dirty(self):
+        """
+        Refresh the hierarchy if it has been marked dirty, returning whether
+        it has been refreshed.
+        """
+        if not self.is_dirty():
+            return False
+        self.refresh()
+        return True
+
+    def refresh(self):
+        """
+        Refresh the whole hierarchy
+        """
+        # Clear the flag first so changes made during the refresh aren't lost
+        self.get_status_queryset().filter(is_dirty=True).update(is_dirty=False)
+        if is_postgres():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "REFRESH MATERIALIZED VIEW CONCURRENTLY "
+                    "catalogue_product_category_hierarchy;"
+                )
+        else:
+            self.rebuild()
+        self.set_status(date_refreshed=timezone.now())
+
+    def get_hierarchy_rows(self, product_categories):
+        """
+        Return the hierarchy rows for the given ``(product_id, category_path)``
+        pairs, linking each product to the category and its ancestors.
+        """
+        Category = get_model("catalogue", "Category")
+        ProductCategoryHierarchy = get_model("catalogue", "ProductCategoryHierarchy")
+        steplen = Category.steplen
+        paths = set()
+        for __, path in product_categories:
+            paths.update(path[:i] for i in range(steplen, len(path) + 1, steplen))
+        category_ids = dict(
+            Category.objects.filter(path__in=paths).values_list("path", "id")
+        )
+        rows = {}
+        for product_id, path in product_categories:
+            for i in range(steplen, len(path) + 1, steplen):
+                category_id = category_ids.get(path[:i])
+                if category_id is None:
+                    continue
+                row_id = "%s-%s" % (product_id, category_id)
+                rows[row_id] = ProductCategoryHierarchy(
+                    id=row_id, product_id=product_id, category_id=category_id
+                )
+        return list(rows.values())
+
+    @transaction.atomic
+    def update_products(self, product_ids):
+        """
+        Rebuild the hierarchy rows of the given products, on databases
+        where the hierarchy is a regular table.
+        """
+        ProductCategory = get_model("catalogue", "ProductCategory")
+        ProductCategoryHierarchy = get_model("catalogue", "ProductCategoryHierarchy")
+        product_ids = list(product_ids)
+        ProductCategoryHierarchy.objects.filter(product_id__in=product_ids).delete()
+        product_categories = list(
+            ProductCategory.objects.filter(product_id__in=product_ids).values_list(
+                "product_id", "category__path"
+            )
+        )
+        ProductCategoryHierarchy.objects.bulk_create(
+            self.get_hierarchy_rows(product_categories), batch_size=self.batch_size
+        )
+
+    @transaction.atomic
+    def rebuild(self):
+        """
+        Rebuild all hierarchy rows, on databases where the hierarchy is a
+        regular table.
+        """
+        ProductCategory = get_model("catalogue", "ProductCategory")
+        ProductCategoryHierarchy = get_model("catalogue", "ProductCategoryHierarchy")
+        ProductCategoryHierarchy.objects.all().delete()
+        product_categories = (
+            ProductCategory.objects.order_by("product_id")
+            .values_list("product_id", "category__path")
+            .iterator(chunk_size=self.batch_size)
+        )
+        batch = []
+        for product_category in product_categories:
+            batch.append(product_category)
+            if len(batch) >= self.batch_size:
+                self._create_rows(batch)
+                batch = []
+        self._create_rows(batch)
+
+    def _create_rows(self, product_categories):
+        ProductCategoryHierarchy = get_model("catalogue", "ProductCategoryHierarchy")
+        # A product's categories may be split across batches, so rows that
+        # were already created are ignored.
+        ProductCategoryHierarchy.objects.bulk_create(
+            self.get_hierarchy_rows(product_categories),
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+
+
+hierarchy_refresher = ProductCategoryHierarchyRefresher()
@@ -0,0 +1,42 @@
+"""
+Image checks used when importing product images.
+
+The functions are run in worker processes, so this module mustn't import
+models or anything else that needs Django to be set up.
+"""
+
+import hashlib
+import io
+
+from PIL import Image
+
+CONTENT_HASH_ALGORITHM = "sha256"
+
+
+def get_content_hash(file, chunk_size=64 * 1024):
+    """
+    Return the hex digest identifying the content of an open binary file,
+    which is read from its current position
+    """
+    content_hash = hashlib.new(CONTENT_HASH_ALGORITHM)
+    for chunk in iter(lambda: file.read(chunk_size), b""):
+        content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+
+def inspect_image(file_path):
+    """
+    Verify and decode the image at the given path, returning the hash of
+    its content.
+
+    Raises ``IOError`` (or another PIL error) if the file isn't a valid
+    image.  ``Image.verify`` doesn't check the image data, so the image is
+    decoded as well, which catches truncated files.
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    with Image.open(io.BytesIO(data)) as image:
+        image.verify()
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+    return hashlib.new(CONTENT_HASH_ALGORITHM, data).hexdigest()
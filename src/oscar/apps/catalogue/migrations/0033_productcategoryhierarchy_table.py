@@ -0,0 +1,76 @@
+from django.db import migrations
+
+from oscar.checks import turned_on_hierarchy_table
+
+
+def create_hierarchy_table(apps, schema_editor):
+    """
+    Creates the product category hierarchy as a regular table on databases
+    that don't support materialized views. It's only populated if
+    OSCAR_CATALOGUE_USE_PRODUCT_CATEGORY_HIERARCHY_TABLE is enabled.
+    """
+    if schema_editor.connection.vendor == "postgresql":
+        return
+    ProductCategoryHierarchy = apps.get_model("catalogue", "ProductCategoryHierarchy")
+    schema_editor.create_model(ProductCategoryHierarchy)
+    schema_editor.execute(
+        "CREATE UNIQUE INDEX catalogue_product_category_hierarchy_idx "
+        "ON catalogue_product_category_hierarchy (product_id, category_id);"
+    )
+    schema_editor.execute(
+        "CREATE INDEX catalogue_product_category_hierarchy_category_idx "
+        "ON catalogue_product_category_hierarchy (category_id);"
+    )
+    if turned_on_hierarchy_table():
+        populate_hierarchy_table(apps, schema_editor.connection.alias)
+
+
+def populate_hierarchy_table(apps, using, batch_size=1000):
+    """
+    Links the existing products to their categories and the categories'
+    ancestors.
+    """
+    Category = apps.get_model("catalogue", "Category")
+    ProductCategory = apps.get_model("catalogue", "ProductCategory")
+    ProductCategoryHierarchy = apps.get_model("catalogue", "ProductCategoryHierarchy")
+    category_ids = dict(Category.objects.using(using).values_list("path", "id"))
+    product_categories = (
+        ProductCategory.objects.using(using)
+        .values_list("product_id", "category__path", "category__depth")
+        .iterator(chunk_size=batch_size)
+    )
+    rows = {}
+    for product_id, path, depth in product_categories:
+        steplen = len(path) // depth
+        for end in range(steplen, len(path) + 1, steplen):
+            category_id = category_ids.get(path[:end])
+            if category_id is not None:
+                row_id = "%s-%s" % (product_id, category_id)
+                rows[row_id] = ProductCategoryHierarchy(
+                    id=row_id, product_id=product_id, category_id=category_id
+                )
+        if len(rows) >= batch_size:
+            ProductCategoryHierarchy.objects.using(using).bulk_create(
+                rows.values(), ignore_conflicts=True
+            )
+            rows = {}
+    ProductCategoryHierarchy.objects.using(using).bulk_create(
+        rows.values(), ignore_conflicts=True
+    )
+
+
+def drop_hierarchy_table(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        return
+    ProductCategoryHierarchy = apps.get_model("catalogue", "ProductCategoryHierarchy")
+    schema_editor.delete_model(ProductCategoryHierarchy)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalogue", "0032_category_exclude_from_menu_category_long_description"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_hierarchy_table, drop_hierarchy_table),
+    ]
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.module_loading import import_string
+
+models_AutoField = import_string(settings.DEFAULT_AUTO_FIELD)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalogue", "0034_productimage_content_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductCategoryHierarchyStatus",
+            fields=[
+                (
+                    "id",
+                    models_AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "is_dirty",
+                    models.BooleanField(default=False, verbose_name="Is dirty"),
+                ),
+                (
+                    "date_refreshed",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Date refreshed"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Product category hierarchy status",
+                "verbose_name_plural": "Product category hierarchy statuses",
+                "abstract": False,
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+import copy
+
+from django.shortcuts import get_object_or_404
+
+from oscar.core.loading import get_class, get_model
+
+Category = get_model("catalogue", "Category")
+get_category_tree = get_class("catalogue.tree", "get_category_tree")
+
+
+class CategoryMixin(object):
+    """
+    Looks up the category of a view's ``pk`` URL argument, from the cached
+    category tree if ``OSCAR_CATALOGUE_CACHE_CATEGORY_TREE`` is enabled
+    """
+
+    def get_category(self):
+        tree = get_category_tree()
+        if tree is not None:
+            node = tree.get(int(self.kwargs["pk"]))
+            if node is not None:
+                # The tree's categories are shared by all requests, so the
+                # view gets a copy it can change.
+                return copy.copy(node.category)
+        return get_object_or_404(Category, pk=self.kwargs["pk"])
@@ -104,3 +104,11 @@ if not is_model_registered("catalogue", "ProductCategoryHierarchy"):
         pass
 
     __all__.append("ProductCategoryHierarchy")
+
+
+if not is_model_registered("catalogue", "ProductCategoryHierarchyStatus"):
+
+    class ProductCategoryHierarchyStatus(AbstractProductCategoryHierarchyStatus):
+        pass
+
+    __all__.append("ProductCategoryHierarchyStatus")
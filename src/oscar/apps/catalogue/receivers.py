@@ -1,14 +1,16 @@
 # -*- coding: utf-8 -*-
 from django.conf import settings
-from django.db import connection
+from django.db import transaction
 from django.db.models.signals import post_delete, post_save, m2m_changed
 from django.dispatch import receiver
 
-from oscar.core.loading import get_model
+from oscar.core.loading import get_class, get_model
 from oscar.checks import use_productcategory_materialised_view
 
 Category = get_model("catalogue", "Category")
 ProductCategory = get_model("catalogue", "ProductCategory")
+hierarchy_refresher = get_class("catalogue.hierarchy", "hierarchy_refresher")
+bump_category_tree_version = get_class("catalogue.tree", "bump_category_tree_version")
 
 
 if settings.OSCAR_DELETE_IMAGE_FILES:
@@ -46,12 +48,34 @@ def post_save_set_ancestors_are_public(sender, instance, **kwargs):
     instance.set_ancestors_are_public()
 
 
-@receiver([post_save, post_delete, m2m_changed], sender=ProductCategory)
-def refresh_materialized_view(sender, **kwargs):
+# Connected after post_save_set_ancestors_are_public, so that the snapshot is
+# only invalidated once the subtree is up to date.
+# pylint: disable=unused-argument
+@receiver([post_save, post_delete], sender=Category, dispatch_uid="bump_category_tree")
+def invalidate_category_tree(sender, **kwargs):
+    transaction.on_commit(bump_category_tree_version)
+
+
+@receiver([post_save, post_delete], sender=ProductCategory)
+def refresh_materialized_view(sender, instance, **kwargs):
     if kwargs.get("raw") or not use_productcategory_materialised_view():
         return
 
-    with connection.cursor() as cursor:
-        cursor.execute(
-            "REFRESH MATERIALIZED VIEW CONCURRENTLY catalogue_product_category_hierarchy;"
-        )
+    hierarchy_refresher.mark_dirty([instance.product_id])
+
+
+@receiver(m2m_changed, sender=ProductCategory)
+def refresh_materialized_view_on_m2m_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not action.startswith("post_") or not use_productcategory_materialised_view():
+        return
+
+    if not reverse:
+        hierarchy_refresher.mark_dirty([instance.pk])
+    elif pk_set is not None:
+        hierarchy_refresher.mark_dirty(pk_set)
+    else:
+        # A category has been cleared of its products, which aren't known
+        # anymore.
+        hierarchy_refresher.mark_dirty()
@@ -0,0 +1,227 @@
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.translation import get_language
+
+from oscar.core.loading import get_model
+
+CATEGORY_TREE_VERSION_CACHE_KEY = "OSCAR_CATEGORY_TREE_VERSION"
+
+
+def get_category_tree_version():
+    """
+    Return the current version of the category tree.
+
+    Like the offers version, it's shared between processes through Django's
+    cache and is a random token, so an evicted key can't bring an old version
+    back.
+    """
+    version = cache.get(CATEGORY_TREE_VERSION_CACHE_KEY)
+    if version is None:
+        version = bump_category_tree_version()
+    return version
+
+
+def bump_category_tree_version():
+    """
+    Invalidate the category tree snapshots of all processes.
+
+    Other processes notice within ``OSCAR_CATALOGUE_CATEGORY_TREE_CHECK_INTERVAL``
+    seconds.  When categories are changed in a transaction, call this once
+    it's committed, eg with ``transaction.on_commit``, so that no process can
+    rebuild its snapshot from the old categories under the new version.
+    """
+    version = uuid.uuid4().hex
+    cache.set(CATEGORY_TREE_VERSION_CACHE_KEY, version, None)
+    category_tree_cache.clear()
+    return version
+
+
+class CategoryNode(object):
+    """
+    A category in a ``CategoryTree``, with the values that are otherwise
+    looked up through its ancestors worked out in advance.
+
+    The category instance is shared by all users of the snapshot and must
+    not be changed.
+    """
+
+    __slots__ = (
+        "category",
+        "parent",
+        "children",
+        "ancestors",
+        "full_slug",
+        "full_name",
+        "is_browsable",
+        "in_menu",
+        "_urls",
+    )
+
+    def __init__(self, category, parent=None):
+        self.category = category
+        self.parent = parent
+        self.children = []
+        if parent is None:
+            self.ancestors = (self,)
+            self.full_slug = category.slug
+            self.full_name = category.name
+        else:
+            parent.children.append(self)
+            self.ancestors = parent.ancestors + (self,)
+            self.full_slug = "%s%s%s" % (
+                parent.full_slug,
+                category._slug_separator,
+                category.slug,
+            )
+            self.full_name = "%s%s%s" % (
+                parent.full_name,
+                category._full_name_separator,
+                category.name,
+            )
+        self.is_browsable = category.is_public and category.ancestors_are_public
+        # Whether the category is in the menu of the whole tree
+        self.in_menu = (
+            (parent is None or parent.in_menu)
+            and self.is_browsable
+            and not category.exclude_from_menu
+        )
+        # URLs depend on the active language through i18n URL patterns
+        self._urls = {}
+
+    @property
+    def pk(self):
+        return self.category.pk
+
+    @property
+    def depth(self):
+        return self.category.depth
+
+    def get_absolute_url(self):
+        language = get_language()
+        url = self._urls.get(language)
+        if url is None:
+            url = reverse(
+                "catalogue:category",
+                kwargs={"category_slug": self.full_slug, "pk": self.pk},
+            )
+            self._urls[language] = url
+        return url
+
+    def get_ancestors_and_self(self):
+        return [node.category for node in self.ancestors]
+
+
+class CategoryTree(object):
+    """
+    Snapshot of the whole category tree, indexed by primary key and path
+    """
+
+    def __init__(self, categories):
+        """
+        :categories: All categories, ordered by path
+        """
+        self.roots = []
+        self.nodes = {}
+        self.nodes_by_path = {}
+        for category in categories:
+            parent = None
+            if category.depth > 1:
+                parent = self.nodes_by_path.get(category.path[: -category.steplen])
+                if parent is None:
+                    # An orphan, which treebeard's fix_tree would remove
+                    continue
+            node = CategoryNode(category, parent)
+            if parent is None:
+                self.roots.append(node)
+            self.nodes[category.pk] = node
+            self.nodes_by_path[category.path] = node
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def get(self, pk):
+        """
+        Return the node of the category with the given primary key, or
+        ``None``
+        """
+        return self.nodes.get(pk)
+
+    def get_menu(self, parent=None, max_depth=None):
+        """
+        Return the nodes of the browsable categories below *parent* (or of
+        the whole tree) that aren't excluded from the menu, in path order,
+        matching ``CategoryQuerySet.for_menu``.
+        """
+        if parent is None:
+            nodes = self.roots
+        else:
+            parent_node = self.get(parent.pk)
+            nodes = parent_node.children if parent_node is not None else []
+        menu = []
+        self._add_menu_nodes(menu, nodes, max_depth)
+        return menu
+
+    def _add_menu_nodes(self, menu, nodes, max_depth):
+        for node in nodes:
+            if max_depth is not None and node.depth > max_depth:
+                continue
+            if not node.is_browsable or node.category.exclude_from_menu:
+                # Neither are any of its descendants
+                continue
+            menu.append(node)
+            self._add_menu_nodes(menu, node.children, max_depth)
+
+
+class CategoryTreeCache(object):
+    """
+    Process-local cache of the category tree snapshot, which is rebuilt from
+    the database once the category tree version changes.
+
+    The version is read from Django's cache at most once every
+    ``OSCAR_CATALOGUE_CATEGORY_TREE_CHECK_INTERVAL`` seconds, rather than for
+    every category looked up.
+    """
+
+    def __init__(self):
+        self._entry = (None, None, None)
+        self._lock = threading.Lock()
+
+    def load_categories(self):
+        Category = get_model("catalogue", "Category")
+        return Category.objects.order_by("path")
+
+    def get_tree(self):
+        cached_version, tree, checked = self._entry
+        interval = settings.OSCAR_CATALOGUE_CATEGORY_TREE_CHECK_INTERVAL
+        if tree is not None and time.monotonic() - checked < interval:
+            return tree
+        version = get_category_tree_version()
+        if cached_version == version:
+            self._entry = (version, tree, time.monotonic())
+            return tree
+        with self._lock:
+            cached_version, tree, checked = self._entry
+            if cached_version != version:
+                tree = CategoryTree(self.load_categories())
+            self._entry = (version, tree, time.monotonic())
+        return tree
+
+    def clear(self):
+        self._entry = (None, None, None)
+
+
+category_tree_cache = CategoryTreeCache()
+
+
+def get_category_tree():
+    """
+    Return the category tree snapshot, or ``None`` if it isn't used
+    """
+    if not settings.OSCAR_CATALOGUE_CACHE_CATEGORY_TREE:
+        return None
+    return category_tree_cache.get_tree()
@@ -4,18 +4,16 @@ import tarfile
 import tempfile
 import zipfile
 import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from django.core.exceptions import FieldError
 from django.core.files import File
-from django.db.transaction import atomic
+from django.db import transaction
+from django.db.models import Max
 from django.utils.translation import gettext_lazy as _
-from PIL import Image
 
-from oscar.apps.catalogue.exceptions import (
-    IdenticalImageError,
-    ImageImportError,
-    InvalidImageArchive,
-)
+from oscar.apps.catalogue.exceptions import ImageImportError, InvalidImageArchive
+from oscar.apps.catalogue.imaging import get_content_hash, inspect_image
 from oscar.core.loading import get_model
 
 Product = get_model("catalogue", "product")
@@ -25,61 +23,53 @@ ProductImage = get_model("catalogue", "productimage")
 # This is an old class only really intended to be used by the internal sandbox
 # site. It's not recommended to be used by your project.
 class Importer(object):
+    """
+    Imports the images in a folder or archive as the images of the products
+    matched by their file names.
+
+    The images are verified, decoded and hashed in a pool of worker
+    processes, and none are imported if any is invalid.  They're then
+    imported in batches: the products of a batch are looked up with one
+    query, images already stored for a product are spotted by their content
+    hash, and the new files are written to storage by a pool of threads
+    before the images are created at once.
+    """
+
     allowed_extensions = [".jpeg", ".jpg", ".gif", ".png"]
+    batch_size = 100
 
-    def __init__(self, logger, field):
+    def __init__(self, logger, field, workers=None, batch_size=None):
         self.logger = logger
         self._field = field
+        # Defaults to the number of processors
+        self._workers = workers
+        if batch_size is not None:
+            self.batch_size = batch_size
 
-    @atomic
     def handle(self, dirname):
         stats = {"num_processed": 0, "num_skipped": 0, "num_invalid": 0}
         image_dir, filenames = self._get_image_files(dirname)
-        if image_dir:
-            for filename in filenames:
-                try:
-                    lookup_value = self._get_lookup_value_from_filename(filename)
-                    self._process_image(image_dir, filename, lookup_value)
-                    stats["num_processed"] += 1
-                except Product.MultipleObjectsReturned:
-                    self.logger.warning(
-                        "Multiple products matching %s='%s',"
-                        " skipping" % (self._field, lookup_value)
-                    )
-                    stats["num_skipped"] += 1
-                except Product.DoesNotExist:
-                    self.logger.warning(
-                        "No item matching %s='%s'" % (self._field, lookup_value)
-                    )
-                    stats["num_skipped"] += 1
-                except IdenticalImageError:
-                    self.logger.warning(
-                        "Identical image already exists for"
-                        " %s='%s', skipping" % (self._field, lookup_value)
-                    )
-                    stats["num_skipped"] += 1
-                except IOError as e:
-                    stats["num_invalid"] += 1
-                    raise ImageImportError(
-                        _("%(filename)s is not a valid image (%(error)s)")
-                        % {"filename": filename, "error": e}
-                    )
-                except FieldError as e:
-                    raise ImageImportError(e)
+        if not image_dir:
+            raise InvalidImageArchive(_("%s is not a valid image archive") % dirname)
+        try:
+            hashes = self._inspect_images(image_dir, filenames, stats)
+            for start in range(0, len(filenames), self.batch_size):
+                end = start + self.batch_size
+                self._import_batch(image_dir, filenames[start:end], hashes, stats)
+        finally:
             if image_dir != dirname:
                 shutil.rmtree(image_dir)
-        else:
-            raise InvalidImageArchive(_("%s is not a valid image archive") % dirname)
         self.logger.info(
             "Finished image import: %(num_processed)d imported,"
             " %(num_skipped)d skipped" % stats
         )
+        return stats
 
     def _get_image_files(self, dirname):
         filenames = []
         image_dir = self._extract_images(dirname)
         if image_dir:
-            for filename in os.listdir(image_dir):
+            for filename in sorted(os.listdir(image_dir)):
                 ext = os.path.splitext(filename)[1]
                 if (
                     os.path.isfile(os.path.join(image_dir, filename))
@@ -121,34 +111,199 @@ class Importer(object):
         # unknown archive - perhaps this should be treated differently
         return ""
 
-    def _process_image(self, dirname, filename, lookup_value):
-        file_path = os.path.join(dirname, filename)
-        trial_image = Image.open(file_path)
-        trial_image.verify()
+    def _inspect_images(self, image_dir, filenames, stats):
+        """
+        Verify and decode all images, returning a dict of their file names
+        to their content hashes
+        """
+        paths = [os.path.join(image_dir, filename) for filename in filenames]
+        if self._workers == 1 or len(paths) < 2:
+            results = [self._try_inspect_image(path) for path in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=self._workers) as executor:
+                futures = [executor.submit(inspect_image, path) for path in paths]
+                results = [self._get_result(future) for future in futures]
+        hashes = {}
+        errors = []
+        for filename, (content_hash, error) in zip(filenames, results):
+            if error is None:
+                hashes[filename] = content_hash
+            else:
+                errors.append((filename, error))
+        if errors:
+            stats["num_invalid"] = len(errors)
+            filename, error = errors[0]
+            raise ImageImportError(
+                _("%(filename)s is not a valid image (%(error)s)")
+                % {"filename": filename, "error": error}
+            )
+        return hashes
+
+    def _try_inspect_image(self, path):
+        try:
+            return inspect_image(path), None
+        except Exception as e:
+            return None, e
+
+    def _get_result(self, future):
+        try:
+            return future.result(), None
+        except Exception as e:
+            return None, e
+
+    def _get_products(self, lookup_values):
+        """
+        Return a dict of the lookup values matching exactly one product to
+        their products, and a set of those matching several
+        """
+        try:
+            products = list(
+                Product._default_manager.filter(
+                    **{"%s__in" % self._field: lookup_values}
+                )
+            )
+        except FieldError as e:
+            raise ImageImportError(e)
+        matches = {}
+        duplicates = set()
+        for product in products:
+            value = str(getattr(product, self._field))
+            if value in matches:
+                duplicates.add(value)
+            matches[value] = product
+        for value in duplicates:
+            del matches[value]
+        return matches, duplicates
 
-        kwargs = {self._field: lookup_value}
-        item = Product._default_manager.get(**kwargs)
+    def _get_existing_images(self, products):
+        """
+        Return a dict of the product ids to the hashes of their images, and
+        a dict of the product ids to their next display order
+        """
+        self._hash_existing_images(products)
+        hashes = {product.pk: set() for product in products}
+        for product_id, content_hash in ProductImage.objects.filter(
+            product__in=products
+        ).values_list("product_id", "content_hash"):
+            hashes[product_id].add(content_hash)
+        next_orders = {
+            product_id: max_order + 1
+            for product_id, max_order in ProductImage.objects.filter(
+                product__in=products
+            )
+            .values("product_id")
+            .annotate(max_order=Max("display_order"))
+            .values_list("product_id", "max_order")
+            .order_by()
+        }
+        return hashes, next_orders
 
-        new_data = open(file_path, "rb").read()
-        next_index = 0
-        for existing in item.images.all():
-            next_index = existing.display_order + 1
+    def _hash_existing_images(self, products):
+        """
+        Work out the hashes of images stored before they were recorded,
+        which is only needed once per image
+        """
+        updated = []
+        for image in ProductImage.objects.filter(
+            product__in=products, content_hash=""
+        ).select_related("product"):
             try:
-                if new_data == existing.original.read():
-                    raise IdenticalImageError()
+                with image.original.open("rb") as f:
+                    image.content_hash = get_content_hash(f)
             except IOError:
                 # File probably doesn't exist
-                existing.delete()
+                image.delete()
+                continue
+            updated.append(image)
+        ProductImage.objects.bulk_update(updated, ["content_hash"])
 
-        new_file = File(open(file_path, "rb"))
-        im = ProductImage(product=item, display_order=next_index)
-        im.original.save(filename, new_file, save=False)
-        im.save()
-        self.logger.debug('Image added to "%s"' % item)
+    def _import_batch(self, image_dir, filenames, hashes, stats):
+        lookup_values = {
+            filename: self._get_lookup_value_from_filename(filename)
+            for filename in filenames
+        }
+        products, duplicates = self._get_products(set(lookup_values.values()))
+        existing_hashes, next_orders = self._get_existing_images(
+            list(products.values())
+        )
+
+        new_images = []
+        for filename in filenames:
+            item = self._get_item_to_add_to(
+                lookup_values[filename],
+                products,
+                duplicates,
+                existing_hashes,
+                hashes[filename],
+            )
+            if item is None:
+                stats["num_skipped"] += 1
+                continue
+            existing_hashes[item.pk].add(hashes[filename])
+            display_order = next_orders.get(item.pk, 0)
+            next_orders[item.pk] = display_order + 1
+            new_images.append(
+                (
+                    filename,
+                    ProductImage(
+                        product=item,
+                        display_order=display_order,
+                        content_hash=hashes[filename],
+                    ),
+                )
+            )
+
+        images = [image for __, image in new_images]
+        try:
+            with ThreadPoolExecutor(max_workers=self._workers) as executor:
+                futures = [
+                    executor.submit(self._store_image, image_dir, filename, image)
+                    for filename, image in new_images
+                ]
+            for future in futures:
+                future.result()
+            with transaction.atomic():
+                ProductImage.objects.bulk_create(images)
+        except Exception:
+            # Don't leave the stored files of the batch behind
+            for image in images:
+                if image.original:
+                    image.original.delete(save=False)
+            raise
+        for image in images:
+            self.logger.debug('Image added to "%s"' % image.product)
+        stats["num_processed"] += len(images)
+
+    def _get_item_to_add_to(
+        self, lookup_value, products, duplicates, existing_hashes, content_hash
+    ):
+        """
+        Return the product an image file should be added to, or None if it
+        should be skipped
+        """
+        if lookup_value in duplicates:
+            self.logger.warning(
+                "Multiple products matching %s='%s',"
+                " skipping" % (self._field, lookup_value)
+            )
+            return None
+        item = products.get(lookup_value)
+        if item is None:
+            self.logger.warning(
+                "No item matching %s='%s'" % (self._field, lookup_value)
+            )
+            return None
+        if content_hash in existing_hashes[item.pk]:
+            self.logger.warning(
+                "Identical image already exists for"
+                " %s='%s', skipping" % (self._field, lookup_value)
+            )
+            return None
+        return item
 
-    def _fetch_item(self, filename):
-        kwargs = {self._field: self._get_lookup_value_from_filename(filename)}
-        return Product._default_manager.get(**kwargs)
+    def _store_image(self, image_dir, filename, image):
+        with open(os.path.join(image_dir, filename), "rb") as f:
+            image.original.save(filename, File(f), save=False)
 
     def _get_lookup_value_from_filename(self, filename):
         return os.path.splitext(filename)[0]
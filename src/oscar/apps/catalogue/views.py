@@ -1,8 +1,13 @@
 from urllib.parse import quote
 
+from django.conf import settings
+from django.contrib import messages
+from django.core.paginator import InvalidPage
 from django.http import Http404, HttpResponsePermanentRedirect
+from django.shortcuts import redirect
+from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
-from django.views.generic import DetailView
+from django.views.generic import DetailView, TemplateView
 
 from oscar.apps.catalogue.signals import product_viewed
 from oscar.core.loading import get_class, get_model
@@ -11,6 +16,9 @@ Product = get_model("catalogue", "product")
 Category = get_model("catalogue", "category")
 ProductAlert = get_model("customer", "ProductAlert")
 ProductAlertForm = get_class("customer.forms", "ProductAlertForm")
+ProductBrowseForm = get_class("catalogue.forms", "ProductBrowseForm")
+ProductBrowser = get_class("catalogue.browsing", "ProductBrowser")
+CategoryMixin = get_class("catalogue.mixins", "CategoryMixin")
 
 
 class ProductDetailView(DetailView):
@@ -121,6 +129,100 @@ class ProductDetailView(DetailView):
         ]
 
 
-# Import catalogue and category view from search app
-CatalogueView = get_class("search.views", "CatalogueView")
-ProductCategoryView = get_class("search.views", "ProductCategoryView")
+class DatabaseCatalogueView(TemplateView):
+    """
+    Browse all products in the catalogue with the database rather than the
+    search backend
+    """
+
+    form_class = ProductBrowseForm
+    browser_class = ProductBrowser
+    template_name = "oscar/catalogue/database/browse.html"
+    paginate_by = settings.OSCAR_PRODUCTS_PER_PAGE
+
+    def get(self, request, *args, **kwargs):
+        form = self.form_class(request.GET)
+        # pylint: disable=attribute-defined-outside-init
+        self.browser = self.get_browser(form)
+        try:
+            page = self.browser.get_page(
+                request.GET.get(self.browser.cursor_param), self.paginate_by
+            )
+        except InvalidPage:
+            messages.error(request, _("The given page number was invalid."))
+            return redirect(self.get_first_page_url())
+        context = self.get_context_data(form=form, page_obj=page)
+        return self.render_to_response(context)
+
+    def get_browser(self, form):
+        return self.browser_class(**self.get_browser_kwargs(form))
+
+    def get_browser_kwargs(self, form):
+        return {
+            "selected_facets": self.request.GET.getlist("selected_facets"),
+            "sort_by": form.cleaned_data["sort_by"] if form.is_valid() else None,
+        }
+
+    def get_first_page_url(self):
+        return reverse("catalogue:index")
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        page = ctx["page_obj"]
+        ctx["paginator"] = page.paginator
+        ctx["products"] = page.object_list
+        ctx["facet_data"] = self.browser.get_facet_data(self.request.get_full_path())
+        ctx["has_facets"] = any(data["results"] for data in ctx["facet_data"].values())
+        ctx["selected_facets"] = self.browser.selected_facets
+        ctx["summary"] = _("All products")
+        return ctx
+
+
+class DatabaseProductCategoryView(CategoryMixin, DatabaseCatalogueView):
+    """
+    Browse products in a given category with the database rather than the
+    search backend
+    """
+
+    template_name = "oscar/catalogue/database/category.html"
+    enforce_paths = True
+
+    def get(self, request, *args, **kwargs):
+        # pylint: disable=attribute-defined-outside-init
+        self.category = self.get_category()
+
+        # Allow staff members so they can test layout etc.
+        if not (self.category.is_public or request.user.is_staff):
+            raise Http404()
+
+        if self.enforce_paths:
+            # Categories are fetched by primary key to allow slug changes.
+            # If the slug has changed, issue a redirect.
+            expected_path = self.category.get_absolute_url()
+            if expected_path != quote(request.path):
+                return HttpResponsePermanentRedirect(expected_path)
+
+        return super().get(request, *args, **kwargs)
+
+    def get_browser_kwargs(self, form):
+        kwargs = super().get_browser_kwargs(form)
+        kwargs["category"] = self.category
+        return kwargs
+
+    def get_first_page_url(self):
+        return self.category.get_absolute_url()
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["category"] = self.category
+        del ctx["summary"]
+        return ctx
+
+
+if settings.OSCAR_CATALOGUE_BROWSE_WITH_DATABASE:
+    CatalogueView = DatabaseCatalogueView
+    ProductCategoryView = DatabaseProductCategoryView
+else:
+    # Import catalogue and category view from search app
+    CatalogueView = get_class("search.views", "CatalogueView")
+    ProductCategoryView = get_class("search.views", "ProductCategoryView")
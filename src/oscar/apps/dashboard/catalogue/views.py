@@ -12,6 +12,7 @@ from django.views import generic
 from django_tables2 import SingleTableMixin, SingleTableView
 
 from oscar.core.loading import get_class, get_classes, get_model
+from oscar.core.pagination import ApproximateCountPaginator
 from oscar.views.generic import IntermediateBulkActionView, ObjectLookupView
 
 partner_product_visibility_q = get_class(
@@ -130,7 +131,10 @@ class ProductListView(
         return table
 
     def get_table_pagination(self, table):
-        return dict(per_page=settings.OSCAR_DASHBOARD_ITEMS_PER_PAGE)
+        return dict(
+            per_page=settings.OSCAR_DASHBOARD_ITEMS_PER_PAGE,
+            paginator_class=ApproximateCountPaginator,
+        )
 
     def get_queryset(self):
         """
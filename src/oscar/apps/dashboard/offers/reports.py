@@ -8,19 +8,20 @@ ReportCSVFormatter = get_class("dashboard.reports.reports", "ReportCSVFormatter"
 class OrderDiscountCSVFormatter(ReportCSVFormatter):
     filename_template = "order-discounts-for-offer-%s.csv"
 
-    def generate_csv(self, response, order_discounts):
-        writer = self.get_csv_writer(response)
-        header_row = [_("Order number"), _("Order date"), _("Order total"), _("Cost")]
-        writer.writerow(header_row)
-        for order_discount in order_discounts:
-            order = order_discount.order
-            row = [
-                order.number,
-                self.format_datetime(order.date_placed),
-                order.total_incl_tax,
-                order_discount.amount,
-            ]
-            writer.writerow(row)
+    def get_header_row(self):
+        return [_("Order number"), _("Order date"), _("Order total"), _("Cost")]
+
+    def prepare_queryset(self, queryset):
+        return queryset.select_related("order")
+
+    def get_row(self, order_discount):
+        order = order_discount.order
+        return [
+            order.number,
+            self.format_datetime(order.date_placed),
+            order.total_incl_tax,
+            order_discount.amount,
+        ]
 
     def filename(self, offer):
         return self.filename_template % offer.id
@@ -65,6 +65,20 @@ class OrderStatsForm(forms.Form):
             self._determine_filter_metadata()
         return self._description
 
+    def get_day_range(self):
+        """
+        Return the first and last days of the orders matched by the filters,
+        either of which is ``None`` if unbounded
+        """
+        if self.errors:
+            return None, None
+        date_from = self.cleaned_data["date_from"]
+        date_to = self.cleaned_data["date_to"]
+        if date_to and not date_from:
+            # Orders placed until the start of the end date
+            date_to -= datetime.timedelta(days=1)
+        return date_from, date_to
+
 
 class OrderSearchForm(forms.Form):
     order_number = forms.CharField(required=False, label=_("Order number"))
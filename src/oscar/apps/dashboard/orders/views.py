@@ -6,8 +6,9 @@ from decimal import InvalidOperation
 from django.conf import settings
 from django.contrib import messages
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Count, Q, Sum, fields
-from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.db.models import Count, OuterRef, Q, Subquery, Sum, fields
+from django.db.models.functions import Coalesce
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -15,11 +16,11 @@ from django.views.generic import DetailView, FormView, ListView, UpdateView
 
 from oscar.apps.order import exceptions as order_exceptions
 from oscar.apps.payment.exceptions import PaymentError
-from oscar.core.compat import UnicodeCSVWriter
+from oscar.core.compat import StreamingCSVBuffer, UnicodeCSVWriter
 from oscar.core.loading import get_class, get_model
 from oscar.core.utils import datetime_combine, format_datetime
 from oscar.views import sort_queryset
-from oscar.views.generic import BulkEditMixin
+from oscar.views.generic import BulkEditMixin, KeysetPaginationMixin
 
 Partner = get_model("partner", "Partner")
 Transaction = get_model("payment", "Transaction")
@@ -31,6 +32,7 @@ Line = get_model("order", "Line")
 ShippingEventType = get_model("order", "ShippingEventType")
 PaymentEventType = get_model("order", "PaymentEventType")
 EventHandlerMixin = get_class("order.mixins", "EventHandlerMixin")
+SalesRecords = get_class("analytics.sales", "SalesRecords")
 OrderStatsForm = get_class("dashboard.orders.forms", "OrderStatsForm")
 OrderSearchForm = get_class("dashboard.orders.forms", "OrderSearchForm")
 OrderNoteForm = get_class("dashboard.orders.forms", "OrderNoteForm")
@@ -90,10 +92,21 @@ class OrderStatsView(FormView):
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         filters = kwargs.get("filters", {})
-        ctx.update(self.get_stats(filters))
+        if self.use_sales_records():
+            start_day, end_day = kwargs["form"].get_day_range()
+            ctx.update(self.get_sales_record_stats(filters, start_day, end_day))
+        else:
+            ctx.update(self.get_stats(filters))
         ctx["title"] = kwargs["form"].get_filter_description()
         return ctx
 
+    def use_sales_records(self):
+        """
+        Whether the totals are read from the daily sales records, which cover
+        the orders of the whole shop
+        """
+        return settings.OSCAR_DASHBOARD_USE_SALES_RECORDS and self.request.user.is_staff
+
     def get_stats(self, filters):
         orders = queryset_orders_for_user(self.request.user).filter(**filters)
         stats = {
@@ -109,11 +122,28 @@ class OrderStatsView(FormView):
         }
         return stats
 
+    def get_sales_record_stats(self, filters, start_day, end_day):
+        """
+        Return the totals of the days in the given range read from the daily
+        sales records
+        """
+        orders = queryset_orders_for_user(self.request.user).filter(**filters)
+        totals = SalesRecords().get_totals(start_day, end_day)
+        return {
+            "total_orders": totals["num_orders"],
+            "total_lines": totals["num_lines"],
+            "total_revenue": totals["revenue"],
+            "order_status_breakdown": orders.order_by("status")
+            .values("status")
+            .annotate(freq=Count("id")),
+        }
+
 
-class OrderListView(EventHandlerMixin, BulkEditMixin, ListView):
+class OrderListView(EventHandlerMixin, BulkEditMixin, KeysetPaginationMixin, ListView):
     """
     Dashboard view for a list of orders.
     Supports the permission-based dashboard.
+    Orders are paginated by keyset on their ordering field.
     """
 
     model = Order
@@ -122,6 +152,8 @@ class OrderListView(EventHandlerMixin, BulkEditMixin, ListView):
     form_class = OrderSearchForm
     paginate_by = settings.OSCAR_DASHBOARD_ITEMS_PER_PAGE
     actions = ("download_selected_orders", "change_order_statuses")
+    # The number of orders read from the database at a time when downloading
+    download_chunk_size = 2000
     CSV_COLUMNS = {
         "number": _("Order number"),
         "value": _("Order value"),
@@ -371,11 +403,34 @@ class OrderListView(EventHandlerMixin, BulkEditMixin, ListView):
     def get_download_filename(self, request):
         return "orders.csv"
 
+    def get_download_queryset(self, orders):
+        """
+        Return the orders to download, with the relations and aggregates of
+        their rows joined and annotated in SQL rather than fetched per order
+        """
+        num_items = (
+            Line.objects.filter(order=OuterRef("pk"))
+            .order_by()
+            .values("order")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        return (
+            orders.select_related("user", "shipping_address", "billing_address")
+            .prefetch_related(None)
+            .annotate(total_quantity=Coalesce(Subquery(num_items), 0))
+        )
+
     def get_row_values(self, order):
+        # Orders that aren't annotated by get_download_queryset() count their
+        # items themselves
+        num_items = getattr(order, "total_quantity", None)
+        if num_items is None:
+            num_items = order.num_items
         row = {
             "number": order.number,
             "customer": order.email,
-            "num_items": order.num_items,
+            "num_items": num_items,
             "date": format_datetime(order.date_placed, "DATETIME_FORMAT"),
             "value": order.total_incl_tax,
             "status": order.status,
@@ -387,17 +442,27 @@ class OrderListView(EventHandlerMixin, BulkEditMixin, ListView):
         return row
 
     def download_selected_orders(self, request, orders):
-        response = HttpResponse(content_type="text/csv")
+        response = StreamingHttpResponse(
+            self.stream_csv(orders), content_type="text/csv"
+        )
         response["Content-Disposition"] = (
             "attachment; filename=%s" % self.get_download_filename(request)
         )
-        writer = UnicodeCSVWriter(open_file=response)
+        return response
+
+    def stream_csv(self, orders):
+        buffer = StreamingCSVBuffer()
+        writer = UnicodeCSVWriter(open_file=buffer)
 
         writer.writerow(self.CSV_COLUMNS.values())
+        yield buffer.read()
+        orders = self.get_download_queryset(orders).iterator(
+            chunk_size=self.download_chunk_size
+        )
         for order in orders:
             row_values = self.get_row_values(order)
             writer.writerow([row_values.get(column, "") for column in self.CSV_COLUMNS])
-        return response
+            yield buffer.read()
 
     def change_order_statuses(self, request, orders):
         for order in orders:
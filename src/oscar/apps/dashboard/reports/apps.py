@@ -19,15 +19,29 @@ class ReportsDashboardConfig(OscarDashboardConfig):
 
         self.permissions_map = {
             "reports-index": DashboardPermission.get("analytics", "view_userrecord"),
+            "reports-jobs": DashboardPermission.get("analytics", "view_userrecord"),
+            "reports-job-download": DashboardPermission.get(
+                "analytics", "view_userrecord"
+            ),
         }
 
     # pylint: disable=attribute-defined-outside-init
     def ready(self):
         self.index_view = get_class("dashboard.reports.views", "IndexView")
+        self.job_list_view = get_class("dashboard.reports.views", "ReportJobListView")
+        self.job_download_view = get_class(
+            "dashboard.reports.views", "ReportJobDownloadView"
+        )
         self.configure_permissions()
 
     def get_urls(self):
         urls = [
             path("", self.index_view.as_view(), name="reports-index"),
+            path("jobs/", self.job_list_view.as_view(), name="reports-jobs"),
+            path(
+                "jobs/<int:pk>/download/",
+                self.job_download_view.as_view(),
+                name="reports-job-download",
+            ),
         ]
         return self.post_process_urls(urls)
@@ -30,6 +30,11 @@ class ReportForm(forms.Form):
         widget=DatePickerInput,
     )
     download = forms.BooleanField(label=_("Download"), required=False)
+    in_background = forms.BooleanField(
+        label=_("Generate in the background"),
+        required=False,
+        help_text=_("Large reports can be downloaded once generated"),
+    )
 
     def clean(self):
         date_from = self.cleaned_data.get("date_from", None)
@@ -0,0 +1,204 @@
+import gzip
+import io
+import logging
+import secrets
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from oscar.core.loading import get_class, get_model
+
+GeneratorRepository = get_class("dashboard.reports.utils", "GeneratorRepository")
+ReportCSVFormatter = get_class("dashboard.reports.reports", "ReportCSVFormatter")
+
+logger = logging.getLogger("oscar.reports")
+
+
+class ReportJobQueue(object):
+    """
+    Generates reports in the background.
+
+    Reports are queued as ``ReportJob`` records by ``enqueue``, which returns
+    the pending, running or recently completed job for the same report, date
+    range and format instead of queueing it again.  The
+    ``oscar_run_report_jobs`` command runs pending jobs one at a time: the
+    report's queryset is read in chunks and written as gzipped CSV to a
+    temporary file, which is saved with the job's storage under a folder
+    with a random name.  The number of rows written is saved every chunk so
+    the dashboard can show progress.  Running jobs that haven't saved any
+    progress for ``OSCAR_REPORT_JOB_TIMEOUT`` seconds, eg because their
+    worker died, are marked as failed so the report can be queued again.
+    """
+
+    generator_repository = GeneratorRepository
+
+    def get_queryset(self):
+        return get_model("analytics", "ReportJob").objects.all()
+
+    def get_generator_class(self, code):
+        return self.generator_repository().get_generator(code)
+
+    def fail_stale_jobs(self):
+        """
+        Mark the running jobs that haven't made progress for
+        ``OSCAR_REPORT_JOB_TIMEOUT`` seconds as failed, returning their number
+        """
+        ReportJob = get_model("analytics", "ReportJob")
+        now = timezone.now()
+        timeout = timedelta(seconds=settings.OSCAR_REPORT_JOB_TIMEOUT)
+        return (
+            self.get_queryset()
+            .filter(status=ReportJob.RUNNING, date_updated__lt=now - timeout)
+            .update(
+                status=ReportJob.FAILED,
+                error_message="The job stopped making progress",
+                date_completed=now,
+                date_updated=now,
+            )
+        )
+
+    # Queueing
+
+    def get_existing_job(self, code, start_date=None, end_date=None, formatter="CSV"):
+        """
+        Return the job that can serve the given report, if any
+        """
+        ReportJob = get_model("analytics", "ReportJob")
+        self.fail_stale_jobs()
+        jobs = self.get_queryset().filter(
+            code=code, start_date=start_date, end_date=end_date, formatter=formatter
+        )
+        job = jobs.filter(status__in=[ReportJob.PENDING, ReportJob.RUNNING]).first()
+        if job is None:
+            max_age = timedelta(seconds=settings.OSCAR_REPORT_FILE_MAX_AGE)
+            job = (
+                jobs.filter(
+                    status=ReportJob.COMPLETE,
+                    date_completed__gte=timezone.now() - max_age,
+                )
+                .order_by("-date_completed")
+                .first()
+            )
+        return job
+
+    def enqueue(self, code, start_date=None, end_date=None, formatter="CSV", user=None):
+        """
+        Queue the given report, returning its job and whether it was created
+        """
+        job = self.get_existing_job(code, start_date, end_date, formatter)
+        if job is not None:
+            return job, False
+        job = self.get_queryset().create(
+            code=code,
+            start_date=start_date,
+            end_date=end_date,
+            formatter=formatter,
+            user=user,
+        )
+        return job, True
+
+    # Running
+
+    def claim_next(self):
+        """
+        Mark the oldest pending job as running and return it, or ``None`` if
+        there are no pending jobs
+        """
+        ReportJob = get_model("analytics", "ReportJob")
+        self.fail_stale_jobs()
+        with transaction.atomic():
+            # Workers running concurrently skip the jobs claimed by others
+            job = (
+                self.get_queryset()
+                .select_for_update(skip_locked=True)
+                .filter(status=ReportJob.PENDING)
+                .order_by("pk")
+                .first()
+            )
+            if job is None:
+                return None
+            job.status = ReportJob.RUNNING
+            job.date_started = timezone.now()
+            job.save(update_fields=["status", "date_started", "date_updated"])
+        return job
+
+    def run(self, job):
+        """
+        Generate the report of a running job and save it
+        """
+        ReportJob = get_model("analytics", "ReportJob")
+        try:
+            generator_class = self.get_generator_class(job.code)
+            if generator_class is None:
+                raise ValueError("No report generator with code %r" % job.code)
+            generator = generator_class(
+                start_date=job.start_date,
+                end_date=job.end_date,
+                formatter=job.formatter,
+            )
+            with tempfile.TemporaryFile() as compressed:
+                self.write_report(job, generator, compressed)
+                compressed.seek(0)
+                job.file.save(self.get_filename(job), File(compressed), save=False)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.exception("Report job #%s failed", job.pk)
+            job.status = ReportJob.FAILED
+            job.error_message = str(e)
+        else:
+            job.status = ReportJob.COMPLETE
+        job.date_completed = timezone.now()
+        job.save()
+        return job
+
+    def write_report(self, job, generator, compressed):
+        formatter = generator.formatter
+        if not isinstance(formatter, ReportCSVFormatter):
+            raise ValueError("Only CSV reports can be generated in the background")
+        job.num_rows_total = generator.queryset.count()
+        job.save(update_fields=["num_rows_total", "date_updated"])
+        with gzip.GzipFile(fileobj=compressed, mode="wb") as gzipped:
+            text = io.TextIOWrapper(gzipped, encoding="utf-8", newline="")
+            if type(formatter).generate_csv is not ReportCSVFormatter.generate_csv:
+                # The formatter writes the whole report itself
+                formatter.generate_csv(text, generator.queryset)
+                num_rows = job.num_rows_total
+            else:
+                writer = formatter.get_csv_writer(text)
+                rows = formatter.iter_rows(generator.queryset)
+                writer.writerow(next(rows))
+                num_rows = 0
+                for row in rows:
+                    writer.writerow(row)
+                    num_rows += 1
+                    if num_rows % formatter.chunk_size == 0:
+                        self.set_progress(job, num_rows)
+            # Leave the gzip file open for the with statement to close
+            text.flush()
+            text.detach()
+        self.set_progress(job, num_rows)
+
+    def set_progress(self, job, num_rows):
+        job.num_rows = num_rows
+        job.save(update_fields=["num_rows", "date_updated"])
+
+    def get_filename(self, job):
+        dates = [date.isoformat() for date in (job.start_date, job.end_date) if date]
+        filename = "%s.csv.gz" % "-".join([job.code] + dates + [str(job.pk)])
+        # Files in a public storage can't be found without the random folder
+        return "%s/%s" % (secrets.token_urlsafe(16), filename)
+
+    def process(self):
+        """
+        Run pending jobs until there are none, returning the number run
+        """
+        num_run = 0
+        while True:
+            job = self.claim_next()
+            if job is None:
+                return num_run
+            self.run(job)
+            num_run += 1
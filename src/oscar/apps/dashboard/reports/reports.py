@@ -1,11 +1,12 @@
 from datetime import time
 
-from django.http import HttpResponse
+from django.db.models import QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
 from django.template.defaultfilters import date
 from django.utils.translation import gettext_lazy as _
 
 from oscar.core import utils
-from oscar.core.compat import UnicodeCSVWriter
+from oscar.core.compat import StreamingCSVBuffer, UnicodeCSVWriter
 
 
 class ReportGenerator(object):
@@ -112,16 +113,67 @@ class ReportFormatter(object):
 
 
 class ReportCSVFormatter(ReportFormatter):
+    """
+    Formats reports as CSV, streamed a row at a time.
+
+    Subclasses give the header row in ``get_header_row`` and the row of each
+    object in ``get_row``.  Querysets are read in chunks of ``chunk_size``
+    objects, with a server-side cursor where the database supports it, after
+    ``prepare_queryset`` has added what the rows need.  Subclasses that
+    write the whole CSV in ``generate_csv`` instead aren't streamed.
+    """
+
+    #: The number of objects read from the database at a time
+    chunk_size = 2000
+
     def get_csv_writer(self, file_handle, **kwargs):
         return UnicodeCSVWriter(open_file=file_handle, **kwargs)
 
+    def get_header_row(self):
+        raise NotImplementedError
+
+    def get_row(self, obj):
+        raise NotImplementedError
+
+    def prepare_queryset(self, queryset):
+        """
+        Return the queryset to read, with the relations and aggregates the
+        rows need joined and annotated in SQL
+        """
+        return queryset
+
+    def iter_rows(self, objects):
+        yield self.get_header_row()
+        if isinstance(objects, QuerySet):
+            objects = self.prepare_queryset(objects).iterator(
+                chunk_size=self.chunk_size
+            )
+        for obj in objects:
+            yield self.get_row(obj)
+
+    def generate_csv(self, response, objects):
+        writer = self.get_csv_writer(response)
+        writer.writerows(self.iter_rows(objects))
+
+    def stream_csv(self, objects):
+        buffer = StreamingCSVBuffer()
+        writer = self.get_csv_writer(buffer)
+        for row in self.iter_rows(objects):
+            writer.writerow(row)
+            yield buffer.read()
+
     def generate_response(self, objects, **kwargs):
-        response = HttpResponse(content_type="text/csv")
+        if type(self).generate_csv is ReportCSVFormatter.generate_csv:
+            response = StreamingHttpResponse(
+                self.stream_csv(objects), content_type="text/csv"
+            )
+        else:
+            response = HttpResponse(content_type="text/csv")
+            self.generate_csv(response, objects)
         # pylint: disable=no-member
         response["Content-Disposition"] = "attachment; filename=%s" % self.filename(
             **kwargs
         )
-        self.generate_csv(response, objects)
         return response
 
 
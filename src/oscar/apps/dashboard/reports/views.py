@@ -1,13 +1,19 @@
+import os
+
 from django.conf import settings
-from django.http import Http404, HttpResponseForbidden
+from django.contrib import messages
+from django.http import FileResponse, Http404, HttpResponseForbidden
+from django.shortcuts import get_object_or_404, redirect
 from django.template.response import TemplateResponse
 from django.utils.translation import gettext_lazy as _
-from django.views.generic import ListView
+from django.views.generic import ListView, View
 
-from oscar.core.loading import get_class
+from oscar.core.loading import get_class, get_model
 
 ReportForm = get_class("dashboard.reports.forms", "ReportForm")
 GeneratorRepository = get_class("dashboard.reports.utils", "GeneratorRepository")
+ReportJobQueue = get_class("dashboard.reports.jobs", "ReportJobQueue")
+ReportJob = get_model("analytics", "ReportJob")
 
 
 class IndexView(ListView):
@@ -44,6 +50,9 @@ class IndexView(ListView):
                         _("You do not have access to this report")
                     )
 
+                if form.cleaned_data["in_background"]:
+                    return self.enqueue(form)
+
                 report = generator.generate()
 
                 if form.cleaned_data["download"]:
@@ -59,3 +68,74 @@ class IndexView(ListView):
         else:
             form = self.report_form_class()
         return TemplateResponse(request, self.template_name, {"form": form})
+
+    def enqueue(self, form):
+        job, created = ReportJobQueue().enqueue(
+            form.cleaned_data["report_type"],
+            start_date=form.cleaned_data["date_from"],
+            end_date=form.cleaned_data["date_to"],
+            user=self.request.user,
+        )
+        if created:
+            messages.info(
+                self.request,
+                _(
+                    "The report is being generated, and can be downloaded below once complete"
+                ),
+            )
+        else:
+            messages.info(
+                self.request,
+                _("The same report has already been requested"),
+            )
+        return redirect("dashboard:reports-jobs")
+
+
+class ReportJobListView(ListView):
+    """
+    Lists the reports generated in the background, with their progress
+    """
+
+    model = ReportJob
+    template_name = "oscar/dashboard/reports/job_list.html"
+    context_object_name = "jobs"
+    paginate_by = settings.OSCAR_DASHBOARD_ITEMS_PER_PAGE
+    generator_repository = GeneratorRepository
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("user")
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        descriptions = {
+            generator.code: generator.description
+            for generator in self.generator_repository().get_report_generators()
+        }
+        for job in ctx["jobs"]:
+            job.description = descriptions.get(job.code, job.code)
+        return ctx
+
+
+class ReportJobDownloadView(View):
+    """
+    Serves the file of a report generated in the background
+    """
+
+    generator_repository = GeneratorRepository
+
+    def get(self, request, *args, **kwargs):
+        job = get_object_or_404(ReportJob, pk=kwargs["pk"], status=ReportJob.COMPLETE)
+        generator_cls = self.generator_repository().get_generator(job.code)
+        if not generator_cls or not job.file:
+            raise Http404()
+        generator = generator_cls(
+            start_date=job.start_date, end_date=job.end_date, formatter=job.formatter
+        )
+        if not generator.is_available_to(request.user):
+            return HttpResponseForbidden(_("You do not have access to this report"))
+        return FileResponse(
+            job.file.open("rb"),
+            as_attachment=True,
+            filename=os.path.basename(job.file.name),
+            content_type="application/gzip",
+        )
@@ -12,6 +12,7 @@ from django_tables2 import SingleTableView
 
 from oscar.core.compat import get_user_model
 from oscar.core.loading import get_class, get_classes, get_model
+from oscar.core.pagination import ApproximateCountPaginator
 from oscar.views.generic import BulkEditMixin
 
 UserSearchForm, ProductAlertSearchForm, ProductAlertUpdateForm = get_classes(
@@ -43,7 +44,10 @@ class IndexView(BulkEditMixin, FormMixin, SingleTableView):
         return super().dispatch(request, *args, **kwargs)
 
     def get_table_pagination(self, table):
-        return dict(per_page=settings.OSCAR_DASHBOARD_ITEMS_PER_PAGE)
+        return dict(
+            per_page=settings.OSCAR_DASHBOARD_ITEMS_PER_PAGE,
+            paginator_class=ApproximateCountPaginator,
+        )
 
     def get_form_kwargs(self):
         """
@@ -3,19 +3,22 @@ from datetime import timedelta
 from decimal import ROUND_UP
 from decimal import Decimal as D
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.forms import AuthenticationForm
 from django.db.models import Avg, Count, Sum
+from django.db.models.functions import TruncHour
 from django.template.response import TemplateResponse
 from django.urls import reverse_lazy
-from django.utils.timezone import now
+from django.utils.timezone import localtime, now
 from django.views.generic import TemplateView
 
 from oscar.core.compat import get_user_model
 from oscar.core.loading import get_class, get_model
 
 RelatedFieldWidgetWrapper = get_class("dashboard.widgets", "RelatedFieldWidgetWrapper")
+SalesRecords = get_class("analytics.sales", "SalesRecords")
 ConditionalOffer = get_model("offer", "ConditionalOffer")
 Voucher = get_model("voucher", "Voucher")
 Basket = get_model("basket", "Basket")
@@ -55,7 +58,7 @@ class IndexView(TemplateView):
         """
         return Voucher.objects.filter(end_datetime__gt=now())
 
-    def get_hourly_report(self, orders, hours=24, segments=10):
+    def get_hourly_report(self, orders, hours=24, segments=10, from_records=False):
         """
         Get report of order revenue split up in hourly chunks. A report is
         generated for the last *hours* (default=24) from the current time.
@@ -63,23 +66,32 @@ class IndexView(TemplateView):
         ``y-range`` as the labelling for the y-axis in a template and
         ``order_total_hourly``, a list of properties for hourly chunks.
         *segments* defines the number of labelling segments used for the y-axis
-        when generating the y-axis labels (default=10).
+        when generating the y-axis labels (default=10). The revenue is read
+        from the hourly sales records instead of *orders* if *from_records*
+        is set.
         """
         # Get datetime for 24 hours ago
-        time_now = now().replace(minute=0, second=0)
+        time_now = localtime(now()).replace(minute=0, second=0, microsecond=0)
         start_time = time_now - timedelta(hours=hours - 1)
+        num_chunks = len(range(0, hours, 2))
+        end_time = start_time + timedelta(hours=2 * num_chunks)
 
-        order_total_hourly = []
-        for _ in range(0, hours, 2):
-            end_time = start_time + timedelta(hours=2)
-            hourly_orders = orders.filter(
-                date_placed__gte=start_time, date_placed__lt=end_time
-            )
-            total = hourly_orders.aggregate(Sum("total_incl_tax"))[
-                "total_incl_tax__sum"
-            ] or D("0.0")
-            order_total_hourly.append({"end_time": end_time, "total_incl_tax": total})
-            start_time = end_time
+        if from_records:
+            revenue_by_hour = SalesRecords().get_hourly_revenue(start_time, end_time)
+        else:
+            revenue_by_hour = self.get_revenue_by_hour(orders, start_time, end_time)
+        totals = [D("0.0")] * num_chunks
+        for hour, revenue in revenue_by_hour.items():
+            chunk = int((hour - start_time).total_seconds() // 7200)
+            if 0 <= chunk < num_chunks:
+                totals[chunk] += revenue
+        order_total_hourly = [
+            {
+                "end_time": start_time + timedelta(hours=2 * (idx + 1)),
+                "total_incl_tax": total,
+            }
+            for idx, total in enumerate(totals)
+        ]
 
         max_value = max([x["total_incl_tax"] for x in order_total_hourly])
         divisor = 1
@@ -108,6 +120,96 @@ class IndexView(TemplateView):
         }
         return ctx
 
+    def get_revenue_by_hour(self, orders, start_time, end_time):
+        """
+        Return a dict of the start of each hour in the given range with
+        orders to their revenue, using a single grouped query
+        """
+        if orders.query.distinct:
+            # Grouping would apply to the joined rows of a distinct queryset
+            orders = Order.objects.filter(pk__in=orders.values("pk"))
+        revenue = (
+            orders.filter(date_placed__gte=start_time, date_placed__lt=end_time)
+            .annotate(hour=TruncHour("date_placed"))
+            .values("hour")
+            .annotate(revenue=Sum("total_incl_tax"))
+            .order_by()
+        )
+        return {row["hour"]: row["revenue"] for row in revenue}
+
+    def use_sales_records(self):
+        """
+        Whether the order and open basket statistics are read from the sales
+        records, which cover the orders and baskets of the whole shop
+        """
+        return settings.OSCAR_DASHBOARD_USE_SALES_RECORDS and self.request.user.is_staff
+
+    def get_order_stats(self, orders, lines, customers, baskets, datetime_24hrs_ago):
+        """
+        Return the order and open basket statistics aggregated from the given
+        querysets
+        """
+        orders_last_day = orders.filter(date_placed__gt=datetime_24hrs_ago)
+        total_lines_last_day = lines.filter(order__in=orders_last_day).count()
+        return {
+            "total_orders_last_day": orders_last_day.count(),
+            "total_lines_last_day": total_lines_last_day,
+            "average_order_costs": orders_last_day.aggregate(Avg("total_incl_tax"))[
+                "total_incl_tax__avg"
+            ]
+            or D("0.00"),
+            "total_revenue_last_day": orders_last_day.aggregate(Sum("total_incl_tax"))[
+                "total_incl_tax__sum"
+            ]
+            or D("0.00"),
+            "hourly_report_dict": self.get_hourly_report(orders),
+            "total_customers_last_day": customers.filter(
+                date_joined__gt=datetime_24hrs_ago,
+            ).count(),
+            "total_customers": customers.count(),
+            "total_orders": orders.count(),
+            "total_lines": lines.count(),
+            "total_revenue": orders.aggregate(Sum("total_incl_tax"))[
+                "total_incl_tax__sum"
+            ]
+            or D("0.00"),
+            "total_open_baskets_last_day": baskets.filter(
+                date_created__gt=datetime_24hrs_ago
+            ).count(),
+            "total_open_baskets": baskets.count(),
+        }
+
+    def get_sales_record_stats(self, datetime_24hrs_ago):
+        """
+        Return the order and open basket statistics read from the sales
+        records. The last
+        day starts at the beginning of the hour 24 hours ago, and customers
+        are counted when they place their first order.
+        """
+        records = SalesRecords()
+        last_day = records.get_totals_since(datetime_24hrs_ago)
+        totals = records.get_totals()
+        if last_day["num_orders"]:
+            average_order_costs = last_day["revenue"] / last_day["num_orders"]
+        else:
+            average_order_costs = D("0.00")
+        return {
+            "total_orders_last_day": last_day["num_orders"],
+            "total_lines_last_day": last_day["num_lines"],
+            "average_order_costs": average_order_costs,
+            "total_revenue_last_day": last_day["revenue"],
+            "hourly_report_dict": self.get_hourly_report(None, from_records=True),
+            # Customers are counted as buyers, and labelled as such
+            "customers_are_buyers": True,
+            "total_customers_last_day": last_day["num_new_customers"],
+            "total_customers": totals["num_new_customers"],
+            "total_orders": totals["num_orders"],
+            "total_lines": totals["num_lines"],
+            "total_revenue": totals["revenue"],
+            "total_open_baskets_last_day": last_day["num_open_baskets"],
+            "total_open_baskets": totals["num_open_baskets"],
+        }
+
     def get_stats(self):
         datetime_24hrs_ago = now() - timedelta(hours=24)
 
@@ -132,45 +234,25 @@ class IndexView(TemplateView):
             lines = lines.filter(partner_id__in=partners_ids)
             products = products.filter(stockrecords__partner_id__in=partners_ids)
 
-        orders_last_day = orders.filter(date_placed__gt=datetime_24hrs_ago)
-
         open_alerts = alerts.filter(status=StockAlert.OPEN)
         closed_alerts = alerts.filter(status=StockAlert.CLOSED)
 
-        total_lines_last_day = lines.filter(order__in=orders_last_day).count()
-        stats = {
-            "total_orders_last_day": orders_last_day.count(),
-            "total_lines_last_day": total_lines_last_day,
-            "average_order_costs": orders_last_day.aggregate(Avg("total_incl_tax"))[
-                "total_incl_tax__avg"
-            ]
-            or D("0.00"),
-            "total_revenue_last_day": orders_last_day.aggregate(Sum("total_incl_tax"))[
-                "total_incl_tax__sum"
-            ]
-            or D("0.00"),
-            "hourly_report_dict": self.get_hourly_report(orders),
-            "total_customers_last_day": customers.filter(
-                date_joined__gt=datetime_24hrs_ago,
-            ).count(),
-            "total_open_baskets_last_day": baskets.filter(
-                date_created__gt=datetime_24hrs_ago
-            ).count(),
-            "total_products": products.count(),
-            "total_open_stock_alerts": open_alerts.count(),
-            "total_closed_stock_alerts": closed_alerts.count(),
-            "total_customers": customers.count(),
-            "total_open_baskets": baskets.count(),
-            "total_orders": orders.count(),
-            "total_lines": lines.count(),
-            "total_revenue": orders.aggregate(Sum("total_incl_tax"))[
-                "total_incl_tax__sum"
-            ]
-            or D("0.00"),
-            "order_status_breakdown": orders.order_by("status")
-            .values("status")
-            .annotate(freq=Count("id")),
-        }
+        if self.use_sales_records():
+            stats = self.get_sales_record_stats(datetime_24hrs_ago)
+        else:
+            stats = self.get_order_stats(
+                orders, lines, customers, baskets, datetime_24hrs_ago
+            )
+        stats.update(
+            {
+                "total_products": products.count(),
+                "total_open_stock_alerts": open_alerts.count(),
+                "total_closed_stock_alerts": closed_alerts.count(),
+                "order_status_breakdown": orders.order_by("status")
+                .values("status")
+                .annotate(freq=Count("id")),
+            }
+        )
         if user.is_staff:
             stats.update(
                 offer_maps=(
@@ -53,13 +53,36 @@ class BaseOfferMixin(models.Model):
             # Short-circuit again.
             if self.__class__ == klass:
                 return self
-            return klass(**field_dict)
+            return self._copy_related_cache(klass(**field_dict))
         if self.type in klassmap:
-            return klassmap[self.type](**field_dict)
+            return self._copy_related_cache(klassmap[self.type](**field_dict))
         raise RuntimeError(
             "Unrecognised %s type (%s)" % (self.__class__.__name__.lower(), self.type)
         )
 
+    def _copy_related_cache(self, proxy):
+        # Share the already loaded related objects (eg the range) with the
+        # proxy so it doesn't have to load them again.
+        proxy._state.fields_cache = dict(self._state.fields_cache)
+        return proxy
+
+    # pylint: disable=W0622
+    def range_contains_product(self, product, membership=None, range=None):
+        """
+        Test whether the product is in the given range (this object's own
+        range by default).
+
+        :membership: An optional ``RangeMembership`` resolver computed for the
+                     current offer application pass.  It is consulted first
+                     to avoid a query per basket line.
+        """
+        range_id = self.range_id if range is None else range.pk
+        if membership is not None and membership.is_resolved(range_id, product.id):
+            return (range_id, product.id) in membership
+        if range is None:
+            range = self.range
+        return range.contains_product(product)
+
     def __str__(self):
         return self.name
 
@@ -278,6 +301,9 @@ class AbstractConditionalOffer(models.Model):
     # voucher offer)
     _voucher = None
 
+    # The fields saved when recording the offer's usage
+    usage_fields = ["num_applications", "total_discount", "num_orders", "status"]
+
     class Meta:
         abstract = True
         app_label = "offer"
@@ -419,7 +445,8 @@ class AbstractConditionalOffer(models.Model):
         self.num_applications += discount["freq"]
         self.total_discount += discount["discount"]
         self.num_orders += 1
-        self.save()
+        # The status is saved too, as the offer may have been consumed
+        self.save(update_fields=self.usage_fields)
 
     record_usage.alters_data = True
 
@@ -792,13 +819,14 @@ class AbstractBenefit(BaseOfferMixin, models.Model):
         :range: The range of products to use for filtering.  The fixed-price
                 benefit ignores its range and uses the condition range
         """
-        if range is None:
-            range = self.range
+        membership = getattr(basket, "range_membership", None)
         line_tuples = []
         for line in basket.all_lines():
             product = line.product
 
-            if not range.contains_product(product) or not self.can_apply_benefit(line):
+            if not self.range_contains_product(
+                product, membership, range
+            ) or not self.can_apply_benefit(line):
                 continue
 
             price = unit_price(offer, line)
@@ -939,7 +967,17 @@ class AbstractCondition(BaseOfferMixin, models.Model):
         if not line.stockrecord_id:
             return False
         product = line.product
-        return self.range.contains_product(product) and product.is_discountable
+        return (
+            self.range_contains_product(product, self._get_range_membership(line))
+            and product.is_discountable
+        )
+
+    def _get_range_membership(self, line):
+        # Only use the basket if it's already cached on the line, as loading
+        # it would cost the query we are trying to save.
+        if not line._meta.get_field("basket").is_cached(line):
+            return None
+        return getattr(line.basket, "range_membership", None)
 
     def get_applicable_lines(self, offer, basket, most_expensive_first=True):
         """
@@ -1092,6 +1130,8 @@ class AbstractRange(models.Model):
     def contains_product(self, product):
         if self.proxy:
             return self.proxy.contains_product(product)
+        if settings.OSCAR_OFFERS_USE_RANGE_MEMBERSHIP_TABLE:
+            return self.product_memberships.filter(product_id=product.id).exists()
         return self.product_queryset.filter(id=product.id).exists()
 
     def invalidate_cached_queryset(self):
@@ -1106,6 +1146,8 @@ class AbstractRange(models.Model):
             return self.proxy.num_products()
         if self.includes_all_products:
             return None
+        if settings.OSCAR_OFFERS_USE_RANGE_MEMBERSHIP_TABLE:
+            return self.product_memberships.count()
         return self.all_products().count()
 
     def all_products(self):
@@ -1124,35 +1166,26 @@ class AbstractRange(models.Model):
     @cached_property
     def product_queryset(self):
         "cached queryset of all the products in the Range"
-        ProductCategoryHierarchy = get_model("catalogue", "ProductCategoryHierarchy")
+        if settings.OSCAR_OFFERS_USE_RANGE_MEMBERSHIP_TABLE:
+            Product = self.included_products.model
+            return Product.objects.filter(range_memberships__range=self)
+        return self.build_product_queryset()
 
+    def build_product_queryset(self):
+        """
+        Return a queryset of all the products in the Range, evaluating the
+        range's rules.
+
+        This is used to populate the range product membership table, so it
+        never reads from it.
+        """
         Product = self.included_products.model
 
         if self.includes_all_products:
             _filter = Q(id__in=self.excluded_products.values("id"))
             # extend filter if excluded_categories exist
             if self.excluded_categories.exists():
-                if use_productcategory_materialised_view():
-                    product_ids = ProductCategoryHierarchy.objects.filter(
-                        category_id__in=self.excluded_categories.values_list(
-                            "id", flat=True
-                        )
-                    ).values_list("product_id", flat=True)
-
-                    _filter |= Q(id__in=product_ids)
-                    _filter |= Q(parent__id__in=product_ids)
-                else:
-                    expanded_range_categories = ExpandDownwardsCategoryQueryset(
-                        self.excluded_categories.values("id")
-                    )
-                    _filter |= Q(categories__in=expanded_range_categories)
-                    # extend filter for parent categories, exclude parent = None
-                    if (
-                        Product.objects.exclude(parent=None)
-                        .filter(parent__categories__in=expanded_range_categories)
-                        .exists()
-                    ):
-                        _filter |= Q(parent__categories__in=expanded_range_categories)
+                _filter |= self._get_categories_filter(self.excluded_categories)
 
             # Filter out blacklisted
             return Product.objects.exclude(_filter)
@@ -1172,28 +1205,7 @@ class AbstractRange(models.Model):
 
         # extend filter if included_categories exist
         if self.included_categories.exists():
-            if use_productcategory_materialised_view():
-                product_ids = ProductCategoryHierarchy.objects.filter(
-                    category_id__in=self.included_categories.values_list(
-                        "id", flat=True
-                    )
-                ).values_list("product_id", flat=True)
-
-                _filter |= Q(id__in=product_ids)
-                _filter |= Q(parent__id__in=product_ids)
-
-            else:
-                expanded_range_categories = ExpandDownwardsCategoryQueryset(
-                    self.included_categories.values("id")
-                )
-                _filter |= Q(categories__in=expanded_range_categories)
-                # extend filter for parent categories, exclude parent = None
-                if (
-                    Product.objects.exclude(parent=None)
-                    .filter(parent__categories__in=expanded_range_categories)
-                    .exists()
-                ):
-                    _filter |= Q(parent__categories__in=expanded_range_categories)
+            _filter |= self._get_categories_filter(self.included_categories)
 
         qs = Product.objects.filter(_filter, ~Q(excludes=self))
 
@@ -1203,6 +1215,35 @@ class AbstractRange(models.Model):
         # make sure to filter out duplicates originating from a join
         return qs.distinct()
 
+    def _get_categories_filter(self, categories):
+        """
+        Return a filter for the products in the given categories or their
+        descendants, including children of such parent products
+        """
+        Product = self.included_products.model
+
+        if use_productcategory_materialised_view():
+            ProductCategoryHierarchy = get_model(
+                "catalogue", "ProductCategoryHierarchy"
+            )
+            product_ids = ProductCategoryHierarchy.objects.filter(
+                category_id__in=categories.values_list("id", flat=True)
+            ).values_list("product_id", flat=True)
+            return Q(id__in=product_ids) | Q(parent__id__in=product_ids)
+
+        expanded_range_categories = ExpandDownwardsCategoryQueryset(
+            categories.values("id")
+        )
+        _filter = Q(categories__in=expanded_range_categories)
+        # extend filter for parent categories, exclude parent = None
+        if (
+            Product.objects.exclude(parent=None)
+            .filter(parent__categories__in=expanded_range_categories)
+            .exists()
+        ):
+            _filter |= Q(parent__categories__in=expanded_range_categories)
+        return _filter
+
     @property
     def is_editable(self):
         """
@@ -1238,6 +1279,30 @@ class AbstractRangeProduct(models.Model):
         unique_together = ("range", "product")
 
 
+class AbstractRangeProductMembership(models.Model):
+    """
+    Denormalised record of a product belonging to a range.
+
+    It's only used if ``OSCAR_OFFERS_USE_RANGE_MEMBERSHIP_TABLE`` is enabled,
+    and is built by the ``oscar_build_range_memberships`` management command
+    and kept up to date by signal receivers.
+    """
+
+    range = models.ForeignKey(
+        "offer.Range", on_delete=models.CASCADE, related_name="product_memberships"
+    )
+    product = models.ForeignKey(
+        "catalogue.Product", on_delete=models.CASCADE, related_name="range_memberships"
+    )
+
+    class Meta:
+        abstract = True
+        app_label = "offer"
+        unique_together = ("range", "product")
+        verbose_name = _("Range product membership")
+        verbose_name_plural = _("Range product memberships")
+
+
 class AbstractRangeProductFileUpload(models.Model):
     range = models.ForeignKey(
         "offer.Range",
@@ -1,10 +1,14 @@
 import logging
 from itertools import chain
 
+from django.conf import settings
+
 from oscar.core.loading import get_class, get_model
 
 logger = logging.getLogger("oscar.offers")
 OfferApplications = get_class("offer.results", "OfferApplications")
+RangeMembership = get_class("offer.membership", "RangeMembership")
+site_offer_cache = get_class("offer.cache", "site_offer_cache")
 
 
 class OfferApplicationError(Exception):
@@ -24,7 +28,11 @@ class Applicator(object):
 
     def apply_offers(self, basket, offers):
         applications = OfferApplications()
+        membership = self.get_range_membership(basket, offers)
+        basket.range_membership = membership
         for offer in offers:
+            if self.is_offer_inapplicable(offer, membership):
+                continue
             num_applications = 0
             # Keep applying the offer until either
             # (a) We reach the max number of applications for the offer.
@@ -42,6 +50,30 @@ class Applicator(object):
         # rendered in templates
         basket.offer_applications = applications
 
+    def get_range_membership(self, basket, offers):
+        """
+        Resolve the range membership of the basket's products for all the
+        condition and benefit ranges of the given offers at once.
+        """
+        return RangeMembership.for_offers(basket, offers)
+
+    def is_offer_inapplicable(self, offer, membership):
+        """
+        Test whether the offer can be skipped without applying it.
+
+        The built-in conditions can only be satisfied by lines within their
+        range, so an offer is skipped if none of the basket's products are in
+        its condition range.  Custom conditions are always applied.
+        """
+        condition = offer.condition
+        if condition.proxy_class or condition.type not in (
+            condition.COUNT,
+            condition.VALUE,
+            condition.COVERAGE,
+        ):
+            return False
+        return membership.is_empty(condition.range_id)
+
     def get_offers(self, basket, user=None, request=None):
         """
         Return all offers to apply to the basket.
@@ -67,6 +99,8 @@ class Applicator(object):
         """
         Return site offers that are available to all users
         """
+        if settings.OSCAR_OFFERS_CACHE_SITE_OFFERS:
+            return site_offer_cache.get_offers(self.load_site_offers)
         ConditionalOffer = get_model("offer", "ConditionalOffer")
         qs = ConditionalOffer.active.filter(offer_type=ConditionalOffer.SITE)
         # Using select_related with the condition/benefit ranges doesn't seem
@@ -74,6 +108,16 @@ class Applicator(object):
         # FK to range with the same name.
         return qs.select_related("condition", "benefit")
 
+    def load_site_offers(self):
+        """
+        Return all open site offers, regardless of their date range, with
+        their conditions, benefits and ranges loaded so they can be cached.
+        """
+        ConditionalOffer = get_model("offer", "ConditionalOffer")
+        return ConditionalOffer.objects.filter(
+            offer_type=ConditionalOffer.SITE, status=ConditionalOffer.OPEN
+        ).select_related("condition__range", "benefit__range")
+
     def get_basket_offers(self, basket, user):
         """
         Return basket-linked offers such as those associated with a voucher
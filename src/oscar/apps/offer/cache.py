@@ -0,0 +1,79 @@
+import copy
+import uuid
+
+from django.core.cache import cache
+from django.utils.timezone import now
+
+OFFERS_VERSION_CACHE_KEY = "OSCAR_OFFERS_VERSION"
+
+
+def get_offers_version():
+    """
+    Return the current version of the offer configuration.
+
+    The version is shared between processes through Django's cache.  A random
+    token is used rather than an incrementing number, so that an evicted key
+    can never bring an old version back.
+    """
+    version = cache.get(OFFERS_VERSION_CACHE_KEY)
+    if version is None:
+        version = bump_offers_version()
+    return version
+
+
+def bump_offers_version():
+    """
+    Invalidate all cached offer data by moving on to a new version
+    """
+    version = uuid.uuid4().hex
+    cache.set(OFFERS_VERSION_CACHE_KEY, version, None)
+    return version
+
+
+class SiteOfferCache(object):
+    """
+    Process-local cache of the open site offers.
+
+    The offers are stored with their conditions, benefits and ranges loaded,
+    and are only reloaded from the database once the offers version changes.
+    Each caller gets its own copies of the offers, as offer application
+    stores state on them.
+    """
+
+    def __init__(self):
+        self._entry = (None, [])
+
+    def get_offers(self, loader):
+        """
+        Return the site offers that are currently active.
+
+        :loader: A callable returning the open site offers with their related
+                 objects loaded.  It's only called when the cache is stale.
+        """
+        version = get_offers_version()
+        cached_version, offers = self._entry
+        if cached_version != version:
+            offers = list(loader())
+            self._entry = (version, offers)
+        # Copy the offers in one go so that ranges shared between offers stay
+        # shared within the copies.
+        return copy.deepcopy(self.filter_active(offers))
+
+    def filter_active(self, offers):
+        """
+        Filter offers down to those within their date range, matching
+        ``ActiveOfferManager``.
+        """
+        cutoff = now()
+        return [
+            offer
+            for offer in offers
+            if (offer.start_datetime is None or offer.start_datetime <= cutoff)
+            and (offer.end_datetime is None or offer.end_datetime >= cutoff)
+        ]
+
+    def clear(self):
+        self._entry = (None, [])
+
+
+site_offer_cache = SiteOfferCache()
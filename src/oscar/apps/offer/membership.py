@@ -0,0 +1,320 @@
+import threading
+import weakref
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import models, transaction
+
+from oscar.core.loading import get_model
+
+# SQLite refuses compound statements with more than 500 terms, so the union
+# of range querysets is issued in chunks.
+MAX_RANGES_PER_QUERY = 100
+
+
+def get_range_members(ranges, product_ids, from_rules=False):
+    """
+    Return ``(product_id, range_id)`` pairs for the given products that are in
+    the given ranges, using a single query for up to
+    ``MAX_RANGES_PER_QUERY`` ranges.
+
+    Custom (proxy) ranges are not supported.  Unless ``from_rules`` is set,
+    the range product membership table is used if it's enabled.
+    """
+    if not product_ids or not ranges:
+        return []
+    if settings.OSCAR_OFFERS_USE_RANGE_MEMBERSHIP_TABLE and not from_rules:
+        RangeProductMembership = get_model("offer", "RangeProductMembership")
+        return RangeProductMembership.objects.filter(
+            range__in=ranges, product_id__in=product_ids
+        ).values_list("product_id", "range_id")
+
+    members = []
+    ranges = list(ranges)
+    while ranges:
+        chunk = ranges[:MAX_RANGES_PER_QUERY]
+        ranges = ranges[MAX_RANGES_PER_QUERY:]
+        querysets = [
+            _get_members_queryset(rng, product_ids, from_rules) for rng in chunk
+        ]
+        members.extend(querysets[0].union(*querysets[1:]))
+    return members
+
+
+def _get_members_queryset(rng, product_ids, from_rules):
+    qs = rng.build_product_queryset() if from_rules else rng.product_queryset
+    return (
+        qs.filter(id__in=product_ids)
+        .order_by()
+        .annotate(range_id=models.Value(rng.pk, output_field=models.IntegerField()))
+        .values_list("id", "range_id")
+    )
+
+
+class RangeMembership(object):
+    """
+    Resolves range membership for a fixed set of products and ranges.
+
+    Conditions and benefits test whether each basket line is in their range,
+    once per line, per offer and per application.  This resolver computes
+    membership for every (range, product) pair up front with a single
+    set-based query, so that the rest of the offer application pass can
+    answer those questions without hitting the database.
+    """
+
+    def __init__(self, ranges, products):
+        self.product_ids = {product.pk for product in products}
+        self.range_ids = set()
+        self._members = set()
+        self._populated_range_ids = set()
+        self.resolve([rng for rng in ranges if rng is not None], products)
+
+    def __contains__(self, key):
+        """
+        Test whether a ``(range_id, product_id)`` pair is a member.
+        """
+        return key in self._members
+
+    @classmethod
+    def for_offers(cls, basket, offers):
+        """
+        Build a resolver for the products in the basket and the condition and
+        benefit ranges of the given offers.
+        """
+        Range = get_model("offer", "Range")
+        ranges = {}
+        missing_range_ids = set()
+        for offer in offers:
+            for obj in (offer.condition, offer.benefit):
+                if obj.range_id is None:
+                    continue
+                # Reuse ranges that are already loaded, eg by the site offer
+                # cache, and fetch the others in one go.
+                if obj._meta.get_field("range").is_cached(obj):
+                    ranges[obj.range_id] = obj.range
+                else:
+                    missing_range_ids.add(obj.range_id)
+        missing_range_ids.difference_update(ranges)
+        if missing_range_ids:
+            ranges.update(Range.objects.in_bulk(missing_range_ids))
+        products = [line.product for line in basket.all_lines()]
+        return cls(ranges.values(), products)
+
+    def resolve(self, ranges, products):
+        queryset_ranges = []
+        for rng in ranges:
+            if rng.proxy:
+                # Custom ranges can't be expressed as a queryset, so they are
+                # asked once for each product instead.
+                for product in products:
+                    if rng.proxy.contains_product(product):
+                        self._add(rng.pk, product.pk)
+            else:
+                queryset_ranges.append(rng)
+            self.range_ids.add(rng.pk)
+
+        for product_id, range_id in get_range_members(
+            queryset_ranges, self.product_ids
+        ):
+            self._add(range_id, product_id)
+
+    def _add(self, range_id, product_id):
+        self._members.add((range_id, product_id))
+        self._populated_range_ids.add(range_id)
+
+    def is_resolved(self, range_id, product_id):
+        """
+        Test whether membership of the pair was computed by this resolver
+        """
+        return range_id in self.range_ids and product_id in self.product_ids
+
+    def is_empty(self, range_id):
+        """
+        Test whether none of the products are in the given (resolved) range
+        """
+        return range_id in self.range_ids and range_id not in self._populated_range_ids
+
+
+class PendingMembershipChanges(object):
+    """
+    The membership changes of a transaction, applied at once when it's
+    committed
+    """
+
+    def __init__(self, updater):
+        self.updater = updater
+        self.rebuild_all = False
+        self.range_ids = set()
+        self.product_ids = set()
+        self.product_ids_by_range = defaultdict(set)
+        self._callback = None
+
+    def is_scheduled(self):
+        # Django drops the callbacks of transactions and savepoints that are
+        # rolled back, which frees the callback and kills the reference.
+        return self._callback is not None and self._callback() is not None
+
+    def schedule(self):
+        callback = self.apply
+        self._callback = weakref.ref(callback)
+        transaction.on_commit(callback)
+
+    def apply(self):
+        self._callback = None
+        if getattr(_pending, "changes", None) is self:
+            _pending.changes = None
+        self.updater.apply_changes(self)
+
+
+_pending = threading.local()
+
+
+class RangeMembershipTableUpdater(object):
+    """
+    Maintains the denormalised ``RangeProductMembership`` table.
+
+    Membership is always computed from the range rules, in bulk, and written
+    with ``bulk_create``.  Custom (proxy) ranges have no rows in the table.
+    """
+
+    batch_size = 1000
+
+    def __init__(self, batch_size=None):
+        if batch_size is not None:
+            self.batch_size = batch_size
+        self.membership_model = get_model("offer", "RangeProductMembership")
+
+    def get_ranges(self):
+        Range = get_model("offer", "Range")
+        return Range.objects.filter(proxy_class__isnull=True)
+
+    def rebuild(self, ranges=None):
+        """
+        Rebuild the memberships of the given ranges (all ranges by default),
+        returning the number of rows written.
+        """
+        if ranges is None:
+            ranges = self.get_ranges()
+        return sum(self.rebuild_range(rng) for rng in ranges)
+
+    @transaction.atomic
+    def rebuild_range(self, rng):
+        self.membership_model.objects.filter(range=rng).delete()
+        if rng.proxy:
+            return 0
+        product_ids = (
+            rng.build_product_queryset().order_by().values_list("id", flat=True)
+        )
+        num_created = 0
+        batch = []
+        for product_id in product_ids.iterator(chunk_size=self.batch_size):
+            batch.append(self.membership_model(range=rng, product_id=product_id))
+            if len(batch) >= self.batch_size:
+                num_created += len(self.membership_model.objects.bulk_create(batch))
+                batch = []
+        if batch:
+            num_created += len(self.membership_model.objects.bulk_create(batch))
+        return num_created
+
+    @transaction.atomic
+    def update_products(self, product_ids, ranges=None):
+        """
+        Recompute the memberships of the given products, and of their
+        children, for the given ranges (all ranges by default).
+        """
+        Product = get_model("catalogue", "Product")
+        product_ids = set(
+            Product.objects.filter(
+                models.Q(id__in=product_ids) | models.Q(parent_id__in=product_ids)
+            ).values_list("id", flat=True)
+        )
+        if ranges is None:
+            ranges = self.get_ranges()
+        ranges = [rng for rng in ranges if not rng.proxy]
+        if not product_ids or not ranges:
+            return
+
+        members = set(get_range_members(ranges, product_ids, from_rules=True))
+        existing = set(
+            self.membership_model.objects.filter(
+                range__in=ranges, product_id__in=product_ids
+            ).values_list("product_id", "range_id")
+        )
+
+        stale_by_range = defaultdict(list)
+        for product_id, range_id in existing - members:
+            stale_by_range[range_id].append(product_id)
+        for range_id, stale_product_ids in stale_by_range.items():
+            self.membership_model.objects.filter(
+                range_id=range_id, product_id__in=stale_product_ids
+            ).delete()
+
+        self.membership_model.objects.bulk_create(
+            [
+                self.membership_model(range_id=range_id, product_id=product_id)
+                for product_id, range_id in members - existing
+            ],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+
+    def get_pending_changes(self):
+        """
+        Return the membership changes pending for the current transaction
+        """
+        changes = getattr(_pending, "changes", None)
+        # Changes of a transaction that was rolled back are discarded
+        if changes is None or not changes.is_scheduled():
+            changes = _pending.changes = PendingMembershipChanges(self)
+        return changes
+
+    def schedule(self, changes):
+        # A single callback applies all the changes of the transaction
+        if not changes.is_scheduled():
+            changes.schedule()
+
+    def rebuild_on_commit(self, range_ids=None):
+        """
+        Rebuild the memberships of the ranges with the given ids (all ranges
+        by default) once the current transaction is committed.
+        """
+        changes = self.get_pending_changes()
+        if range_ids is None:
+            changes.rebuild_all = True
+        else:
+            changes.range_ids.update(range_ids)
+        self.schedule(changes)
+
+    def update_products_on_commit(self, product_ids, range_ids=None):
+        """
+        Recompute the memberships of the products with the given ids once the
+        current transaction is committed.
+
+        Waiting for the commit means products and ranges that are being
+        deleted along with the change are gone by then, and are skipped.
+        """
+        changes = self.get_pending_changes()
+        if range_ids is None:
+            changes.product_ids.update(product_ids)
+        else:
+            for range_id in range_ids:
+                changes.product_ids_by_range[range_id].update(product_ids)
+        self.schedule(changes)
+
+    def apply_changes(self, changes):
+        """
+        Apply the membership changes collected for a transaction, with one
+        update per kind of change rather than one per changed object
+        """
+        if changes.rebuild_all:
+            self.rebuild()
+            return
+        if changes.range_ids:
+            Range = get_model("offer", "Range")
+            self.rebuild(Range.objects.filter(pk__in=changes.range_ids))
+        if changes.product_ids:
+            self.update_products(changes.product_ids)
+        for range_id, product_ids in changes.product_ids_by_range.items():
+            # Rebuilt ranges are up to date already
+            if range_id not in changes.range_ids and product_ids:
+                self.update_products(product_ids, self.get_ranges().filter(pk=range_id))
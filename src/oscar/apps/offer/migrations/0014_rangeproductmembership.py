@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalogue", "0032_category_exclude_from_menu_category_long_description"),
+        ("offer", "0013_range_excluded_categories"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RangeProductMembership",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="range_memberships",
+                        to="catalogue.product",
+                    ),
+                ),
+                (
+                    "range",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="product_memberships",
+                        to="offer.range",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Range product membership",
+                "verbose_name_plural": "Range product memberships",
+                "abstract": False,
+                "unique_together": {("range", "product")},
+            },
+        ),
+    ]
@@ -6,6 +6,7 @@ from oscar.apps.offer.abstract_models import (
     AbstractRange,
     AbstractRangeProduct,
     AbstractRangeProductFileUpload,
+    AbstractRangeProductMembership,
 )
 from oscar.apps.offer.results import (
     SHIPPING_DISCOUNT,
@@ -65,6 +66,14 @@ if not is_model_registered("offer", "RangeProduct"):
     __all__.append("RangeProduct")
 
 
+if not is_model_registered("offer", "RangeProductMembership"):
+
+    class RangeProductMembership(AbstractRangeProductMembership):
+        pass
+
+    __all__.append("RangeProductMembership")
+
+
 if not is_model_registered("offer", "RangeProductFileUpload"):
 
     class RangeProductFileUpload(AbstractRangeProductFileUpload):
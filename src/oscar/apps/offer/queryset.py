@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 from oscar.checks import use_productcategory_materialised_view
@@ -78,6 +79,8 @@ class RangeQuerySet(models.query.QuerySet):
         return ExpandUpwardsCategoryQueryset(self._get_category_ids(product))
 
     def contains_product(self, product):
+        if settings.OSCAR_OFFERS_USE_RANGE_MEMBERSHIP_TABLE:
+            return self.filter(product_memberships__product=product)
         # the wide query is used to determine which ranges have includes_all_products
         # turned on, we only need to look at explicit exclusions, the other
         # mechanism for adding a product to a range don't need to be checked
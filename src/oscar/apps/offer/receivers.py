@@ -1,11 +1,22 @@
-from django.db.models.signals import post_delete
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from oscar.core.loading import get_model
+from oscar.core.loading import get_class, get_model
 
 ConditionalOffer = get_model("offer", "ConditionalOffer")
 Condition = get_model("offer", "Condition")
 Benefit = get_model("offer", "Benefit")
+Range = get_model("offer", "Range")
+RangeProduct = get_model("offer", "RangeProduct")
+Product = get_model("catalogue", "Product")
+ProductCategory = get_model("catalogue", "ProductCategory")
+bump_offers_version = get_class("offer.cache", "bump_offers_version")
+RangeMembershipTableUpdater = get_class(
+    "offer.membership", "RangeMembershipTableUpdater"
+)
 
 
 @receiver(post_delete, sender=ConditionalOffer)
@@ -29,3 +40,121 @@ def delete_unused_related_conditions_and_benefits(instance, **kwargs):
         # Only delete if not using a proxy, and not used by other offers
         if benefit.proxy_class == "" and not benefit.offers.exists():
             benefit.delete()
+
+
+def is_usage_update(instance, update_fields):
+    """
+    Whether an offer is only saved to record its usage. That doesn't change
+    whether the offer is available, unless the offer's applications are
+    limited.
+    """
+    return (
+        isinstance(instance, ConditionalOffer)
+        and update_fields is not None
+        and set(update_fields) <= set(instance.usage_fields)
+        and not instance.max_global_applications
+        and not instance.max_user_applications
+    )
+
+
+def invalidate_cached_offers(instance=None, update_fields=None, **kwargs):
+    """
+    Invalidate cached offer data once a change to offers or their ranges is
+    committed, so that other processes can't cache the old data again
+    """
+    if is_usage_update(instance, update_fields):
+        return
+    transaction.on_commit(bump_offers_version)
+
+
+# Saving a proxy model (eg the condition and benefit proxies) sends signals
+# with the proxy as the sender, so every subclass is connected.
+for model in apps.get_models():
+    if issubclass(model, (ConditionalOffer, Condition, Benefit, Range, RangeProduct)):
+        post_save.connect(
+            invalidate_cached_offers,
+            sender=model,
+            dispatch_uid="invalidate_cached_offers",
+        )
+        post_delete.connect(
+            invalidate_cached_offers,
+            sender=model,
+            dispatch_uid="invalidate_cached_offers",
+        )
+
+
+@receiver(m2m_changed, sender=Range.excluded_products.through)
+@receiver(m2m_changed, sender=Range.classes.through)
+@receiver(m2m_changed, sender=Range.included_categories.through)
+@receiver(m2m_changed, sender=Range.excluded_categories.through)
+def invalidate_cached_offers_on_range_change(action, **kwargs):
+    if action.startswith("post_"):
+        invalidate_cached_offers()
+
+
+def use_range_membership_table(**kwargs):
+    return settings.OSCAR_OFFERS_USE_RANGE_MEMBERSHIP_TABLE and not kwargs.get("raw")
+
+
+@receiver(post_save, sender=Product)
+def update_range_memberships_of_product(instance, **kwargs):
+    if use_range_membership_table(**kwargs):
+        RangeMembershipTableUpdater().update_products_on_commit([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=ProductCategory)
+def update_range_memberships_of_categorised_product(instance, **kwargs):
+    if use_range_membership_table(**kwargs):
+        RangeMembershipTableUpdater().update_products_on_commit([instance.product_id])
+
+
+@receiver(m2m_changed, sender=ProductCategory)
+def update_range_memberships_on_category_change(
+    instance, action, reverse, pk_set, **kwargs
+):
+    if not use_range_membership_table() or not action.startswith("post_"):
+        return
+    updater = RangeMembershipTableUpdater()
+    if not reverse:
+        updater.update_products_on_commit([instance.pk])
+    elif pk_set:
+        updater.update_products_on_commit(pk_set)
+    else:
+        # The category was cleared of all its products, which are unknown by
+        # now, so the memberships have to be rebuilt.
+        updater.rebuild_on_commit()
+
+
+@receiver(post_save, sender=Range)
+def rebuild_range_memberships(instance, **kwargs):
+    if use_range_membership_table(**kwargs):
+        RangeMembershipTableUpdater().rebuild_on_commit([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=RangeProduct)
+def update_range_memberships_of_range_product(instance, **kwargs):
+    if use_range_membership_table(**kwargs):
+        RangeMembershipTableUpdater().update_products_on_commit(
+            [instance.product_id], [instance.range_id]
+        )
+
+
+@receiver(m2m_changed, sender=Range.excluded_products.through)
+@receiver(m2m_changed, sender=Range.classes.through)
+@receiver(m2m_changed, sender=Range.included_categories.through)
+@receiver(m2m_changed, sender=Range.excluded_categories.through)
+def update_range_memberships_on_rule_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if not use_range_membership_table() or not action.startswith("post_"):
+        return
+    updater = RangeMembershipTableUpdater()
+    if not reverse:
+        if sender is Range.excluded_products.through and pk_set:
+            updater.update_products_on_commit(pk_set, [instance.pk])
+        else:
+            updater.rebuild_on_commit([instance.pk])
+    elif sender is Range.excluded_products.through:
+        updater.update_products_on_commit([instance.pk])
+    else:
+        updater.rebuild_on_commit(pk_set)
@@ -14,15 +14,11 @@ OrderDiscount = get_model("order", "OrderDiscount")
 class OfferReportCSVFormatter(ReportCSVFormatter):
     filename_template = "conditional-offer-performance.csv"
 
-    def generate_csv(self, response, offer_discounts):
-        writer = self.get_csv_writer(response)
-        header_row = [_("Offer"), _("Total discount")]
-        writer.writerow(header_row)
+    def get_header_row(self):
+        return [_("Offer"), _("Total discount")]
 
-        for discount in offer_discounts:
-            writer.writerow(
-                [discount["display_offer_name"], discount["total_discount"]]
-            )
+    def get_row(self, discount):
+        return [discount["display_offer_name"], discount["total_discount"]]
 
 
 class OfferReportHTMLFormatter(ReportHTMLFormatter):
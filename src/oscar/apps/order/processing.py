@@ -1,8 +1,16 @@
 from decimal import Decimal as D
 
+from django.db import transaction
+from django.db.models import Case, F, Value, When, prefetch_related_objects
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 
 from oscar.apps.order import exceptions
+from oscar.apps.order.abstract_models import AbstractLine
+from oscar.apps.partner.exceptions import InvalidStockAdjustment
+from oscar.core.loading import get_model
+
+StockRecord = get_model("partner", "StockRecord")
 
 
 class EventHandler(object):
@@ -210,27 +218,119 @@ class EventHandler(object):
         """
         Consume the stock allocations for the passed lines.
 
-        If no lines/quantities are passed, do it for all lines.
+        If no lines/quantities are passed, do it for all lines.  The lines and
+        their stock records are updated in bulk, and nothing is consumed if
+        any of the consumptions isn't possible. If ``Line.consume_allocation``
+        is overridden, it's called for each line instead.
         """
         if not lines:
             lines = order.lines.all()
         if not line_quantities:
             line_quantities = [line.quantity for line in lines]
-        for line, qty in zip(lines, line_quantities):
-            line.consume_allocation(qty)
+        if self._is_line_method_overridden(order, "consume_allocation"):
+            for line, qty in zip(lines, line_quantities):
+                line.consume_allocation(qty)
+            return
+        allocations = self.get_tracked_allocations(lines, line_quantities)
+        for line, qty in allocations:
+            if not line.is_allocation_consumption_possible(qty):
+                raise InvalidStockAdjustment(_("Invalid stock consumption request"))
+        if not allocations:
+            return
+
+        Line = order.lines.model
+        with transaction.atomic():
+            Line._default_manager.filter(
+                pk__in=[line.pk for line, __ in allocations]
+            ).update(
+                num_allocated=Case(
+                    *[
+                        When(
+                            pk=line.pk,
+                            then=Coalesce(F("num_allocated"), 0) - Value(qty),
+                        )
+                        for line, qty in allocations
+                    ]
+                )
+            )
+            StockRecord._default_manager.consume_allocations(
+                [(line.stockrecord, qty) for line, qty in allocations]
+            )
+        for line, qty in allocations:
+            line.num_allocated -= qty
 
     def cancel_stock_allocations(self, order, lines=None, line_quantities=None):
         """
         Cancel the stock allocations for the passed lines.
 
-        If no lines/quantities are passed, do it for all lines.
+        If no lines/quantities are passed, do it for all lines.  The lines and
+        their stock records are updated in bulk, without sending ``post_save``
+        for the lines. If ``Line.cancel_allocation`` is overridden, it's called
+        for each line instead.
         """
         if not lines:
             lines = order.lines.all()
         if not line_quantities:
             line_quantities = [line.quantity for line in lines]
-        for line, qty in zip(lines, line_quantities):
-            line.cancel_allocation(qty)
+        if self._is_line_method_overridden(order, "cancel_allocation"):
+            for line, qty in zip(lines, line_quantities):
+                line.cancel_allocation(qty)
+            return
+        allocations = [
+            (line, qty)
+            for line, qty in self.get_tracked_allocations(lines, line_quantities)
+            if line.is_allocation_consumption_possible(qty)
+        ]
+        if not allocations:
+            return
+
+        Line = order.lines.model
+        quantities = {line.pk: qty for line, qty in allocations}
+        with transaction.atomic():
+            locked_lines = list(
+                Line._default_manager.select_for_update()
+                .filter(pk__in=quantities)
+                .order_by("pk")
+            )
+            for locked_line in locked_lines:
+                qty = quantities[locked_line.pk]
+                if locked_line.num_allocated == qty:
+                    locked_line.num_allocated = 0
+                    locked_line.allocation_cancelled = True
+                else:
+                    locked_line.num_allocated -= qty
+            Line._default_manager.bulk_update(
+                locked_lines, ["num_allocated", "allocation_cancelled"]
+            )
+            StockRecord._default_manager.cancel_allocations(
+                [(line.stockrecord, qty) for line, qty in allocations]
+            )
+        locked_lines = {line.pk: line for line in locked_lines}
+        for line, __ in allocations:
+            line.num_allocated = locked_lines[line.pk].num_allocated
+            line.allocation_cancelled = locked_lines[line.pk].allocation_cancelled
+
+    def _is_line_method_overridden(self, order, method_name):
+        return getattr(order.lines.model, method_name) is not getattr(
+            AbstractLine, method_name
+        )
+
+    def get_tracked_allocations(self, lines, line_quantities):
+        """
+        Return the ``(line, quantity)`` pairs of the lines whose stock
+        allocations are tracked
+        """
+        lines = list(lines)
+        prefetch_related_objects(
+            lines,
+            "stockrecord__product__product_class",
+            "stockrecord__product__parent__product_class",
+        )
+        return [
+            (line, qty)
+            for line, qty in zip(lines, line_quantities)
+            if line.stockrecord and line.can_track_allocations
+        ]
 
     # Model instance creation
     # -----------------------
@@ -3,7 +3,8 @@ from decimal import Decimal as D
 
 from django.conf import settings
 from django.contrib.sites.models import Site
-from django.db import transaction
+from django.db import connections, router, transaction
+from django.db.models import prefetch_related_objects
 from django.utils.translation import gettext_lazy as _
 
 from oscar.apps.order.signals import order_placed
@@ -13,12 +14,15 @@ from . import exceptions
 
 Order = get_model("order", "Order")
 Line = get_model("order", "Line")
+LineAttribute = get_model("order", "LineAttribute")
+LinePrice = get_model("order", "LinePrice")
 OrderDiscount = get_model("order", "OrderDiscount")
 OrderLineDiscount = get_model("order", "OrderLineDiscount")
 CommunicationEvent = get_model("order", "CommunicationEvent")
 CommunicationEventType = get_model("communication", "CommunicationEventType")
 Dispatcher = get_class("communication.utils", "Dispatcher")
 Surcharge = get_model("order", "Surcharge")
+StockRecord = get_model("partner", "StockRecord")
 
 
 class OrderNumberGenerator(object):
@@ -41,6 +45,10 @@ class OrderCreator(object):
     Places the order by writing out the various models
     """
 
+    #: Raise ``InvalidStockAdjustment`` instead of placing an order that would
+    #: allocate more stock than is available
+    refuse_over_allocation = False
+
     def place_order(
         self,
         basket,
@@ -122,16 +130,9 @@ class OrderCreator(object):
 
             # Create the lines in basket order, so that the resulting line pks
             # preserve the order the customer saw in their basket.
-            for line in basket.all_lines():
-                self.create_line_models(order, line)
+            self.create_lines_models(order, basket.all_lines())
 
-            # Allocate stock in a deterministic (stock-record) order so that
-            # concurrent placements take the row locks in the same order and
-            # can't deadlock.
-            for line in sorted(
-                basket.all_lines(), key=lambda line: line.stockrecord_id
-            ):
-                self.update_stock_records(line)
+            self.allocate_stock(basket.all_lines())
 
         # Send signal for analytics to pick up
         order_placed.send(sender=self, order=order, user=user)
@@ -193,6 +194,67 @@ class OrderCreator(object):
 
         return order
 
+    def create_lines_models(self, order, basket_lines):
+        """
+        Create the order lines and their related models for all basket lines.
+
+        The lines, prices, attributes and discounts are built in memory and
+        written with one bulk insert per model.  Projects that override
+        ``create_line_models``, or databases that can't return the primary
+        keys of bulk inserted rows, get the lines created one by one.
+        Overridden ``create_line_price_models``, ``create_line_attributes`` and
+        ``create_line_discount_models`` hooks are still called for each line.
+        """
+        basket_lines = list(basket_lines)
+        db = router.db_for_write(Line)
+        if (
+            self._is_overridden("create_line_models")
+            or not connections[db].features.can_return_rows_from_bulk_insert
+        ):
+            return [
+                self.create_line_models(order, basket_line)
+                for basket_line in basket_lines
+            ]
+
+        prefetch_related_objects(basket_lines, "stockrecord__partner")
+        order_lines = [
+            Line(**self.get_line_data(order, basket_line))
+            for basket_line in basket_lines
+        ]
+        Line._default_manager.bulk_create(order_lines)
+
+        order_discounts = self.get_order_discounts(order)
+        prices, attributes, discounts = [], [], []
+        for order_line, basket_line in zip(order_lines, basket_lines):
+            if self._is_overridden("create_line_price_models"):
+                self.create_line_price_models(order, order_line, basket_line)
+            else:
+                prices.extend(
+                    self.get_line_price_models(order, order_line, basket_line)
+                )
+            if self._is_overridden("create_line_attributes"):
+                self.create_line_attributes(order, order_line, basket_line)
+            else:
+                attributes.extend(
+                    self.get_line_attribute_models(order, order_line, basket_line)
+                )
+            if self._is_overridden("create_line_discount_models"):
+                self.create_line_discount_models(order, order_line, basket_line)
+            else:
+                discounts.extend(
+                    self.get_line_discount_models(
+                        order, order_line, basket_line, order_discounts
+                    )
+                )
+        LinePrice._default_manager.bulk_create(prices)
+        LineAttribute._default_manager.bulk_create(attributes)
+        OrderLineDiscount._default_manager.bulk_create(discounts)
+
+        for order_line, basket_line in zip(order_lines, basket_lines):
+            self.create_additional_line_models(order, order_line, basket_line)
+
+        return order_lines
+
     def create_line_models(self, order, basket_line, extra_line_fields=None):
         """
         Create the batch line model.
@@ -200,6 +262,19 @@ class OrderCreator(object):
         You can set extra fields by passing a dictionary as the
         extra_line_fields value
         """
+        line_data = self.get_line_data(order, basket_line, extra_line_fields)
+        order_line = Line._default_manager.create(**line_data)
+        self.create_line_price_models(order, order_line, basket_line)
+        self.create_line_attributes(order, order_line, basket_line)
+        self.create_line_discount_models(order, order_line, basket_line)
+        self.create_additional_line_models(order, order_line, basket_line)
+
+        return order_line
+
+    def get_line_data(self, order, basket_line, extra_line_fields=None):
+        """
+        Return the field values of the order line for a basket line.
+        """
         product = basket_line.product
         stockrecord = basket_line.stockrecord
         if not stockrecord:
@@ -239,14 +314,32 @@ class OrderCreator(object):
                 )
         if extra_line_fields:
             line_data.update(extra_line_fields)
+        return line_data
 
-        order_line = Line._default_manager.create(**line_data)
-        self.create_line_price_models(order, order_line, basket_line)
-        self.create_line_attributes(order, order_line, basket_line)
-        self.create_line_discount_models(order, order_line, basket_line)
-        self.create_additional_line_models(order, order_line, basket_line)
+    def _is_overridden(self, method_name):
+        method = getattr(self, method_name)
+        return getattr(method, "__func__", method) is not getattr(
+            OrderCreator, method_name
+        )
 
-        return order_line
+    def allocate_stock(self, basket_lines):
+        """
+        Allocate the stock of all basket lines at once.
+
+        If ``update_stock_records`` is overridden, it's called for each line
+        instead, and ``refuse_over_allocation`` is ignored.
+        """
+        if self._is_overridden("update_stock_records"):
+            # Allocate stock in a deterministic (stock-record) order so that
+            # concurrent placements take the row locks in the same order and
+            # can't deadlock.
+            for line in sorted(basket_lines, key=lambda line: line.stockrecord_id):
+                self.update_stock_records(line)
+            return
+        StockRecord._default_manager.allocate(
+            [(line.stockrecord, line.quantity) for line in basket_lines],
+            refuse_over_allocation=self.refuse_over_allocation,
+        )
 
     def update_stock_records(self, line):
         """
@@ -269,6 +362,38 @@ class OrderCreator(object):
                     amount=discount.amount,
                 )
 
+    def get_order_discounts(self, order):
+        """
+        Return the order's discounts by the id of their offer
+        """
+        order_discounts = {}
+        for order_discount in order.discounts.order_by("pk"):
+            order_discounts.setdefault(order_discount.offer_id, order_discount)
+        return order_discounts
+
+    def get_line_discount_models(self, order, order_line, basket_line, order_discounts):
+        """
+        Return the unsaved line discount models of an order line.
+
+        :order_discounts: The order's discounts by the id of their offer, as
+                          returned by ``get_order_discounts``.
+        """
+        line_discounts = []
+        for discount in basket_line.discounts:
+            if not discount.offer:
+                continue
+            order_discount = order_discounts.get(discount.offer.id)
+            if order_discount:
+                line_discounts.append(
+                    OrderLineDiscount(
+                        line=order_line,
+                        order_discount=order_discount,
+                        is_incl_tax=discount.incl_tax,
+                        amount=discount.amount,
+                    )
+                )
+        return line_discounts
+
     def create_additional_line_models(self, order, order_line, basket_line):
         """
         Empty method designed to be overridden.
@@ -293,6 +418,24 @@ class OrderCreator(object):
                 tax_code=basket_line.tax_code,
             )
 
+    def get_line_price_models(self, order, order_line, basket_line):
+        """
+        Return the unsaved line price models of an order line
+        """
+        return [
+            LinePrice(
+                order=order,
+                line=order_line,
+                quantity=quantity,
+                price_incl_tax=price_incl_tax,
+                price_excl_tax=price_excl_tax,
+                tax_code=basket_line.tax_code,
+            )
+            for price_incl_tax, price_excl_tax, quantity in (
+                basket_line.get_price_breakdown()
+            )
+        ]
+
     # pylint: disable=unused-argument
     def create_line_attributes(self, order, order_line, basket_line):
         """
@@ -303,6 +446,21 @@ class OrderCreator(object):
                 option=attr.option, type=attr.option.code, value=attr.value
             )
 
+    # pylint: disable=unused-argument
+    def get_line_attribute_models(self, order, order_line, basket_line):
+        """
+        Return the unsaved attribute models of an order line
+        """
+        return [
+            LineAttribute(
+                line=order_line,
+                option=attr.option,
+                type=attr.option.code,
+                value=attr.value,
+            )
+            for attr in basket_line.attributes.all()
+        ]
+
     def create_discount_model(self, order, discount):
         """
         Create an order discount model for each offer application attached to
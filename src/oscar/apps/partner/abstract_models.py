@@ -7,6 +7,7 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.translation import pgettext_lazy
 
 from oscar.apps.partner.exceptions import InvalidStockAdjustment
+from oscar.apps.partner.managers import StockRecordManager
 from oscar.core.compat import AUTH_USER_MODEL
 from oscar.core.utils import get_default_currency
 from oscar.models.fields import AutoSlugField
@@ -150,6 +151,8 @@ class AbstractStockRecord(models.Model):
     date_created = models.DateTimeField(_("Date created"), auto_now_add=True)
     date_updated = models.DateTimeField(_("Date updated"), auto_now=True, db_index=True)
 
+    objects = StockRecordManager()
+
     def __str__(self):
         msg = "Partner: %s, product: %s" % (
             self.partner.display_name,
@@ -1,11 +1,18 @@
 import csv
+import json
 import os
+import time
 from decimal import Decimal as D
 
-from django.db.transaction import atomic
+from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
+from oscar.apps.partner.signals import stock_levels_updated
+from oscar.checks import use_productcategory_materialised_view
 from oscar.core.loading import get_class, get_model
+from oscar.core.utils import slugify
 
 ImportingError = get_class("partner.exceptions", "ImportingError")
 
@@ -16,31 +23,58 @@ ProductCategory = get_model("catalogue", "ProductCategory")
 ProductClass = get_model("catalogue", "ProductClass")
 StockRecord = get_model("partner", "StockRecord")
 
-create_from_breadcrumbs = get_class("catalogue.categories", "create_from_breadcrumbs")
+BulkCategoryCreator = get_class("catalogue.categories", "BulkCategoryCreator")
+hierarchy_refresher = get_class("catalogue.hierarchy", "hierarchy_refresher")
+invalidate_purchase_info = get_class("partner.strategy", "invalidate_purchase_info")
+ProductIndexQueue = get_class("search.indexing", "ProductIndexQueue")
+RangeMembershipTableUpdater = get_class(
+    "offer.membership", "RangeMembershipTableUpdater"
+)
 
 
 class CatalogueImporter(object):
     """
     CSV product importer used to built sandbox. Might not work very well
     for anything else.
+
+    Rows are read as a stream and imported in batches of ``batch_size``, each
+    in its own transaction.  The objects of a batch are looked up with a few
+    queries and written with bulk queries, so no model signals are sent for
+    them; the search index queue, purchase info, stock alerts, category
+    hierarchy and range memberships are updated per batch instead.
+
+    After each batch a checkpoint is written next to the file, so that an
+    interrupted import can carry on from the last imported batch with
+    ``resume=True``.
     """
 
     _flush = False
+    batch_size = 1000
 
-    def __init__(self, logger, delimiter=",", flush=False):
+    def __init__(
+        self, logger, delimiter=",", flush=False, batch_size=None, resume=False
+    ):
         self.logger = logger
         self._delimiter = delimiter
         self._flush = flush
+        if batch_size is not None:
+            self.batch_size = batch_size
+        self._resume = resume
+        self._categories = {}
+        self._product_classes = {}
+        self._partners = {}
+        self.stats = self._get_initial_stats()
 
     def handle(self, file_path=None):
         """Handles the actual import process"""
         if not file_path:
             raise ImportingError(_("No file path supplied"))
         Validator().validate(file_path)
-        if self._flush is True:
+        start_row = self._read_checkpoint(file_path) if self._resume else 0
+        if self._flush is True and not start_row:
             self.logger.info(" - Flushing product data before import")
             self._flush_product_data()
-        self._import(file_path)
+        self._import(file_path, start_row)
 
     def _flush_product_data(self):
         """Flush out product and stock models"""
@@ -48,74 +82,301 @@ class CatalogueImporter(object):
         ProductClass.objects.all().delete()
         Partner.objects.all().delete()
         StockRecord.objects.all().delete()
+        self._product_classes = {}
+        self._partners = {}
+
+    def _get_initial_stats(self):
+        return {
+            "rows": 0,
+            "skipped_rows": 0,
+            "new_items": 0,
+            "updated_items": 0,
+            "stockrecords": 0,
+            "batches": 0,
+            "seconds": 0.0,
+        }
 
-    @atomic
-    def _import(self, file_path):
+    def get_rate(self):
+        """Return the number of rows imported per second"""
+        if not self.stats["seconds"]:
+            return 0.0
+        return self.stats["rows"] / self.stats["seconds"]
+
+    def _import(self, file_path, start_row=0):
         """Imports given file"""
-        stats = {"new_items": 0, "updated_items": 0}
+        self.stats = self._get_initial_stats()
+        started = time.monotonic()
+        if start_row:
+            self.logger.info(" - Resuming import after row %d", start_row)
         row_number = 0
+        batch = []
         with open(file_path, "rt", encoding="utf-8") as f:
             reader = csv.reader(f, escapechar="\\")
             for row in reader:
                 row_number += 1
-                self._import_row(row_number, row, stats)
-        msg = "New items: %d, updated items: %d" % (
-            stats["new_items"],
-            stats["updated_items"],
+                if row_number <= start_row:
+                    continue
+                if len(row) != 5 and len(row) != 9:
+                    self.logger.error(
+                        "Row number %d has an invalid number of fields"
+                        " (%d), skipping..." % (row_number, len(row))
+                    )
+                    self.stats["skipped_rows"] += 1
+                    continue
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    self._import_batch(batch)
+                    self._finish_batch(file_path, row_number, started)
+                    batch = []
+        if batch:
+            self._import_batch(batch)
+            self._finish_batch(file_path, row_number, started)
+        self._remove_checkpoint(file_path)
+        self.stats["seconds"] = time.monotonic() - started
+        msg = (
+            "New items: %d, updated items: %d, stock records: %d"
+            " (%d rows in %d batches, %.1fs, %.0f rows/s)"
+            % (
+                self.stats["new_items"],
+                self.stats["updated_items"],
+                self.stats["stockrecords"],
+                self.stats["rows"],
+                self.stats["batches"],
+                self.stats["seconds"],
+                self.get_rate(),
+            )
         )
         self.logger.info(msg)
 
-    def _import_row(self, row_number, row, stats):
-        if len(row) != 5 and len(row) != 9:
-            self.logger.error(
-                "Row number %d has an invalid number of fields"
-                " (%d), skipping..." % (row_number, len(row))
-            )
-            return
-        item = self._create_item(*row[:5], stats=stats)
-        if len(row) == 9:
-            # With stock data
-            self._create_stockrecord(item, *row[5:9])
-
-    def _create_item(self, product_class, category_str, upc, title, description, stats):
-        # Ignore any entries that are NULL
-        if description == "NULL":
-            description = ""
-
-        # Create item class and item
-        product_class, __ = ProductClass.objects.get_or_create(name=product_class)
+    def _finish_batch(self, file_path, row_number, started):
+        self.stats["batches"] += 1
+        self.stats["seconds"] = time.monotonic() - started
+        self._write_checkpoint(file_path, row_number)
+        self.logger.info(
+            " - Imported %d rows up to row %d (%.0f rows/s)",
+            self.stats["rows"],
+            row_number,
+            self.get_rate(),
+        )
+
+    # Checkpoints
+
+    def get_checkpoint_path(self, file_path):
+        return "%s.checkpoint" % file_path
+
+    def _get_file_signature(self, file_path):
+        stat = os.stat(file_path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def _read_checkpoint(self, file_path):
+        """
+        Return the number of the last row imported from the file by an
+        earlier run, or 0 if there's no checkpoint for the file as it is now
+        """
+        checkpoint_path = self.get_checkpoint_path(file_path)
         try:
-            item = Product.objects.get(upc=upc)
-            stats["updated_items"] += 1
-        except Product.DoesNotExist:
-            item = Product()
-            stats["new_items"] += 1
-        item.upc = upc
-        item.title = title
-        item.description = description
-        item.product_class = product_class
-        item.save()
-
-        # Category
-        cat = create_from_breadcrumbs(category_str)
-        ProductCategory.objects.update_or_create(product=item, category=cat)
-
-        return item
-
-    def _create_stockrecord(self, item, partner_name, partner_sku, price, num_in_stock):
-        # Create partner and stock record
-        partner, _ = Partner.objects.get_or_create(name=partner_name)
+            with open(checkpoint_path, "rt", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            self.logger.warning(" - Ignoring unreadable checkpoint %s", checkpoint_path)
+            return 0
+        if checkpoint.get("file") != self._get_file_signature(file_path):
+            self.logger.warning(
+                " - Ignoring checkpoint %s as the file has changed since",
+                checkpoint_path,
+            )
+            return 0
+        return checkpoint.get("row_number", 0)
+
+    def _write_checkpoint(self, file_path, row_number):
+        checkpoint_path = self.get_checkpoint_path(file_path)
+        checkpoint = {
+            "row_number": row_number,
+            "file": self._get_file_signature(file_path),
+        }
+        # Replace the checkpoint at once, so it can't be left half written
+        with open(checkpoint_path + ".tmp", "wt", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(checkpoint_path + ".tmp", checkpoint_path)
+
+    def _remove_checkpoint(self, file_path):
         try:
-            stock = StockRecord.objects.get(partner_sku=partner_sku)
-        except StockRecord.DoesNotExist:
-            stock = StockRecord()
-
-        stock.product = item
-        stock.partner = partner
-        stock.partner_sku = partner_sku
-        stock.price = D(price)
-        stock.num_in_stock = num_in_stock
-        stock.save()
+            os.remove(self.get_checkpoint_path(file_path))
+        except FileNotFoundError:
+            pass
+
+    # Batches
+
+    def _import_batch(self, rows):
+        with transaction.atomic():
+            self._categories = BulkCategoryCreator().create(
+                dict.fromkeys(row[1] for row in rows)
+            )
+            products = self._save_products(rows)
+            stockrecords = self._save_stockrecords(
+                [(products[row[2]], *row[5:9]) for row in rows if len(row) == 9]
+            )
+            self._update_dependents(
+                [product.pk for product in products.values()], stockrecords
+            )
+        self.stats["rows"] += len(rows)
+
+    def _get_product_classes(self, names):
+        missing = [name for name in names if name not in self._product_classes]
+        if missing:
+            for product_class in ProductClass.objects.filter(name__in=missing):
+                self._product_classes.setdefault(product_class.name, product_class)
+            for name in missing:
+                if name not in self._product_classes:
+                    # Saved one at a time for its slug, as there are few
+                    self._product_classes[name] = ProductClass.objects.create(name=name)
+        return self._product_classes
+
+    def _get_partners(self, names):
+        missing = [name for name in names if name not in self._partners]
+        if missing:
+            for partner in Partner.objects.filter(name__in=missing):
+                self._partners.setdefault(partner.name, partner)
+            for name in missing:
+                if name not in self._partners:
+                    self._partners[name] = Partner.objects.create(name=name)
+        return self._partners
+
+    def _set_auto_now_fields(self, instance, timestamp):
+        # Bulk updates don't call pre_save
+        for field in instance._meta.concrete_fields:
+            if getattr(field, "auto_now", False):
+                setattr(instance, field.attname, timestamp)
+
+    def _save_products(self, rows):
+        """
+        Create or update the products of the rows, returning a dict of their
+        UPCs to the products
+        """
+        product_classes = self._get_product_classes(
+            dict.fromkeys(row[0] for row in rows)
+        )
+        products = Product.objects.in_bulk([row[2] for row in rows], field_name="upc")
+        new_products = {}
+        updated_products = {}
+        links = {}
+        timestamp = now()
+        for product_class, category_str, upc, title, description in (
+            row[:5] for row in rows
+        ):
+            # Ignore any entries that are NULL
+            if description == "NULL":
+                description = ""
+            item = products.get(upc)
+            if item is None:
+                item = products[upc] = Product(upc=upc)
+                new_products[upc] = item
+                self.stats["new_items"] += 1
+            else:
+                if upc not in new_products:
+                    updated_products[upc] = item
+                self.stats["updated_items"] += 1
+            item.title = title
+            item.description = description
+            item.product_class = product_classes[product_class]
+            links[(upc, self._categories[category_str].pk)] = None
+
+        for item in new_products.values():
+            item.slug = slugify(item.get_title())
+        Product.objects.bulk_create(new_products.values(), batch_size=self.batch_size)
+        if any(item.pk is None for item in new_products.values()):
+            # Not all databases (eg MySQL) return the primary keys of bulk
+            # inserts
+            products.update(Product.objects.in_bulk(new_products, field_name="upc"))
+        for item in updated_products.values():
+            self._set_auto_now_fields(item, timestamp)
+        Product.objects.bulk_update(
+            updated_products.values(),
+            ["title", "description", "product_class", "date_updated"],
+            batch_size=self.batch_size,
+        )
+
+        existing_links = set(
+            ProductCategory.objects.filter(
+                product__in=[products[upc] for upc in updated_products]
+            ).values_list("product_id", "category_id")
+        )
+        ProductCategory.objects.bulk_create(
+            [
+                ProductCategory(product=products[upc], category_id=category_id)
+                for upc, category_id in links
+                if (products[upc].pk, category_id) not in existing_links
+            ],
+            batch_size=self.batch_size,
+        )
+        return products
+
+    def _save_stockrecords(self, rows):
+        """
+        Create or update the stock records of (product, partner name, partner
+        SKU, price, number in stock) rows, returning the saved stock records
+        """
+        partners = self._get_partners(dict.fromkeys(row[1] for row in rows))
+        stockrecords = {}
+        for stock in StockRecord.objects.filter(
+            partner_sku__in=[row[2] for row in rows]
+        ):
+            stockrecords.setdefault(stock.partner_sku, stock)
+        new_stockrecords = {}
+        updated_stockrecords = {}
+        timestamp = now()
+        for item, partner_name, partner_sku, price, num_in_stock in rows:
+            stock = stockrecords.get(partner_sku)
+            if stock is None:
+                stock = stockrecords[partner_sku] = StockRecord()
+                new_stockrecords[partner_sku] = stock
+            elif partner_sku not in new_stockrecords:
+                updated_stockrecords[partner_sku] = stock
+            stock.product = item
+            stock.partner = partners[partner_name]
+            stock.partner_sku = partner_sku
+            stock.price = D(price)
+            stock.num_in_stock = int(num_in_stock)
+
+        StockRecord.objects.bulk_create(
+            new_stockrecords.values(), batch_size=self.batch_size
+        )
+        if any(stock.pk is None for stock in new_stockrecords.values()):
+            # Not all databases (eg MySQL) return the primary keys of bulk
+            # inserts
+            for partner_id, partner_sku, pk in StockRecord.objects.filter(
+                partner_sku__in=new_stockrecords
+            ).values_list("partner_id", "partner_sku", "pk"):
+                stock = new_stockrecords.get(partner_sku)
+                if stock is not None and stock.partner_id == partner_id:
+                    stock.pk = pk
+        for stock in updated_stockrecords.values():
+            self._set_auto_now_fields(stock, timestamp)
+        StockRecord.objects.bulk_update(
+            updated_stockrecords.values(),
+            ["product", "partner", "price", "num_in_stock", "date_updated"],
+            batch_size=self.batch_size,
+        )
+        self.stats["stockrecords"] += len(rows)
+        return list(new_stockrecords.values()) + list(updated_stockrecords.values())
+
+    def _update_dependents(self, product_ids, stockrecords):
+        """
+        Do what the receivers of the model signals would have done for the
+        objects of a batch
+        """
+        if settings.OSCAR_SEARCH_INDEX_QUEUE:
+            ProductIndexQueue().enqueue(product_ids)
+        if use_productcategory_materialised_view():
+            hierarchy_refresher.mark_dirty(product_ids)
+        if settings.OSCAR_OFFERS_USE_RANGE_MEMBERSHIP_TABLE:
+            RangeMembershipTableUpdater().update_products_on_commit(product_ids)
+        invalidate_purchase_info(product_ids=product_ids)
+        if stockrecords:
+            # Updates the stock alerts as well
+            stock_levels_updated.send(sender=StockRecord, stockrecords=stockrecords)
 
 
 class Validator(object):
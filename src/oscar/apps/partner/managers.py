@@ -0,0 +1,160 @@
+from django.conf import settings
+from django.db import models, router, transaction
+from django.db.models import Case, Value, When, prefetch_related_objects
+from django.db.models.signals import post_save, pre_save
+from django.utils.timezone import now
+from django.utils.translation import gettext_lazy as _
+
+from oscar.apps.partner.exceptions import InvalidStockAdjustment
+from oscar.apps.partner.signals import stock_levels_updated
+
+
+class StockRecordManager(models.Manager):
+    """
+    Adjusts the stock levels of many stock records at once.
+
+    The adjustment methods take an iterable of ``(stockrecord, quantity)``
+    pairs.  Stock records that don't track stock are skipped.  The others are
+    locked with a single ``SELECT ... FOR UPDATE`` in primary key order, so
+    that concurrent adjustments can't deadlock, and updated with a single
+    ``UPDATE``.  The passed instances are updated in place, and
+    ``stock_levels_updated`` is sent once for all of them rather than sending
+    ``pre_save`` and ``post_save`` for each, unless
+    ``OSCAR_STOCK_ADJUSTMENTS_SEND_SAVE_SIGNALS`` is set.
+    """
+
+    #: The fields written by stock adjustments
+    adjusted_fields = ("num_in_stock", "num_allocated", "date_updated")
+
+    def allocate(self, allocations, refuse_over_allocation=False):
+        """
+        Record stock allocations.
+
+        If ``refuse_over_allocation`` is set, ``InvalidStockAdjustment`` is
+        raised and no stock is allocated if any stock record doesn't have
+        enough stock left, rather than letting its net stock level go
+        negative.
+        """
+
+        def adjust(num_in_stock, num_allocated, quantity):
+            if (
+                refuse_over_allocation
+                and (num_in_stock or 0) - num_allocated < quantity
+            ):
+                raise InvalidStockAdjustment(_("Insufficient stock to allocate"))
+            return num_in_stock, num_allocated + quantity
+
+        return self.adjust_stock_levels(allocations, adjust, "allocate")
+
+    allocate.alters_data = True
+
+    def consume_allocations(self, allocations):
+        """
+        Consume previous allocations, removing the allocations and adjusting
+        the numbers in stock.
+
+        ``InvalidStockAdjustment`` is raised and nothing is consumed if any
+        of the consumptions isn't possible.
+        """
+
+        def adjust(num_in_stock, num_allocated, quantity):
+            if quantity > min(num_allocated, num_in_stock or 0):
+                raise InvalidStockAdjustment(_("Invalid stock consumption request"))
+            return (num_in_stock or 0) - quantity, num_allocated - quantity
+
+        return self.adjust_stock_levels(allocations, adjust, "consume")
+
+    consume_allocations.alters_data = True
+
+    def cancel_allocations(self, allocations):
+        """
+        Cancel previous allocations
+        """
+
+        def adjust(num_in_stock, num_allocated, quantity):
+            return num_in_stock, num_allocated - min(num_allocated, quantity)
+
+        return self.adjust_stock_levels(allocations, adjust, "cancel")
+
+    cancel_allocations.alters_data = True
+
+    def adjust_stock_levels(self, allocations, adjust, action):
+        """
+        Apply a stock level adjustment to the given stock records.
+
+        :adjust: A callable taking the locked number in stock, number
+                 allocated (``None`` is treated as zero) and the quantity,
+                 and returning the new number in stock and number allocated.
+        :action: The name of the adjustment, passed on to the signal.
+        """
+        instances, quantities = {}, {}
+        for stockrecord, quantity in allocations:
+            instances.setdefault(stockrecord.pk, []).append(stockrecord)
+            quantities[stockrecord.pk] = quantities.get(stockrecord.pk, 0) + quantity
+        stockrecords = [records[0] for records in instances.values()]
+        prefetch_related_objects(
+            stockrecords, "product__product_class", "product__parent__product_class"
+        )
+        quantities = {
+            stockrecord.pk: quantities[stockrecord.pk]
+            for stockrecord in stockrecords
+            if stockrecord.can_track_allocations
+        }
+        if not quantities:
+            return []
+
+        levels = {}
+        db = router.db_for_write(self.model)
+        send_save_signals = settings.OSCAR_STOCK_ADJUSTMENTS_SEND_SAVE_SIGNALS
+        with transaction.atomic(using=db):
+            locked = (
+                self.using(db)
+                .select_for_update()
+                .filter(pk__in=quantities)
+                .order_by("pk")
+                .values_list("pk", "num_in_stock", "num_allocated")
+            )
+            for pk, num_in_stock, num_allocated in locked:
+                levels[pk] = adjust(num_in_stock, num_allocated or 0, quantities[pk])
+
+            # update() doesn't set auto_now fields
+            date_updated = now()
+            updated = []
+            for pk, (num_in_stock, num_allocated) in levels.items():
+                for stockrecord in instances[pk]:
+                    stockrecord.num_in_stock = num_in_stock
+                    stockrecord.num_allocated = num_allocated
+                    stockrecord.date_updated = date_updated
+                updated.append(instances[pk][0])
+            if send_save_signals:
+                self._send_save_signals(pre_save, updated, db)
+            self.using(db).filter(pk__in=levels).update(
+                num_in_stock=self._get_case(levels, 0, "num_in_stock"),
+                num_allocated=self._get_case(levels, 1, "num_allocated"),
+                date_updated=date_updated,
+            )
+            if send_save_signals:
+                self._send_save_signals(post_save, updated, db, created=False)
+
+        stock_levels_updated.send(
+            sender=self.model, stockrecords=updated, action=action, using=db
+        )
+        return updated
+
+    def _send_save_signals(self, signal, stockrecords, db, **kwargs):
+        # For receivers written before stock_levels_updated existed
+        for stockrecord in stockrecords:
+            signal.send(
+                sender=self.model,
+                instance=stockrecord,
+                raw=False,
+                using=db,
+                update_fields=frozenset(self.adjusted_fields),
+                **kwargs,
+            )
+
+    def _get_case(self, levels, index, field_name):
+        return Case(
+            *[When(pk=pk, then=Value(values[index])) for pk, values in levels.items()],
+            output_field=self.model._meta.get_field(field_name),
+        )
@@ -1,10 +1,14 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from django.utils.timezone import now
 
-from oscar.core.loading import get_model
+from oscar.apps.partner.signals import stock_levels_updated
+from oscar.core.loading import get_class, get_model
 
 StockAlert = get_model("partner", "StockAlert")
 StockRecord = get_model("partner", "StockRecord")
+Product = get_model("catalogue", "Product")
+invalidate_purchase_info = get_class("partner.strategy", "invalidate_purchase_info")
 
 
 # pylint: disable=unused-argument
@@ -27,3 +31,57 @@ def update_stock_alerts(sender, instance, created, **kwargs):
         )
     elif not stockrecord.is_below_threshold and alert:
         alert.close()
+
+
+# pylint: disable=unused-argument
+@receiver(stock_levels_updated, sender=StockRecord)
+def update_stock_alerts_in_bulk(sender, stockrecords, **kwargs):
+    """
+    Update the low-stock alerts of stock records adjusted at once
+    """
+    open_alerts = set(
+        StockAlert.objects.filter(
+            stockrecord__in=stockrecords, status=StockAlert.OPEN
+        ).values_list("stockrecord_id", flat=True)
+    )
+    new_alerts = [
+        StockAlert(stockrecord=stockrecord, threshold=stockrecord.low_stock_threshold)
+        for stockrecord in stockrecords
+        if stockrecord.is_below_threshold and stockrecord.pk not in open_alerts
+    ]
+    if new_alerts:
+        StockAlert.objects.bulk_create(new_alerts)
+    closed_ids = [
+        stockrecord.pk
+        for stockrecord in stockrecords
+        if not stockrecord.is_below_threshold and stockrecord.pk in open_alerts
+    ]
+    if closed_ids:
+        StockAlert.objects.filter(
+            stockrecord_id__in=closed_ids, status=StockAlert.OPEN
+        ).update(status=StockAlert.CLOSED, date_closed=now())
+
+
+# pylint: disable=unused-argument
+@receiver(post_save, sender=StockRecord)
+@receiver(post_delete, sender=StockRecord)
+def invalidate_memoised_purchase_info(sender, instance, **kwargs):
+    invalidate_purchase_info(
+        product_ids=[instance.product_id], stockrecord_ids=[instance.pk]
+    )
+
+
+# pylint: disable=unused-argument
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_memoised_purchase_info_on_product_change(sender, instance, **kwargs):
+    invalidate_purchase_info(product_ids=[instance.pk])
+
+
+# pylint: disable=unused-argument
+@receiver(stock_levels_updated, sender=StockRecord)
+def invalidate_memoised_purchase_info_in_bulk(sender, stockrecords, **kwargs):
+    invalidate_purchase_info(
+        product_ids=[stockrecord.product_id for stockrecord in stockrecords],
+        stockrecord_ids=[stockrecord.pk for stockrecord in stockrecords],
+    )
@@ -0,0 +1,5 @@
+import django.dispatch
+
+# Sent once the stock levels of many stock records have been adjusted at once
+# by the StockRecord manager, instead of pre_save and post_save for each.
+stock_levels_updated = django.dispatch.Signal()
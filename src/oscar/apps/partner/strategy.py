@@ -1,9 +1,11 @@
-from collections import namedtuple
+import threading
+import weakref
+from collections import OrderedDict, namedtuple
 from decimal import Decimal as D
 
-from django.db.models import QuerySet
+from django.db.models import Prefetch, QuerySet, prefetch_related_objects
 
-from oscar.core.loading import get_class
+from oscar.core.loading import get_class, get_model
 
 Unavailable = get_class("partner.availability", "Unavailable")
 Available = get_class("partner.availability", "Available")
@@ -15,6 +17,21 @@ TaxInclusiveFixedPrice = get_class("partner.prices", "TaxInclusiveFixedPrice")
 # A container for policies
 PurchaseInfo = namedtuple("PurchaseInfo", ["price", "availability", "stockrecord"])
 
+# Strategies holding memoised purchase info, for invalidation
+_memoising_strategies = weakref.WeakSet()
+_memoising_strategies_lock = threading.Lock()
+
+
+def invalidate_purchase_info(product_ids=None, stockrecord_ids=None):
+    """
+    Discard the purchase info memoised by all strategies for the given
+    products and stockrecords, or all of it if neither is given
+    """
+    with _memoising_strategies_lock:
+        strategies = list(_memoising_strategies)
+    for strategy in strategies:
+        strategy.invalidate_memo(product_ids, stockrecord_ids)
+
 
 class Selector(object):
     """
@@ -93,6 +110,50 @@ class Base(object):
             "information."
         )
 
+    def fetch_for_products(self, products):
+        """
+        Given an iterable of products, return a dict of ``PurchaseInfo``
+        instances keyed by product id.
+
+        Parents get the ``PurchaseInfo`` returned by ``fetch_for_parent``.
+        What's needed to fetch them is loaded for all products at once by
+        ``prefetch_for_products``, rather than for each product in turn.
+        """
+        products = list(products)
+        self.prefetch_for_products(products)
+        purchase_info = {}
+        for product in products:
+            if product.is_parent:
+                purchase_info[product.pk] = self.fetch_for_parent(product)
+            else:
+                purchase_info[product.pk] = self.fetch_for_product(product)
+        return purchase_info
+
+    def prefetch_for_products(self, products):
+        """
+        Load the product classes, the public children of parents and the
+        stockrecords of all products and children, so that fetching their
+        purchase info doesn't make any further queries.
+
+        Relations that are already loaded aren't loaded again.  Strategies
+        that need anything else should extend this method.
+        """
+        Product = get_model("catalogue", "Product")
+        prefetch_related_objects(products, "product_class")
+        parents = [product for product in products if product.is_parent]
+        prefetch_related_objects(
+            parents,
+            Prefetch(
+                "children",
+                queryset=Product.objects.public(),
+                to_attr="_prefetched_public_children",
+            ),
+        )
+        products_with_stock = [product for product in products if not product.is_parent]
+        for parent in parents:
+            products_with_stock.extend(parent.get_public_children())
+        prefetch_related_objects(products_with_stock, "stockrecords")
+
     def fetch_for_line(self, line, stockrecord=None):
         """
         Given a basket line instance, fetch a ``PurchaseInfo`` instance.
@@ -107,6 +168,13 @@ class Base(object):
         # do with them within Oscar - that's up to your project to implement.
         return self.fetch_for_product(line.product)
 
+    def invalidate_memo(self, product_ids=None, stockrecord_ids=None):
+        """
+        Discard any purchase info memoised for the given products and
+        stockrecords, or all of it if neither is given.  This strategy
+        doesn't memoise anything.
+        """
+
 
 class Structured(Base):
     """
@@ -116,14 +184,31 @@ class Structured(Base):
     #) A stockrecord
     #) A pricing policy
     #) An availability policy
+
+    The ``PurchaseInfo`` instances are memoised for the lifetime of the
+    strategy, which is normally a request, keyed on the product, the passed
+    stockrecord and the options of basket lines.  The memo holds up to
+    ``memo_size`` entries, and entries are discarded when their product, or
+    one of its stockrecords or basket lines, is saved or deleted.  ``memo_hits`` and
+    ``memo_misses`` count how often the memo was used.
     """
 
+    #: The maximum number of memoised ``PurchaseInfo`` instances, or 0 to
+    #: disable memoisation
+    memo_size = 1000
+    memo_hits = 0
+    memo_misses = 0
+
     def fetch_for_product(self, product, stockrecord=None):
         """
         Return the appropriate ``PurchaseInfo`` instance.
 
         This method is not intended to be overridden.
         """
+        key = self.get_memo_key("product", product, stockrecord)
+        return self.memoise(key, self.calculate_for_product, product, stockrecord)
+
+    def calculate_for_product(self, product, stockrecord=None):
         if stockrecord is None:
             stockrecord = self.select_stockrecord(product)
         return PurchaseInfo(
@@ -133,6 +218,10 @@ class Structured(Base):
         )
 
     def fetch_for_parent(self, product):
+        key = self.get_memo_key("parent", product)
+        return self.memoise(key, self.calculate_for_parent, product)
+
+    def calculate_for_parent(self, product):
         # Select children and associated stockrecords
         children_stock = self.select_children_stockrecords(product)
         return PurchaseInfo(
@@ -141,6 +230,96 @@ class Structured(Base):
             stockrecord=None,
         )
 
+    def fetch_for_line(self, line, stockrecord=None):
+        if line.pk is None:
+            return super().fetch_for_line(line, stockrecord)
+        key = self.get_memo_key(
+            "line", line.product, stockrecord, self.get_line_options_key(line)
+        )
+        return self.memoise(key, super().fetch_for_line, line, stockrecord)
+
+    # Memoisation
+
+    def get_memo_key(self, kind, product, stockrecord=None, options=None):
+        """
+        Return the key to memoise purchase info under, or ``None`` if it
+        can't be memoised
+        """
+        if product.pk is None or (stockrecord is not None and stockrecord.pk is None):
+            return None
+        stockrecord_id = stockrecord.pk if stockrecord is not None else None
+        return (kind, product.pk, stockrecord_id, options)
+
+    def get_line_options_key(self, line):
+        """
+        Return a hashable representation of the options of a basket line
+        """
+        return tuple(
+            sorted(
+                (attribute.option_id, repr(attribute.value))
+                for attribute in line.attributes.all()
+            )
+        )
+
+    def memoise(self, key, calculate, *args):
+        if key is None or not self.memo_size:
+            return calculate(*args)
+        memo, lock = self.get_memo()
+        with lock:
+            purchase_info = memo.get(key)
+            if purchase_info is not None:
+                self.memo_hits += 1
+                memo.move_to_end(key)
+                return purchase_info
+            self.memo_misses += 1
+        # Calculated outside the lock, as it may be memoised recursively
+        purchase_info = calculate(*args)
+        with lock:
+            memo[key] = purchase_info
+            while len(memo) > self.memo_size:
+                memo.popitem(last=False)
+        return purchase_info
+
+    def get_memo(self):
+        # Stockrecord changes in other threads invalidate the memo too
+        if not hasattr(self, "_memo"):
+            self._memo, self._memo_lock = OrderedDict(), threading.Lock()
+            with _memoising_strategies_lock:
+                _memoising_strategies.add(self)
+        return self._memo, self._memo_lock
+
+    def invalidate_memo(self, product_ids=None, stockrecord_ids=None):
+        """
+        Discard the memoised purchase info of the given products and
+        stockrecords, or all of it if neither is given.
+
+        The purchase info of parents depends on their children's
+        stockrecords, so it's discarded whenever anything changes.
+        """
+        if not hasattr(self, "_memo"):
+            return
+        product_ids = set(product_ids or ())
+        stockrecord_ids = set(stockrecord_ids or ())
+        with self._memo_lock:
+            if not product_ids and not stockrecord_ids:
+                self._memo.clear()
+                return
+            for key, purchase_info in list(self._memo.items()):
+                kind, product_id, stockrecord_id, __ = key
+                selected = purchase_info.stockrecord
+                if (
+                    kind == "parent"
+                    or product_id in product_ids
+                    or stockrecord_id in stockrecord_ids
+                    or (selected is not None and selected.pk in stockrecord_ids)
+                ):
+                    del self._memo[key]
+
+    @property
+    def memo_hit_rate(self):
+        lookups = self.memo_hits + self.memo_misses
+        return self.memo_hits / lookups if lookups else 0.0
+
     def select_stockrecord(self, product):
         """
         Select the appropriate stockrecord
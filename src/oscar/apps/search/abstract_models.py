@@ -0,0 +1,27 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class AbstractProductIndexQueueEntry(models.Model):
+    """
+    A product whose search index entry is out of date.
+
+    Entries are recorded in the same transaction as the change, and removed
+    once the product has been reindexed.  A product is recorded once per
+    change, and the ``oscar_process_product_index_queue`` command indexes it
+    once per batch.
+    """
+
+    # Not a foreign key, as deleted products must be removed from the index
+    product_id = models.PositiveIntegerField(_("Product ID"))
+    date_queued = models.DateTimeField(_("Date queued"), auto_now_add=True)
+
+    class Meta:
+        abstract = True
+        app_label = "search"
+        ordering = ["pk"]
+        verbose_name = _("Product index queue entry")
+        verbose_name_plural = _("Product index queue entries")
+
+    def __str__(self):
+        return _("Product #%s") % self.product_id
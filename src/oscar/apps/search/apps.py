@@ -12,8 +12,10 @@ class SearchConfig(OscarConfig):
 
     namespace = "search"
 
-    # pylint: disable=attribute-defined-outside-init
+    # pylint: disable=attribute-defined-outside-init, unused-import
     def ready(self):
+        from . import receivers
+
         self.search_view = get_class("search.views", "FacetedSearchView")
 
     def get_urls(self):
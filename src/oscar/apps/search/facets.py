@@ -1,4 +1,8 @@
+import hashlib
+import uuid
+
 from django.conf import settings
+from django.core.cache import cache
 from oscar.core.loading import get_class
 from haystack.query import SearchQuerySet
 from haystack.exceptions import MissingDependency
@@ -13,17 +17,19 @@ from purl import URL
 is_solr_supported = get_class("search.features", "is_solr_supported")
 
 
-def base_sqs():
+def base_sqs(facets=True):
     """
-    Return the base SearchQuerySet for Haystack searches.
+    Return the base SearchQuerySet for Haystack searches, which asks for the
+    configured facets unless ``facets`` is false.
     """
     sqs = SearchQuerySet()
-    for facet in settings.OSCAR_SEARCH_FACETS["fields"].values():
-        options = facet.get("options", {})
-        sqs = sqs.facet(facet["field"], **options)
-    for facet in settings.OSCAR_SEARCH_FACETS["queries"].values():
-        for query in facet["queries"]:
-            sqs = sqs.query_facet(facet["field"], query[1])
+    if facets:
+        for facet in settings.OSCAR_SEARCH_FACETS["fields"].values():
+            options = facet.get("options", {})
+            sqs = sqs.facet(facet["field"], **options)
+        for facet in settings.OSCAR_SEARCH_FACETS["queries"].values():
+            for query in facet["queries"]:
+                sqs = sqs.query_facet(facet["field"], query[1])
 
     sqs = sqs.filter_and(is_public="true", structure__in=["standalone", "parent"])
     return sqs
@@ -130,3 +136,85 @@ class FacetMunger(object):
         if url.has_query_param("page"):
             url = url.remove_query_param("page")
         return url.as_string()
+
+
+FACETS_VERSION_CACHE_KEY = "OSCAR_SEARCH_FACETS_VERSION"
+
+
+def get_facets_version():
+    """
+    Return the current version of the search index's facets
+    """
+    version = cache.get(FACETS_VERSION_CACHE_KEY)
+    if version is None:
+        version = bump_facets_version()
+    return version
+
+
+def bump_facets_version():
+    """
+    Invalidate all cached facets by moving on to a new version
+    """
+    version = uuid.uuid4().hex
+    cache.set(FACETS_VERSION_CACHE_KEY, version, None)
+    return version
+
+
+class FacetCache(object):
+    """
+    Caches the facet counts and facet data of searches without a query.
+
+    Browsing the catalogue or a category gives the same facets to everyone,
+    so they're cached by the request path, which identifies the category,
+    the selected facets and the sort order.  Requests with any other
+    parameter aren't cached.  Cached facets are discarded when products are
+    indexed, and expire after ``OSCAR_SEARCH_FACETS_CACHE_TIMEOUT`` seconds
+    in case the index is updated some other way.
+    """
+
+    key_prefix = "oscar-search-facets"
+
+    #: The request parameters that cached facets can be shared across
+    cacheable_params = ("q", "selected_facets", "sort_by", "page")
+
+    def is_cacheable(self, request):
+        if not settings.OSCAR_SEARCH_FACETS_CACHE_TIMEOUT:
+            return False
+        if request.method not in ("GET", "HEAD"):
+            return False
+        if request.GET.get("q", "").strip():
+            return False
+        return all(name in self.cacheable_params for name in request.GET)
+
+    def get_key(self, request):
+        parts = [
+            get_facets_version(),
+            request.path,
+            sorted(request.GET.getlist("selected_facets")),
+            request.GET.get("sort_by", ""),
+        ]
+        return "%s-%s" % (
+            self.key_prefix,
+            hashlib.sha1(repr(parts).encode("utf8")).hexdigest(),
+        )
+
+    def get(self, request):
+        """
+        Return the cached facet counts and facet data for the request as a
+        dict, or ``None`` if there aren't any
+        """
+        if not self.is_cacheable(request):
+            return None
+        return cache.get(self.get_key(request))
+
+    def set(self, request, facets, facet_data):
+        if not self.is_cacheable(request):
+            return
+        cache.set(
+            self.get_key(request),
+            {"facets": facets, "facet_data": facet_data},
+            settings.OSCAR_SEARCH_FACETS_CACHE_TIMEOUT,
+        )
+
+
+facet_cache = FacetCache()
@@ -0,0 +1,274 @@
+import json
+import logging
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db import connections as db_connections
+from django.utils import timezone
+from haystack import connections
+from haystack.constants import DEFAULT_ALIAS
+
+from oscar.core.loading import get_class, get_model
+
+bump_facets_version = get_class("search.facets", "bump_facets_version")
+
+logger = logging.getLogger("oscar.search")
+
+
+def _initialise_worker():
+    # Needed when worker processes are spawned rather than forked
+    django.setup()
+
+
+class ProductIndexBuilder(object):
+    """
+    Builds the search index of products in chunks.
+
+    Chunks are ranges of ``chunk_size`` product primary keys.  Each chunk is
+    loaded with ``ProductIndex.load_chunk``, which prefetches what preparing
+    the products needs, and is sent to the search backend on its own, so
+    memory use doesn't grow with the size of the catalogue.  With several
+    workers, chunks are indexed by a pool of processes, which needs a search
+    backend that accepts concurrent updates.
+
+    The last primary key up to which all chunks have been indexed is written
+    to a checkpoint file, from which an interrupted build can resume.  It's
+    in the temporary directory unless ``checkpoint_path`` is given.
+    """
+
+    chunk_size = 500
+
+    def __init__(
+        self, using=DEFAULT_ALIAS, chunk_size=None, workers=1, checkpoint_path=None
+    ):
+        self.using = using
+        if chunk_size:
+            self.chunk_size = chunk_size
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path or os.path.join(
+            tempfile.gettempdir(), "oscar-product-index-%s.checkpoint" % using
+        )
+
+    def get_index(self):
+        Product = get_model("catalogue", "Product")
+        return connections[self.using].get_unified_index().get_index(Product)
+
+    # Checkpoints
+
+    def get_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, "rt", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logger.warning("Ignoring unreadable checkpoint %s", self.checkpoint_path)
+            return None
+        return checkpoint.get("last_pk")
+
+    def set_checkpoint(self, last_pk):
+        # Replace the checkpoint at once, so it can't be left half written
+        with open(self.checkpoint_path + ".tmp", "wt", encoding="utf-8") as f:
+            json.dump({"last_pk": last_pk}, f)
+        os.replace(self.checkpoint_path + ".tmp", self.checkpoint_path)
+
+    def clear_checkpoint(self):
+        try:
+            os.remove(self.checkpoint_path)
+        except FileNotFoundError:
+            pass
+
+    # Building
+
+    def get_chunks(self, after_pk=None):
+        """
+        Return the ``(first_pk, last_pk)`` ranges of the chunks to index,
+        after the given primary key if any
+        """
+        queryset = self.get_index().index_queryset(self.using).order_by("pk")
+        if after_pk is not None:
+            queryset = queryset.filter(pk__gt=after_pk)
+        chunks, first_pk, num_products = [], None, 0
+        for pk in queryset.values_list("pk", flat=True).iterator(
+            chunk_size=self.chunk_size
+        ):
+            if first_pk is None:
+                first_pk = pk
+            num_products += 1
+            if num_products == self.chunk_size:
+                chunks.append((first_pk, pk))
+                first_pk, num_products = None, 0
+        if first_pk is not None:
+            chunks.append((first_pk, pk))
+        return chunks
+
+    def index_chunk(self, first_pk, last_pk):
+        """
+        Index the products in the given range, returning how many there were
+        """
+        index = self.get_index()
+        products = index.load_chunk(first_pk, last_pk, using=self.using)
+        if products:
+            backend = connections[self.using].get_backend()
+            backend.update(index, products)
+        return len(products)
+
+    def build(self, resume=False):
+        """
+        Index all products, or the products after the checkpoint if
+        resuming.  Returns the number of products indexed.
+        """
+        after_pk = self.get_checkpoint() if resume else None
+        chunks = self.get_chunks(after_pk)
+        logger.info("Indexing products in %d chunks", len(chunks))
+        if self.workers > 1:
+            num_indexed = self.build_in_parallel(chunks)
+        else:
+            num_indexed = 0
+            for first_pk, last_pk in chunks:
+                num_indexed += self.index_chunk(first_pk, last_pk)
+                self.set_checkpoint(last_pk)
+        self.clear_checkpoint()
+        bump_facets_version()
+        logger.info("Indexed %d products", num_indexed)
+        return num_indexed
+
+    def build_in_parallel(self, chunks):
+        # Worker processes must open their own database connections
+        db_connections.close_all()
+        num_indexed = 0
+        pending = deque()
+        chunks = iter(chunks)
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_initialise_worker
+        ) as executor:
+            while True:
+                # Keep a bounded number of chunks in flight
+                while len(pending) < self.workers * 2:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    future = executor.submit(self.index_chunk, *chunk)
+                    pending.append((chunk[1], future))
+                if not pending:
+                    break
+                # Chunks complete in order for the checkpoint to be valid
+                last_pk, future = pending.popleft()
+                num_indexed += future.result()
+                self.set_checkpoint(last_pk)
+        return num_indexed
+
+
+class ProductIndexQueue(object):
+    """
+    Keeps the search index of products in sync with their changes.
+
+    The ids of changed products are recorded in the
+    ``ProductIndexQueueEntry`` table, in the same transaction as the change,
+    when ``OSCAR_SEARCH_INDEX_QUEUE`` is enabled.  Batches of entries are
+    processed by the ``oscar_process_product_index_queue`` command: each
+    changed product is indexed once per batch, or removed from the index
+    if it's no longer indexable.  Child products are indexed through their
+    parents.
+    """
+
+    batch_size = 500
+
+    def __init__(self, using=DEFAULT_ALIAS, batch_size=None):
+        self.using = using
+        if batch_size:
+            self.batch_size = batch_size
+
+    def get_queryset(self):
+        return get_model("search", "ProductIndexQueueEntry").objects.all()
+
+    def enqueue(self, product_ids):
+        """
+        Record that the given products need reindexing
+        """
+        Entry = get_model("search", "ProductIndexQueueEntry")
+        Entry.objects.bulk_create(
+            [
+                Entry(product_id=product_id)
+                for product_id in set(product_ids)
+                if product_id
+            ]
+        )
+
+    def get_length(self):
+        return self.get_queryset().count()
+
+    def get_lag(self):
+        """
+        Return how long the oldest queued change has been waiting, or
+        ``None`` if the queue is empty
+        """
+        oldest = self.get_queryset().order_by("pk").first()
+        if oldest is None:
+            return None
+        return timezone.now() - oldest.date_queued
+
+    def process_batch(self):
+        """
+        Index the products of the oldest batch of entries, and remove the
+        entries.  Returns the number of entries processed.
+        """
+        entries = list(
+            self.get_queryset()
+            .order_by("pk")
+            .values_list("pk", "product_id", "date_queued")[: self.batch_size]
+        )
+        if not entries:
+            return 0
+        product_ids = {product_id for __, product_id, __ in entries}
+        num_indexed, num_removed = self.update_products(product_ids)
+        bump_facets_version()
+        # Entries queued while indexing are kept for the next batch
+        self.get_queryset().filter(pk__in=[pk for pk, __, __ in entries]).delete()
+        lag = timezone.now() - min(date_queued for __, __, date_queued in entries)
+        logger.info(
+            "Indexed %d and removed %d products from %d queued changes, "
+            "the oldest queued %.1f seconds ago",
+            num_indexed,
+            num_removed,
+            len(entries),
+            lag.total_seconds(),
+        )
+        return len(entries)
+
+    def process(self):
+        """
+        Process batches until the queue is empty, returning the number of
+        entries processed
+        """
+        num_processed = 0
+        while True:
+            num_entries = self.process_batch()
+            if not num_entries:
+                return num_processed
+            num_processed += num_entries
+
+    def update_products(self, product_ids):
+        """
+        Index the given products, or their parents for child products, and
+        remove those that aren't indexable anymore from the index
+        """
+        Product = get_model("catalogue", "Product")
+        index = connections[self.using].get_unified_index().get_index(Product)
+        backend = connections[self.using].get_backend()
+        parent_ids = dict(
+            Product.objects.filter(pk__in=product_ids).values_list("pk", "parent_id")
+        )
+        target_ids = {parent_ids.get(pk) or pk for pk in product_ids}
+        products = index.load_products(
+            index.index_queryset(self.using).filter(pk__in=target_ids)
+        )
+        if products:
+            backend.update(index, products)
+        removed_ids = target_ids - {product.pk for product in products}
+        for pk in removed_ids:
+            backend.remove("%s.%s" % (Product._meta.label_lower, pk))
+        return len(products), len(removed_ids)
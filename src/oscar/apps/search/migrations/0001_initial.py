@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductIndexQueueEntry",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("product_id", models.PositiveIntegerField(verbose_name="Product ID")),
+                (
+                    "date_queued",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Date queued"),
+                ),
+            ],
+            options={
+                "verbose_name": "Product index queue entry",
+                "verbose_name_plural": "Product index queue entries",
+                "ordering": ["pk"],
+                "abstract": False,
+            },
+        ),
+    ]
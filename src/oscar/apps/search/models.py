@@ -0,0 +1,12 @@
+from oscar.apps.search.abstract_models import AbstractProductIndexQueueEntry
+from oscar.core.loading import is_model_registered
+
+__all__ = []
+
+
+if not is_model_registered("search", "ProductIndexQueueEntry"):
+
+    class ProductIndexQueueEntry(AbstractProductIndexQueueEntry):
+        pass
+
+    __all__.append("ProductIndexQueueEntry")
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from oscar.apps.partner.signals import stock_levels_updated
+from oscar.core.loading import get_class, get_model
+
+Category = get_model("catalogue", "Category")
+Product = get_model("catalogue", "Product")
+ProductAttributeValue = get_model("catalogue", "ProductAttributeValue")
+ProductCategory = get_model("catalogue", "ProductCategory")
+StockRecord = get_model("partner", "StockRecord")
+ProductIndexQueue = get_class("search.indexing", "ProductIndexQueue")
+
+
+def _queue_products(product_ids, **kwargs):
+    if settings.OSCAR_SEARCH_INDEX_QUEUE and not kwargs.get("raw", False):
+        ProductIndexQueue().enqueue(product_ids)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def queue_product(instance, **kwargs):
+    # Child products are indexed through their parents
+    _queue_products([instance.pk, instance.parent_id], **kwargs)
+
+
+@receiver(post_save, sender=StockRecord)
+@receiver(post_delete, sender=StockRecord)
+@receiver(post_save, sender=ProductAttributeValue)
+@receiver(post_delete, sender=ProductAttributeValue)
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+def queue_related_product(instance, **kwargs):
+    _queue_products([instance.product_id], **kwargs)
+
+
+# pylint: disable=unused-argument
+@receiver(stock_levels_updated, sender=StockRecord)
+def queue_stock_level_products(sender, stockrecords, **kwargs):
+    _queue_products([stockrecord.product_id for stockrecord in stockrecords])
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def queue_categorised_products(instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        _queue_products([instance.pk])
+    elif action == "pre_clear":
+        _queue_products(
+            ProductCategory.objects.filter(category=instance).values_list(
+                "product_id", flat=True
+            )
+        )
+    else:
+        _queue_products(pk_set or ())
+
+
+@receiver(post_save, sender=Category)
+def queue_category_products(instance, **kwargs):
+    # Whether a category is browsable depends on its ancestors
+    if settings.OSCAR_SEARCH_INDEX_QUEUE and not kwargs.get("raw", False):
+        _queue_products(
+            ProductCategory.objects.filter(
+                category__path__startswith=instance.path
+            ).values_list("product_id", flat=True)
+        )
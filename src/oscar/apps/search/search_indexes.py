@@ -4,6 +4,7 @@ from oscar.core.loading import get_class, get_model
 
 # Load default strategy (without a user/request)
 is_solr_supported = get_class("search.features", "is_solr_supported")
+bump_facets_version = get_class("search.facets", "bump_facets_version")
 Selector = get_class("partner.strategy", "Selector")
 
 
@@ -47,11 +48,40 @@ class ProductIndex(indexes.SearchIndex, indexes.Indexable):
     def read_queryset(self, using=None):
         return self.get_model().objects.browsable().base_queryset()
 
+    def load_chunk(self, first_pk, last_pk, using=None):
+        """
+        Return the products to index with primary keys in the given range
+        """
+        return self.load_products(
+            self.index_queryset(using).filter(pk__gte=first_pk, pk__lte=last_pk)
+        )
+
+    def load_products(self, queryset):
+        """
+        Return the products of the queryset, with everything that preparing
+        them needs loaded in a fixed number of queries
+        """
+        products = list(
+            queryset.order_by("pk")
+            .select_related("product_class")
+            .prefetch_browsable_categories()
+            .prefetch_attribute_values()
+        )
+        # Prices and stock levels are fetched once per product, and the
+        # strategy prefetches the stockrecords and children they need
+        purchase_info = self.get_strategy().fetch_for_products(products)
+        for product in products:
+            product._prefetched_purchase_info = purchase_info[product.pk]
+        return products
+
     def prepare_product_class(self, obj):
         return obj.get_product_class().name
 
     def prepare_category(self, obj):
-        return list(obj.get_categories().values_list("pk", flat=True)) or []
+        categories = obj.get_categories()
+        if isinstance(categories, list):
+            return [category.pk for category in categories]
+        return list(categories.values_list("pk", flat=True)) or []
 
     def prepare_rating(self, obj):
         if obj.rating is not None:
@@ -66,29 +96,42 @@ class ProductIndex(indexes.SearchIndex, indexes.Indexable):
             self._strategy = Selector().strategy()
         return self._strategy
 
-    def prepare_price(self, obj):
+    def get_purchase_info(self, obj):
+        """
+        Return the purchase info of a product, if it has any stockrecords or
+        is a parent
+        """
+        if hasattr(obj, "_prefetched_purchase_info"):
+            result = obj._prefetched_purchase_info
+            if obj.is_parent or result.stockrecord is not None:
+                return result
+            return None
         strategy = self.get_strategy()
-        result = None
         if obj.is_parent:
-            result = strategy.fetch_for_parent(obj)
+            return strategy.fetch_for_parent(obj)
         elif obj.has_stockrecords:
-            result = strategy.fetch_for_product(obj)
+            return strategy.fetch_for_product(obj)
+        return None
 
+    def prepare_price(self, obj):
+        result = self.get_purchase_info(obj)
         if result:
             if result.price.is_tax_known:
                 return result.price.incl_tax
             return result.price.excl_tax
 
     def prepare_num_in_stock(self, obj):
-        strategy = self.get_strategy()
         if obj.is_parent:
             # Don't return a stock level for parent products
             return None
-        elif obj.has_stockrecords:
-            result = strategy.fetch_for_product(obj)
+        result = self.get_purchase_info(obj)
+        if result and result.stockrecord:
             return result.stockrecord.net_stock_level
 
     def prepare(self, obj):
+        if not hasattr(obj, "_prefetched_purchase_info"):
+            # The strategy outlives the product's changes
+            self.get_strategy().invalidate_memo(product_ids=[obj.pk])
         prepared_data = super().prepare(obj)
 
         # We use Haystack's dynamic fields to ensure that the title field used
@@ -101,6 +144,15 @@ class ProductIndex(indexes.SearchIndex, indexes.Indexable):
 
         return prepared_data
 
+    # Objects are updated one at a time by Haystack's signal processors
+    def update_object(self, instance, using=None, **kwargs):
+        super().update_object(instance, using=using, **kwargs)
+        bump_facets_version()
+
+    def remove_object(self, instance, using=None, **kwargs):
+        super().remove_object(instance, using=using, **kwargs)
+        bump_facets_version()
+
     def get_updated_field(self):
         """
         Used to specify the field used to determine if an object has been
@@ -6,16 +6,25 @@ from oscar.core.loading import get_class
 
 FacetMunger = get_class("search.facets", "FacetMunger")
 base_sqs = get_class("search.facets", "base_sqs")
+facet_cache = get_class("search.facets", "facet_cache")
 
 
 class BaseSearchView(BaseFacetedSearchView):
     facet_fields = settings.OSCAR_SEARCH_FACETS["fields"].keys()
     paginate_by = settings.OSCAR_PRODUCTS_PER_PAGE
 
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        # pylint: disable=W0201
+        self.cached_facets = facet_cache.get(request)
+
     def get_queryset(self):
-        return base_sqs()
+        # Don't ask the search backend for facets that are cached
+        return base_sqs(facets=self.cached_facets is None)
 
     def get_context_data(self, *args, **kwargs):
+        # FacetedSearchMixin adds the facet counts of the search, which are
+        # empty if the facets are cached, as they aren't asked for then
         context = super().get_context_data(*args, **kwargs)
 
         form = context[self.form_name]
@@ -28,21 +37,34 @@ class BaseSearchView(BaseFacetedSearchView):
             if suggestion != context["query"]:
                 context["suggestion"] = suggestion
 
-        # Convert facet data into a more useful data structure
-        if "fields" in context["facets"]:
-            munger = FacetMunger(
-                self.request.get_full_path(),
-                form.selected_multi_facets,
-                self.queryset.facet_counts(),
-                query_type=type(self.queryset.query),
-            )
-            context["facet_data"] = munger.facet_data()
-            has_facets = any(
-                [len(data["results"]) for data in context["facet_data"].values()]
-            )
+        if self.cached_facets is not None:
+            context["facets"] = self.cached_facets["facets"]
+            facet_data = self.cached_facets["facet_data"]
+        else:
+            facet_data = self.get_facet_data(form, context["facets"])
+            if form.is_valid():
+                facet_cache.set(self.request, context["facets"], facet_data)
+
+        if facet_data is not None:
+            context["facet_data"] = facet_data
+            has_facets = any([len(data["results"]) for data in facet_data.values()])
             context["has_facets"] = has_facets
 
         context["selected_facets"] = form.selected_facets
         context[self.page_kwarg] = context["page_obj"]
 
         return context
+
+    def get_facet_data(self, form, facets):
+        """
+        Convert facet data into a more useful data structure
+        """
+        if "fields" not in facets:
+            return None
+        munger = FacetMunger(
+            self.request.get_full_path(),
+            form.selected_multi_facets,
+            facets,
+            query_type=type(self.queryset.query),
+        )
+        return munger.facet_data()
@@ -3,7 +3,7 @@ from urllib.parse import quote
 
 from django.contrib import messages
 from django.http import Http404, HttpResponsePermanentRedirect
-from django.shortcuts import get_object_or_404, redirect
+from django.shortcuts import redirect
 from django.utils.translation import gettext_lazy as _
 
 from oscar.core.loading import get_class, get_model
@@ -12,6 +12,7 @@ BrowseCategoryForm = get_class("search.forms", "BrowseCategoryForm")
 CategoryForm = get_class("search.forms", "CategoryForm")
 BaseSearchView = get_class("search.views.base", "BaseSearchView")
 Category = get_model("catalogue", "Category")
+CategoryMixin = get_class("catalogue.mixins", "CategoryMixin")
 
 
 class CatalogueView(BaseSearchView):
@@ -38,7 +39,7 @@ class CatalogueView(BaseSearchView):
         return ctx
 
 
-class ProductCategoryView(BaseSearchView):
+class ProductCategoryView(CategoryMixin, BaseSearchView):
     """
     Browse products in a given category
     """
@@ -77,9 +78,6 @@ class ProductCategoryView(BaseSearchView):
             if expected_path != quote(current_path):
                 return HttpResponsePermanentRedirect(expected_path)
 
-    def get_category(self):
-        return get_object_or_404(Category, pk=self.kwargs["pk"])
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["category"] = self.category
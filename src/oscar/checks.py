@@ -11,6 +11,12 @@ def turned_on_materialised_views():
     )
 
 
+def turned_on_hierarchy_table():
+    return getattr(
+        settings, "OSCAR_CATALOGUE_USE_PRODUCT_CATEGORY_HIERARCHY_TABLE", False
+    )
+
+
 def is_postgres():
     return connection.vendor == "postgresql"
 
@@ -26,16 +32,31 @@ def startup_check(*args, **kwargs):
         errors.append(
             Error(
                 "The OSCAR_PRODUCT_SEARCH_HANDLER is removed since django-oscar==3.2.4.",
-                hint="Use the new class based haystack views instead located in search.views. Any customizations that has been done to the search handler should be moved there.",
+                hint=(
+                    "Use the new class based haystack views instead located in "
+                    "search.views. Any customizations that has been done to the "
+                    "search handler should be moved there."
+                ),
                 id="django-oscar.E001",
             )
         )
 
-    if turned_on_materialised_views() and not is_postgres():
+    if (
+        turned_on_materialised_views()
+        and not is_postgres()
+        and not turned_on_hierarchy_table()
+    ):
         errors.append(
             Warning(
-                "OSCAR_CATALOGUE_USE_POSTGRES_MATERIALISED_VIEWS is enabled but PostgreSQL is not detected. Materialized views are not functioning and fallback queries are being used instead.",
-                hint="Either switch your database backend to PostgreSQL or disable the OSCAR_CATALOGUE_USE_POSTGRES_MATERIALISED_VIEWS setting in your configuration.",
+                "OSCAR_CATALOGUE_USE_POSTGRES_MATERIALISED_VIEWS is enabled but "
+                "PostgreSQL is not detected. Materialized views are not available "
+                "and fallback queries are being used instead.",
+                hint=(
+                    "Switch your database backend to PostgreSQL, disable the "
+                    "OSCAR_CATALOGUE_USE_POSTGRES_MATERIALISED_VIEWS setting, or "
+                    "enable OSCAR_CATALOGUE_USE_PRODUCT_CATEGORY_HIERARCHY_TABLE to "
+                    "maintain the product category hierarchy as a regular table."
+                ),
                 id="django-oscar.W001",
             )
         )
@@ -43,4 +64,10 @@ def startup_check(*args, **kwargs):
 
 
 def use_productcategory_materialised_view():
-    return is_postgres() and turned_on_materialised_views()
+    """
+    Whether the product category hierarchy can be queried, either as a
+    materialised view on PostgreSQL or as a regular table elsewhere.
+    """
+    if is_postgres():
+        return turned_on_materialised_views()
+    return turned_on_hierarchy_table()
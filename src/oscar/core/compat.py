@@ -127,3 +127,28 @@ class UnicodeCSVWriter:
     def writerows(self, rows):
         for row in rows:
             self.writerow(row)
+
+
+class StreamingCSVBuffer:
+    """
+    File-like object that keeps what's written to it until it's read, to
+    stream CSV a row at a time:
+
+        buffer = StreamingCSVBuffer()
+        writer = UnicodeCSVWriter(open_file=buffer)
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.read()
+    """
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+        return len(data)
+
+    def read(self):
+        data = "".join(self.chunks)
+        self.chunks = []
+        return data
@@ -0,0 +1,243 @@
+import base64
+import binascii
+import hashlib
+import json
+import math
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+#: Querysets estimated to have fewer objects than this are counted exactly
+EXACT_COUNT_THRESHOLD = 1000
+
+
+def get_estimated_count(queryset):
+    """
+    Return the query planner's estimate of the number of objects in the
+    queryset, or ``None`` if the database can't estimate it
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return None
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_approximate_count(queryset):
+    """
+    Return the approximate number of objects in the queryset, without
+    counting them on every call.
+
+    Large querysets are estimated by the query planner where the database
+    can do so.  Others are counted exactly, and the count is cached for
+    ``OSCAR_PAGINATION_COUNT_CACHE_TIMEOUT`` seconds, keyed by the SQL of the
+    query.
+    """
+    estimate = get_estimated_count(queryset)
+    if estimate is not None and estimate >= EXACT_COUNT_THRESHOLD:
+        return estimate
+    timeout = settings.OSCAR_PAGINATION_COUNT_CACHE_TIMEOUT
+    if not timeout:
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    digest = hashlib.sha1(
+        ("%s|%s|%r" % (queryset.db, sql, params)).encode("utf8")
+    ).hexdigest()
+    key = "oscar-pagination-count-%s" % digest
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    A paginator that counts its objects with ``get_approximate_count``.
+
+    It also accepts the rows of ``django-tables2`` tables, which are counted
+    by the queryset they wrap.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        # Table rows wrap the table data, which wraps the queryset
+        table_data = getattr(queryset, "data", None)
+        if isinstance(getattr(table_data, "data", None), QuerySet):
+            queryset = table_data.data
+        if not isinstance(queryset, QuerySet):
+            return super().count
+        return get_approximate_count(queryset)
+
+
+class KeysetPage(Sequence):
+    """
+    A page of a ``KeysetPaginator``.
+
+    It has the same ``has_next`` and ``has_previous`` methods as Django's
+    pages, and the cursors of the next and previous pages instead of page
+    numbers.
+    """
+
+    # Lets templates tell keyset pages from numbered ones
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return "<Keyset page of %d objects>" % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+
+class KeysetPaginator(object):
+    """
+    Paginates a queryset by the values of its ordering fields rather than by
+    offset.
+
+    Each page is fetched with a ``WHERE`` clause that seeks past the last
+    object of the previous page, so fetching a page costs the same however
+    deep it is, given an index on the ordering fields.  Pages are identified
+    by opaque cursors rather than numbers.
+
+    The queryset's ordering, or the model's default ordering, must only
+    contain the names of non-nullable fields of the model.  The primary key
+    is appended to it if needed to make it unique.
+
+    The total number of objects is only counted when asked for, and with
+    ``approximate_count`` set it's approximated with
+    ``get_approximate_count``.
+    """
+
+    NEXT, PREVIOUS = "n", "p"
+
+    def __init__(self, object_list, per_page, ordering=None, approximate_count=False):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.approximate_count = approximate_count
+        opts = object_list.model._meta
+        if ordering is None:
+            ordering = object_list.query.order_by or opts.ordering
+        self.ordering = []
+        for name in ordering:
+            if not isinstance(name, str) or name == "?":
+                raise ValueError("Keyset pagination needs ordering by field names")
+            descending = name.startswith("-")
+            field = (
+                opts.pk
+                if name.lstrip("-") == "pk"
+                else opts.get_field(name.lstrip("-"))
+            )
+            self.ordering.append((field, descending))
+        if not any(field.primary_key for field, __ in self.ordering):
+            descending = self.ordering[-1][1] if self.ordering else False
+            self.ordering.append((opts.pk, descending))
+
+    @cached_property
+    def count(self):
+        """
+        Return the total number of objects, which costs a query
+        """
+        if self.approximate_count:
+            return get_approximate_count(self.object_list)
+        return self.object_list.count()
+
+    @property
+    def num_pages(self):
+        return max(1, math.ceil(self.count / self.per_page))
+
+    def get_order_by(self, reverse=False):
+        return [
+            ("-" if descending != reverse else "") + field.attname
+            for field, descending in self.ordering
+        ]
+
+    def get_seek_filter(self, values, reverse=False):
+        """
+        Return the filter for the objects after the given values of the
+        ordering fields, or before them if ``reverse`` is set
+        """
+        seek, equal = Q(), {}
+        for (field, descending), value in zip(self.ordering, values):
+            lookup = "lt" if descending != reverse else "gt"
+            seek |= Q(**equal, **{"%s__%s" % (field.attname, lookup): value})
+            equal[field.attname] = value
+        return seek
+
+    def page(self, cursor=None):
+        """
+        Return the page for the given cursor, or the first page
+        """
+        queryset = self.object_list
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+            reverse = direction == self.PREVIOUS
+            queryset = queryset.filter(self.get_seek_filter(values, reverse))
+        else:
+            reverse = False
+        objects = list(
+            queryset.order_by(*self.get_order_by(reverse))[: self.per_page + 1]
+        )
+        has_more = len(objects) > self.per_page
+        objects = objects[: self.per_page]
+        if reverse:
+            objects.reverse()
+            has_previous, has_next = has_more, True
+        else:
+            has_previous, has_next = bool(cursor), has_more
+        next_cursor = previous_cursor = None
+        if objects and has_next:
+            next_cursor = self.encode_cursor(self.NEXT, objects[-1])
+        if objects and has_previous:
+            previous_cursor = self.encode_cursor(self.PREVIOUS, objects[0])
+        return KeysetPage(objects, self, next_cursor, previous_cursor)
+
+    def encode_cursor(self, direction, obj):
+        values = [field.value_to_string(obj) for field, __ in self.ordering]
+        data = json.dumps([direction, values], separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode("utf8")).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            direction, values = json.loads(data.decode("utf8"))
+            if direction not in (self.NEXT, self.PREVIOUS):
+                raise ValueError
+            if len(values) != len(self.ordering):
+                raise ValueError
+            values = [
+                field.to_python(value)
+                for (field, __), value in zip(self.ordering, values)
+            ]
+        except (binascii.Error, TypeError, ValueError, ValidationError) as e:
+            raise InvalidCursor(_("Invalid page")) from e
+        return direction, values
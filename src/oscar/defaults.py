@@ -13,6 +13,9 @@ OSCAR_BASKET_COOKIE_LIFETIME = 7 * 24 * 60 * 60
 OSCAR_BASKET_COOKIE_OPEN = "oscar_open_basket"
 OSCAR_BASKET_COOKIE_SECURE = False
 OSCAR_MAX_BASKET_QUANTITY_THRESHOLD = 10000
+OSCAR_BASKET_CACHE_PRICING = False
+OSCAR_BASKET_PRICING_CACHE_TIMEOUT = 5 * 60
+OSCAR_BASKET_SUMMARY_CACHE_TIMEOUT = 60 * 60
 
 # Recently-viewed products
 OSCAR_RECENTLY_VIEWED_COOKIE_LIFETIME = 7 * 24 * 60 * 60
@@ -25,6 +28,7 @@ OSCAR_DEFAULT_CURRENCY = "GBP"
 
 # Paths
 OSCAR_IMAGE_FOLDER = "images/products/%Y/%m/"
+OSCAR_REPORT_FOLDER = "reports/%Y/%m/"
 OSCAR_DELETE_IMAGE_FILES = True
 
 # Copy this image from oscar/static/img to your MEDIA_ROOT folder.
@@ -52,6 +56,12 @@ OSCAR_ORDERS_PER_PAGE = 20
 OSCAR_ADDRESSES_PER_PAGE = 20
 OSCAR_STOCK_ALERTS_PER_PAGE = 20
 OSCAR_DASHBOARD_ITEMS_PER_PAGE = 20
+OSCAR_PAGINATION_COUNT_CACHE_TIMEOUT = 0
+
+# Reports
+OSCAR_REPORT_FILE_MAX_AGE = 60 * 60
+OSCAR_REPORT_JOB_TIMEOUT = 30 * 60
+OSCAR_REPORT_STORAGE = "default"
 
 # Checkout
 OSCAR_ALLOW_ANON_CHECKOUT = False
@@ -73,6 +83,9 @@ OSCAR_ACCOUNTS_REDIRECT_URL = "customer:profile-view"
 # run periodically, e.g. as a cron job. In this case eager alerts should be
 # disabled.
 OSCAR_EAGER_ALERTS = True
+# Send pre_save and post_save for each stock record whose stock levels are
+# adjusted by allocations, as well as the stock_levels_updated signal.
+OSCAR_STOCK_ADJUSTMENTS_SEND_SAVE_SIGNALS = False
 
 # Registration
 OSCAR_SEND_REGISTRATION_EMAIL = True
@@ -97,6 +110,12 @@ OSCAR_OFFERS_IMPLEMENTED_TYPES = [
     "SITE",
     "VOUCHER",
 ]
+# Keep the site offers in a process-local cache, which is invalidated through
+# a version key in Django's cache when offers or ranges change.
+OSCAR_OFFERS_CACHE_SITE_OFFERS = False
+# Read range membership from the denormalised RangeProductMembership table
+# instead of evaluating the range rules on every lookup.
+OSCAR_OFFERS_USE_RANGE_MEMBERSHIP_TABLE = False
 
 # Hidden Oscar features, e.g. wishlists or reviews
 OSCAR_HIDDEN_FEATURES = []
@@ -225,6 +244,7 @@ OSCAR_DASHBOARD_NAVIGATION = [
     },
 ]
 OSCAR_DASHBOARD_DEFAULT_ACCESS_FUNCTION = "oscar.apps.dashboard.nav.default_access_fn"
+OSCAR_DASHBOARD_USE_SALES_RECORDS = False
 
 # bulk actions
 OSCAR_BULK_INTERMEDIATE_SESSION_KEY = "bulk_intermediate"
@@ -268,12 +288,41 @@ OSCAR_SEARCH_FACETS = {
     },
 }
 
+# Record changed products in a queue, for the
+# oscar_process_product_index_queue command to reindex
+OSCAR_SEARCH_INDEX_QUEUE = False
+
+# The number of seconds facets of searches without a query are cached for
+OSCAR_SEARCH_FACETS_CACHE_TIMEOUT = 0
+
+# Browse the catalogue with the database rather than the search backend
+OSCAR_CATALOGUE_BROWSE_WITH_DATABASE = False
+# Keep a process-local snapshot of the category tree, which is invalidated
+# through a version key in Django's cache when categories change.
+OSCAR_CATALOGUE_CACHE_CATEGORY_TREE = False
+OSCAR_CATALOGUE_CATEGORY_TREE_CHECK_INTERVAL = 5
+
 OSCAR_THUMBNAILER = "oscar.core.thumbnails.SorlThumbnail"
 
 OSCAR_URL_SCHEMA = "http"
 
 OSCAR_SAVE_SENT_EMAILS_TO_DB = True
 
+# Buffer analytics counters and product views, and write them in batches.
+# Either None, to write them directly, or the dotted path of an analytics
+# buffer class, eg "oscar.apps.analytics.buffer.CacheAnalyticsBuffer".
+OSCAR_ANALYTICS_BUFFER = None
+OSCAR_ANALYTICS_BUFFER_FLUSH_INTERVAL = 60
+OSCAR_ANALYTICS_BUFFER_FLUSH_THRESHOLD = 1000
+# Number of days after which activity counts half in product scores
+OSCAR_ANALYTICS_SCORE_HALF_LIFE = None
+
 OSCAR_CATALOGUE_USE_POSTGRES_MATERIALISED_VIEWS = False
+# Maintain the product category hierarchy as a regular table on databases
+# other than PostgreSQL
+OSCAR_CATALOGUE_USE_PRODUCT_CATEGORY_HIERARCHY_TABLE = False
+# Minimum number of seconds between refreshes of the product category
+# hierarchy materialised view. 0 refreshes it on every commit that changes it.
+OSCAR_CATALOGUE_MATERIALISED_VIEW_REFRESH_INTERVAL = 0
 
 HAYSTACK_SIGNAL_PROCESSOR = "haystack.signals.RealtimeSignalProcessor"
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from haystack.constants import DEFAULT_ALIAS
+
+from oscar.core.loading import get_class
+
+ProductIndexBuilder = get_class("search.indexing", "ProductIndexBuilder")
+
+
+class Command(BaseCommand):
+    help = """Index all products in chunks, optionally in parallel. Faster
+              than Haystack's update_index for large catalogues, as what
+              preparing the products needs is loaded per chunk."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--using",
+            dest="using",
+            default=DEFAULT_ALIAS,
+            help="The Haystack connection to update",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            dest="chunk_size",
+            type=int,
+            default=ProductIndexBuilder.chunk_size,
+            help="Number of products to index at once",
+        )
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            type=int,
+            default=1,
+            help="Number of processes to index chunks in",
+        )
+        parser.add_argument(
+            "--resume",
+            dest="resume",
+            action="store_true",
+            help="Resume an interrupted build from its checkpoint",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            dest="checkpoint_path",
+            metavar="PATH",
+            help="File to keep the checkpoint in, instead of the temporary directory",
+        )
+
+    def handle(self, *args, **options):
+        builder = ProductIndexBuilder(
+            using=options["using"],
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+            checkpoint_path=options["checkpoint_path"],
+        )
+        num_indexed = builder.build(resume=options["resume"])
+        self.stdout.write("Indexed %d products\n" % num_indexed)
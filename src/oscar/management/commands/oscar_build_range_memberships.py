@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from oscar.core.loading import get_class, get_model
+
+Range = get_model("offer", "Range")
+RangeMembershipTableUpdater = get_class(
+    "offer.membership", "RangeMembershipTableUpdater"
+)
+
+
+class Command(BaseCommand):
+    help = """Build the denormalised range product membership table used when
+              OSCAR_OFFERS_USE_RANGE_MEMBERSHIP_TABLE is enabled. Should be run
+              when enabling the setting, and after changes that bypass
+              signals (eg moving categories within the tree)."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--range",
+            dest="ranges",
+            action="append",
+            metavar="SLUG",
+            help="Only rebuild the range with this slug (can be repeated)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=RangeMembershipTableUpdater.batch_size,
+            help="Number of rows to insert per query",
+        )
+
+    def handle(self, *args, **options):
+        updater = RangeMembershipTableUpdater(batch_size=options["batch_size"])
+        ranges = updater.get_ranges()
+        if options["ranges"]:
+            ranges = Range.objects.filter(slug__in=options["ranges"])
+        ranges = list(ranges)
+        num_rows = updater.rebuild(ranges)
+        self.stdout.write(
+            "Built %d range product memberships for %d ranges\n"
+            % (num_rows, len(ranges))
+        )
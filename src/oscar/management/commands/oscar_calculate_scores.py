@@ -1,6 +1,9 @@
 import logging
+from datetime import datetime, time
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
 from oscar.core.loading import get_class
 
@@ -10,7 +13,46 @@ logger = logging.getLogger(__name__)
 
 
 class Command(BaseCommand):
-    help = "Calculate product scores based on analytics data"
+    help = """Calculate product scores based on analytics data. Only the
+              records changed since the last calculation are recalculated,
+              unless an earlier --since or --all is given."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            dest="chunk_size",
+            type=int,
+            default=Calculator.chunk_size,
+            help="Number of records to update per transaction",
+        )
+        parser.add_argument(
+            "--since",
+            dest="since",
+            metavar="DATETIME",
+            help="Also recalculate the records changed since this date or time",
+        )
+        parser.add_argument(
+            "--all",
+            dest="recalculate_all",
+            action="store_true",
+            help="Recalculate all records, eg after changing the weights",
+        )
 
     def handle(self, *args, **options):
-        Calculator(logger).run()
+        since = options["since"]
+        if since:
+            since = self.parse_since(since)
+        Calculator(logger, chunk_size=options["chunk_size"]).run(
+            since=since, recalculate_all=options["recalculate_all"]
+        )
+
+    def parse_since(self, value):
+        since = parse_datetime(value)
+        if since is None:
+            date = parse_date(value)
+            if date is None:
+                raise CommandError("Invalid date or time: %s" % value)
+            since = datetime.combine(date, time.min)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from oscar.core.loading import get_class
+
+get_analytics_buffer = get_class("analytics.buffer", "get_analytics_buffer")
+
+
+class Command(BaseCommand):
+    help = """Write the analytics buffered as configured by
+              OSCAR_ANALYTICS_BUFFER to the database. Meant to be run
+              periodically."""
+
+    def handle(self, *args, **options):
+        buffer = get_analytics_buffer()
+        if buffer is None:
+            self.stdout.write("Analytics aren't buffered\n")
+            return
+        num_written = buffer.flush()
+        self.stdout.write(
+            "Wrote %d buffered analytics counters and views\n" % num_written
+        )
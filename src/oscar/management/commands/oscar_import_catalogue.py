@@ -30,11 +30,29 @@ class Command(BaseCommand):
             default=",",
             help="Delimiter used within CSV file(s)",
         )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=CatalogueImporter.batch_size,
+            help="Number of rows imported in each transaction",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            dest="resume",
+            default=False,
+            help="Carry on from the checkpoint of an interrupted import",
+        )
 
     def handle(self, *args, **options):
         logger.info("Starting catalogue import")
         importer = CatalogueImporter(
-            logger, delimiter=options.get("delimiter"), flush=options.get("flush")
+            logger,
+            delimiter=options.get("delimiter"),
+            flush=options.get("flush"),
+            batch_size=options["batch_size"],
+            resume=options["resume"],
         )
         for file_path in options["filename"]:
             logger.info(" - Importing records from '%s'", file_path)
@@ -42,3 +60,15 @@ class Command(BaseCommand):
                 importer.handle(file_path)
             except ImportingError as e:
                 raise CommandError(str(e))
+            self.stdout.write(
+                "%s: %d rows in %.1fs (%.0f rows/s), %d new and %d updated"
+                " products\n"
+                % (
+                    file_path,
+                    importer.stats["rows"],
+                    importer.stats["seconds"],
+                    importer.get_rate(),
+                    importer.stats["new_items"],
+                    importer.stats["updated_items"],
+                )
+            )
@@ -1,10 +1,12 @@
 import logging
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 from oscar.core.loading import get_class
 
 Importer = get_class("catalogue.utils", "Importer")
+ImageImportError = get_class("catalogue.exceptions", "ImageImportError")
+InvalidImageArchive = get_class("catalogue.exceptions", "InvalidImageArchive")
 
 logger = logging.getLogger("oscar.catalogue.import")
 
@@ -21,9 +23,35 @@ class Command(BaseCommand):
             default="upc",
             help="Product field to lookup from image filename",
         )
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            type=int,
+            default=None,
+            help="Number of processes checking images and of threads storing"
+            " them (defaults to the number of processors)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=Importer.batch_size,
+            help="Number of images imported in each transaction",
+        )
 
     def handle(self, *args, **options):
         logger.info("Starting image import")
         dirname = options["path"]
-        importer = Importer(logger, field=options.get("filename"))
-        importer.handle(dirname)
+        importer = Importer(
+            logger,
+            field=options.get("filename"),
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+        )
+        try:
+            stats = importer.handle(dirname)
+        except (ImageImportError, InvalidImageArchive) as e:
+            raise CommandError(str(e))
+        self.stdout.write(
+            "%(num_processed)d images imported, %(num_skipped)d skipped\n" % stats
+        )
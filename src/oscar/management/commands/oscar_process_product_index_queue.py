@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand
+from haystack.constants import DEFAULT_ALIAS
+
+from oscar.core.loading import get_class
+
+ProductIndexQueue = get_class("search.indexing", "ProductIndexQueue")
+
+
+class Command(BaseCommand):
+    help = """Reindex the products queued as changed when
+              OSCAR_SEARCH_INDEX_QUEUE is enabled."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--using",
+            dest="using",
+            default=DEFAULT_ALIAS,
+            help="The Haystack connection to update",
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=ProductIndexQueue.batch_size,
+            help="Number of queued changes to process at once",
+        )
+        parser.add_argument(
+            "--loop",
+            dest="loop",
+            action="store_true",
+            help="Keep processing changes as they are queued",
+        )
+        parser.add_argument(
+            "--interval",
+            dest="interval",
+            type=float,
+            default=5,
+            help="Seconds to wait for changes when looping and the queue is empty",
+        )
+        parser.add_argument(
+            "--stats",
+            dest="stats",
+            action="store_true",
+            help="Print the length and lag of the queue and exit",
+        )
+
+    def handle(self, *args, **options):
+        queue = ProductIndexQueue(
+            using=options["using"], batch_size=options["batch_size"]
+        )
+        if options["stats"]:
+            self.print_stats(queue)
+            return
+        while True:
+            num_processed = queue.process()
+            if num_processed:
+                self.stdout.write("Processed %d queued changes\n" % num_processed)
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+    def print_stats(self, queue):
+        lag = queue.get_lag()
+        self.stdout.write("Queued changes: %d\n" % queue.get_length())
+        self.stdout.write(
+            "Lag: %s\n" % ("%.1f seconds" % lag.total_seconds() if lag else "none")
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from oscar.core.loading import get_class
+
+SalesRecords = get_class("analytics.sales", "SalesRecords")
+
+
+class Command(BaseCommand):
+    help = """Rebuild the hourly and daily sales records read by the dashboard
+              from all the orders."""
+
+    def handle(self, *args, **options):
+        num_hours = SalesRecords().rebuild()
+        self.stdout.write("Rebuilt the sales records of %d hours\n" % num_hours)
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from oscar.core.loading import get_class
+
+hierarchy_refresher = get_class("catalogue.hierarchy", "hierarchy_refresher")
+
+
+class Command(BaseCommand):
+    help = """Refresh the product category hierarchy if it has been marked
+              dirty. Meant to be run periodically when
+              OSCAR_CATALOGUE_MATERIALISED_VIEW_REFRESH_INTERVAL is set, or
+              after changes that bypass signals (eg moving categories)."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Refresh the hierarchy even if it hasn't been marked dirty",
+        )
+
+    def handle(self, *args, **options):
+        if options["force"]:
+            hierarchy_refresher.refresh()
+            refreshed = True
+        else:
+            refreshed = hierarchy_refresher.refresh_if_dirty()
+        if refreshed:
+            self.stdout.write("Refreshed the product category hierarchy\n")
+        else:
+            self.stdout.write("The product category hierarchy is up to date\n")
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from oscar.core.loading import get_class
+
+ReportJobQueue = get_class("dashboard.reports.jobs", "ReportJobQueue")
+
+
+class Command(BaseCommand):
+    help = """Generate the reports queued from the reports dashboard to be
+              generated in the background."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            dest="loop",
+            action="store_true",
+            help="Keep generating reports as they are queued",
+        )
+        parser.add_argument(
+            "--interval",
+            dest="interval",
+            type=float,
+            default=5,
+            help="Seconds to wait for reports when looping and none are queued",
+        )
+
+    def handle(self, *args, **options):
+        queue = ReportJobQueue()
+        while True:
+            num_run = queue.process()
+            if num_run:
+                self.stdout.write("Ran %d report jobs\n" % num_run)
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -104,6 +104,21 @@ var oscar = (function(o, $) {
         }
     };
 
+    // Mini-basket in the header, whose lines are only loaded when its
+    // dropdown is opened.
+    o.miniBasket = {
+        init: function() {
+            $('.basket-mini').on('show.bs.dropdown', function() {
+                var $menu = $(this).find('[data-behaviours~="load-basket-lines"]');
+                if ($menu.data('loaded')) {
+                    return;
+                }
+                $menu.data('loaded', true);
+                $menu.load($menu.data('url'));
+            });
+        }
+    };
+
     o.basket = {
         is_form_being_submitted: false,
         init: function(options) {
@@ -298,6 +313,7 @@ var oscar = (function(o, $) {
     o.init = function() {
         o.forms.init();
         o.datetimepickers.init();
+        o.miniBasket.init();
     };
 
     return o;
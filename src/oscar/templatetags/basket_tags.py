@@ -37,3 +37,13 @@ def basket_form(request, product, quantity_type="single"):
     )
 
     return form
+
+
+@register.simple_tag(takes_context=True)
+def basket_summary(context):
+    """
+    Return the number of items and totals of the request basket, without
+    loading the basket lines or applying offers if possible.
+    """
+    request = context.get("request")
+    return getattr(request, "basket_summary", None)
@@ -1,9 +1,10 @@
 from django import template
 
-from oscar.core.loading import get_model
+from oscar.core.loading import get_class, get_model
 
 register = template.Library()
 Category = get_model("catalogue", "category")
+get_category_tree = get_class("catalogue.tree", "get_category_tree")
 
 
 class PassThrough(object):
@@ -79,21 +80,26 @@ def get_annotated_list(depth=None, parent=None):
     max_depth = depth
 
     annotated_categories = []
-    tree_slug = ""
 
     start_depth, prev_depth = (None, None)
-    if parent:
-        categories = parent.get_descendants()
-        tree_slug = parent.get_full_slug()
-        if max_depth is not None:
-            max_depth += parent.get_depth()
+    if parent and max_depth is not None:
+        max_depth += parent.get_depth()
+
+    tree = get_category_tree()
+    if tree is not None:
+        nodes = tree.get_menu(parent, max_depth)
+        categories = [node.category for node in nodes]
+        urls = {node.pk: node.get_absolute_url() for node in nodes}
     else:
-        categories = Category.get_tree()
-
-    if max_depth is not None:
-        categories = categories.filter(depth__lte=max_depth)
-
-    categories = categories.for_menu()
+        categories = parent.get_descendants() if parent else Category.get_tree()
+        if max_depth is not None:
+            categories = categories.filter(depth__lte=max_depth)
+        categories = list(categories.for_menu())
+        full_slugs = Category.get_full_slugs(categories)
+        urls = {
+            category.pk: category._get_absolute_url(full_slug=full_slugs[category.pk])
+            for category in categories
+        }
 
     info = CheapCategoryInfo(parent, url="")
 
@@ -106,21 +112,14 @@ def get_annotated_list(depth=None, parent=None):
         # Update previous node's info
         if prev_depth is None or node_depth > prev_depth:
             info["has_children"] = True
-            if info.category is not None:
-                tree_slug = info.category.get_full_slug(tree_slug)
 
         if prev_depth is not None and node_depth < prev_depth:
             depth_difference = prev_depth - node_depth
             info["num_to_close"] = list(range(0, depth_difference))
-            tree_slugs = tree_slug.rsplit(node._slug_separator, depth_difference)
-            if tree_slugs:
-                tree_slug = tree_slugs[0]
-            else:
-                tree_slug = node.slug
 
         info = CheapCategoryInfo(
             node,
-            url=node._get_absolute_url(tree_slug),
+            url=urls[node.pk],
             num_to_close=[],
             level=node_depth - start_depth,
         )
@@ -3,8 +3,30 @@ from django import template
 register = template.Library()
 
 
+@register.simple_tag
+def prefetch_purchase_info(request, products):
+    """
+    Fetch the purchase info of a page of products at once, for
+    ``purchase_info_for_product`` to use when rendering them.
+
+    Accepts products or search results.
+    """
+    products = [getattr(product, "object", product) for product in products]
+    purchase_info = request.strategy.fetch_for_products(
+        [product for product in products if product is not None]
+    )
+    if not hasattr(request, "prefetched_purchase_info"):
+        request.prefetched_purchase_info = {}
+    request.prefetched_purchase_info.update(purchase_info)
+    return ""
+
+
 @register.simple_tag
 def purchase_info_for_product(request, product):
+    prefetched = getattr(request, "prefetched_purchase_info", {})
+    if product.pk in prefetched:
+        return prefetched[product.pk]
+
     if product.is_parent:
         return request.strategy.fetch_for_parent(product)
 
@@ -32,6 +32,8 @@ def anchor(context, field, title=None):
     request = context["request"]
     get_vars = request.GET.copy()
     sort_field = get_vars.pop("sort", [None])[0]
+    # Keyset cursors only make sense for the ordering they were made for
+    get_vars.pop("cursor", None)
 
     icon = ""
     if sort_field == field:
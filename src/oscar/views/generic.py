@@ -2,7 +2,8 @@ import hashlib
 import time
 
 from django.contrib import messages
-from django.http import HttpResponseBase, JsonResponse
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponseBase, JsonResponse
 from django.shortcuts import redirect
 from django.template.response import TemplateResponse
 from django.utils.encoding import smart_str
@@ -10,6 +11,7 @@ from django.utils.translation import gettext_lazy as _
 from django.views.generic.base import View
 from django.conf import settings
 
+from oscar.core.pagination import KeysetPaginator
 from oscar.core.utils import safe_referrer
 
 
@@ -92,6 +94,40 @@ class PostActionMixin:
             return self.get(request, *args, **kwargs)
 
 
+class KeysetPaginationMixin:
+    """
+    Mixin for list views to paginate their queryset by keyset rather than by
+    offset, using ``KeysetPaginator``.
+
+    Pages are requested with a ``cursor`` parameter instead of a page
+    number, and the total number of objects is approximated.  The queryset
+    must be ordered by non-nullable fields of its model.
+    """
+
+    page_kwarg = "cursor"
+    paginator_class = KeysetPaginator
+    approximate_count = True
+
+    def get_paginator(
+        self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs
+    ):
+        # Keyset pages have no orphans, and the first page may be empty
+        return self.paginator_class(
+            queryset, per_page, approximate_count=self.approximate_count, **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = self.get_paginator(queryset, page_size)
+        cursor = self.kwargs.get(self.page_kwarg) or self.request.GET.get(
+            self.page_kwarg
+        )
+        try:
+            page = paginator.page(cursor)
+        except InvalidPage as e:
+            raise Http404(_("Invalid page: %s") % e)
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
 class BulkEditMixin:
     """
     Mixin for views that have a bulk editing facility.  This is normally in the
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalogue", "0033_productcategoryhierarchy_table"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productimage",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                editable=False,
+                max_length=64,
+                verbose_name="Content hash",
+            ),
+        ),
+    ]
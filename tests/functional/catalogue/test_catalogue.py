@@ -1,11 +1,13 @@
 from http import client as http_client
 
 from django.conf import settings
+from django.test import override_settings
 from django.urls import reverse
 from django.utils.translation import gettext
 from django.core.management import call_command
 
 from oscar.apps.catalogue.models import Category
+from oscar.apps.catalogue.tree import category_tree_cache
 from oscar.test.factories import create_product
 from oscar.test.testcases import WebTestCase
 
@@ -178,3 +180,11 @@ class TestProductCategoryView(WebTestCase):
         child.save()
         response = self.app.get(child.get_absolute_url(), expect_errors=True)
         self.assertEqual(http_client.NOT_FOUND, response.status_code)
+
+
+@override_settings(OSCAR_CATALOGUE_CACHE_CATEGORY_TREE=True)
+class TestProductCategoryViewWithCategoryTree(TestProductCategoryView):
+    def setUp(self):
+        category_tree_cache.clear()
+        self.addCleanup(category_tree_cache.clear)
+        super().setUp()
@@ -1,5 +1,6 @@
 from decimal import Decimal as D
 
+from django.test import override_settings
 from django.urls import reverse
 from oscar.core.compat import get_user_model
 
@@ -15,6 +16,7 @@ from oscar.test.factories import (
 )
 from oscar.test.testcases import WebTestCase
 
+Basket = get_model("basket", "Basket")
 StockAlert = get_model("partner", "StockAlert")
 DashboardPermission = get_class("dashboard.permissions", "DashboardPermission")
 User = get_user_model()
@@ -89,10 +91,42 @@ class TestDashboardIndexForStaffUser(WebTestCase):
         self.assertEqual(len(report["y_range"]), 11)
         self.assertEqual(report["max_revenue"], D("60"))
 
+    @override_settings(OSCAR_DASHBOARD_USE_SALES_RECORDS=True)
+    def test_includes_hourly_report_from_sales_records(self):
+        create_order(total=prices.Price("GBP", excl_tax=D("34.05"), tax=D("0.00")))
+        create_order(total=prices.Price("GBP", excl_tax=D("21.90"), tax=D("0.00")))
+        Order.objects.all().delete()
+        report = IndexView().get_hourly_report(None, from_records=True)
+
+        self.assertEqual(len(report["order_total_hourly"]), 12)
+        self.assertEqual(report["order_total_hourly"][-1]["total_incl_tax"], D("55.95"))
+        self.assertEqual(report["max_revenue"], D("60"))
+
+    @override_settings(OSCAR_DASHBOARD_USE_SALES_RECORDS=True)
+    def test_reads_stats_from_sales_records(self):
+        order = create_order(user=UserFactory())
+        create_order()
+        Order.objects.filter(pk=order.pk).delete()
+        Basket.objects.create()
+        Basket.objects.create().submit()
+        response = self.get(reverse("dashboard:index"))
+        for key in GENERIC_STATS_KEYS + STAFF_STATS_KEYS:
+            self.assertInContext(response, key)
+        # The records aren't updated when orders are deleted
+        self.assertEqual(response.context["total_orders"], 2)
+        self.assertEqual(response.context["total_orders_last_day"], 2)
+        self.assertEqual(response.context["total_customers"], 1)
+        self.assertEqual(response.context["average_order_costs"], order.total_incl_tax)
+        self.assertEqual(response.context["total_open_baskets"], 1)
+        self.assertEqual(response.context["total_open_baskets_last_day"], 1)
+        self.assertContains(response, "First-time Buyers")
+        self.assertNotContains(response, "New Customers")
+
     def test_has_stats_vars_in_context(self):
         response = self.get(reverse("dashboard:index"))
         for key in GENERIC_STATS_KEYS + STAFF_STATS_KEYS:
             self.assertInContext(response, key)
+        self.assertContains(response, "New Customers")
 
     def test_login_redirects_to_dashboard_index(self):
         page = self.get(reverse("dashboard:login"))
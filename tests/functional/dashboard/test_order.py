@@ -1,7 +1,13 @@
+from decimal import Decimal as D
 from http import client as http_client
+from io import StringIO
+from unittest import mock
 
 from django.conf import settings
+from django.core.management import call_command
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 
 from oscar.apps.order.models import Order, OrderNote, PaymentEvent, PaymentEventType
 from oscar.core.loading import get_model, get_class
@@ -11,6 +17,7 @@ from oscar.test.factories import (
     SourceTypeFactory,
     create_basket,
     create_order,
+    create_product,
 )
 from oscar.test.testcases import WebTestCase
 
@@ -18,6 +25,7 @@ Basket = get_model("basket", "Basket")
 Partner = get_model("partner", "Partner")
 ShippingAddress = get_model("order", "ShippingAddress")
 DashboardPermission = get_class("dashboard.permissions", "DashboardPermission")
+OrderListView = get_class("dashboard.orders.views", "OrderListView")
 
 
 class TestOrderListDashboard(WebTestCase):
@@ -43,6 +51,41 @@ class TestOrderListDashboard(WebTestCase):
         self.assertEqual(response.headers["Content-Type"], "text/csv")
         self.assertIn("orders.csv", response.headers["Content-Disposition"])
 
+    def test_downloads_number_of_items_of_orders(self):
+        basket = create_basket(empty=True)
+        basket.add_product(create_product(price=D("5.00")), quantity=3)
+        order = create_order(basket=basket)
+        response = self.get(
+            reverse("dashboard:order-list"), params={"response_format": "csv"}
+        )
+        rows = response.content.decode("utf8").splitlines()
+        self.assertEqual(len(rows), 2)
+        self.assertIn(str(order.number), rows[1])
+        self.assertIn(",3,", rows[1])
+
+    def test_counts_items_of_orders_without_annotations(self):
+        basket = create_basket(empty=True)
+        basket.add_product(create_product(price=D("5.00")), quantity=3)
+        order = create_order(basket=basket)
+        row = OrderListView().get_row_values(Order.objects.get(pk=order.pk))
+        self.assertEqual(row["num_items"], 3)
+
+    def test_pages_through_orders_by_cursor(self):
+        orders = [create_order() for __ in range(3)]
+        url = reverse("dashboard:order-list")
+        with mock.patch.object(OrderListView, "paginate_by", 2):
+            page = self.get(url, params={"sort": "number"})
+            first = list(page.context["orders"])
+            self.assertEqual(first, orders[:2])
+            page = page.click(linkid=None, href="cursor=")
+            self.assertEqual(list(page.context["orders"]), orders[2:])
+
+    def test_rejects_invalid_cursor(self):
+        response = self.get(
+            reverse("dashboard:order-list"), params={"cursor": "nonsense"}, status="*"
+        )
+        self.assertEqual(http_client.NOT_FOUND, response.status_code)
+
     def test_allows_order_number_search(self):
         page = self.get(reverse("dashboard:order-list"))
         form = page.forms["search_form"]
@@ -50,6 +93,42 @@ class TestOrderListDashboard(WebTestCase):
         form.submit()
 
 
+class TestOrderStatsDashboard(WebTestCase):
+    is_staff = True
+    permissions = DashboardPermission.get("order", "view_order")
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        self.order = create_order(date_placed=now)
+        create_order(date_placed=now - timezone.timedelta(days=3))
+        self.today = timezone.localdate(now)
+
+    def get_stats(self, **params):
+        return self.get(reverse("dashboard:order-stats"), params=params).context
+
+    def test_shows_totals(self):
+        context = self.get_stats()
+        self.assertEqual(context["total_orders"], 2)
+        context = self.get_stats(date_from=self.today.isoformat())
+        self.assertEqual(context["total_orders"], 1)
+        self.assertEqual(context["total_revenue"], self.order.total_incl_tax)
+
+    @override_settings(OSCAR_DASHBOARD_USE_SALES_RECORDS=True)
+    def test_reads_totals_from_sales_records(self):
+        # The orders were placed before the records were enabled
+        call_command("oscar_rebuild_sales_records", stdout=StringIO())
+        Order.objects.all().delete()
+        context = self.get_stats()
+        self.assertEqual(context["total_orders"], 2)
+        context = self.get_stats(date_from=self.today.isoformat())
+        self.assertEqual(context["total_orders"], 1)
+        self.assertEqual(context["total_lines"], 1)
+        self.assertEqual(context["total_revenue"], self.order.total_incl_tax)
+        context = self.get_stats(date_to=self.today.isoformat())
+        self.assertEqual(context["total_orders"], 1)
+
+
 class PermissionBasedDashboardOrderTestsBase(WebTestCase):
     permissions = DashboardPermission.partner_dashboard_access
     username = "user1@example.com"
@@ -1,9 +1,14 @@
+import shutil
+import tempfile
+
 from django.urls import reverse
 
-from oscar.core.loading import get_class
+from oscar.core.loading import get_class, get_model
 from oscar.test.testcases import WebTestCase
 
 DashboardPermission = get_class("dashboard.permissions", "DashboardPermission")
+ReportJobQueue = get_class("dashboard.reports.jobs", "ReportJobQueue")
+ReportJob = get_model("analytics", "ReportJob")
 
 
 class ReportsDashboardTests(WebTestCase):
@@ -43,3 +48,26 @@ class ReportsDashboardTests(WebTestCase):
         response.forms["generate_report_form"]["download"] = "true"
         response.forms["generate_report_form"].submit()
         self.assertIsOk(response)
+
+    def test_generates_reports_in_the_background(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        url = reverse("dashboard:reports-index")
+        response = self.get(url)
+        form = response.forms["generate_report_form"]
+        form["report_type"] = "order_report"
+        form["in_background"] = True
+        response = form.submit().follow()
+        self.assertIsOk(response)
+        job = ReportJob.objects.get()
+        self.assertEqual(job.code, "order_report")
+        self.assertEqual(job.user, self.user)
+
+        with self.settings(MEDIA_ROOT=media_root):
+            ReportJobQueue().process()
+            response = self.get(reverse("dashboard:reports-jobs"))
+            response = response.click(
+                href=reverse("dashboard:reports-job-download", kwargs={"pk": job.pk})
+            )
+        self.assertIsOk(response)
+        self.assertEqual(response.headers["Content-Type"], "application/gzip")
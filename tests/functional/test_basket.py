@@ -118,6 +118,21 @@ class TestMergedBasketsMessage(TestCase):
         self.assertEqual(messages[2].message, expected)
 
 
+class BasketQuickViewTests(WebTestCase):
+    csrf_checks = False
+
+    def test_lists_basket_lines(self):
+        product = create_product(title="Quick product", num_in_stock=10)
+        self.app.post(reverse("basket:add", args=(product.pk,)), params={"quantity": 1})
+        response = self.app.get(reverse("basket:quick"))
+        self.assertEqual(http_client.OK, response.status_code)
+        self.assertContains(response, "Quick product")
+
+    def test_empty_basket(self):
+        response = self.app.get(reverse("basket:quick"))
+        self.assertContains(response, "Your basket is empty.")
+
+
 class BasketSummaryViewTests(WebTestCase):
     def setUp(self):
         url = reverse("basket:summary")
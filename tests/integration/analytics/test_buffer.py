@@ -0,0 +1,141 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from oscar.apps.analytics import receivers
+from oscar.apps.analytics.buffer import (
+    CacheAnalyticsBuffer,
+    InProcessAnalyticsBuffer,
+    get_analytics_buffer,
+)
+from oscar.apps.analytics.models import ProductRecord, UserProductView, UserRecord
+from oscar.test.factories import UserFactory, create_product
+
+unbuffered_settings = override_settings(
+    OSCAR_ANALYTICS_BUFFER_FLUSH_INTERVAL=None,
+    OSCAR_ANALYTICS_BUFFER_FLUSH_THRESHOLD=None,
+)
+
+
+class BufferTestMixin(object):
+    buffer_class = None
+
+    def setUp(self):
+        cache.clear()
+        self.buffer = self.buffer_class()
+        self.product = create_product()
+        self.other_product = create_product()
+        self.user = UserFactory()
+        ProductRecord.objects.create(product=self.product, num_views=2)
+
+    def test_accumulates_increments_until_flushed(self):
+        for __ in range(3):
+            self.buffer.increment("product", self.product.pk, "num_views")
+        self.buffer.increment("product", self.other_product.pk, "num_views", 2)
+        self.buffer.increment("product", self.other_product.pk, "num_purchases")
+        self.buffer.increment("user", self.user.pk, "num_product_views")
+        self.buffer.add_product_view(self.product.pk, self.user.pk)
+        self.assertEqual(UserProductView.objects.count(), 0)
+
+        with self.assertNumQueries(10):
+            self.assertEqual(self.buffer.flush(), 5)
+
+        self.assertEqual(ProductRecord.objects.get(product=self.product).num_views, 5)
+        other = ProductRecord.objects.get(product=self.other_product)
+        self.assertEqual((other.num_views, other.num_purchases), (2, 1))
+        self.assertEqual(UserRecord.objects.get(user=self.user).num_product_views, 1)
+        self.assertEqual(UserProductView.objects.get().product, self.product)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_ignores_deleted_objects(self):
+        self.buffer.increment("product", self.other_product.pk, "num_views")
+        self.buffer.add_product_view(self.other_product.pk, self.user.pk)
+        self.other_product.delete()
+        self.buffer.flush()
+        self.assertEqual(ProductRecord.objects.count(), 1)
+        self.assertEqual(UserProductView.objects.count(), 0)
+
+    @override_settings(OSCAR_ANALYTICS_BUFFER_FLUSH_THRESHOLD=3)
+    def test_flushes_in_background_at_threshold(self):
+        with mock.patch.object(self.buffer, "flush") as flush:
+            self.buffer.increment("product", self.product.pk, "num_views")
+            self.buffer.increment("product", self.product.pk, "num_views")
+            self.assertIsNone(self.buffer._flush_thread)
+            self.buffer.increment("product", self.product.pk, "num_views")
+            self.buffer._flush_thread.join()
+        flush.assert_called_once_with()
+
+
+@unbuffered_settings
+class TestInProcessAnalyticsBuffer(BufferTestMixin, TestCase):
+    buffer_class = InProcessAnalyticsBuffer
+
+    def test_keeps_events_when_writing_fails(self):
+        self.buffer.increment("product", self.product.pk, "num_views")
+        self.buffer.increment("product", "invalid", "num_views")
+        with self.assertRaises(ValueError):
+            self.buffer.flush()
+        self.buffer.increment("product", self.product.pk, "num_views")
+        self.assertEqual(
+            self.buffer._increments[("product", self.product.pk, "num_views")], 2
+        )
+
+
+@unbuffered_settings
+class TestCacheAnalyticsBuffer(BufferTestMixin, TestCase):
+    buffer_class = CacheAnalyticsBuffer
+
+    def test_shares_events_between_buffers(self):
+        self.buffer.increment("product", self.product.pk, "num_views")
+        CacheAnalyticsBuffer().increment("product", self.product.pk, "num_views")
+        CacheAnalyticsBuffer().flush()
+        self.assertEqual(ProductRecord.objects.get(product=self.product).num_views, 4)
+
+    def test_waits_for_entries_not_stored_yet(self):
+        self.buffer.increment("product", self.product.pk, "num_views")
+        # A sequence number taken by another process, which hasn't stored
+        # its entry yet
+        sequence = cache.incr(self.buffer.get_key("sequence"))
+        self.buffer.increment("product", self.product.pk, "num_views")
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(ProductRecord.objects.get(product=self.product).num_views, 3)
+
+        cache.set(
+            self.buffer.get_key(sequence),
+            ("increment", ("product", self.product.pk, "num_views"), 1),
+        )
+        self.buffer.flush()
+        self.assertEqual(ProductRecord.objects.get(product=self.product).num_views, 5)
+
+    def test_skips_lost_entries(self):
+        cache.add(self.buffer.get_key("sequence"), 0, None)
+        cache.incr(self.buffer.get_key("sequence"))
+        self.buffer.increment("product", self.product.pk, "num_views")
+        self.assertEqual(self.buffer.flush(), 0)
+        with mock.patch.object(CacheAnalyticsBuffer, "missing_entry_timeout", 0):
+            self.assertEqual(self.buffer.flush(), 1)
+        self.assertEqual(ProductRecord.objects.get(product=self.product).num_views, 3)
+
+
+@unbuffered_settings
+@override_settings(
+    OSCAR_ANALYTICS_BUFFER="oscar.apps.analytics.buffer.InProcessAnalyticsBuffer"
+)
+class TestBufferedReceivers(TestCase):
+    def test_buffers_product_views_and_basket_additions(self):
+        product = create_product()
+        user = UserFactory()
+        with self.assertNumQueries(0):
+            receivers.receive_product_view(sender=self, product=product, user=user)
+            receivers.receive_basket_addition(sender=self, product=product, user=user)
+
+        out = StringIO()
+        call_command("oscar_flush_analytics", stdout=out)
+        self.assertIn("Wrote 5 buffered analytics counters and views", out.getvalue())
+        record = ProductRecord.objects.get(product=product)
+        self.assertEqual((record.num_views, record.num_basket_additions), (1, 1))
+        self.assertEqual(UserProductView.objects.filter(user=user).count(), 1)
+        self.assertIsInstance(get_analytics_buffer(), InProcessAnalyticsBuffer)
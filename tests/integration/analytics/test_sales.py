@@ -0,0 +1,139 @@
+from datetime import timedelta
+from decimal import Decimal as D
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from oscar.apps.analytics.models import DailySalesRecord, HourlySalesRecord
+from oscar.apps.analytics.sales import SalesRecords
+from oscar.apps.basket.models import Basket
+from oscar.test.factories import UserFactory, create_order
+
+
+@override_settings(OSCAR_DASHBOARD_USE_SALES_RECORDS=True)
+class TestRecordingOrders(TestCase):
+    def setUp(self):
+        self.records = SalesRecords()
+        self.placed = timezone.now().replace(minute=30)
+
+    def test_adds_placed_orders_to_their_hour_and_day(self):
+        user = UserFactory()
+        order = create_order(user=user, date_placed=self.placed)
+        create_order(user=user, date_placed=self.placed)
+        create_order(date_placed=self.placed - timedelta(days=1))
+        hour = HourlySalesRecord.objects.get(hour=self.records.get_hour(self.placed))
+        self.assertEqual(hour.num_orders, 2)
+        self.assertEqual(hour.num_lines, 2)
+        self.assertEqual(hour.num_items, 2)
+        self.assertEqual(hour.revenue, 2 * order.total_incl_tax)
+        self.assertEqual(hour.num_new_customers, 1)
+        day = DailySalesRecord.objects.get(day=self.records.get_day(self.placed))
+        self.assertEqual(day.num_orders, 2)
+        self.assertEqual(DailySalesRecord.objects.count(), 2)
+
+    def test_reads_totals(self):
+        order = create_order(date_placed=self.placed)
+        create_order(date_placed=self.placed - timedelta(days=2))
+        self.assertEqual(self.records.get_totals()["num_orders"], 2)
+        today = self.records.get_day(self.placed)
+        self.assertEqual(self.records.get_totals(start_day=today)["num_orders"], 1)
+        totals = self.records.get_totals_since(self.placed - timedelta(hours=1))
+        self.assertEqual(totals["revenue"], order.total_incl_tax)
+
+    def test_reads_zero_totals_without_records(self):
+        totals = self.records.get_totals()
+        self.assertEqual(totals["revenue"], D("0.00"))
+        self.assertEqual(totals["num_orders"], 0)
+
+    @override_settings(OSCAR_DASHBOARD_USE_SALES_RECORDS=False)
+    def test_doesnt_record_orders_unless_enabled(self):
+        create_order()
+        Basket.objects.create()
+        self.assertFalse(HourlySalesRecord.objects.exists())
+        self.assertFalse(DailySalesRecord.objects.exists())
+
+
+@override_settings(OSCAR_DASHBOARD_USE_SALES_RECORDS=True)
+class TestRecordingOpenBaskets(TestCase):
+    def setUp(self):
+        self.records = SalesRecords()
+
+    def get_num_open_baskets(self):
+        return self.records.get_totals()["num_open_baskets"]
+
+    def test_counts_baskets_while_they_are_open(self):
+        basket = Basket.objects.create()
+        Basket.objects.create()
+        self.assertEqual(self.get_num_open_baskets(), 2)
+        hour = HourlySalesRecord.objects.get(
+            hour=self.records.get_hour(basket.date_created)
+        )
+        self.assertEqual(hour.num_open_baskets, 2)
+
+        basket.freeze()
+        self.assertEqual(self.get_num_open_baskets(), 1)
+        basket.thaw()
+        self.assertEqual(self.get_num_open_baskets(), 2)
+        basket.submit()
+        self.assertEqual(self.get_num_open_baskets(), 1)
+
+    def test_counts_changes_to_loaded_baskets(self):
+        basket = Basket.objects.create()
+        Basket.objects.get(pk=basket.pk).submit()
+        self.assertEqual(self.get_num_open_baskets(), 0)
+        # Saving a closed basket again doesn't change the count
+        Basket.objects.get(pk=basket.pk).save()
+        self.assertEqual(self.get_num_open_baskets(), 0)
+
+    def test_counts_merged_and_deleted_baskets(self):
+        basket = Basket.objects.create()
+        other = Basket.objects.create()
+        Basket.objects.create().delete()
+        self.assertEqual(self.get_num_open_baskets(), 2)
+        basket.merge(other)
+        self.assertEqual(self.get_num_open_baskets(), 1)
+        Basket.objects.all().delete()
+        self.assertEqual(self.get_num_open_baskets(), 0)
+
+
+@override_settings(OSCAR_DASHBOARD_USE_SALES_RECORDS=True)
+class TestRebuildingRecords(TestCase):
+    maxDiff = None
+
+    def test_matches_recorded_orders(self):
+        placed = timezone.now().replace(minute=30)
+        user = UserFactory()
+        create_order(date_placed=placed - timedelta(days=3))
+        create_order(user=user, date_placed=placed - timedelta(hours=3))
+        create_order(user=user, date_placed=placed)
+        Basket.objects.create()
+        Basket.objects.create().freeze()
+        recorded = {
+            model: list(model.objects.values(*self.get_fields(model)))
+            for model in (HourlySalesRecord, DailySalesRecord)
+        }
+        HourlySalesRecord.objects.update(num_orders=0, num_open_baskets=0)
+        DailySalesRecord.objects.all().delete()
+
+        self.assertEqual(SalesRecords().rebuild(), 3)
+        for model, records in recorded.items():
+            self.assertCountEqual(
+                list(model.objects.values(*self.get_fields(model))), records
+            )
+
+    def get_fields(self, model):
+        return [
+            field.name
+            for field in model._meta.concrete_fields
+            if field.name not in ("id", "date_updated")
+        ]
+
+    def test_command_rebuilds_records(self):
+        create_order()
+        DailySalesRecord.objects.all().delete()
+        out = StringIO()
+        call_command("oscar_rebuild_sales_records", stdout=out)
+        self.assertEqual(DailySalesRecord.objects.get().num_orders, 1)
+        self.assertIn("1 hours", out.getvalue())
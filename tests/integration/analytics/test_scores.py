@@ -0,0 +1,146 @@
+import logging
+import math
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from oscar.apps.analytics.models import ProductRecord
+from oscar.apps.analytics.scores import Calculator
+from oscar.test.factories import create_product
+
+logger = logging.getLogger(__name__)
+
+
+class TestCalculator(TestCase):
+    def setUp(self):
+        # Scores of 1 to 5, last changed before any calculation
+        self.records = [
+            ProductRecord.objects.create(product=create_product(), num_views=9 * i)
+            for i in range(1, 6)
+        ]
+        ProductRecord.objects.update(date_updated=timezone.now() - timedelta(days=10))
+
+    def clear_counters_unnoticed(self):
+        ProductRecord.objects.update(
+            num_views=0, date_updated=timezone.now() - timedelta(days=20)
+        )
+
+    def get_scores(self):
+        return list(
+            ProductRecord.objects.order_by("pk").values_list("score", flat=True)
+        )
+
+    def test_calculates_weighted_scores_in_chunks(self):
+        calculator = Calculator(logger, chunk_size=2)
+        # Three chunks of one SELECT and one UPDATE each, and an empty SELECT
+        with self.assertNumQueries(7 + 6):
+            self.assertEqual(calculator.calculate_scores(), 5)
+        self.assertEqual(self.get_scores(), [1.0, 2.0, 3.0, 4.0, 5.0])
+
+    def test_only_recalculates_records_changed_since_the_last_run(self):
+        Calculator(logger).run()
+        self.clear_counters_unnoticed()
+        ProductRecord.objects.filter(pk=self.records[0].pk).update(
+            num_views=18, date_updated=timezone.now() + timedelta(minutes=10)
+        )
+        Calculator(logger).run()
+        self.assertEqual(self.get_scores(), [2.0, 2.0, 3.0, 4.0, 5.0])
+
+        Calculator(logger).run(recalculate_all=True)
+        self.assertEqual(self.get_scores(), [2.0, 0.0, 0.0, 0.0, 0.0])
+
+    def test_keeps_the_last_calculated_change_in_the_database(self):
+        Calculator(logger).run()
+        last_scored = ProductRecord.objects.order_by("-date_scored")[0]
+        self.assertEqual(last_scored.date_scored, last_scored.date_updated)
+
+        # Changed within the overlap of the last calculated change
+        ProductRecord.objects.filter(pk=self.records[1].pk).update(
+            num_views=0, date_updated=last_scored.date_updated - timedelta(minutes=1)
+        )
+        ProductRecord.objects.filter(pk=self.records[2].pk).update(
+            num_views=0, date_updated=last_scored.date_updated - timedelta(days=1)
+        )
+        Calculator(logger).run()
+        self.assertEqual(self.get_scores(), [1.0, 0.0, 3.0, 4.0, 5.0])
+
+    def test_recalculates_records_changed_since_a_given_time(self):
+        Calculator(logger).run()
+        self.clear_counters_unnoticed()
+        ProductRecord.objects.filter(pk=self.records[4].pk).update(
+            date_updated=timezone.now() - timedelta(days=2)
+        )
+        Calculator(logger).run(since=timezone.now() - timedelta(days=3))
+        self.assertEqual(self.get_scores(), [1.0, 2.0, 3.0, 4.0, 0.0])
+
+        # A later time doesn't skip changes since the last calculation
+        ProductRecord.objects.filter(pk=self.records[3].pk).update(
+            date_updated=timezone.now() - timedelta(days=1)
+        )
+        Calculator(logger).run(since=timezone.now())
+        self.assertEqual(self.get_scores(), [1.0, 2.0, 3.0, 0.0, 0.0])
+
+    @override_settings(OSCAR_ANALYTICS_SCORE_HALF_LIFE=7)
+    def test_decayed_scores_favour_recent_activity(self):
+        now = timezone.now()
+        ProductRecord.objects.filter(pk=self.records[1].pk).update(date_updated=now)
+        # Twice the activity, but two half-lives earlier
+        ProductRecord.objects.filter(pk=self.records[3].pk).update(
+            date_updated=now - timedelta(days=14)
+        )
+        ProductRecord.objects.filter(pk=self.records[0].pk).update(num_views=0)
+        Calculator(logger).run()
+
+        scores = self.get_scores()
+        self.assertEqual(scores[0], 0.0)
+        self.assertAlmostEqual(scores[1] - scores[3], math.log2(2 / 4) + 2)
+        self.assertGreater(scores[4], scores[2])
+
+    @override_settings(OSCAR_ANALYTICS_SCORE_HALF_LIFE=7)
+    def test_decayed_scores_only_count_new_activity_as_recent(self):
+        now = timezone.now()
+        ProductRecord.objects.filter(pk=self.records[0].pk).update(
+            num_views=9, date_updated=now - timedelta(days=14)
+        )
+        ProductRecord.objects.filter(pk=self.records[1].pk).update(
+            num_views=9, date_updated=now - timedelta(days=14)
+        )
+        Calculator(logger).run()
+        old_score = self.get_scores()[0]
+
+        # One more view today doesn't make the earlier ones count as recent
+        ProductRecord.objects.filter(pk=self.records[0].pk).update(
+            num_views=10, date_updated=now
+        )
+        ProductRecord.objects.filter(pk=self.records[1].pk).update(
+            num_views=9, date_updated=now
+        )
+        Calculator(logger).run()
+
+        scores = self.get_scores()
+        # Nine views, plus one view worth four at the earlier time
+        self.assertAlmostEqual(scores[0] - old_score, math.log2(13 / 9))
+        # Unchanged activity keeps its score
+        self.assertAlmostEqual(scores[1], old_score)
+
+        Calculator(logger).run(recalculate_all=True)
+        self.assertAlmostEqual(self.get_scores()[0] - old_score, math.log2(40 / 9))
+
+
+class TestCalculateScoresCommand(TestCase):
+    def setUp(self):
+        self.record = ProductRecord.objects.create(
+            product=create_product(), num_basket_additions=3
+        )
+
+    def test_calculates_scores(self):
+        call_command("oscar_calculate_scores", "--chunk-size", "10")
+        self.record.refresh_from_db()
+        self.assertEqual(self.record.score, 1.0)
+
+    def test_accepts_a_date_to_recalculate_from(self):
+        call_command("oscar_calculate_scores", "--since", "2000-01-01")
+        self.record.refresh_from_db()
+        self.assertEqual(self.record.score, 1.0)
@@ -1,7 +1,25 @@
+import datetime
+from decimal import Decimal as D
+from unittest import mock
+
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.http import HttpResponse
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from oscar.apps.basket import middleware
+from oscar.apps.basket.cache import basket_pricing_cache
+from oscar.apps.basket.models import Basket
+from oscar.apps.offer.models import Benefit, Condition
+from oscar.test.basket import add_product
+from oscar.test.factories import (
+    BasketFactory,
+    BenefitFactory,
+    ConditionalOfferFactory,
+    ConditionFactory,
+    RangeFactory,
+    VoucherFactory,
+)
 from oscar.test.utils import RequestFactory
 
 
@@ -38,3 +56,81 @@ class TestBasketMiddleware(TestCase):
 
         self.assertEqual(None, cookie_basket)
         self.assertIn("oscar_open_basket", request.cookies_to_delete)
+
+
+@override_settings(OSCAR_BASKET_CACHE_PRICING=True)
+class TestBasketPricingCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.middleware = middleware.BasketMiddleware(
+            TestBasketMiddleware.get_response_for_test
+        )
+        self.request = RequestFactory().get("/")
+        self.request.user = AnonymousUser()
+        self.basket = BasketFactory()
+        add_product(self.basket, D("10.00"), 2)
+        add_product(self.basket, D("5.00"))
+        self.line = self.basket.all_lines()[0]
+        rng = RangeFactory(includes_all_products=True)
+        condition = ConditionFactory(range=rng, type=Condition.COUNT, value=1)
+        benefit = BenefitFactory(range=rng, type=Benefit.PERCENTAGE, value=10)
+        self.offer = ConditionalOfferFactory(condition=condition, benefit=benefit)
+
+    def apply_offers(self):
+        basket = Basket.objects.get(pk=self.basket.pk)
+        basket.strategy = self.request.strategy
+        self.middleware.apply_offers_to_basket(self.request, basket)
+        return basket
+
+    def test_restores_discounts_of_unchanged_baskets(self):
+        first = self.apply_offers()
+        with mock.patch.object(middleware.Applicator, "apply") as apply:
+            second = self.apply_offers()
+            apply.assert_not_called()
+
+        self.assertEqual(second.total_discount, D("2.50"))
+        self.assertEqual(second.total_incl_tax, first.total_incl_tax)
+        self.assertEqual(list(second.applied_offers()), [self.offer.pk])
+        for line in second.all_lines():
+            self.assertTrue(line.has_offer_discount(self.offer))
+            self.assertEqual(line.quantity_without_discount, 0)
+
+    def test_changing_the_basket_applies_offers_again(self):
+        self.apply_offers()
+        self.line.quantity = 3
+        self.line.save()
+        basket = self.apply_offers()
+        self.assertEqual(basket.total_discount, D("3.50"))
+
+    def test_changing_offers_applies_offers_again(self):
+        self.apply_offers()
+        self.offer.status = self.offer.SUSPENDED
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offer.save()
+        basket = self.apply_offers()
+        self.assertEqual(basket.total_discount, D("0.00"))
+
+    def test_using_vouchers_applies_offers_again(self):
+        voucher = VoucherFactory()
+        self.basket.vouchers.add(voucher)
+        key = basket_pricing_cache.get_key(self.basket)
+        voucher.num_orders += 1
+        voucher.save()
+        self.assertNotEqual(basket_pricing_cache.get_key(self.basket), key)
+
+    def test_discounts_expire_when_an_applied_offer_ends(self):
+        self.offer.end_datetime = timezone.now() + datetime.timedelta(seconds=60)
+        self.offer.save()
+        basket = self.apply_offers()
+        self.assertLessEqual(basket_pricing_cache.get_timeout(basket), 60)
+
+    def test_discounts_expire_when_another_offer_starts(self):
+        ConditionalOfferFactory(
+            start_datetime=timezone.now() + datetime.timedelta(seconds=30)
+        )
+        basket = self.apply_offers()
+        self.assertLessEqual(basket_pricing_cache.get_timeout(basket), 30)
+
+    def test_discounts_are_kept_for_the_timeout_otherwise(self):
+        basket = self.apply_offers()
+        self.assertEqual(basket_pricing_cache.get_timeout(basket), 300)
@@ -9,7 +9,7 @@ from oscar.apps.basket.reports import (
     SubmittedBasketReportGenerator,
 )
 from oscar.core.loading import get_model
-from oscar.test.factories import BasketFactory
+from oscar.test.factories import BasketFactory, create_product
 
 Basket = get_model("basket", "Basket")
 
@@ -66,3 +66,15 @@ class TestBasketReports(TestCase):
         }
         generator = SubmittedBasketReportGenerator(**data)
         assert generator.queryset.count() == 1
+
+    def test_open_report_counts_lines_and_items_in_sql(self):
+        Basket.objects.all().delete()
+        basket = BasketFactory(status=Basket.OPEN)
+        basket.add_product(create_product(price=5), quantity=2)
+        basket.add_product(create_product(price=5), quantity=3)
+        generator = OpenBasketReportGenerator(formatter="CSV")
+        response = generator.generate()
+        with self.assertNumQueries(1):
+            rows = b"".join(response.streaming_content).decode("utf8").splitlines()
+        self.assertEqual(len(rows), 2)
+        self.assertIn(",2,5,", rows[1])
@@ -0,0 +1,95 @@
+from decimal import Decimal as D
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.utils.functional import empty
+from django.test import TestCase
+
+from oscar.apps.basket import middleware
+from oscar.apps.basket.summary import basket_summary_cache
+from oscar.apps.offer.models import Benefit, Condition
+from oscar.test.basket import add_product
+from oscar.test.factories import (
+    BasketFactory,
+    BenefitFactory,
+    ConditionalOfferFactory,
+    ConditionFactory,
+    RangeFactory,
+    UserFactory,
+)
+from oscar.test.utils import RequestFactory
+
+
+class TestBasketSummary(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.basket = BasketFactory(owner=self.user)
+        add_product(self.basket, D("10.00"), 2)
+        add_product(self.basket, D("5.00"))
+        rng = RangeFactory(includes_all_products=True)
+        condition = ConditionFactory(range=rng, type=Condition.COUNT, value=1)
+        benefit = BenefitFactory(range=rng, type=Benefit.PERCENTAGE, value=10)
+        ConditionalOfferFactory(condition=condition, benefit=benefit)
+
+    def get_request(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        middleware.BasketMiddleware(lambda request: HttpResponse())(request)
+        return request
+
+    def test_calculates_summary_from_line_prices(self):
+        request = self.get_request()
+        with self.assertNumQueries(2):
+            summary = request.basket_summary
+            self.assertEqual(summary.num_lines, 2)
+            self.assertEqual(summary.num_items, 3)
+            self.assertEqual(summary.total_excl_tax, D("25.00"))
+            self.assertTrue(summary.is_tax_known)
+            self.assertFalse(summary.includes_discounts)
+
+    def test_caches_summary_of_full_basket(self):
+        self.assertEqual(self.get_request().basket.total_excl_tax, D("22.50"))
+
+        request = self.get_request()
+        with self.assertNumQueries(1):
+            self.assertEqual(request.basket_summary.total_excl_tax, D("22.50"))
+            self.assertEqual(request.basket_summary.num_items, 3)
+            self.assertTrue(request.basket_summary.includes_discounts)
+
+    def test_changing_lines_discards_cached_summary(self):
+        basket = self.get_request().basket
+        basket_summary_cache.store(basket)
+        add_product(basket, D("1.00"))
+        self.assertEqual(self.get_request().basket_summary.num_items, 4)
+
+    def test_uses_loaded_basket(self):
+        request = self.get_request()
+        request.basket.num_items
+        with self.assertNumQueries(0):
+            self.assertEqual(request.basket_summary.total_excl_tax, D("22.50"))
+
+    def test_empty_basket(self):
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        middleware.BasketMiddleware(lambda request: HttpResponse())(request)
+        with self.assertNumQueries(0):
+            self.assertTrue(request.basket_summary.is_empty)
+
+    def test_template_tag(self):
+        template = Template(
+            "{% load basket_tags %}{% basket_summary as summary %}"
+            "{{ summary.num_items }}"
+        )
+        request = self.get_request()
+        self.assertEqual(template.render(Context({"request": request})), "3")
+
+    def test_mini_basket_doesnt_load_full_basket(self):
+        request = self.get_request()
+        html = render_to_string("oscar/partials/mini_basket.html", request=request)
+        self.assertIs(request.basket._wrapped, empty)
+        self.assertIn("Basket total before discounts:", html)
+        self.assertIn("25.00", html)
@@ -0,0 +1,157 @@
+from django.test import TestCase, override_settings
+from django.urls import path, re_path
+
+from oscar.apps.catalogue.browsing import ProductBrowser
+from oscar.apps.catalogue.categories import create_from_breadcrumbs
+from oscar.apps.catalogue.views import (
+    DatabaseCatalogueView,
+    DatabaseProductCategoryView,
+)
+from oscar.test import factories
+from tests._site.urls import urlpatterns as site_urlpatterns
+
+urlpatterns = [
+    path("browse/", DatabaseCatalogueView.as_view(paginate_by=2), name="browse"),
+    re_path(
+        r"^browse/(?P<pk>\d+)/$",
+        DatabaseProductCategoryView.as_view(enforce_paths=False),
+        name="browse-category",
+    ),
+] + site_urlpatterns
+
+
+class ColourBrowser(ProductBrowser):
+    attribute_facets = ("colour",)
+
+
+class BrowsingTestCase(TestCase):
+    def setUp(self):
+        self.books = create_from_breadcrumbs("Books")
+        self.fiction = create_from_breadcrumbs("Books > Fiction")
+        self.history = create_from_breadcrumbs("Books > History")
+        self.hidden = create_from_breadcrumbs("Books > Hidden")
+        self.hidden.is_public = False
+        self.hidden.save()
+
+        self.novel = self.create_product("Novel", "Book", self.fiction, "red")
+        self.saga = self.create_product("Saga", "Book", self.fiction, "blue")
+        self.atlas = self.create_product("Atlas", "Map", self.history, "red")
+        self.both = self.create_product("Chronicle", "Book", self.history, "blue")
+        self.both.categories.add(self.fiction)
+        self.secret = self.create_product("Secret", "Book", self.hidden, "red")
+        self.dvd = self.create_product("Film", "DVD", None, "red")
+
+    def create_product(self, title, product_class, category, colour):
+        product = factories.create_product(
+            title=title, product_class=product_class, attributes={"colour": colour}
+        )
+        if category is not None:
+            product.categories.add(category)
+        return product
+
+
+class TestProductBrowser(BrowsingTestCase):
+    def get_products(self, browser):
+        return set(browser.get_page(per_page=100))
+
+    def test_browses_browsable_categories_below_a_category(self):
+        browser = ProductBrowser(category=self.books)
+        self.assertEqual(
+            self.get_products(browser), {self.novel, self.saga, self.atlas, self.both}
+        )
+
+    def test_filters_by_selected_facets(self):
+        browser = ColourBrowser(
+            category=self.books,
+            selected_facets=[
+                "category:%s" % self.fiction.pk,
+                "product_class:book",
+                "attribute_colour:blue",
+                "unknown:value",
+            ],
+        )
+        self.assertEqual(self.get_products(browser), {self.saga, self.both})
+        self.assertEqual(len(browser.selected_facets), 3)
+
+    def test_sorts_products(self):
+        browser = ProductBrowser(category=self.books, sort_by="title-asc")
+        titles = [product.title for product in browser.get_page(per_page=100)]
+        self.assertEqual(titles, ["Atlas", "Chronicle", "Novel", "Saga"])
+
+    def test_counts_facets_of_other_selected_fields(self):
+        browser = ColourBrowser(
+            category=self.books,
+            selected_facets=["category:%s" % self.fiction.pk, "attribute_colour:red"],
+        )
+        with self.assertNumQueries(7):
+            counts = browser.get_facet_counts()
+        # Counted for red products
+        self.assertEqual(
+            counts["category"][1],
+            [
+                (str(self.fiction.pk), "Fiction", 1),
+                (str(self.history.pk), "History", 1),
+            ],
+        )
+        # Counted for fiction
+        self.assertEqual(
+            counts["attribute_colour"][1], [("blue", "blue", 2), ("red", "red", 1)]
+        )
+        self.assertEqual(counts["product_class"][1], [("book", "Book", 1)])
+
+    def test_builds_facet_urls(self):
+        browser = ProductBrowser(selected_facets=["product_class:book"])
+        facet_data = browser.get_facet_data(
+            "/browse/?selected_facets=product_class:book&cursor=abc"
+        )
+        results = {
+            datum["name"]: datum for datum in facet_data["product_class"]["results"]
+        }
+        self.assertTrue(results["Book"]["selected"])
+        self.assertEqual(results["Book"]["deselect_url"], "/browse/")
+        self.assertIn(
+            "selected_facets=product_class%3Advd", results["DVD"]["select_url"]
+        )
+        self.assertNotIn("cursor", results["DVD"]["select_url"])
+        categories = [datum["name"] for datum in facet_data["category"]["results"]]
+        self.assertEqual(categories, ["Books"])
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestDatabaseBrowseViews(BrowsingTestCase):
+    def test_pages_through_the_catalogue(self):
+        response = self.client.get("/browse/", {"sort_by": "title-asc"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["products"]), [self.atlas, self.both])
+        self.assertEqual(response.context["paginator"].count, 6)
+        self.assertTrue(response.context["has_facets"])
+
+        page = response.context["page_obj"]
+        response = self.client.get(
+            "/browse/", {"sort_by": "title-asc", "cursor": page.next_cursor}
+        )
+        self.assertEqual(list(response.context["products"]), [self.dvd, self.novel])
+        self.assertContains(
+            response, "cursor=%s" % response.context["page_obj"].previous_cursor
+        )
+
+    def test_redirects_invalid_cursors_to_the_first_page(self):
+        response = self.client.get(
+            "/browse/%d/" % self.books.pk, {"cursor": "nonsense"}
+        )
+        self.assertRedirects(
+            response, self.books.get_absolute_url(), fetch_redirect_response=False
+        )
+
+    def test_browses_a_category(self):
+        response = self.client.get(
+            "/browse/%d/" % self.books.pk,
+            {"selected_facets": "category:%s" % self.history.pk},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["category"], self.books)
+        self.assertEqual(set(response.context["products"]), {self.atlas, self.both})
+
+    def test_hides_non_public_categories(self):
+        response = self.client.get("/browse/%d/" % self.hidden.pk)
+        self.assertEqual(response.status_code, 404)
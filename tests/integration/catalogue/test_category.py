@@ -1,11 +1,16 @@
 # -*- coding: utf-8 -*-
 import json
+from unittest import mock
 
 from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
 from django.test.utils import override_settings
 
-from oscar.apps.catalogue.categories import create_from_breadcrumbs
+from oscar.apps.catalogue.categories import (
+    BulkCategoryCreator,
+    create_from_breadcrumbs,
+)
 from oscar.apps.catalogue.models import Category
 from oscar.templatetags.category_tags import get_annotated_list
 
@@ -63,6 +68,44 @@ class TestCategory(TestCase):
         )
 
 
+class TestCategoryFullSlugs(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        create_from_breadcrumbs("Books > Fiction > Horror > Teen")
+        create_from_breadcrumbs("Books > Fiction > Comedy")
+        self.categories = list(Category.objects.order_by("path"))
+        cache.clear()
+
+    def test_resolves_uncached_slugs_with_one_query(self):
+        with self.assertNumQueries(1):
+            full_slugs = Category.get_full_slugs(self.categories)
+        self.assertEqual(
+            [full_slugs[category.pk] for category in self.categories],
+            [
+                "books",
+                "books/fiction",
+                "books/fiction/horror",
+                "books/fiction/horror/teen",
+                "books/fiction/comedy",
+            ],
+        )
+        teen = self.categories[3]
+        self.assertEqual(
+            cache.get(teen.get_url_cache_key()), "books/fiction/horror/teen"
+        )
+
+    def test_reads_cached_slugs(self):
+        Category.get_full_slugs(self.categories)
+        with self.assertNumQueries(0):
+            Category.get_full_slugs(self.categories)
+
+    def test_absolute_url_needs_one_query(self):
+        teen = self.categories[3]
+        with self.assertNumQueries(1):
+            self.assertIn("books/fiction/horror/teen_", teen.get_absolute_url())
+
+
 class TestMovingACategory(TestCase):
     def setUp(self):
         breadcrumbs = (
@@ -351,3 +394,75 @@ class TestBrowsableCategoriesManager(TestCase):
         self.assertNotIn("Comedy", browsable_menu_names)
         self.assertIn("Books", browsable_menu_names)
         self.assertIn("Fiction", browsable_menu_names)
+
+
+class TestBulkCategoryCreator(TestCase):
+    def setUp(self):
+        self.creator = BulkCategoryCreator()
+
+    def test_creates_missing_categories(self):
+        categories = self.creator.create(
+            ["Books > Fiction > Horror", "Books > Fiction > Comedy", "Music"]
+        )
+        horror = categories["Books > Fiction > Horror"]
+        self.assertEqual(horror.full_name, "Books > Fiction > Horror")
+        self.assertEqual(horror.slug, "horror")
+        self.assertEqual(Category.objects.count(), 5)
+        self.assertEqual(Category.find_problems(), ([], [], [], [], []))
+        self.assertEqual(horror.get_parent().numchild, 2)
+        self.assertEqual(categories["Music"].depth, 1)
+
+    def test_reuses_existing_categories(self):
+        fiction = create_from_breadcrumbs("Books > Fiction")
+        create_from_breadcrumbs("Books > Non-fiction")
+        categories = self.creator.create(["Books > Fiction", "Books > Fiction > Teen"])
+        self.assertEqual(categories["Books > Fiction"], fiction)
+        teen = categories["Books > Fiction > Teen"]
+        self.assertEqual(teen.get_parent(), fiction)
+        self.assertEqual(Category.objects.count(), 4)
+        self.assertEqual(Category.find_problems(), ([], [], [], [], []))
+
+    def test_appends_after_existing_children(self):
+        books = create_from_breadcrumbs("Books")
+        fiction = books.add_child(name="Fiction")
+        categories = self.creator.create(["Books > Comics", "Toys"])
+        self.assertGreater(categories["Books > Comics"].path, fiction.path)
+        self.assertGreater(categories["Toys"].path, books.path)
+        books.refresh_from_db()
+        self.assertEqual(books.numchild, 2)
+        # Treebeard carries on after the new categories
+        self.assertGreater(
+            books.add_child(name="Art").path, categories["Books > Comics"].path
+        )
+
+    def test_takes_ancestors_are_public_from_parent(self):
+        books = create_from_breadcrumbs("Books")
+        books.is_public = False
+        books.save()
+        categories = self.creator.create(["Books > Fiction > Teen"])
+        self.assertFalse(categories["Books > Fiction > Teen"].ancestors_are_public)
+        self.assertFalse(Category.objects.get(name="Fiction").ancestors_are_public)
+
+    def test_creates_categories_with_few_queries(self):
+        breadcrumbs = [
+            "Books > Genre %d > Sub %d" % (i, j) for i in range(5) for j in range(5)
+        ]
+        with self.assertNumQueries(5):
+            # Existing categories, last positions, the insert and a savepoint
+            self.creator.create(breadcrumbs)
+        self.assertEqual(Category.objects.count(), 31)
+
+    def test_looks_up_primary_keys_not_returned_by_bulk_inserts(self):
+        with mock.patch.object(
+            type(connection.features), "can_return_rows_from_bulk_insert", False
+        ):
+            categories = self.creator.create(["Books > Fiction"])
+        fiction = categories["Books > Fiction"]
+        self.assertEqual(fiction, Category.objects.get(name="Fiction"))
+        self.assertEqual(fiction.get_parent().pk, Category.objects.get(name="Books").pk)
+
+    def test_rejects_ambiguous_categories(self):
+        Category.add_root(name="Books")
+        Category.add_root(name="Books")
+        with self.assertRaises(ValueError):
+            self.creator.create(["Books > Fiction"])
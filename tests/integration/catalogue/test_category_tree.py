@@ -0,0 +1,129 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from oscar.apps.catalogue.categories import create_from_breadcrumbs
+from oscar.apps.catalogue.mixins import CategoryMixin
+from oscar.apps.catalogue.models import Category
+from oscar.apps.catalogue.tree import (
+    CATEGORY_TREE_VERSION_CACHE_KEY,
+    CategoryTree,
+    category_tree_cache,
+)
+from oscar.templatetags.category_tags import get_annotated_list
+
+
+class CategoryTreeTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        category_tree_cache.clear()
+        self.addCleanup(category_tree_cache.clear)
+        breadcrumbs = (
+            "Books > Fiction > Horror > Teen",
+            "Books > Fiction > Comedy",
+            "Books > Non-fiction > Biography",
+            "Books > Children",
+            "Music > Jazz",
+        )
+        for trail in breadcrumbs:
+            create_from_breadcrumbs(trail)
+        self.horror = Category.objects.get(name="Horror")
+
+
+class TestCategoryTree(CategoryTreeTestCase):
+    def get_tree(self):
+        return CategoryTree(Category.objects.order_by("path"))
+
+    def test_precomputes_category_values(self):
+        node = self.get_tree().get(self.horror.pk)
+        self.assertEqual(node.full_slug, self.horror.get_full_slug())
+        self.assertEqual(node.full_name, "Books > Fiction > Horror")
+        self.assertEqual(node.get_absolute_url(), self.horror.get_absolute_url())
+        self.assertEqual(
+            [category.name for category in node.get_ancestors_and_self()],
+            ["Books", "Fiction", "Horror"],
+        )
+
+    def test_menu_matches_queryset(self):
+        Category.objects.filter(name="Non-fiction").update(exclude_from_menu=True)
+        music = Category.objects.get(name="Music")
+        music.is_public = False
+        music.save()
+        tree = self.get_tree()
+        fiction = Category.objects.get(name="Fiction")
+        self.assertEqual(
+            [node.category for node in tree.get_menu()],
+            list(Category.get_tree().for_menu()),
+        )
+        self.assertEqual(
+            [node.category for node in tree.get_menu(max_depth=2)],
+            list(Category.get_tree().filter(depth__lte=2).for_menu()),
+        )
+        self.assertEqual(
+            [node.category for node in tree.get_menu(fiction)],
+            list(fiction.get_descendants().for_menu()),
+        )
+
+
+@override_settings(OSCAR_CATALOGUE_CACHE_CATEGORY_TREE=True)
+class TestCachedCategoryTree(CategoryTreeTestCase):
+    def test_serves_categories_without_queries(self):
+        url = self.horror.get_absolute_url()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.horror.get_absolute_url(), url)
+            self.assertEqual(self.horror.full_name, "Books > Fiction > Horror")
+            self.assertEqual(len(self.horror.get_ancestors_and_self()), 3)
+            get_annotated_list()
+
+    def test_is_rebuilt_when_categories_change(self):
+        self.horror.get_absolute_url()
+        fiction = Category.objects.get(name="Fiction")
+        fiction.slug = "novels"
+        with self.captureOnCommitCallbacks(execute=True):
+            fiction.save()
+        self.horror.refresh_from_db()
+        self.assertIn("/novels/horror", self.horror.get_absolute_url())
+
+    def test_isnt_rebuilt_before_changes_are_committed(self):
+        self.horror.get_absolute_url()
+        fiction = Category.objects.get(name="Fiction")
+        fiction.slug = "novels"
+        with self.captureOnCommitCallbacks() as callbacks:
+            fiction.save()
+        self.horror.refresh_from_db()
+        self.assertNotIn("/novels/horror", self.horror.get_absolute_url())
+        for callback in callbacks:
+            callback()
+        self.assertIn("/novels/horror", self.horror.get_absolute_url())
+
+    @override_settings(OSCAR_CATALOGUE_CATEGORY_TREE_CHECK_INTERVAL=60)
+    def test_checks_version_once_per_interval(self):
+        tree = category_tree_cache.get_tree()
+        # Another process changes the categories
+        cache.set(CATEGORY_TREE_VERSION_CACHE_KEY, "new")
+        with self.assertNumQueries(0):
+            self.assertIs(category_tree_cache.get_tree(), tree)
+        with override_settings(OSCAR_CATALOGUE_CATEGORY_TREE_CHECK_INTERVAL=0):
+            self.assertIsNot(category_tree_cache.get_tree(), tree)
+
+    def test_views_get_copies_of_cached_categories(self):
+        view = CategoryMixin()
+        view.kwargs = {"pk": str(self.horror.pk)}
+        category_tree_cache.get_tree()
+        with self.assertNumQueries(0):
+            category = view.get_category()
+        self.assertEqual(category, self.horror)
+        category.name = "Changed"
+        self.assertEqual(view.get_category().name, "Horror")
+
+    def test_ignores_unsaved_changes(self):
+        self.horror.slug = "scary"
+        self.assertEqual(self.horror.get_full_slug(), "books/fiction/scary")
+
+    def test_template_tag_matches_database(self):
+        cached = [(info.category, dict(info)) for info in get_annotated_list(depth=3)]
+        with override_settings(OSCAR_CATALOGUE_CACHE_CATEGORY_TREE=False):
+            cache.clear()
+            expected = [
+                (info.category, dict(info)) for info in get_annotated_list(depth=3)
+            ]
+        self.assertEqual(cached, expected)
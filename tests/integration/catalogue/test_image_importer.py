@@ -0,0 +1,140 @@
+import io
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from oscar.apps.catalogue.exceptions import ImageImportError, InvalidImageArchive
+from oscar.apps.catalogue.models import ProductImage
+from oscar.apps.catalogue.utils import Importer
+from oscar.test import factories
+
+logger = logging.getLogger("Null")
+logger.addHandler(logging.NullHandler())
+
+
+def get_image_data(colour, image_format="JPEG"):
+    data = io.BytesIO()
+    Image.new("RGB", (10, 10), colour).save(data, image_format)
+    return data.getvalue()
+
+
+class ImageImporterTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.image_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.image_dir)
+        self.product = factories.create_product(upc="1234")
+        self.other_product = factories.create_product(upc="5678")
+
+    def add_image(self, filename, data):
+        with open(os.path.join(self.image_dir, filename), "wb") as f:
+            f.write(data)
+
+    def import_images(self, **kwargs):
+        kwargs.setdefault("workers", 1)
+        return Importer(logger, field="upc", **kwargs).handle(self.image_dir)
+
+
+class TestImageImporter(ImageImporterTestCase):
+    def test_imports_images_of_matching_products(self):
+        self.add_image("1234.jpg", get_image_data("red"))
+        self.add_image("1234.png", get_image_data("blue", "PNG"))
+        self.add_image("5678.jpg", get_image_data("red"))
+        self.add_image("9999.jpg", get_image_data("green"))
+
+        stats = self.import_images(batch_size=2)
+
+        self.assertEqual(stats["num_processed"], 3)
+        self.assertEqual(stats["num_skipped"], 1)
+        self.assertEqual(
+            [image.display_order for image in self.product.images.all()], [0, 1]
+        )
+        image = self.other_product.images.get()
+        self.assertEqual(len(image.content_hash), 64)
+        with image.original.open("rb") as f:
+            self.assertEqual(f.read(), get_image_data("red"))
+
+    def test_skips_images_already_stored_for_product(self):
+        factories.create_product_image(
+            product=self.product,
+            original=ContentFile(get_image_data("red"), name="existing.jpg"),
+        )
+        self.add_image("1234.jpg", get_image_data("red"))
+        self.add_image("1234.png", get_image_data("blue", "PNG"))
+
+        stats = self.import_images()
+
+        self.assertEqual(stats["num_processed"], 1)
+        self.assertEqual(stats["num_skipped"], 1)
+        self.assertEqual(
+            [image.display_order for image in self.product.images.all()], [0, 1]
+        )
+
+    def test_hashes_images_stored_without_hash(self):
+        image = factories.create_product_image(
+            product=self.product,
+            original=ContentFile(get_image_data("red"), name="existing.jpg"),
+        )
+        ProductImage.objects.filter(pk=image.pk).update(content_hash="")
+        self.add_image("1234.jpg", get_image_data("red"))
+
+        stats = self.import_images()
+
+        self.assertEqual(stats["num_skipped"], 1)
+        image.refresh_from_db()
+        self.assertEqual(len(image.content_hash), 64)
+
+    def test_doesnt_import_anything_if_an_image_is_invalid(self):
+        self.add_image("1234.jpg", get_image_data("red"))
+        self.add_image("5678.jpg", get_image_data("red")[:100])
+
+        with self.assertRaises(ImageImportError):
+            self.import_images()
+        self.assertFalse(ProductImage.objects.exists())
+
+    def test_raises_error_for_unknown_product_field(self):
+        self.add_image("1234.jpg", get_image_data("red"))
+        with self.assertRaises(ImageImportError):
+            Importer(logger, field="colour", workers=1).handle(self.image_dir)
+
+    def test_raises_error_for_invalid_archive(self):
+        with self.assertRaises(InvalidImageArchive):
+            Importer(logger, field="upc").handle("/tmp/images.rar")
+
+    def test_imports_archive(self):
+        archive_path = os.path.join(self.image_dir, "images.zip")
+        with zipfile.ZipFile(archive_path, "w") as archive:
+            archive.writestr("1234.jpg", get_image_data("red"))
+
+        stats = Importer(logger, field="upc", workers=1).handle(archive_path)
+
+        self.assertEqual(stats["num_processed"], 1)
+        self.assertEqual(self.product.images.count(), 1)
+
+    def test_checks_images_in_worker_processes(self):
+        self.add_image("1234.jpg", get_image_data("red"))
+        self.add_image("5678.jpg", get_image_data("blue"))
+
+        stats = self.import_images(workers=2)
+
+        self.assertEqual(stats["num_processed"], 2)
+
+    def test_command_imports_images(self):
+        self.add_image("1234.jpg", get_image_data("red"))
+        out = io.StringIO()
+        call_command(
+            "oscar_import_catalogue_images", self.image_dir, "--workers=1", stdout=out
+        )
+        self.assertIn("1 images imported", out.getvalue())
+        self.assertEqual(self.product.images.count(), 1)
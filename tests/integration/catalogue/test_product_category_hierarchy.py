@@ -0,0 +1,151 @@
+from importlib import import_module
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.test import TestCase, override_settings
+
+from oscar.apps.catalogue import hierarchy
+from oscar.apps.catalogue.hierarchy import hierarchy_refresher
+from oscar.apps.catalogue.models import (
+    Category,
+    ProductCategoryHierarchy,
+    ProductCategoryHierarchyStatus,
+)
+from oscar.test.factories import create_product
+
+
+@override_settings(OSCAR_CATALOGUE_USE_PRODUCT_CATEGORY_HIERARCHY_TABLE=True)
+class TestProductCategoryHierarchyTable(TestCase):
+    def setUp(self):
+        self.root = Category.add_root(name="root")
+        self.child = self.root.add_child(name="child")
+        self.product = create_product()
+
+    def get_category_ids(self, product):
+        return set(
+            ProductCategoryHierarchy.objects.filter(product_id=product.pk).values_list(
+                "category_id", flat=True
+            )
+        )
+
+    def test_links_products_to_category_ancestors(self):
+        self.product.categories.add(self.child)
+        self.assertEqual(
+            self.get_category_ids(self.product), {self.root.pk, self.child.pk}
+        )
+
+    @override_settings(
+        OSCAR_CATALOGUE_USE_PRODUCT_CATEGORY_HIERARCHY_TABLE=False,
+        OSCAR_CATALOGUE_USE_POSTGRES_MATERIALISED_VIEWS=True,
+    )
+    def test_materialised_view_setting_requires_postgres(self):
+        self.product.categories.add(self.child)
+        self.assertEqual(self.get_category_ids(self.product), set())
+
+    def test_removing_categories(self):
+        self.product.categories.add(self.child)
+        self.product.categories.remove(self.child)
+        self.assertEqual(self.get_category_ids(self.product), set())
+
+    def test_reverse_changes(self):
+        self.child.product_set.add(self.product)
+        self.assertEqual(
+            self.get_category_ids(self.product), {self.root.pk, self.child.pk}
+        )
+        self.child.product_set.clear()
+        self.assertEqual(self.get_category_ids(self.product), set())
+
+    def test_suspending_refreshes(self):
+        other_product = create_product()
+        with mock.patch.object(
+            hierarchy_refresher, "update_products"
+        ) as update_products:
+            with hierarchy_refresher.suspended():
+                self.product.categories.add(self.child)
+                with hierarchy_refresher.suspended():
+                    other_product.categories.add(self.root)
+                update_products.assert_not_called()
+        update_products.assert_called_once_with({self.product.pk, other_product.pk})
+
+    def test_rebuild(self):
+        with hierarchy_refresher.suspended():
+            self.product.categories.add(self.child)
+            self.assertEqual(self.get_category_ids(self.product), set())
+        ProductCategoryHierarchy.objects.all().delete()
+        hierarchy_refresher.rebuild()
+        self.assertEqual(
+            self.get_category_ids(self.product), {self.root.pk, self.child.pk}
+        )
+
+    def test_migration_populates_the_table(self):
+        migration = import_module(
+            "oscar.apps.catalogue.migrations.0033_productcategoryhierarchy_table"
+        )
+        other_product = create_product()
+        self.product.categories.add(self.child, self.root)
+        other_product.categories.add(self.root)
+        ProductCategoryHierarchy.objects.all().delete()
+
+        migration.populate_hierarchy_table(apps, "default", batch_size=1)
+        self.assertEqual(
+            self.get_category_ids(self.product), {self.root.pk, self.child.pk}
+        )
+        self.assertEqual(self.get_category_ids(other_product), {self.root.pk})
+
+
+@override_settings(OSCAR_CATALOGUE_USE_PRODUCT_CATEGORY_HIERARCHY_TABLE=True)
+@mock.patch.object(hierarchy, "is_postgres", return_value=True)
+class TestMaterialisedViewRefresh(TestCase):
+    def setUp(self):
+        self.category = Category.add_root(name="root")
+        self.products = [create_product() for __ in range(3)]
+
+    @mock.patch.object(hierarchy.ProductCategoryHierarchyRefresher, "refresh")
+    def test_refreshes_once_per_commit(self, refresh, is_postgres):
+        with self.captureOnCommitCallbacks(execute=True):
+            for product in self.products:
+                product.categories.add(self.category)
+        refresh.assert_called_once_with()
+
+    @mock.patch.object(hierarchy.ProductCategoryHierarchyRefresher, "refresh")
+    def test_refreshes_after_a_rolled_back_transaction(self, refresh, is_postgres):
+        try:
+            with transaction.atomic():
+                self.products[0].categories.add(self.category)
+                raise DatabaseError
+        except DatabaseError:
+            pass
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products[1].categories.add(self.category)
+        refresh.assert_called_once_with()
+
+    @override_settings(OSCAR_CATALOGUE_MATERIALISED_VIEW_REFRESH_INTERVAL=60)
+    def test_refreshes_at_most_once_per_interval(self, is_postgres):
+        with mock.patch("oscar.apps.catalogue.hierarchy.connection") as conn:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.products[0].categories.add(self.category)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.products[1].categories.add(self.category)
+            self.assertEqual(conn.cursor.call_count, 1)
+            self.assertTrue(hierarchy_refresher.is_dirty())
+
+            out = StringIO()
+            call_command("oscar_refresh_product_category_hierarchy", stdout=out)
+            self.assertEqual(conn.cursor.call_count, 2)
+            self.assertIn("Refreshed", out.getvalue())
+            self.assertFalse(hierarchy_refresher.is_dirty())
+            self.assertIsNotNone(
+                ProductCategoryHierarchyStatus.objects.get().date_refreshed
+            )
+
+    @mock.patch.object(hierarchy.ProductCategoryHierarchyRefresher, "refresh")
+    def test_suspending_refreshes(self, refresh, is_postgres):
+        with self.captureOnCommitCallbacks(execute=True):
+            with hierarchy_refresher.suspended():
+                for product in self.products:
+                    product.categories.add(self.category)
+            self.assertTrue(hierarchy_refresher.is_dirty())
+        refresh.assert_called_once_with()
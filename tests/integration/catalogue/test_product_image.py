@@ -97,3 +97,19 @@ class TestMissingProductImage(StaticLiveServerTestCase):
     def test_no_symlink_when_no_media_root(self, mock_symlink):
         MissingProductImage()
         self.assertEqual(mock_symlink.call_count, 0)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestProductImageContentHash(TestCase):
+    def test_hash_is_recorded_for_uploaded_images(self):
+        first = factories.ProductImageFactory()
+        second = factories.ProductImageFactory()
+        self.assertEqual(len(first.content_hash), 64)
+        self.assertEqual(first.content_hash, second.content_hash)
+
+    def test_hash_covers_the_whole_file_after_earlier_reads(self):
+        expected = factories.ProductImageFactory().content_hash
+        image = factories.ProductImageFactory.build(product=factories.create_product())
+        image.original.read()
+        image.save()
+        self.assertEqual(image.content_hash, expected)
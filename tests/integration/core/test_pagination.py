@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from oscar.core.loading import get_model
+from oscar.core.pagination import (
+    ApproximateCountPaginator,
+    KeysetPaginator,
+    get_approximate_count,
+)
+from oscar.test import factories
+
+Product = get_model("catalogue", "Product")
+
+
+class TestKeysetPaginator(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        for i in range(7):
+            product = factories.create_product(title="Product %d" % (i // 2))
+            # Products created at the same time are ordered by primary key
+            Product.objects.filter(pk=product.pk).update(
+                date_created=now - timedelta(days=i // 3)
+            )
+        self.queryset = Product.objects.order_by("-date_created")
+        self.expected = list(self.queryset.order_by("-date_created", "-pk"))
+
+    def test_pages_through_all_objects_in_order(self):
+        paginator = KeysetPaginator(self.queryset, 3)
+        page = paginator.page()
+        self.assertFalse(page.has_previous())
+        objects = list(page)
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            self.assertTrue(page.has_previous())
+            objects.extend(page)
+        self.assertEqual(objects, self.expected)
+        self.assertEqual(len(page), 1)
+        self.assertEqual(paginator.count, 7)
+
+    def test_pages_backwards(self):
+        paginator = KeysetPaginator(self.queryset, 3)
+        second = paginator.page(paginator.page().next_cursor)
+        third = paginator.page(second.next_cursor)
+        previous = paginator.page(third.previous_cursor)
+        self.assertEqual(list(previous), list(second))
+        self.assertTrue(previous.has_next())
+        first = paginator.page(previous.previous_cursor)
+        self.assertEqual(list(first), self.expected[:3])
+        self.assertFalse(first.has_previous())
+
+    def test_supports_orderings_in_mixed_directions(self):
+        paginator = KeysetPaginator(Product.objects.all(), 2, ["title", "-pk"])
+        page, objects = paginator.page(), []
+        objects.extend(page)
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            objects.extend(page)
+        self.assertEqual(objects, list(Product.objects.order_by("title", "-pk")))
+
+    def test_rejects_invalid_cursors(self):
+        paginator = KeysetPaginator(self.queryset, 3)
+        for cursor in ["nonsense", "WyJuIixbXV0", "WyJ4IixbIjEiLCIyIl1d"]:
+            with self.assertRaises(InvalidPage):
+                paginator.page(cursor)
+
+    def test_approximates_count_when_asked_to(self):
+        paginator = KeysetPaginator(self.queryset, 3, approximate_count=True)
+        with mock.patch("oscar.core.pagination.get_estimated_count", return_value=5000):
+            self.assertEqual(paginator.count, 5000)
+        self.assertEqual(paginator.num_pages, 1667)
+
+
+class TestApproximateCount(TestCase):
+    def setUp(self):
+        cache.clear()
+        for __ in range(3):
+            factories.create_product()
+
+    def test_uses_estimate_of_large_querysets(self):
+        with mock.patch("oscar.core.pagination.get_estimated_count", return_value=5000):
+            with self.assertNumQueries(0):
+                self.assertEqual(get_approximate_count(Product.objects.all()), 5000)
+
+    def test_counts_small_querysets_exactly(self):
+        with mock.patch("oscar.core.pagination.get_estimated_count", return_value=1):
+            self.assertEqual(get_approximate_count(Product.objects.all()), 3)
+
+    @override_settings(OSCAR_PAGINATION_COUNT_CACHE_TIMEOUT=60)
+    def test_caches_exact_counts_by_query(self):
+        self.assertEqual(get_approximate_count(Product.objects.all()), 3)
+        factories.create_product()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_approximate_count(Product.objects.all()), 3)
+        self.assertEqual(
+            get_approximate_count(Product.objects.filter(is_public=True)), 4
+        )
+
+    @override_settings(OSCAR_PAGINATION_COUNT_CACHE_TIMEOUT=0)
+    def test_counts_every_time_without_cache_timeout(self):
+        self.assertEqual(get_approximate_count(Product.objects.all()), 3)
+        factories.create_product()
+        self.assertEqual(get_approximate_count(Product.objects.all()), 4)
+
+    def test_paginator_counts_approximately(self):
+        paginator = ApproximateCountPaginator(Product.objects.order_by("pk"), 2)
+        with mock.patch("oscar.core.pagination.get_estimated_count", return_value=5000):
+            self.assertEqual(paginator.num_pages, 2500)
@@ -0,0 +1,132 @@
+import gzip
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from oscar.core.loading import get_class, get_model
+from oscar.test.factories import create_order
+
+ReportJob = get_model("analytics", "ReportJob")
+ReportJobQueue = get_class("dashboard.reports.jobs", "ReportJobQueue")
+
+
+class ReportJobTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.queue = ReportJobQueue()
+
+
+class TestEnqueueingReportJobs(ReportJobTestCase):
+    def test_creates_pending_job(self):
+        job, created = self.queue.enqueue("order_report", date(2020, 1, 1))
+        self.assertTrue(created)
+        self.assertEqual(job.status, ReportJob.PENDING)
+
+    def test_deduplicates_pending_jobs(self):
+        job, __ = self.queue.enqueue("order_report", date(2020, 1, 1))
+        same_job, created = self.queue.enqueue("order_report", date(2020, 1, 1))
+        self.assertFalse(created)
+        self.assertEqual(same_job, job)
+        __, created = self.queue.enqueue("order_report", date(2020, 1, 2))
+        self.assertTrue(created)
+
+    def test_serves_recent_complete_jobs(self):
+        job, __ = self.queue.enqueue("order_report")
+        self.queue.process()
+        same_job, created = self.queue.enqueue("order_report")
+        self.assertFalse(created)
+        self.assertEqual(same_job, job)
+
+    @override_settings(OSCAR_REPORT_FILE_MAX_AGE=60)
+    def test_regenerates_old_reports(self):
+        job, __ = self.queue.enqueue("order_report")
+        self.queue.process()
+        ReportJob.objects.filter(pk=job.pk).update(
+            date_completed=timezone.now() - timedelta(minutes=2)
+        )
+        __, created = self.queue.enqueue("order_report")
+        self.assertTrue(created)
+
+    @override_settings(OSCAR_REPORT_JOB_TIMEOUT=60)
+    def test_fails_running_jobs_without_progress(self):
+        job, __ = self.queue.enqueue("order_report")
+        self.assertEqual(self.queue.claim_next(), job)
+        ReportJob.objects.filter(pk=job.pk).update(
+            date_updated=timezone.now() - timedelta(minutes=2)
+        )
+        new_job, created = self.queue.enqueue("order_report")
+        self.assertTrue(created)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.FAILED)
+        self.assertEqual(self.queue.claim_next(), new_job)
+
+    @override_settings(OSCAR_REPORT_JOB_TIMEOUT=60)
+    def test_keeps_running_jobs_with_recent_progress(self):
+        job, __ = self.queue.enqueue("order_report")
+        self.queue.claim_next()
+        __, created = self.queue.enqueue("order_report")
+        self.assertFalse(created)
+
+    def test_doesnt_serve_failed_jobs(self):
+        job, __ = self.queue.enqueue("order_report")
+        ReportJob.objects.filter(pk=job.pk).update(status=ReportJob.FAILED)
+        __, created = self.queue.enqueue("order_report")
+        self.assertTrue(created)
+
+
+class TestRunningReportJobs(ReportJobTestCase):
+    def test_saves_compressed_report(self):
+        orders = [create_order() for __ in range(3)]
+        job, __ = self.queue.enqueue("order_report")
+        self.assertEqual(self.queue.process(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.COMPLETE)
+        self.assertEqual(job.num_rows, 3)
+        self.assertEqual(job.progress, 100)
+        self.assertTrue(job.file.name.endswith("order_report-%d.csv.gz" % job.pk))
+        # Stored in a folder with a random name
+        self.assertEqual(len(job.file.name.split("/")), 5)
+        with job.file.open("rb") as f:
+            rows = gzip.decompress(f.read()).decode("utf8").splitlines()
+        self.assertEqual(len(rows), 4)
+        for order in orders:
+            self.assertTrue(any(str(order.number) in row for row in rows))
+
+    def test_records_progress_every_chunk(self):
+        for __ in range(3):
+            create_order()
+        job, __ = self.queue.enqueue("order_report")
+        with mock.patch.object(self.queue, "set_progress") as set_progress:
+            with mock.patch(
+                "oscar.apps.order.reports.OrderReportCSVFormatter.chunk_size", 2
+            ):
+                self.queue.process()
+        self.assertEqual([call.args[1] for call in set_progress.call_args_list], [2, 3])
+
+    def test_records_failures(self):
+        job, __ = self.queue.enqueue("unknown_report")
+        self.queue.process()
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.FAILED)
+        self.assertIn("unknown_report", job.error_message)
+        self.assertIsNotNone(job.date_completed)
+
+    def test_only_claims_pending_jobs(self):
+        job, __ = self.queue.enqueue("order_report")
+        self.assertEqual(self.queue.claim_next(), job)
+        self.assertIsNone(self.queue.claim_next())
+
+    def test_command_runs_pending_jobs(self):
+        job, __ = self.queue.enqueue("order_report")
+        call_command("oscar_run_report_jobs", stdout=mock.Mock())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.COMPLETE)
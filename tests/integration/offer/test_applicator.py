@@ -1,9 +1,12 @@
+import datetime
 from decimal import Decimal as D
 from unittest.mock import Mock
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.utils import timezone
 
 from oscar.apps.offer import models
+from oscar.apps.offer.cache import site_offer_cache
 from oscar.apps.offer.results import OfferApplications
 from oscar.apps.offer.utils import Applicator
 from oscar.test.basket import add_product
@@ -13,6 +16,7 @@ from oscar.test.factories import (
     ConditionalOfferFactory,
     ConditionFactory,
     RangeFactory,
+    create_product,
 )
 
 
@@ -114,3 +118,76 @@ class TestOfferApplicationsWrapper(TestCase):
 
     def test_aggregates_results_from_same_offer(self):
         self.assertEqual(1, len(list(self.applications)))
+
+
+@override_settings(OSCAR_OFFERS_CACHE_SITE_OFFERS=True)
+class TestCachedSiteOffers(TestCase):
+    def setUp(self):
+        site_offer_cache.clear()
+        self.offer = ConditionalOfferFactory(
+            name="globaloffer", offer_type=models.ConditionalOffer.SITE
+        )
+
+    def tearDown(self):
+        site_offer_cache.clear()
+
+    def test_loads_site_offers_only_once(self):
+        self.assertEqual(len(Applicator().get_site_offers()), 1)
+        with self.assertNumQueries(0):
+            offers = Applicator().get_site_offers()
+            self.assertEqual(offers[0].name, "globaloffer")
+            self.assertFalse(offers[0].condition.range.includes_all_products)
+            self.assertTrue(offers[0].benefit.proxy().range)
+
+    def test_returns_copies_of_cached_offers(self):
+        first, second = Applicator().get_site_offers(), Applicator().get_site_offers()
+        self.assertEqual(first[0], second[0])
+        self.assertIsNot(first[0], second[0])
+
+    def test_saving_an_offer_invalidates_the_cache(self):
+        Applicator().get_site_offers()
+        self.offer.name = "renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offer.save()
+        self.assertEqual(Applicator().get_site_offers()[0].name, "renamed")
+
+    def test_recording_usage_keeps_the_cache(self):
+        Applicator().get_site_offers()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offer.record_usage({"freq": 1, "discount": D("1.00")})
+        with self.assertNumQueries(0):
+            Applicator().get_site_offers()
+
+    def test_recording_usage_of_limited_offers_invalidates_the_cache(self):
+        self.offer.max_global_applications = 1
+        self.offer.save()
+        Applicator().get_site_offers()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offer.record_usage({"freq": 1, "discount": D("1.00")})
+        self.assertEqual(Applicator().get_site_offers(), [])
+
+    def test_changing_a_range_invalidates_the_cache(self):
+        Applicator().get_site_offers()
+        rng = self.offer.condition.range
+        with self.captureOnCommitCallbacks(execute=True):
+            rng.excluded_products.add(create_product())
+        with self.assertNumQueries(1):
+            Applicator().get_site_offers()
+
+    def test_excludes_offers_outside_their_date_range(self):
+        Applicator().get_site_offers()
+        self.offer.end_datetime = timezone.now() - datetime.timedelta(days=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offer.save()
+        self.assertEqual(Applicator().get_site_offers(), [])
+
+    def test_invalidates_the_cache_once_committed(self):
+        Applicator().get_site_offers()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.offer.name = "renamed"
+            self.offer.save()
+            self.offer.condition.proxy().save()
+            self.assertEqual(Applicator().get_site_offers()[0].name, "globaloffer")
+        self.assertEqual(len(callbacks), 2)
+        callbacks[0]()
+        self.assertEqual(Applicator().get_site_offers()[0].name, "renamed")
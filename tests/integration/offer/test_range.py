@@ -38,9 +38,15 @@ class TestWholeSiteRange(TestCase):
 
     @override_settings(OSCAR_CATALOGUE_USE_POSTGRES_MATERIALISED_VIEWS=True)
     def test_category_blacklisting_materialised(self):
-        self.prod.categories.add(
-            self.category
-        )  # we need to refresh the materialised view with the setting enabled for things to work
+        with self.captureOnCommitCallbacks(execute=True):
+            self.prod.categories.add(
+                self.category
+            )  # we need to refresh the materialised view with the setting enabled for things to work
+        self._test_category_blacklisting()
+
+    @override_settings(OSCAR_CATALOGUE_USE_PRODUCT_CATEGORY_HIERARCHY_TABLE=True)
+    def test_category_blacklisting_hierarchy_table(self):
+        self.prod.categories.add(self.category)
         self._test_category_blacklisting()
 
     def _test_category_blacklisting(self):
@@ -340,13 +346,19 @@ class TestRangeQuerySet(TestCase):
     def test_category_materialized(self):
         self._test_category()
 
+    @override_settings(OSCAR_CATALOGUE_USE_PRODUCT_CATEGORY_HIERARCHY_TABLE=True)
+    def test_category_hierarchy_table(self):
+        self._test_category()
+
     def _test_category(self):
         parent_category = catalogue_models.Category.add_root(name="parent")
         child_category = parent_category.add_child(name="child")
         grand_child_category = child_category.add_child(name="grand-child")
-        catalogue_models.ProductCategory.objects.create(
-            product=self.parent, category=grand_child_category
-        )
+        # The materialised view is refreshed when the transaction is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            catalogue_models.ProductCategory.objects.create(
+                product=self.parent, category=grand_child_category
+            )
 
         cat_range, _ = models.Range.objects.get_or_create(
             name="category range", includes_all_products=False
@@ -0,0 +1,101 @@
+from decimal import Decimal as D
+
+from django.test import TestCase
+
+from oscar.apps.offer import models
+from oscar.apps.offer.membership import RangeMembership
+from oscar.apps.offer.utils import Applicator
+from oscar.test.basket import add_product
+from oscar.test.factories import (
+    BasketFactory,
+    ConditionalOfferFactory,
+    create_product,
+)
+
+
+class TestRangeMembership(TestCase):
+    def setUp(self):
+        self.product = create_product()
+        self.other_product = create_product()
+        self.child = create_product(structure="child", parent=self.product)
+        self.range = models.Range.objects.create(name="Some products")
+        self.range.add_product(self.product)
+        self.all_range = models.Range.objects.create(
+            name="All products", includes_all_products=True
+        )
+        self.all_range.excluded_products.add(self.other_product)
+        self.products = [self.product, self.other_product, self.child]
+
+    def test_resolves_membership_of_all_pairs(self):
+        membership = RangeMembership([self.range, self.all_range], self.products)
+        for rng in (self.range, self.all_range):
+            for product in self.products:
+                self.assertEqual(
+                    (rng.pk, product.pk) in membership,
+                    rng.contains_product(product),
+                )
+
+    def test_answers_membership_without_queries(self):
+        membership = RangeMembership([self.range, self.all_range], self.products)
+        with self.assertNumQueries(0):
+            self.assertIn((self.range.pk, self.child.pk), membership)
+            self.assertNotIn((self.range.pk, self.other_product.pk), membership)
+            self.assertNotIn((self.all_range.pk, self.other_product.pk), membership)
+
+    def test_only_resolves_given_ranges_and_products(self):
+        membership = RangeMembership([self.range], [self.product])
+        self.assertTrue(membership.is_resolved(self.range.pk, self.product.pk))
+        self.assertFalse(membership.is_resolved(self.all_range.pk, self.product.pk))
+        self.assertFalse(membership.is_resolved(self.range.pk, self.child.pk))
+
+    def test_is_empty(self):
+        membership = RangeMembership([self.range, self.all_range], [self.other_product])
+        self.assertTrue(membership.is_empty(self.range.pk))
+        self.assertTrue(membership.is_empty(self.all_range.pk))
+
+        membership = RangeMembership([self.range], [self.product])
+        self.assertFalse(membership.is_empty(self.range.pk))
+        self.assertFalse(membership.is_empty(self.all_range.pk))
+
+
+class TestApplicatorRangeMembership(TestCase):
+    def setUp(self):
+        self.basket = BasketFactory()
+        for __ in range(3):
+            add_product(self.basket, D("10.00"))
+        self.range = models.Range.objects.create(
+            name="All products", includes_all_products=True
+        )
+
+    def create_offer(self, rng):
+        condition = models.Condition.objects.create(
+            range=rng, type=models.Condition.COUNT, value=1
+        )
+        benefit = models.Benefit.objects.create(
+            range=rng, type=models.Benefit.PERCENTAGE, value=10
+        )
+        return ConditionalOfferFactory(condition=condition, benefit=benefit)
+
+    def test_stores_membership_on_basket(self):
+        offer = self.create_offer(self.range)
+        Applicator().apply_offers(self.basket, [offer])
+        membership = self.basket.range_membership
+        for line in self.basket.all_lines():
+            self.assertIn((self.range.pk, line.product_id), membership)
+        self.assertEqual(self.basket.total_discount, D("3.00"))
+
+    def test_skips_offers_without_products_in_condition_range(self):
+        empty_range = models.Range.objects.create(name="Empty range")
+        offer = self.create_offer(empty_range)
+        applicator = Applicator()
+        membership = applicator.get_range_membership(self.basket, [offer])
+        self.assertTrue(applicator.is_offer_inapplicable(offer, membership))
+
+        applicator.apply_offers(self.basket, [offer])
+        self.assertEqual(len(self.basket.offer_applications), 0)
+
+    def test_resetting_offer_applications_clears_membership(self):
+        offer = self.create_offer(self.range)
+        Applicator().apply_offers(self.basket, [offer])
+        self.basket.reset_offer_applications()
+        self.assertIsNone(self.basket.range_membership)
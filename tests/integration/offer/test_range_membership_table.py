@@ -0,0 +1,149 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError, transaction
+from django.test import TestCase, override_settings
+
+from oscar.apps.catalogue.models import Category
+from oscar.apps.offer import models
+from oscar.apps.offer.membership import RangeMembershipTableUpdater
+from oscar.test.factories import create_product
+
+
+@override_settings(OSCAR_OFFERS_USE_RANGE_MEMBERSHIP_TABLE=True)
+class TestRangeMembershipTable(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category = Category.add_root(name="root")
+            self.product = create_product()
+            self.other_product = create_product()
+            self.child = create_product(structure="child", parent=self.product)
+            self.range = models.Range.objects.create(name="Some products")
+            self.all_range = models.Range.objects.create(
+                name="All products", includes_all_products=True
+            )
+
+    def get_members(self, rng):
+        return set(
+            models.RangeProductMembership.objects.filter(range=rng).values_list(
+                "product_id", flat=True
+            )
+        )
+
+    def test_rebuilding_from_range_rules(self):
+        with override_settings(OSCAR_OFFERS_USE_RANGE_MEMBERSHIP_TABLE=False):
+            self.range.add_product(self.product)
+        models.RangeProductMembership.objects.all().delete()
+
+        num_rows = RangeMembershipTableUpdater().rebuild()
+
+        self.assertEqual(num_rows, 5)
+        self.assertEqual(self.get_members(self.range), {self.product.pk, self.child.pk})
+        self.assertEqual(
+            self.get_members(self.all_range),
+            {self.product.pk, self.child.pk, self.other_product.pk},
+        )
+
+    def test_management_command(self):
+        models.RangeProductMembership.objects.all().delete()
+        out = StringIO()
+        call_command(
+            "oscar_build_range_memberships", "--range", "all-products", stdout=out
+        )
+        self.assertIn("Built 3 range product memberships for 1 ranges", out.getvalue())
+        self.assertEqual(len(self.get_members(self.all_range)), 3)
+        self.assertEqual(self.get_members(self.range), set())
+
+    def test_lookups_use_membership_table(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.range.add_product(self.product)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(self.range.contains_product(self.child))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.range.num_products(), 2)
+        self.assertEqual(set(self.range.all_products()), {self.product, self.child})
+        self.assertEqual(
+            set(models.Range.objects.contains_product(self.child)),
+            {self.range, self.all_range},
+        )
+
+    def test_lookups_ignore_stale_rules(self):
+        # Changes that bypass signals are only picked up after a rebuild
+        models.RangeProduct.objects.bulk_create(
+            [models.RangeProduct(range=self.range, product=self.other_product)]
+        )
+        self.assertFalse(self.range.contains_product(self.other_product))
+        RangeMembershipTableUpdater().rebuild([self.range])
+        self.assertTrue(self.range.contains_product(self.other_product))
+
+    def test_removing_product_from_range(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.range.add_product(self.product)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.range.remove_product(self.product)
+        self.assertEqual(self.get_members(self.range), set())
+
+    def test_excluding_product_from_all_products_range(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.all_range.excluded_products.add(self.other_product)
+        self.assertNotIn(self.other_product.pk, self.get_members(self.all_range))
+
+    def test_new_products_are_added(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = create_product()
+        self.assertIn(product.pk, self.get_members(self.all_range))
+
+    def test_categorising_products(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.range.included_categories.add(self.category)
+        self.assertEqual(self.get_members(self.range), set())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_product.categories.add(self.category)
+        self.assertEqual(self.get_members(self.range), {self.other_product.pk})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_product.categories.remove(self.category)
+        self.assertEqual(self.get_members(self.range), set())
+
+    def test_deleting_a_product(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.range.add_product(self.product)
+            self.product.categories.add(self.category)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.delete()
+        self.assertEqual(self.get_members(self.range), set())
+        self.assertEqual(self.get_members(self.all_range), {self.other_product.pk})
+
+    def test_changes_are_applied_once_per_transaction(self):
+        with mock.patch.object(
+            RangeMembershipTableUpdater,
+            "update_products",
+            autospec=True,
+            side_effect=RangeMembershipTableUpdater.update_products,
+        ) as update_products:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                products = [create_product() for __ in range(3)]
+                for product in products:
+                    product.categories.add(self.category)
+        self.assertEqual(len(callbacks), 1)
+        update_products.assert_called_once()
+        self.assertEqual(
+            update_products.call_args.args[1], {product.pk for product in products}
+        )
+        self.assertTrue(
+            {product.pk for product in products} <= self.get_members(self.all_range)
+        )
+
+    def test_changes_of_a_rolled_back_transaction_are_discarded(self):
+        try:
+            with transaction.atomic():
+                self.range.add_product(self.other_product)
+                raise DatabaseError
+        except DatabaseError:
+            pass
+        with self.captureOnCommitCallbacks(execute=True):
+            self.range.add_product(self.product)
+        self.assertEqual(self.get_members(self.range), {self.product.pk, self.child.pk})
@@ -5,8 +5,10 @@ from decimal import Decimal as D
 
 import pytest
 from django.contrib.auth.models import AnonymousUser
+from django.db import connection
 from django.http import HttpRequest
 from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.test.utils import override_settings
 from django.utils import timezone
 
@@ -16,6 +18,7 @@ from oscar.apps.offer.utils import Applicator
 from oscar.apps.offer import models
 from oscar.apps.order.models import Order
 from oscar.apps.order.utils import OrderCreator
+from oscar.apps.partner.exceptions import InvalidStockAdjustment
 from oscar.apps.shipping.methods import FixedPrice, Free
 from oscar.apps.shipping.repository import Repository
 from oscar.apps.voucher.models import Voucher
@@ -58,6 +61,14 @@ class TestOrderCreatorErrorCases(TestCase):
                 order_number="1234",
             )
 
+    def test_refuses_over_allocation_when_enabled(self):
+        add_product(self.basket, D("12.00"), 2)
+        self.basket.all_lines()[0].stockrecord.allocate(2)
+        self.creator.refuse_over_allocation = True
+        with self.assertRaises(InvalidStockAdjustment):
+            place_order(self.creator, surcharges=self.surcharges, basket=self.basket)
+        self.assertFalse(Order.objects.exists())
+
     def test_no_error_with_none_offer_discount(self):
         """Test that a discount with no offer can be processed without raising an error"""
         # Setup
@@ -608,3 +619,68 @@ class TestTaxValuesForOrder(TestCase):
         self.assertEqual(order.total_excl_tax, D("10.65"))
         self.assertEqual(order.total_incl_tax, D("12.75"))
         self.assertEqual(order.total_tax, D("2.10"))
+
+
+class TestBulkLineCreation(TestCase):
+    def setUp(self):
+        self.basket = factories.create_basket(empty=True)
+        self.basket.strategy = UK()
+        product_range = Range.objects.create(
+            name="All products range", includes_all_products=True
+        )
+        condition = models.CountCondition.objects.create(
+            range=product_range, type=models.Condition.COUNT, value=1
+        )
+        benefit = models.PercentageDiscountBenefit.objects.create(
+            range=product_range, type=models.Benefit.PERCENTAGE, value=10
+        )
+        self.offer = models.ConditionalOffer.objects.create(
+            name="Test",
+            offer_type=models.ConditionalOffer.SITE,
+            condition=condition,
+            benefit=benefit,
+        )
+
+    def create_order(self, creator, num_lines):
+        for __ in range(num_lines):
+            add_product(self.basket, D("10.00"), 2)
+        Applicator().apply_offers(self.basket, [self.offer])
+        surcharges = SurchargeApplicator().get_applicable_surcharges(self.basket)
+        return place_order(creator, surcharges=surcharges, basket=self.basket)
+
+    def test_creates_lines_with_prices_and_discounts(self):
+        order = self.create_order(OrderCreator(), 3)
+        self.assertEqual(order.lines.count(), 3)
+        self.assertEqual(order.line_prices.count(), 3)
+        discount = order.discounts.get()
+        self.assertEqual(discount.discount_lines.count(), 3)
+        self.assertEqual(discount.amount, D("7.20"))
+        for line in order.lines.all():
+            self.assertEqual(line.line_price_before_discounts_excl_tax, D("20.00"))
+
+    def test_number_of_queries_does_not_depend_on_number_of_lines(self):
+        class CountingCreator(OrderCreator):
+            def create_lines_models(self, order, basket_lines):
+                with CaptureQueriesContext(connection) as queries:
+                    order_lines = super().create_lines_models(order, basket_lines)
+                self.num_queries = len(queries)
+                return order_lines
+
+        small = CountingCreator()
+        self.create_order(small, 2)
+        self.basket = factories.create_basket(empty=True)
+        self.basket.strategy = UK()
+        large = CountingCreator()
+        self.create_order(large, 6)
+        self.assertEqual(small.num_queries, large.num_queries)
+
+    def test_calls_overridden_line_hooks(self):
+        class Creator(OrderCreator):
+            def create_line_models(self, order, basket_line, extra_line_fields=None):
+                return super().create_line_models(
+                    order, basket_line, {"status": "Custom"}
+                )
+
+        order = self.create_order(Creator(), 2)
+        self.assertEqual(set(order.lines.values_list("status", flat=True)), {"Custom"})
+        self.assertEqual(order.discounts.get().discount_lines.count(), 2)
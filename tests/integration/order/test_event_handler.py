@@ -1,4 +1,5 @@
 from decimal import Decimal as D
+from unittest import mock
 
 from django.test import TestCase
 
@@ -184,6 +185,30 @@ class TestEventHandler(TestCase):
             "Stock should have decreased, but didn't.",
         )
 
+    def test_consume_stock_allocations_calls_overridden_line_method(self):
+        basket = factories.create_basket(empty=True)
+        add_product(basket, D("10.00"), 5)
+        order = factories.create_order(basket=basket)
+
+        with mock.patch.object(
+            models.Line, "consume_allocation", autospec=True
+        ) as consume_allocation:
+            self.handler.consume_stock_allocations(order)
+
+        consume_allocation.assert_called_once_with(order.lines.get(), 5)
+
+    def test_cancel_stock_allocations_calls_overridden_line_method(self):
+        basket = factories.create_basket(empty=True)
+        add_product(basket, D("10.00"), 5)
+        order = factories.create_order(basket=basket)
+
+        with mock.patch.object(
+            models.Line, "cancel_allocation", autospec=True
+        ) as cancel_allocation:
+            self.handler.cancel_stock_allocations(order)
+
+        cancel_allocation.assert_called_once_with(order.lines.get(), 5)
+
     def test_line_allocations(self):
         product_class = factories.ProductClassFactory(
             requires_shipping=False, track_stock=True
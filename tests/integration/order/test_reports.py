@@ -4,6 +4,7 @@ from django.test import TestCase
 from django.utils.timezone import now
 
 from oscar.apps.order import reports
+from oscar.test.factories import create_order
 
 
 class TestOrderReportGenerator(TestCase):
@@ -19,3 +20,16 @@ class TestOrderReportGenerator(TestCase):
             start_date=start_date, end_date=end_date, formatter="CSV"
         )
         generator.generate()
+
+    def test_streams_csv_rows(self):
+        orders = [create_order() for __ in range(3)]
+        generator = reports.OrderReportGenerator(formatter="CSV")
+        response = generator.generate()
+        self.assertTrue(response.streaming)
+        with self.assertNumQueries(1):
+            chunks = list(response.streaming_content)
+        # The header row, then a row per order
+        self.assertEqual(len(chunks), 4)
+        content = b"".join(chunks).decode("utf8")
+        for order in orders:
+            self.assertIn(str(order.number), content)
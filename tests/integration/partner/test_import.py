@@ -1,10 +1,16 @@
+import io
 import logging
 import os
+import shutil
+import tempfile
 from decimal import Decimal as D
+from unittest import mock
 
-from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
 
-from oscar.apps.catalogue.models import Product, ProductClass
+from oscar.apps.catalogue.models import Product, ProductCategory, ProductClass
 from oscar.apps.partner.exceptions import ImportingError
 from oscar.apps.partner.importers import CatalogueImporter
 from oscar.apps.partner.models import Partner
@@ -123,3 +129,96 @@ class ImportWithFlushTest(TestCase):
 
         with self.assertRaises(Product.DoesNotExist):
             Product.objects.get(upc=upc)
+
+
+class BatchedImportTest(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.file_path = os.path.join(directory, "books.csv")
+        shutil.copy(TEST_BOOKS_CSV, self.file_path)
+
+    def test_imports_rows_in_batches(self):
+        importer = CatalogueImporter(logger, batch_size=3)
+        importer.handle(self.file_path)
+        self.assertEqual(importer.stats["batches"], 4)
+        self.assertEqual(importer.stats["rows"], 10)
+        self.assertEqual(importer.stats["new_items"], 10)
+        self.assertEqual(Product.objects.count(), 10)
+        self.assertEqual(ProductCategory.objects.count(), 10)
+        self.assertFalse(os.path.exists(importer.get_checkpoint_path(self.file_path)))
+
+    def test_imports_without_primary_keys_returned_by_bulk_inserts(self):
+        with mock.patch.object(
+            type(connection.features), "can_return_rows_from_bulk_insert", False
+        ):
+            importer = CatalogueImporter(logger, batch_size=3)
+            importer.handle(self.file_path)
+        self.assertEqual(Product.objects.count(), 10)
+        self.assertEqual(ProductCategory.objects.count(), 10)
+        stockrecord = StockRecord.objects.get(partner_sku="9780115531446")
+        self.assertEqual(stockrecord.product.upc, "9780115531446")
+
+    @override_settings(OSCAR_SLUG_BLACKLIST=["for", "your"])
+    def test_slugifies_titles_with_oscar_slug_settings(self):
+        CatalogueImporter(logger, batch_size=3).handle(self.file_path)
+        product = Product.objects.get(upc="9780115531446")
+        self.assertEqual(product.slug, "prepare-practical-driving-test")
+
+    def test_updates_existing_products_and_stockrecords(self):
+        CatalogueImporter(logger, batch_size=4).handle(self.file_path)
+        StockRecord.objects.update(price=D("1.00"), num_in_stock=0)
+        Product.objects.update(title="Old title")
+
+        importer = CatalogueImporter(logger, batch_size=4)
+        importer.handle(self.file_path)
+
+        self.assertEqual(importer.stats["new_items"], 0)
+        self.assertEqual(importer.stats["updated_items"], 10)
+        self.assertEqual(Product.objects.count(), 10)
+        self.assertEqual(ProductCategory.objects.count(), 10)
+        product = Product.objects.get(upc="9780115531446")
+        self.assertEqual(product.title, "Prepare for Your Practical Driving Test")
+        stockrecord = StockRecord.objects.get(partner_sku="9780115531446")
+        self.assertEqual(stockrecord.price, D("10.32"))
+        self.assertEqual(stockrecord.num_in_stock, 6)
+
+    def test_resumes_after_last_imported_batch(self):
+        importer = CatalogueImporter(logger, batch_size=4)
+        import_batch = importer._import_batch
+
+        def fail_second_batch(rows):
+            if importer.stats["batches"]:
+                raise RuntimeError
+            import_batch(rows)
+
+        with mock.patch.object(importer, "_import_batch", fail_second_batch):
+            with self.assertRaises(RuntimeError):
+                importer.handle(self.file_path)
+        self.assertTrue(os.path.exists(importer.get_checkpoint_path(self.file_path)))
+
+        importer = CatalogueImporter(logger, batch_size=4, resume=True)
+        importer.handle(self.file_path)
+        self.assertEqual(importer.stats["rows"], 6)
+        self.assertEqual(importer.stats["new_items"], 6)
+        self.assertEqual(Product.objects.count(), 10)
+        self.assertFalse(os.path.exists(importer.get_checkpoint_path(self.file_path)))
+
+    def test_ignores_checkpoint_of_changed_file(self):
+        importer = CatalogueImporter(logger, batch_size=4)
+        importer._write_checkpoint(self.file_path, 8)
+        with open(self.file_path, "at", encoding="utf-8") as f:
+            f.write('Book,Books,"123456789",New book,NULL\n')
+
+        importer = CatalogueImporter(logger, batch_size=4, resume=True)
+        importer.handle(self.file_path)
+        self.assertEqual(importer.stats["rows"], 11)
+
+    def test_command_reports_throughput(self):
+        out = io.StringIO()
+        call_command(
+            "oscar_import_catalogue", self.file_path, "--batch-size=5", stdout=out
+        )
+        self.assertIn("10 rows in", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
+        self.assertEqual(Product.objects.count(), 10)
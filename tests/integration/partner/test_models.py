@@ -1,11 +1,18 @@
 from decimal import Decimal as D
 
-from django.test import TestCase
+from unittest import mock
 
+from django.db.models.signals import post_save, pre_save
+from django.test import TestCase, override_settings
+
+from oscar.apps.partner.exceptions import InvalidStockAdjustment
+from oscar.apps.partner.signals import stock_levels_updated
 from oscar.core.loading import get_model
 from oscar.test import factories
 
 Partner = get_model("partner", "Partner")
+StockAlert = get_model("partner", "StockAlert")
+StockRecord = get_model("partner", "StockRecord")
 PartnerAddress = get_model("partner", "PartnerAddress")
 Country = get_model("address", "Country")
 
@@ -121,6 +128,118 @@ class TestStockRecordNoStockTrack(TestCase):
         self.assertEqual(stockrecord.num_allocated, None)
 
 
+class TestBulkStockAdjustment(TestCase):
+    def setUp(self):
+        self.first = factories.create_stockrecord(
+            factories.create_product(), num_in_stock=10
+        )
+        self.second = factories.create_stockrecord(
+            factories.create_product(), num_in_stock=5
+        )
+        untracked_class = factories.ProductClassFactory(track_stock=False)
+        self.untracked = factories.create_stockrecord(
+            factories.create_product(product_class=untracked_class), num_in_stock=5
+        )
+
+    def get_levels(self):
+        return list(
+            StockRecord.objects.order_by("pk").values_list(
+                "num_in_stock", "num_allocated"
+            )
+        )
+
+    def test_allocates_many_stock_records(self):
+        handler = mock.Mock()
+        stock_levels_updated.connect(handler)
+        self.addCleanup(stock_levels_updated.disconnect, handler)
+
+        updated = StockRecord.objects.allocate(
+            [(self.first, 2), (self.second, 3), (self.first, 1), (self.untracked, 1)]
+        )
+
+        self.assertEqual(updated, [self.first, self.second])
+        self.assertEqual(self.get_levels(), [(10, 3), (5, 3), (5, None)])
+        self.assertEqual(self.first.num_allocated, 3)
+        handler.assert_called_once()
+        self.assertEqual(handler.call_args[1]["action"], "allocate")
+
+    def test_refuses_over_allocation(self):
+        with self.assertRaises(InvalidStockAdjustment):
+            StockRecord.objects.allocate(
+                [(self.first, 2), (self.second, 6)], refuse_over_allocation=True
+            )
+        self.assertEqual(self.get_levels(), [(10, None), (5, None), (5, None)])
+
+        StockRecord.objects.allocate([(self.second, 6)])
+        self.assertEqual(self.second.net_stock_level, -1)
+
+    def test_consumes_allocations(self):
+        StockRecord.objects.allocate([(self.first, 4), (self.second, 2)])
+        StockRecord.objects.consume_allocations([(self.first, 3), (self.second, 2)])
+        self.assertEqual(self.get_levels(), [(7, 1), (3, 0), (5, None)])
+
+        with self.assertRaises(InvalidStockAdjustment):
+            StockRecord.objects.consume_allocations([(self.first, 1), (self.second, 1)])
+        self.assertEqual(self.get_levels(), [(7, 1), (3, 0), (5, None)])
+
+    def test_cancels_allocations(self):
+        StockRecord.objects.allocate([(self.first, 4), (self.second, 2)])
+        StockRecord.objects.cancel_allocations([(self.first, 3), (self.second, 5)])
+        self.assertEqual(self.get_levels(), [(10, 1), (5, 0), (5, None)])
+
+    def test_updates_stock_alerts(self):
+        self.first.low_stock_threshold = 8
+        self.first.save()
+        StockRecord.objects.allocate([(self.first, 3), (self.second, 1)])
+        alert = StockAlert.objects.get()
+        self.assertEqual(alert.stockrecord, self.first)
+
+        StockRecord.objects.cancel_allocations([(self.first, 3)])
+        alert.refresh_from_db()
+        self.assertEqual(alert.status, StockAlert.CLOSED)
+
+    def test_updates_date_updated(self):
+        date_updated = self.first.date_updated
+        StockRecord.objects.allocate([(self.first, 1)])
+        self.assertGreater(self.first.date_updated, date_updated)
+        self.first.refresh_from_db()
+        self.assertGreater(self.first.date_updated, date_updated)
+
+    def test_does_not_send_save_signals_by_default(self):
+        handler = mock.Mock()
+        post_save.connect(handler, sender=StockRecord)
+        self.addCleanup(post_save.disconnect, handler, sender=StockRecord)
+
+        StockRecord.objects.allocate([(self.first, 1)])
+        handler.assert_not_called()
+
+    @override_settings(OSCAR_STOCK_ADJUSTMENTS_SEND_SAVE_SIGNALS=True)
+    def test_sends_save_signals_when_enabled(self):
+        levels = []
+
+        def pre_handler(instance, **kwargs):
+            levels.append(
+                StockRecord.objects.values_list("num_allocated", flat=True).get(
+                    pk=instance.pk
+                )
+            )
+
+        post_handler = mock.Mock()
+        pre_save.connect(pre_handler, sender=StockRecord)
+        post_save.connect(post_handler, sender=StockRecord)
+        self.addCleanup(pre_save.disconnect, pre_handler, sender=StockRecord)
+        self.addCleanup(post_save.disconnect, post_handler, sender=StockRecord)
+
+        StockRecord.objects.allocate([(self.first, 2), (self.second, 1)])
+
+        self.assertEqual(levels, [None, None])
+        self.assertEqual(post_handler.call_count, 2)
+        kwargs = post_handler.call_args_list[0][1]
+        self.assertEqual(kwargs["instance"], self.first)
+        self.assertFalse(kwargs["created"])
+        self.assertIn("num_allocated", kwargs["update_fields"])
+
+
 class TestPartnerAddress(TestCase):
     def setUp(self):
         self.partner = Partner._default_manager.create(name="Dummy partner")
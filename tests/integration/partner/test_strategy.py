@@ -120,6 +120,129 @@ class TestDefaultStrategyForParentProductWithOutOfStockVariant(TestCase):
         self.assertEqual(D("10.00"), self.info.price.incl_tax)
 
 
+class TestFetchForProducts(TestCase):
+    def setUp(self):
+        self.strategy = strategy.Default()
+        self.parents = []
+        for __ in range(3):
+            parent = factories.create_product(structure="parent")
+            factories.create_product(parent=parent, price=D("5.00"), num_in_stock=0)
+            factories.create_product(parent=parent, price=D("6.00"), num_in_stock=2)
+            self.parents.append(parent)
+        self.products = [
+            factories.create_product(price=D("1.99"), num_in_stock=4),
+            factories.create_product(),
+        ]
+
+    def test_fetches_purchase_info_with_a_fixed_number_of_queries(self):
+        products = list(models.Product.objects.filter(parent=None).order_by("pk"))
+        # Product classes, public children and stockrecords
+        with self.assertNumQueries(3):
+            purchase_info = self.strategy.fetch_for_products(products)
+
+        self.assertEqual(len(purchase_info), 5)
+        for parent in self.parents:
+            info = purchase_info[parent.pk]
+            self.assertTrue(info.availability.is_available_to_buy)
+            self.assertEqual(info.price.excl_tax, D("6.00"))
+            self.assertIsNone(info.stockrecord)
+        available, unavailable = self.products
+        self.assertEqual(purchase_info[available.pk].price.excl_tax, D("1.99"))
+        self.assertTrue(purchase_info[available.pk].availability.is_available_to_buy)
+        self.assertFalse(purchase_info[unavailable.pk].price.exists)
+
+    def test_matches_fetching_for_each_product(self):
+        for product in self.parents + self.products:
+            product = models.Product.objects.get(pk=product.pk)
+            expected = (
+                self.strategy.fetch_for_parent(product)
+                if product.is_parent
+                else self.strategy.fetch_for_product(product)
+            )
+            info = self.strategy.fetch_for_products([product])[product.pk]
+            self.assertEqual(info.price.excl_tax, expected.price.excl_tax)
+            self.assertEqual(info.availability.code, expected.availability.code)
+            self.assertEqual(info.stockrecord, expected.stockrecord)
+
+    def test_doesnt_reload_prefetched_relations(self):
+        products = list(
+            models.Product.objects.base_queryset()
+            .prefetch_public_children(
+                models.Product.objects.public().prefetch_related("stockrecords")
+            )
+            .filter(parent=None)
+        )
+        with self.assertNumQueries(0):
+            self.strategy.fetch_for_products(products)
+
+
+class TestPurchaseInfoMemo(TestCase):
+    def setUp(self):
+        self.strategy = strategy.Default()
+        self.product = factories.create_product(price=D("1.99"), num_in_stock=4)
+        self.stockrecord = self.product.stockrecords.get()
+
+    def test_memoises_purchase_info_of_products(self):
+        info = self.strategy.fetch_for_product(self.product)
+        with self.assertNumQueries(0):
+            self.assertIs(self.strategy.fetch_for_product(self.product), info)
+        self.assertEqual((self.strategy.memo_hits, self.strategy.memo_misses), (1, 1))
+        self.assertEqual(self.strategy.memo_hit_rate, 0.5)
+
+    def test_memoises_per_stockrecord(self):
+        other = factories.create_stockrecord(self.product, price=D("2.50"))
+        self.strategy.fetch_for_product(self.product)
+        info = self.strategy.fetch_for_product(self.product, other)
+        self.assertEqual(info.price.excl_tax, D("2.50"))
+        self.assertEqual(self.strategy.memo_misses, 2)
+
+    def test_memoises_purchase_info_of_lines_per_options(self):
+        basket = factories.create_basket(empty=True)
+        basket.add_product(self.product)
+        line = basket.all_lines()[0]
+        info = self.strategy.fetch_for_line(line)
+        self.assertIs(self.strategy.fetch_for_line(line), info)
+        option = factories.OptionFactory()
+        line.attributes.create(option=option, value="red")
+        line = basket.lines.prefetch_related("attributes").get()
+        self.strategy.fetch_for_line(line)
+        # Lines with other options still share the product's purchase info
+        self.assertEqual((self.strategy.memo_hits, self.strategy.memo_misses), (2, 3))
+
+    def test_stockrecord_changes_invalidate_the_memo(self):
+        self.strategy.fetch_for_product(self.product)
+        self.stockrecord.price = D("3.00")
+        self.stockrecord.save()
+        info = self.strategy.fetch_for_product(self.product)
+        self.assertEqual(info.price.excl_tax, D("3.00"))
+        self.assertEqual(self.strategy.memo_hits, 0)
+
+    def test_bulk_stock_adjustments_invalidate_the_memo(self):
+        self.strategy.fetch_for_product(self.product)
+        StockRecord = self.stockrecord.__class__
+        StockRecord.objects.allocate([(self.stockrecord, 4)])
+        info = self.strategy.fetch_for_product(self.product)
+        self.assertFalse(info.availability.is_available_to_buy)
+
+    def test_child_stockrecord_changes_invalidate_the_parent(self):
+        parent = factories.create_product(structure="parent")
+        child = factories.create_product(parent=parent, price=D("5.00"))
+        self.strategy.fetch_for_parent(parent)
+        stockrecord = child.stockrecords.get()
+        stockrecord.price = D("6.00")
+        stockrecord.save()
+        info = self.strategy.fetch_for_parent(parent)
+        self.assertEqual(info.price.excl_tax, D("6.00"))
+
+    def test_memo_is_bounded(self):
+        self.strategy.memo_size = 2
+        products = [factories.create_product() for __ in range(3)]
+        for product in products:
+            self.strategy.fetch_for_product(product)
+        self.strategy.fetch_for_product(products[0])
+        self.assertEqual(self.strategy.memo_misses, 4)
+
+
 class TestFixedRateTax(TestCase):
     def test_pricing_policy_unavailable_if_no_price_excl_tax(self):
         product = factories.ProductFactory(stockrecords=[])
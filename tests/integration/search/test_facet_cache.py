@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from haystack.backends.whoosh_backend import WhooshSearchBackend
+
+from oscar.apps.search import facets
+from oscar.apps.search.views import base
+from oscar.test import factories
+
+
+@override_settings(OSCAR_SEARCH_FACETS_CACHE_TIMEOUT=60)
+class TestFacetCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        factories.create_product(title="Facet test")
+        self.url = reverse("catalogue:index")
+        patcher = mock.patch.object(
+            base.FacetMunger, "facet_data", autospec=True, return_value={}
+        )
+        self.facet_data = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, params=None):
+        with mock.patch.object(base, "base_sqs", wraps=facets.base_sqs) as base_sqs:
+            response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, base_sqs.call_args.kwargs["facets"]
+
+    def test_serves_facets_from_the_cache(self):
+        response, with_facets = self.get()
+        self.assertTrue(with_facets)
+        self.assertEqual(self.facet_data.call_count, 1)
+
+        cached_response, with_facets = self.get({"page": "1"})
+        self.assertFalse(with_facets)
+        self.assertEqual(self.facet_data.call_count, 1)
+        self.assertEqual(cached_response.context["facets"], response.context["facets"])
+        self.assertEqual(cached_response.context["facet_data"], {})
+
+    def test_doesnt_search_again_for_cached_facets(self):
+        searches = []
+        for params in [None, {"page": "1"}]:
+            with mock.patch.object(
+                WhooshSearchBackend,
+                "search",
+                autospec=True,
+                side_effect=WhooshSearchBackend.search,
+            ) as search:
+                self.get(params)
+            searches.append(search.call_args_list)
+        uncached, cached = searches
+        self.assertTrue(any(call.kwargs.get("facets") for call in uncached))
+        self.assertFalse(any(call.kwargs.get("facets") for call in cached))
+        self.assertEqual(len(cached), len(uncached))
+
+    def test_caches_facets_by_selected_facets_and_sort_order(self):
+        params = [
+            {},
+            {"sort_by": "newest"},
+            {"selected_facets": ["rating:5", "product_class:Book"]},
+        ]
+        for param in params:
+            __, with_facets = self.get(param)
+            self.assertTrue(with_facets)
+        __, with_facets = self.get(
+            {"selected_facets": ["product_class:Book", "rating:5"]}
+        )
+        self.assertFalse(with_facets)
+
+    def test_doesnt_cache_searches_with_a_query_or_other_params(self):
+        self.get({"q": "facet"})
+        self.get({"q": "facet"})
+        self.get({"utm_source": "newsletter"})
+        self.get({"utm_source": "newsletter"})
+        self.assertEqual(self.facet_data.call_count, 4)
+
+    def test_indexing_a_product_invalidates_cached_facets(self):
+        self.get()
+        factories.create_product(title="Another")
+        __, with_facets = self.get()
+        self.assertTrue(with_facets)
+        self.assertEqual(self.facet_data.call_count, 2)
+
+    @override_settings(OSCAR_SEARCH_FACETS_CACHE_TIMEOUT=0)
+    def test_is_disabled_without_a_timeout(self):
+        self.get()
+        __, with_facets = self.get()
+        self.assertTrue(with_facets)
+        self.assertEqual(self.facet_data.call_count, 2)
@@ -0,0 +1,82 @@
+import os
+import tempfile
+from decimal import Decimal as D
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from oscar.apps.catalogue.models import Product
+from oscar.apps.search.indexing import ProductIndexBuilder
+from oscar.test import factories
+
+
+class IndexingTestMixin(object):
+    def setUp(self):
+        cache.clear()
+        category = factories.CategoryFactory()
+        self.products = []
+        for i in range(4):
+            product = factories.create_product(
+                upc="upc-%d" % i, price=D("%d.00" % (i + 1)), num_in_stock=i
+            )
+            factories.ProductCategoryFactory(product=product, category=category)
+            self.products.append(product)
+        self.parent = factories.create_product(structure="parent")
+        factories.create_product(parent=self.parent, price=D("7.00"))
+        self.products.append(self.parent)
+        checkpoint_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(checkpoint_dir.cleanup)
+        self.checkpoint_path = os.path.join(checkpoint_dir.name, "index.checkpoint")
+        self.builder = ProductIndexBuilder(
+            chunk_size=2, checkpoint_path=self.checkpoint_path
+        )
+        self.index = self.builder.get_index()
+
+
+class TestProductIndexChunks(IndexingTestMixin, TestCase):
+    def test_prepares_chunks_with_a_fixed_number_of_queries(self):
+        pks = sorted(product.pk for product in self.products)
+        # Products, categories, attribute values, attributes, children and
+        # stockrecords
+        with self.assertNumQueries(6):
+            products = self.index.load_chunk(pks[0], pks[-1])
+            prepared = [self.index.full_prepare(product) for product in products]
+        self.assertEqual(len(prepared), 5)
+
+    def test_prepares_the_same_data_as_products_loaded_individually(self):
+        pks = sorted(product.pk for product in self.products)
+        for product in self.index.load_chunk(pks[0], pks[-1]):
+            expected = self.index.full_prepare(Product.objects.get(pk=product.pk))
+            self.assertEqual(self.index.full_prepare(product), expected)
+
+
+@mock.patch("haystack.backends.whoosh_backend.WhooshSearchBackend.update")
+class TestProductIndexBuilder(IndexingTestMixin, TestCase):
+    def get_indexed_pks(self, update):
+        return [
+            [product.pk for product in call.args[1]] for call in update.call_args_list
+        ]
+
+    def test_indexes_products_in_chunks(self, update):
+        self.assertEqual(self.builder.build(), 5)
+        pks = sorted(product.pk for product in self.products)
+        self.assertEqual(self.get_indexed_pks(update), [pks[:2], pks[2:4], pks[4:]])
+        self.assertIsNone(self.builder.get_checkpoint())
+
+    def test_keeps_a_checkpoint_of_indexed_chunks(self, update):
+        update.side_effect = [None, Exception("Backend unavailable")]
+        with self.assertRaises(Exception):
+            self.builder.build()
+        pks = sorted(product.pk for product in self.products)
+        self.assertEqual(self.builder.get_checkpoint(), pks[1])
+
+        # Another process resumes from the checkpoint file
+        builder = ProductIndexBuilder(
+            chunk_size=2, checkpoint_path=self.checkpoint_path
+        )
+        update.side_effect = None
+        update.reset_mock()
+        self.assertEqual(builder.build(resume=True), 3)
+        self.assertEqual(self.get_indexed_pks(update), [pks[2:4], pks[4:]])
+        self.assertFalse(os.path.exists(self.checkpoint_path))
@@ -0,0 +1,105 @@
+from decimal import Decimal as D
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from oscar.apps.search.indexing import ProductIndexQueue
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+Product = get_model("catalogue", "Product")
+ProductIndexQueueEntry = get_model("search", "ProductIndexQueueEntry")
+StockRecord = get_model("partner", "StockRecord")
+
+
+def get_queued_ids():
+    return set(ProductIndexQueueEntry.objects.values_list("product_id", flat=True))
+
+
+@override_settings(OSCAR_SEARCH_INDEX_QUEUE=True)
+class TestChangeCapture(TestCase):
+    def setUp(self):
+        self.product = factories.create_product(price=D("5.00"), num_in_stock=3)
+        ProductIndexQueueEntry.objects.all().delete()
+
+    def test_queues_changed_products(self):
+        self.product.title = "New title"
+        self.product.save()
+        self.assertEqual(get_queued_ids(), {self.product.pk})
+
+    def test_queues_parents_of_changed_children(self):
+        parent = factories.create_product(structure="parent")
+        child = factories.create_product(parent=parent)
+        ProductIndexQueueEntry.objects.all().delete()
+        child.delete()
+        self.assertIn(parent.pk, get_queued_ids())
+
+    def test_queues_stock_changes(self):
+        stockrecord = self.product.stockrecords.get()
+        StockRecord.objects.allocate([(stockrecord, 2)])
+        self.assertEqual(get_queued_ids(), {self.product.pk})
+
+    def test_queues_category_changes(self):
+        category = factories.CategoryFactory()
+        self.product.categories.add(category)
+        self.assertEqual(get_queued_ids(), {self.product.pk})
+        ProductIndexQueueEntry.objects.all().delete()
+
+        category.is_public = False
+        category.save()
+        self.assertEqual(get_queued_ids(), {self.product.pk})
+
+    @override_settings(OSCAR_SEARCH_INDEX_QUEUE=False)
+    def test_doesnt_queue_unless_enabled(self):
+        self.product.save()
+        self.assertEqual(get_queued_ids(), set())
+
+
+@mock.patch("haystack.backends.whoosh_backend.WhooshSearchBackend.remove")
+@mock.patch("haystack.backends.whoosh_backend.WhooshSearchBackend.update")
+class TestProductIndexQueue(TestCase):
+    def setUp(self):
+        self.products = [factories.create_product() for __ in range(3)]
+        self.queue = ProductIndexQueue(batch_size=3)
+
+    def test_processes_deduplicated_batches(self, update, remove):
+        for product in self.products + self.products[:2]:
+            self.queue.enqueue([product.pk])
+        self.assertEqual(self.queue.get_length(), 5)
+        self.assertIsNotNone(self.queue.get_lag())
+
+        self.assertEqual(self.queue.process(), 5)
+        indexed = [
+            {product.pk for product in call.args[1]} for call in update.call_args_list
+        ]
+        pks = [product.pk for product in self.products]
+        self.assertEqual(indexed, [set(pks), set(pks[:2])])
+        self.assertEqual(self.queue.get_length(), 0)
+        self.assertIsNone(self.queue.get_lag())
+        remove.assert_not_called()
+
+    def test_removes_products_that_arent_indexable(self, update, remove):
+        deleted, hidden = self.products[:2]
+        deleted_pk = deleted.pk
+        deleted.delete()
+        Product.objects.filter(pk=hidden.pk).update(is_public=False)
+        self.queue.enqueue([deleted_pk, hidden.pk])
+        remove.reset_mock()
+        self.queue.process()
+        update.assert_not_called()
+        removed = {call.args[0] for call in remove.call_args_list}
+        self.assertEqual(
+            removed,
+            {"catalogue.product.%s" % deleted_pk, "catalogue.product.%s" % hidden.pk},
+        )
+
+    def test_command_processes_the_queue_and_prints_stats(self, update, remove):
+        self.queue.enqueue([self.products[0].pk])
+        out = StringIO()
+        call_command("oscar_process_product_index_queue", "--stats", stdout=out)
+        self.assertIn("Queued changes: 1", out.getvalue())
+        call_command("oscar_process_product_index_queue", stdout=out)
+        self.assertIn("Processed 1 queued changes", out.getvalue())
+        self.assertEqual(self.queue.get_length(), 0)
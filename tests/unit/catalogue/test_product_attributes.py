@@ -72,7 +72,7 @@ class ProductAttributeTest(TransactionTestCase):
         )
         self.child_product.full_clean()
 
-    def test_update_child_with_attributes(self, num_queries=11):
+    def test_update_child_with_attributes(self, num_queries=9):
         """
         Attributes preseent on the parent should not be copied to the child
         when title of the child is modified
@@ -128,7 +128,7 @@ class ProductAttributeTest(TransactionTestCase):
         self.child_product = Product.objects.prefetch_attribute_values().get(
             pk=self.child_product.pk
         )
-        self.test_update_child_with_attributes(num_queries=10)
+        self.test_update_child_with_attributes(num_queries=8)
 
     def test_update_child_attributes(self, num_queries=12):
         """